@@ -0,0 +1,195 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import argparse
+import json
+import logging
+import sys
+from multiprocessing import Manager
+
+# Third Party Imports
+
+# Local Imports
+from navigate.model.data_sources import FILE_TYPES
+from .acquisition import SCENARIOS, benchmark_acquisition
+from .analysis import benchmark_find_cell_boundary, benchmark_map_labels
+from .data_sources import benchmark_data_sources
+from .harness import create_model, get_environment
+
+
+def parse_arguments(argv=None):
+    """Parse the command line arguments of the benchmarks.
+
+    Parameters
+    ----------
+    argv : list, optional
+        Command line arguments. sys.argv if None.
+
+    Returns
+    -------
+    args : argparse.Namespace
+        Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark navigate acquisitions with synthetic hardware.",
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="*",
+        choices=list(SCENARIOS),
+        default=list(SCENARIOS),
+        help="Acquisition scenarios to run.",
+    )
+    parser.add_argument(
+        "--file-types",
+        nargs="*",
+        choices=FILE_TYPES,
+        default=FILE_TYPES,
+        help="Data sources to benchmark.",
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Also run the z-stack and multi-position scenarios with saving.",
+    )
+    parser.add_argument(
+        "--label-counts",
+        nargs="*",
+        type=int,
+        default=[10, 100, 1000, 10000],
+        help="Number of labels of each map_labels run.",
+    )
+    parser.add_argument(
+        "--downsamples",
+        nargs="*",
+        type=int,
+        default=[1, 2, 4],
+        help="Decimation factors of the chunked 3D segmentation runs.",
+    )
+    parser.add_argument(
+        "--volume-shape",
+        nargs=3,
+        type=int,
+        default=[32, 512, 512],
+        help="Shape (z, y, x) of the volume segmented.",
+    )
+    parser.add_argument("--frames", type=int, default=200, help="Frames per run.")
+    parser.add_argument(
+        "--image-size", type=int, default=512, help="Frame width and height."
+    )
+    parser.add_argument(
+        "--exposure", type=float, default=5.0, help="Exposure time in ms."
+    )
+    parser.add_argument(
+        "--output", default=None, help="JSON file for the results. stdout if None."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmarks and write the results as JSON.
+
+    Parameters
+    ----------
+    argv : list, optional
+        Command line arguments. sys.argv if None.
+    """
+    args = parse_arguments(argv)
+    logging.disable(logging.INFO)
+
+    results = []
+    if args.label_counts:
+        results += benchmark_map_labels(label_counts=args.label_counts)
+    if args.downsamples:
+        results += benchmark_find_cell_boundary(
+            shape=tuple(args.volume_shape), downsamples=args.downsamples
+        )
+
+    with Manager() as manager:
+        model = create_model(manager) if args.scenarios or args.file_types else None
+        if args.scenarios:
+            results += benchmark_acquisition(
+                model,
+                manager,
+                scenarios=args.scenarios,
+                number_of_frames=args.frames,
+                image_size=args.image_size,
+                exposure_time=args.exposure,
+                file_types=(None, *args.file_types) if args.save else (None,),
+            )
+        if args.file_types:
+            results += benchmark_data_sources(
+                model,
+                manager,
+                file_types=args.file_types,
+                number_of_frames=args.frames,
+                image_size=args.image_size,
+            )
+        if model is not None:
+            model.terminate()
+
+    report = {"environment": get_environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    for result in results:
+        name = result.get("scenario") or result["benchmark"]
+        if "peak_memory_mb" in result:
+            print(
+                f"{name:>29} {result.get('downsample', ''):>2}: "
+                f"{result['elapsed_s'] * 1e3:8.1f} ms "
+                f"{result['peak_memory_mb']:8.1f} MB",
+                file=sys.stderr,
+            )
+            continue
+        if "labels" in result:
+            print(
+                f"{name:>15} {result['labels']:>9}: "
+                f"{result['elapsed_s'] * 1e3:8.1f} ms",
+                file=sys.stderr,
+            )
+            continue
+        print(
+            f"{name:>15} {str(result['file_type']):>9}: "
+            f"{result['frames_per_second']:8.1f} frames/s",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
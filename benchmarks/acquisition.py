@@ -0,0 +1,151 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import shutil
+import tempfile
+
+# Third Party Imports
+
+# Local Imports
+from navigate.model.features.feature_related_functions import (
+    convert_str_to_feature_list,
+)
+from .harness import configure_acquisition, run_acquisition
+
+#: dict: Acquisition scenarios and their experiment settings.
+SCENARIOS = {
+    "live": {"image_mode": "live", "number_of_channels": 2},
+    "z-stack": {"image_mode": "z-stack", "number_of_channels": 2},
+    "multi-position": {
+        "image_mode": "z-stack",
+        "number_of_channels": 1,
+        "positions": [[float(i), 0.0, 0.0, 0.0, 0.0] for i in range(4)],
+    },
+    "customized": {
+        "image_mode": "customized",
+        "number_of_channels": 2,
+        "feature_list": "[({'name': PrepareNextChannel}, "
+        "{'name': LoopByCount, 'args': (%d,)})]",
+    },
+}
+
+
+def benchmark_acquisition(
+    model,
+    manager,
+    scenarios=None,
+    number_of_frames=200,
+    image_size=512,
+    exposure_time=5.0,
+    file_types=(None,),
+):
+    """Measure frames per second, display latency and dropped frames.
+
+    Parameters
+    ----------
+    model : navigate.model.model.Model
+        Model with synthetic hardware.
+    manager : multiprocessing.Manager
+        Manager of the shared configuration.
+    scenarios : list, optional
+        Names of the scenarios to run. All scenarios if None.
+    number_of_frames : int
+        Approximate number of frames of each acquisition.
+    image_size : int
+        Width and height of the camera frames in pixels.
+    exposure_time : float
+        Camera exposure time in milliseconds.
+    file_types : tuple
+        File types to save the data as. None runs without saving. Live mode never
+        saves.
+
+    Returns
+    -------
+    results : list
+        One record per scenario and file type.
+    """
+    results = []
+    for name in scenarios or SCENARIOS:
+        settings = dict(SCENARIOS[name])
+        feature_list = settings.pop("feature_list", None)
+        number_of_channels = settings["number_of_channels"]
+        number_of_positions = len(settings.get("positions") or [None])
+        number_z_steps = max(
+            number_of_frames // (number_of_channels * number_of_positions), 1
+        )
+
+        for file_type in file_types:
+            if file_type is not None and settings["image_mode"] in (
+                "live",
+                "customized",
+            ):
+                continue
+
+            save_directory = tempfile.mkdtemp(prefix="navigate-benchmark-")
+            try:
+                configure_acquisition(
+                    model,
+                    manager,
+                    image_size=image_size,
+                    number_z_steps=number_z_steps,
+                    exposure_time=exposure_time,
+                    is_save=file_type is not None,
+                    file_type=file_type or "TIFF",
+                    save_directory=save_directory,
+                    **settings,
+                )
+                if feature_list:
+                    model.addon_feature = convert_str_to_feature_list(
+                        feature_list % number_of_frames
+                    )
+                metrics = run_acquisition(
+                    model,
+                    max_frames=number_of_frames
+                    if settings["image_mode"] == "live"
+                    else None,
+                )
+            finally:
+                model.addon_feature = None
+                shutil.rmtree(save_directory, ignore_errors=True)
+
+            results.append(
+                {
+                    "benchmark": "acquisition",
+                    "scenario": name,
+                    "file_type": file_type,
+                    "image_size": image_size,
+                    "exposure_time_ms": exposure_time,
+                    **metrics,
+                }
+            )
+    return results
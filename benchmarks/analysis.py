@@ -0,0 +1,249 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import math
+import time
+import tracemalloc
+
+# Third Party Imports
+import numpy as np
+
+# Local Imports
+from navigate.model.analysis.boundary_detect import (
+    find_cell_boundary_3d,
+    find_cell_boundary_3d_chunked,
+    map_labels,
+)
+
+
+def synthetic_labels(number_of_labels, label_size=16, z_steps=8, seed=0):
+    """Create a labeled volume of boxes in a jittered grid.
+
+    Parameters
+    ----------
+    number_of_labels : int
+        Number of labels.
+    label_size : int
+        Grid spacing in pixels. Each box is at most label_size - 2 pixels wide.
+    z_steps : int
+        Number of z planes.
+    seed : int
+        Seed of the random box sizes.
+
+    Returns
+    -------
+    labeled_image : ndarray
+        z_steps x N x N array of labels, 0 is the background.
+    """
+    rng = np.random.default_rng(seed)
+    side = math.ceil(math.sqrt(number_of_labels))
+    labeled_image = np.zeros((z_steps, side * label_size, side * label_size), np.int32)
+    for i in range(number_of_labels):
+        row, column = divmod(i, side)
+        z0, y0, x0 = rng.integers(0, [z_steps // 2, 3, 3])
+        dz, dy, dx = rng.integers([1, 10, 10], [z_steps // 2 + 1, 14, 14])
+        y0, x0 = y0 + row * label_size, x0 + column * label_size
+        labeled_image[z0 : z0 + dz, y0 : y0 + dy, x0 : x0 + dx] = i + 1
+    return labeled_image
+
+
+def benchmark_map_labels(label_counts=(10, 100, 1000, 10000), repeats=3):
+    """Measure the time to map labels to a table of tile positions.
+
+    Parameters
+    ----------
+    label_counts : tuple
+        Number of labels in each synthetic volume.
+    repeats : int
+        Number of runs per volume. The fastest one is reported.
+
+    Returns
+    -------
+    results : list
+        One record per label count.
+    """
+    results = []
+    for number_of_labels in label_counts:
+        labeled_image = synthetic_labels(number_of_labels)
+        height, width = labeled_image.shape[1:]
+        elapsed = math.inf
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            _, position_table, _ = map_labels(
+                labeled_image,
+                position=[0.0, 0.0, 0.0, 0.0, 0.0],
+                z_start=0,
+                z_step=1.0,
+                x_direction="x",
+                y_direction="y",
+                current_pixel_size=6.5,
+                current_image_width=width,
+                current_image_height=height,
+                target_pixel_size=0.5,
+                target_image_width=64,
+                target_image_height=64,
+            )
+            elapsed = min(elapsed, time.perf_counter() - start_time)
+        results.append(
+            {
+                "benchmark": "map_labels",
+                "labels": number_of_labels,
+                "image_shape": list(labeled_image.shape),
+                "positions": len(position_table),
+                "elapsed_s": elapsed,
+                "seconds_per_label": elapsed / number_of_labels,
+            }
+        )
+    return results
+
+
+def synthetic_blobs(shape=(32, 512, 512), number_of_blobs=40, seed=0):
+    """Create a noisy volume of bright spheres, every other one hollow.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of the volume in z, y and x.
+    number_of_blobs : int
+        Number of spheres.
+    seed : int
+        Seed of the noise, sphere positions and radii.
+
+    Returns
+    -------
+    image : ndarray
+        uint16 volume.
+    """
+    rng = np.random.default_rng(seed)
+    image = rng.normal(100, 10, shape).astype(np.float32)
+    for i in range(number_of_blobs):
+        center = rng.uniform(0, shape)
+        radius = rng.uniform(4, 16)
+        low = np.maximum(np.floor(center - radius), 0).astype(int)
+        high = np.minimum(np.ceil(center + radius) + 1, shape).astype(int)
+        z, y, x = np.ogrid[low[0] : high[0], low[1] : high[1], low[2] : high[2]]
+        distance = np.sqrt(
+            (z - center[0]) ** 2 + (y - center[1]) ** 2 + (x - center[2]) ** 2
+        )
+        blob = distance < radius
+        if i % 2:
+            blob &= distance > radius - 3
+        image[low[0] : high[0], low[1] : high[1], low[2] : high[2]][blob] += 1000
+    return image.clip(0, 2**16 - 1).astype(np.uint16)
+
+
+def measure_call(function, *args, **kwargs):
+    """Call a function and measure its wall time and peak memory.
+
+    Parameters
+    ----------
+    function : callable
+        Function to measure.
+    *args, **kwargs
+        Arguments of the function.
+
+    Returns
+    -------
+    result : object
+        Return value of the function.
+    elapsed : float
+        Wall time in seconds.
+    peak_memory : int
+        Peak of the memory allocated during the call in bytes, as traced by
+        tracemalloc.
+    """
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    try:
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start_time
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak_memory
+
+
+def benchmark_find_cell_boundary(
+    shape=(32, 512, 512), downsamples=(1, 2, 4), slab_size=16, max_workers=None
+):
+    """Compare the chunked 3D segmentation with find_cell_boundary_3d.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of the synthetic volume in z, y and x.
+    downsamples : tuple
+        Decimation factors of the chunked segmentation.
+    slab_size : int
+        Number of z planes per slab.
+    max_workers : int, optional
+        Number of threads of the chunked segmentation.
+
+    Returns
+    -------
+    results : list
+        One record for find_cell_boundary_3d and one per decimation factor.
+    """
+    image = synthetic_blobs(shape)
+    expected, elapsed, peak_memory = measure_call(find_cell_boundary_3d, image)
+    results = [
+        {
+            "benchmark": "find_cell_boundary_3d",
+            "image_shape": list(shape),
+            "labels": int(expected.max()),
+            "elapsed_s": elapsed,
+            "peak_memory_mb": peak_memory / 1e6,
+        }
+    ]
+    for downsample in downsamples:
+        labels, elapsed, peak_memory = measure_call(
+            find_cell_boundary_3d_chunked,
+            image,
+            downsample=downsample,
+            slab_size=slab_size,
+            max_workers=max_workers,
+        )
+        results.append(
+            {
+                "benchmark": "find_cell_boundary_3d_chunked",
+                "image_shape": list(shape),
+                "downsample": downsample,
+                "slab_size": slab_size,
+                "labels": int(labels.max()),
+                "labels_match": bool(np.array_equal(labels, expected)),
+                "foreground_match": float(np.mean((labels > 0) == (expected > 0))),
+                "elapsed_s": elapsed,
+                "peak_memory_mb": peak_memory / 1e6,
+            }
+        )
+    return results
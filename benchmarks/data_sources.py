@@ -0,0 +1,145 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import os
+import shutil
+import tempfile
+import time
+
+# Third Party Imports
+import numpy as np
+
+# Local Imports
+from navigate.model.data_sources import FILE_TYPES, get_data_source
+from .harness import configure_acquisition
+
+
+def get_size_on_disk(path):
+    """Get the size of a file or directory in bytes.
+
+    Parameters
+    ----------
+    path : str
+        Path to a file or directory.
+
+    Returns
+    -------
+    size : int
+        Size in bytes.
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    size = 0
+    for root, _, files in os.walk(path):
+        size += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return size
+
+
+def benchmark_data_sources(
+    model, manager, file_types=None, number_of_frames=200, image_size=512
+):
+    """Measure the write throughput of each data source.
+
+    A single channel z-stack is written to a temporary directory, without the
+    acquisition in the loop.
+
+    Parameters
+    ----------
+    model : navigate.model.model.Model
+        Model with synthetic hardware, used for its configuration.
+    manager : multiprocessing.Manager
+        Manager of the shared configuration.
+    file_types : list, optional
+        File types to benchmark. All file types if None.
+    number_of_frames : int
+        Number of frames written.
+    image_size : int
+        Width and height of the frames in pixels.
+
+    Returns
+    -------
+    results : list
+        One record per file type.
+    """
+    configure_acquisition(
+        model,
+        manager,
+        image_mode="z-stack",
+        image_size=image_size,
+        number_of_channels=1,
+        number_z_steps=number_of_frames,
+    )
+    microscope_name = model.configuration["experiment"]["MicroscopeState"][
+        "microscope_name"
+    ]
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 2**12, size=(8, image_size, image_size), dtype=np.uint16)
+
+    results = []
+    for file_type in file_types or FILE_TYPES:
+        save_directory = tempfile.mkdtemp(prefix="navigate-benchmark-")
+        ext = "." + file_type.lower().replace(" ", ".").replace("-", ".")
+        file_name = os.path.join(save_directory, f"benchmark{ext}")
+        try:
+            data_source = get_data_source(file_type)(file_name=file_name)
+            data_source.set_metadata_from_configuration_experiment(
+                model.configuration, microscope_name
+            )
+
+            start_time = time.perf_counter()
+            for i in range(number_of_frames):
+                data_source.write(
+                    frames[i % len(frames)], x=0.0, y=0.0, z=float(i), theta=0.0, f=0.0
+                )
+            write_time = time.perf_counter() - start_time
+            data_source.close()
+            elapsed = time.perf_counter() - start_time
+            size_on_disk = get_size_on_disk(save_directory)
+        finally:
+            shutil.rmtree(save_directory, ignore_errors=True)
+
+        data_size = number_of_frames * frames[0].nbytes
+        results.append(
+            {
+                "benchmark": "data_source",
+                "file_type": file_type,
+                "image_size": image_size,
+                "frames": number_of_frames,
+                "elapsed_s": elapsed,
+                "close_s": elapsed - write_time,
+                "frames_per_second": number_of_frames / elapsed,
+                "write_mb_per_s": data_size / elapsed / 1e6,
+                "size_on_disk_mb": size_on_disk / 1e6,
+            }
+        )
+    return results
@@ -0,0 +1,351 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import os
+import platform
+import queue
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+# Third Party Imports
+import numpy as np
+
+# Local Imports
+import navigate
+from navigate.config.config import (
+    load_configs,
+    update_config_dict,
+    verify_configuration,
+    verify_experiment_config,
+    verify_positions_config,
+    verify_waveform_constants,
+)
+
+#: Path: Configuration files that ship with the code base.
+CONFIGURATION_DIRECTORY = Path(navigate.__file__).resolve().parent / "config"
+
+
+def create_model(manager):
+    """Create a Model with synthetic hardware.
+
+    Parameters
+    ----------
+    manager : multiprocessing.Manager
+        Manager of the shared configuration.
+
+    Returns
+    -------
+    model : navigate.model.model.Model
+        Model with synthetic hardware.
+    """
+    from navigate.model.model import Model
+
+    configuration = load_configs(
+        manager,
+        configuration=CONFIGURATION_DIRECTORY / "configuration.yaml",
+        experiment=CONFIGURATION_DIRECTORY / "experiment.yml",
+        waveform_constants=CONFIGURATION_DIRECTORY / "waveform_constants.yml",
+        rest_api_config=CONFIGURATION_DIRECTORY / "rest_api_config.yml",
+    )
+    verify_configuration(manager, configuration)
+    verify_experiment_config(manager, configuration)
+    verify_waveform_constants(manager, configuration)
+    update_config_dict(
+        manager, configuration, "multi_positions", verify_positions_config([])
+    )
+
+    model = Model(
+        args=SimpleNamespace(synthetic_hardware=True),
+        configuration=configuration,
+        event_queue=queue.Queue(),
+    )
+    return model
+
+
+def configure_acquisition(
+    model,
+    manager,
+    image_mode="z-stack",
+    image_size=512,
+    number_of_channels=1,
+    number_z_steps=10,
+    positions=None,
+    exposure_time=5.0,
+    is_save=False,
+    file_type="TIFF",
+    save_directory=None,
+):
+    """Set the experiment of a benchmark acquisition.
+
+    Parameters
+    ----------
+    model : navigate.model.model.Model
+        Model with synthetic hardware.
+    manager : multiprocessing.Manager
+        Manager of the shared configuration.
+    image_mode : str
+        Acquisition mode: "live", "single", "z-stack" or "customized".
+    image_size : int
+        Width and height of the camera frames in pixels.
+    number_of_channels : int
+        Number of selected channels.
+    number_z_steps : int
+        Number of slices of a z-stack.
+    positions : list, optional
+        Multi-position table. A single position acquisition if None.
+    exposure_time : float
+        Camera exposure time in milliseconds.
+    is_save : bool
+        Save the data.
+    file_type : str
+        File type of the saved data.
+    save_directory : str, optional
+        Directory of the saved data.
+    """
+    experiment = model.configuration["experiment"]
+    state = experiment["MicroscopeState"]
+    microscope_name = state["microscope_name"]
+
+    state["image_mode"] = image_mode
+    state["is_save"] = is_save
+    state["timepoints"] = 1
+    state["stack_cycling_mode"] = "per_stack"
+    state["number_z_steps"] = number_z_steps
+    state["start_position"] = 0.0
+    state["end_position"] = float(number_z_steps - 1)
+    state["step_size"] = 1.0
+    state["start_focus"] = 0.0
+    state["end_focus"] = 0.0
+    for i, channel in enumerate(state["channels"].values()):
+        channel["is_selected"] = i < number_of_channels
+        channel["camera_exposure_time"] = exposure_time
+
+    state["is_multiposition"] = positions is not None
+    update_config_dict(manager, model.configuration, "multi_positions", positions or [])
+
+    camera_parameters = experiment["CameraParameters"]
+    camera_parameters["img_x_pixels"] = image_size
+    camera_parameters["img_y_pixels"] = image_size
+    camera_parameters[microscope_name]["x_pixels"] = image_size
+    camera_parameters[microscope_name]["y_pixels"] = image_size
+    camera_parameters[microscope_name]["img_x_pixels"] = image_size
+    camera_parameters[microscope_name]["img_y_pixels"] = image_size
+    camera_parameters[microscope_name]["center_x"] = image_size // 2
+    camera_parameters[microscope_name]["center_y"] = image_size // 2
+    model.get_data_buffer(image_size, image_size)
+
+    experiment["Saving"]["file_type"] = file_type
+    if save_directory is not None:
+        experiment["Saving"]["save_directory"] = save_directory
+
+
+class FrameRecorder:
+    """Record when frames are generated and delivered by the synthetic camera.
+
+    The synthetic camera's methods are wrapped on the instance, so the Model runs
+    unchanged.
+    """
+
+    def __init__(self, camera):
+        """Initialize the frame recorder.
+
+        Parameters
+        ----------
+        camera : navigate.model.devices.camera.synthetic.SyntheticCamera
+            Synthetic camera of the active microscope.
+        """
+        #: SyntheticCamera: Synthetic camera.
+        self.camera = camera
+
+        #: int: Number of frames generated by the camera.
+        self.generated = 0
+
+        #: int: Number of frames delivered to the data thread.
+        self.delivered = 0
+
+        #: dict: Time each frame id was delivered to the data thread.
+        self.delivery_time = {}
+
+        self._generate_new_frame = camera.generate_new_frame
+        self._get_new_frame = camera.get_new_frame
+        camera.generate_new_frame = self.generate_new_frame
+        camera.get_new_frame = self.get_new_frame
+
+    def generate_new_frame(self):
+        """Count generated frames."""
+        if self.camera.is_acquiring:
+            self.generated += 1
+        self._generate_new_frame()
+
+    def get_new_frame(self):
+        """Record the delivery time of frames."""
+        frame_ids = self._get_new_frame()
+        now = time.perf_counter()
+        self.delivered += len(frame_ids)
+        for frame_id in frame_ids:
+            self.delivery_time[frame_id] = now
+        return frame_ids
+
+    def restore(self):
+        """Remove the wrappers from the camera."""
+        del self.camera.generate_new_frame
+        del self.camera.get_new_frame
+
+
+def run_acquisition(model, max_frames=None, timeout=120.0):
+    """Run an acquisition and measure throughput and display latency.
+
+    Parameters
+    ----------
+    model : navigate.model.model.Model
+        Configured model.
+    max_frames : int, optional
+        Stop the acquisition after this many displayed frames. Required for live
+        mode, which does not end by itself.
+    timeout : float
+        Maximum duration of the acquisition in seconds.
+
+    Returns
+    -------
+    metrics : dict
+        Frames delivered, frames per second, display latency and dropped frames.
+    """
+    show_img_pipe = model.create_pipe("show_img_pipe")
+    recorder = FrameRecorder(model.active_microscope.camera)
+    latencies = []
+    displayed = 0
+    stop_requested = False
+
+    try:
+        start_time = time.perf_counter()
+        model.run_command("acquire")
+        while True:
+            if not show_img_pipe.poll(timeout):
+                model.run_command("stop")
+                raise TimeoutError("Benchmark acquisition timed out.")
+            frame_id = show_img_pipe.recv()
+            if frame_id == "stop":
+                break
+            now = time.perf_counter()
+            if frame_id in recorder.delivery_time:
+                latencies.append(now - recorder.delivery_time.pop(frame_id))
+            displayed += 1
+            if max_frames and displayed >= max_frames and not stop_requested:
+                model.run_command("stop")
+                stop_requested = True
+            if now - start_time > timeout and not stop_requested:
+                model.run_command("stop")
+                stop_requested = True
+        elapsed = time.perf_counter() - start_time
+        model.data_thread.join()
+        model.signal_thread.join()
+    finally:
+        recorder.restore()
+        model.release_pipe("show_img_pipe")
+        while not model.event_queue.empty():
+            model.event_queue.get()
+
+    frame_bytes = model.img_width * model.img_height * 2
+    return {
+        "frames_generated": recorder.generated,
+        "frames_delivered": recorder.delivered,
+        "frames_displayed": displayed,
+        "dropped_frames": max(recorder.generated - recorder.delivered, 0),
+        "elapsed_s": elapsed,
+        "frames_per_second": recorder.delivered / elapsed,
+        "throughput_mb_per_s": recorder.delivered * frame_bytes / elapsed / 1e6,
+        **summarize_latency(latencies),
+    }
+
+
+def summarize_latency(latencies):
+    """Summarize display latencies in milliseconds.
+
+    Parameters
+    ----------
+    latencies : list
+        Display latencies in seconds.
+
+    Returns
+    -------
+    summary : dict
+        Mean, median, 95th percentile and maximum latency in milliseconds.
+    """
+    if not latencies:
+        return {
+            "display_latency_mean_ms": None,
+            "display_latency_p50_ms": None,
+            "display_latency_p95_ms": None,
+            "display_latency_max_ms": None,
+        }
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "display_latency_mean_ms": float(latencies.mean()),
+        "display_latency_p50_ms": float(np.percentile(latencies, 50)),
+        "display_latency_p95_ms": float(np.percentile(latencies, 95)),
+        "display_latency_max_ms": float(latencies.max()),
+    }
+
+
+def get_environment():
+    """Describe the environment the benchmarks ran in.
+
+    Returns
+    -------
+    environment : dict
+        Date, navigate version, git commit, Python, NumPy and platform.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(__file__),
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "navigate_version": getattr(navigate, "__version__", None),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
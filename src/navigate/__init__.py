@@ -1,6 +1,10 @@
 import os
 from pathlib import Path
 
+if os.environ.get("NAVIGATE_PROFILE_STARTUP") == "1":
+    # Time imports from the start, e.g. in the model subprocess.
+    from .tools import startup_profiler  # noqa: F401
+
 from ._commit import __commit__  # noqa: F401
 
 with open(os.path.join(Path(__file__).resolve().parent, 'VERSION')) as version_file:
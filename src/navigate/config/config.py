@@ -46,6 +46,7 @@ import yaml
 
 # Local Imports
 from navigate.tools.common_functions import build_ref_name
+from navigate.tools.file_functions import parse_yaml_file
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -149,13 +150,12 @@ def load_configs(manager, **kwargs):
     for config_name, file_path in kwargs.items():
         file_path = Path(file_path)
         assert file_path.exists(), "Configuration File not found: {}".format(file_path)
-        with open(file_path) as f:
-            try:
-                config_data = yaml.load(f, Loader=yaml.FullLoader)
-                build_nested_dict(manager, config_dict, config_name, config_data)
-            except yaml.YAMLError as yaml_error:
-                print(f"Configuration - Yaml Error: {yaml_error}")
-                sys.exit(1)
+        try:
+            config_data = parse_yaml_file(file_path)
+            build_nested_dict(manager, config_dict, config_name, config_data)
+        except yaml.YAMLError as yaml_error:
+            print(f"Configuration - Yaml Error: {yaml_error}")
+            sys.exit(1)
 
     # return combined dictionary
     return config_dict
@@ -175,19 +175,34 @@ def build_nested_dict(manager, parent_dict, key_name, dict_data):
     dict_data : dict
         Dictionary to insert
     """
-    if type(dict_data) != dict and type(dict_data) != list:
-        parent_dict[key_name] = dict_data
-        return
-    if type(dict_data) == dict:
-        d = manager.dict()
-        for k in dict_data:
-            build_nested_dict(manager, d, k, dict_data[k])
-    else:
-        d = manager.list()
-        for i, v in enumerate(dict_data):
-            d.append(None)
-            build_nested_dict(manager, d, i, v)
-    parent_dict[key_name] = d
+    parent_dict[key_name] = build_proxy_object(manager, dict_data)
+
+
+def build_proxy_object(manager, data):
+    """Convert nested dictionaries and lists to manager proxies.
+
+    The tree is built bottom-up, and every dictionary or list is created with its
+    content in a single manager call instead of one call per item.
+
+    Parameters
+    ----------
+    manager : multiprocessing.Manager
+        Shares objects (e.g., dict) between processes
+    data : Any
+        Dictionary, list or value to convert.
+
+    Returns
+    -------
+    proxy : Union[DictProxy, ListProxy, Any]
+        Proxy of the dictionary or list, or data itself if it is a plain value.
+    """
+    if type(data) == dict:
+        return manager.dict(
+            {k: build_proxy_object(manager, v) for k, v in data.items()}
+        )
+    if type(data) == list:
+        return manager.list([build_proxy_object(manager, v) for v in data])
+    return data
 
 
 def update_config_dict(
@@ -220,8 +235,7 @@ def update_config_dict(
         if isfile(file_path) and (
             file_path.endswith(".yml") or file_path.endswith(".yaml")
         ):
-            with open(file_path) as f:
-                new_config = yaml.load(f, Loader=yaml.FullLoader)
+            new_config = parse_yaml_file(file_path)
         else:
             return False
 
@@ -536,6 +550,7 @@ def verify_experiment_config(manager, configuration):
         "abs_z_start": 0.0,
         "abs_z_end": 100.0,
         "waveform_template": "Default",
+        "optimize_channel_order": False,
     }
     if (
         "MicroscopeState" not in configuration["experiment"]
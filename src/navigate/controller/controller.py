@@ -57,6 +57,7 @@ from navigate.controller.sub_controllers import (
     CameraSettingController,
     CameraViewController,
     MIPViewController,
+    OverviewViewController,
     MultiPositionController,
     ChannelsTabController,
     AcquireBarController,
@@ -68,7 +69,10 @@ from navigate.controller.sub_controllers import (
     # AdaptiveOpticsPopupController,
 )
 
-from navigate.controller.thread_pool import SynchronizedThreadPool
+from navigate.controller.thread_pool import (
+    SynchronizedThreadPool,
+    get_cancellation_token,
+)
 
 # Local Model Imports
 from navigate.model.model import Model
@@ -93,6 +97,7 @@ from navigate.tools.file_functions import (
 from navigate.tools.common_dict_tools import update_stage_dict
 from navigate.tools.multipos_table_tools import update_table
 from navigate.tools.common_functions import combine_funcs
+from navigate.tools.tracing import tracer
 
 # Logger Setup
 import logging
@@ -268,6 +273,11 @@ class Controller:
             self.view.camera_waveform.mip_tab, self
         )
 
+        #: OverviewViewController: Overview Tab Sub-Controller.
+        self.overview_controller = OverviewViewController(
+            self.view.camera_waveform.overview_tab, self
+        )
+
         #: CameraSettingController: Camera Settings Tab Sub-Controller.
         self.camera_setting_controller = CameraSettingController(
             self.view.settings.camera_settings_tab, self
@@ -429,6 +439,7 @@ class Controller:
         # Populating Min and Max Counts
         self.camera_view_controller.initialize("minmax", [0, 2**16 - 1])
         self.mip_setting_controller.initialize("minmax", [0, 2**16 - 1])
+        self.overview_controller.initialize("minmax", [0, 2**16 - 1])
         self.camera_view_controller.initialize("image", [1, 0, 0])
 
     def populate_experiment_setting(self, file_name=None, in_initialize=False):
@@ -634,6 +645,7 @@ class Controller:
         self.camera_view_controller.set_mode(mode)
         self.camera_setting_controller.set_mode(mode)
         self.mip_setting_controller.set_mode(mode)
+        self.overview_controller.set_mode(mode)
         self.waveform_tab_controller.set_mode(mode)
 
         # additional microscopes
@@ -670,8 +682,12 @@ class Controller:
             args[0] : dict
                 dict = {'x': value, 'y': value, 'z': value, 'theta': value, 'f': value}
             """
+            # a newer move of the same axis replaces a waiting one.
             self.threads_pool.createThread(
-                "model", self.move_stage, args=({args[1] + "_abs": args[0]},)
+                "model",
+                self.move_stage,
+                args=({args[1] + "_abs": args[0]},),
+                coalesceKey=f"move_stage_{args[1]}",
             )
 
         elif command == "stop_stage":
@@ -964,12 +980,35 @@ class Controller:
 
             self.current_image_id = -1
 
+        elif command == "export_trace":
+            """Export the traced spans of the controller and the model.
+
+            Parameters
+            __________
+            args[0] : string
+                Path of the Chrome trace JSON file.
+            """
+            tracer.export_chrome_trace(
+                args[0], "controller", events=self.model.get_trace_events()
+            )
+
         elif command == "exit":
             """Exit the program.
 
             Saves the current settings to .navigate/config/*.yml files.
+            If tracing is enabled, the traced spans are saved to .navigate/traces.
             """
             self.sloppy_stop()
+            if tracer.enabled:
+                trace_directory = os.path.join(get_navigate_path(), "traces")
+                os.makedirs(trace_directory, exist_ok=True)
+                self.execute(
+                    "export_trace",
+                    os.path.join(
+                        trace_directory,
+                        f"trace_{time.strftime('%Y%m%d-%H%M%S')}.json",
+                    ),
+                )
             self.update_experiment_setting()
             file_directory = os.path.join(get_navigate_path(), "config")
             for config_name, filename in [("experiment", "experiment.yml"),
@@ -1059,6 +1098,8 @@ class Controller:
         """
         self.camera_view_controller.image_count = 0
         self.mip_setting_controller.image_count = 0
+        self.camera_view_controller.acquisition_plan = None
+        self.acquire_bar_controller.acquisition_plan = None
 
         # Start up Progress Bars
         images_received = 0
@@ -1091,18 +1132,38 @@ class Controller:
             self.configuration["experiment"]["CameraParameters"][microscope_name],
         )
 
+        self.mip_setting_controller.mip = self.model.get_mip_buffer()
         self.mip_setting_controller.initialize_non_live_display(
             self.configuration["experiment"]["MicroscopeState"],
             self.configuration["experiment"]["CameraParameters"][microscope_name],
         )
 
+        self.overview_controller.overview = self.model.get_overview_buffer()
+        self.overview_controller.initialize_non_live_display(
+            self.configuration["experiment"]["MicroscopeState"],
+            self.configuration["experiment"]["CameraParameters"][microscope_name],
+        )
+
+        # Frame table shared by the model, so frames need not be re-derived here.
+        acquisition_plan = self.model.get_acquisition_plan()
+        self.camera_view_controller.acquisition_plan = acquisition_plan
+        self.acquire_bar_controller.acquisition_plan = acquisition_plan
+
         self.stop_acquisition_flag = False
         start_time = time.time()
         self.camera_setting_controller.update_readout_time()
 
+        # Set when the pool cancels this task, e.g. on exit.
+        token = get_cancellation_token()
+
         while True:
             if self.stop_acquisition_flag:
                 break
+            if token is not None and token.cancelled:
+                # The model runs in another process and can not see the token.
+                if self.model is not None:
+                    self.execute("stop_acquire")
+                break
             # Receive the Image and log it.
             image_id = self.show_img_pipe.recv()
             logger.info(f"Navigate Controller - Received Image: {image_id}")
@@ -1121,15 +1182,19 @@ class Controller:
                 self.execute("stop_acquire")
 
             # Display the image and update the histogram
-            self.camera_view_controller.try_to_display_image(
-                image=self.data_buffer[image_id]
-            )
-            self.mip_setting_controller.try_to_display_image(
-                image=self.data_buffer[image_id]
-            )
-            self.histogram_controller.populate_histogram(
-                image=self.data_buffer[image_id]
-            )
+            with tracer.span("capture_image.display", frame=image_id):
+                self.camera_view_controller.try_to_display_image(
+                    image=self.data_buffer[image_id]
+                )
+                self.mip_setting_controller.try_to_display_image(
+                    image=self.data_buffer[image_id]
+                )
+                self.overview_controller.try_to_display_image(
+                    image=self.data_buffer[image_id]
+                )
+                self.histogram_controller.populate_histogram(
+                    image=self.data_buffer[image_id]
+                )
             images_received += 1
 
             # Update progress bar.
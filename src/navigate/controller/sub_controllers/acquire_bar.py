@@ -101,6 +101,9 @@ class AcquireBarController(GUIController):
         # framerate information.
         self.framerate = 0
 
+        #: AcquisitionPlan: Frame table of the current acquisition, if planned.
+        self.acquisition_plan = None
+
         #: dict: The ProxyDict for the BDV configuration.
         self.bdv_configuration = self.parent_controller.configuration["experiment"].get(
             "BDVParameters", None
@@ -148,36 +151,41 @@ class AcquireBarController(GUIController):
                 self.view.OvrAcq["value"] = 0
 
         # Calculate the number of images anticipated.
-        number_of_channels = 0
-        for channel in microscope_state["channels"].keys():
-            if microscope_state["channels"][channel]["is_selected"] is True:
-                number_of_channels += 1
+        if self.acquisition_plan is not None:
+            # The model planned every frame, no need to query the configuration.
+            top_anticipated_images = self.acquisition_plan.shape_z
+            bottom_anticipated_images = len(self.acquisition_plan)
+        else:
+            number_of_channels = 0
+            for channel in microscope_state["channels"].keys():
+                if microscope_state["channels"][channel]["is_selected"] is True:
+                    number_of_channels += 1
 
-        # Time-lapse acquisition
-        number_of_timepoints = int(microscope_state["timepoints"])
+            # Time-lapse acquisition
+            number_of_timepoints = int(microscope_state["timepoints"])
 
-        # Multi-Position Acquisition
-        if microscope_state["is_multiposition"] is False:
-            number_of_positions = 1
-        else:
-            number_of_positions = len(
-                self.parent_controller.configuration["multi_positions"]
-            )
+            # Multi-Position Acquisition
+            if microscope_state["is_multiposition"] is False:
+                number_of_positions = 1
+            else:
+                number_of_positions = len(
+                    self.parent_controller.configuration["multi_positions"]
+                )
 
-        if mode == "single":
-            number_of_slices = 1
-        elif mode == "z-stack":
-            number_of_slices = microscope_state["number_z_steps"]
-        else:
-            number_of_slices = 1
-
-        top_anticipated_images = number_of_slices
-        bottom_anticipated_images = (
-            number_of_channels
-            * number_of_slices
-            * number_of_timepoints
-            * number_of_positions
-        )
+            if mode == "single":
+                number_of_slices = 1
+            elif mode == "z-stack":
+                number_of_slices = microscope_state["number_z_steps"]
+            else:
+                number_of_slices = 1
+
+            top_anticipated_images = number_of_slices
+            bottom_anticipated_images = (
+                number_of_channels
+                * number_of_slices
+                * number_of_timepoints
+                * number_of_positions
+            )
 
         if images_received > 0:
             # Update progress bars according to imaging mode.
@@ -187,8 +195,16 @@ class AcquireBarController(GUIController):
                     # Time is estimated from the framerate, which includes stage
                     # movement time inherently.
                     try:
-                        images_remaining = bottom_anticipated_images - images_received
-                        seconds_left = images_remaining / self.framerate
+                        if self.acquisition_plan is not None:
+                            # Weigh the remaining frames by their exposure times.
+                            seconds_left = self.acquisition_plan.remaining_time(
+                                images_received, images_received / self.framerate
+                            )
+                        else:
+                            images_remaining = (
+                                bottom_anticipated_images - images_received
+                            )
+                            seconds_left = images_remaining / self.framerate
                         self.update_progress_label(seconds_left)
                     except ZeroDivisionError:
                         pass
@@ -52,6 +52,8 @@ import numpy as np
 # Local Imports
 from navigate.controller.sub_controllers.gui import GUIController
 from navigate.model.analysis.camera import compute_signal_to_noise
+from navigate.model.analysis.mip import MIPAccumulator
+from navigate.model.analysis.overview import OverviewMosaic
 from navigate.tools.common_functions import VariableWithLock
 from navigate.tools.file_functions import get_ram_info
 from navigate.config import get_navigate_path, update_config_dict
@@ -205,6 +207,9 @@ class BaseViewController(GUIController, ABaseViewController):
         #: np.ndarray: The saturated pixels in the image.
         self.saturated_pixels = None
 
+        #: AcquisitionPlan: Frame table of the current acquisition, if planned.
+        self.acquisition_plan = None
+
         #: list: The selected channels being acquired.
         self.selected_channels = None
 
@@ -491,7 +496,13 @@ class BaseViewController(GUIController, ABaseViewController):
             self.image_count = 0
 
         # Store each image to the pre-allocated memory.
-        if (
+        if self.acquisition_plan is not None:
+            # The model planned the acquisition, look the frame up.
+            channel_idx, slice_idx = self.acquisition_plan.channel_and_slice(
+                self.image_count
+            )
+
+        elif (
             self.image_mode in ["live", "single"]
             or self.image_mode != "customized"
             and self.stack_cycling_mode == "per_z"
@@ -1368,15 +1379,20 @@ class CameraViewController(BaseViewController):
         if not self.ilastik_mask_ready_lock.locked():
             self.ilastik_mask_ready_lock.acquire()
 
-    def display_mask(self, mask):
+    def display_mask(self, shared_mask):
         """Display segmentation mask
 
         Parameters
         ----------
-        mask : np.ndarray
-            Segmentation mask to display
+        shared_mask : tuple
+            (mask buffer, pending flags, slot index) in shared memory. The slot is
+            handed back to the model once the mask is copied.
         """
-        self.ilastik_seg_mask = cv2.applyColorMap(mask, self.mask_color_table)
+        mask_buffer, mask_pending, idx = shared_mask
+        self.ilastik_seg_mask = cv2.applyColorMap(
+            mask_buffer[idx], self.mask_color_table
+        )
+        mask_pending[idx] = 0
         self.ilastik_mask_ready_lock.release()
 
     @property
@@ -1424,6 +1440,9 @@ class MIPViewController(BaseViewController):
         #: np.ndarray: The maximum intensity projection in the XY plane.
         self.xy_mip = None
 
+        #: MIPAccumulator: The projections accumulated by the model.
+        self.mip = None
+
         #: bool: The autoscale flag.
         self.autoscale = True
 
@@ -1520,8 +1539,20 @@ class MIPViewController(BaseViewController):
     def preallocate_matrices(self):
         """Preallocate the matrices for the MIP.
 
-        Pre-allocated matrix is shape (number_of_channels, number_of_slices, width)
+        Uses the shared memory projections accumulated by the model if they match
+        the acquisition. Otherwise, pre-allocated matrix is shape
+        (number_of_channels, number_of_slices, width)
         """
+        if isinstance(self.mip, MIPAccumulator) and self.mip.matches(
+            self.number_of_channels,
+            self.number_of_slices,
+            self.original_image_height,
+            self.original_image_width,
+        ):
+            self.xy_mip = self.mip.xy
+            self.zy_mip = self.mip.zy
+            self.zx_mip = self.mip.zx
+            return
 
         self.xy_mip = 100 * np.ones(
             (
@@ -1612,28 +1643,20 @@ class MIPViewController(BaseViewController):
     def try_to_display_image(self, image):
         """Display the image.
 
+        The orthogonal maximum intensity projections are accumulated by the model
+        in shared memory, so only the display is refreshed here.
+
         Parameters
         ----------
         image : numpy.ndarray
             Image data.
         """
-        channel_idx, slice_idx = self.identify_channel_index_and_slice()
-
         if self.image_mode in ["live", "single"]:
             return
 
         if self.display_enabled.get() is False:
             return
 
-        # Orthogonal maximum intensity projections.
-        self.xy_mip[channel_idx] = np.maximum(self.xy_mip[channel_idx], image)
-        self.zy_mip[channel_idx, slice_idx] = np.maximum(
-            self.zy_mip[channel_idx, slice_idx], np.max(image, axis=0)
-        )
-        self.zx_mip[channel_idx, slice_idx] = np.maximum(
-            self.zx_mip[channel_idx, slice_idx], np.max(image, axis=1)
-        )
-
         super().try_to_display_image(image)
 
     def display_image(self, image):
@@ -1714,6 +1737,248 @@ class MIPViewController(BaseViewController):
         return down_sampled_image
 
 
+class OverviewViewController(BaseViewController):
+    """Overview View Controller Class."""
+
+    def __init__(self, view, parent_controller=None):
+        """Initialize the Overview View Controller Class.
+
+        Parameters
+        ----------
+        view : OverviewTab
+            The overview tkinter frame that contains the widgets.
+        parent_controller : Controller
+            The parent controller of the overview view controller.
+        """
+        super().__init__(view, parent_controller)
+
+        #: tkinter.Frame: The overview tab.
+        self.view = view
+
+        #: OverviewMosaic: The overview canvas built by the model.
+        self.overview = None
+
+        #: int: Number of tiles in the overview when it was last displayed.
+        self.revision = -1
+
+        #: tuple: Last mouse position while panning.
+        self.pan_start = None
+
+        # Stage positions are not marked on the overview.
+        self.apply_cross_hair = False
+
+        #: dict: The render widgets.
+        self.render_widgets = self.view.render.get_widgets()
+
+        if platform.system() == "Windows":
+            self.resize_event_id = self.view.bind("<Configure>", self.resize)
+
+        #: bool: The display enabled flag.
+        self.display_enabled = tk.BooleanVar()
+
+        for label in ["Toggle Crosshair", "Move Crosshair", "Move Here"]:
+            self.menu.entryconfig(label, state="disabled")
+        self.menu.entryconfig("Mark Position", state="disabled")
+        self.menu.add_separator()
+        self.menu.add_checkbutton(
+            label="Enable Overview Display",
+            variable=self.display_enabled,
+            onvalue=True,
+            offvalue=False,
+            command=self.update_experiment,
+        )
+
+        gui_config = self.parent_controller.configuration["gui"]
+        if "overview_display" not in gui_config.keys():
+            update_config_dict(
+                manager=self.parent_controller.manager,
+                parent_dict=gui_config,
+                config_name="overview_display",
+                new_config={"enabled": True, "um_per_pixel": 0},
+            )
+
+        self.display_enabled.set(gui_config["overview_display"].get("enabled", True))
+        self.render_widgets["um_per_pixel"].set(
+            gui_config["overview_display"].get("um_per_pixel", 0) or 0
+        )
+        self.render_widgets["um_per_pixel"].get_variable().trace_add(
+            "write", lambda *_: self.update_experiment()
+        )
+
+    def update_experiment(self) -> None:
+        """Store the display settings for the next acquisition."""
+        overview_display = self.parent_controller.configuration["gui"][
+            "overview_display"
+        ]
+        overview_display["enabled"] = self.display_enabled.get()
+        try:
+            overview_display["um_per_pixel"] = float(
+                self.render_widgets["um_per_pixel"].get()
+            )
+        except ValueError:
+            pass
+
+    def initialize(self, name: str, data: list):
+        """Initialize the overview view.
+
+        Sets the min and max intensity values for the image, selects the gray
+        colormap and autoscaling, and hides the SNR widget.
+
+        Parameters
+        ----------
+        name : str
+            'minmax', 'image'.
+        data : list
+            Min and max intensity values.
+        """
+        self.image_palette["Min"].set(data[0])
+        self.image_palette["Max"].set(data[1])
+        self.image_palette["Min"].widget["state"] = "disabled"
+        self.image_palette["Max"].widget["state"] = "disabled"
+        self.image_palette["Gray"].widget.invoke()
+        self.image_palette["Autoscale"].widget.invoke()
+        self.image_palette["SNR"].grid_remove()
+
+        self.get_selected_channels()
+        if isinstance(self.selected_channels, list) and len(self.selected_channels) > 0:
+            self.render_widgets["channel"].set(self.selected_channels[0])
+
+        self.render_widgets["channel"].get_variable().trace_add(
+            "write", self.display_overview_image
+        )
+
+    def initialize_non_live_display(self, microscope_state, camera_parameters):
+        """Initialize the display for the overview of a new acquisition.
+
+        Parameters
+        ----------
+        microscope_state : dict
+            Microscope state.
+        camera_parameters : dict
+            Camera parameters.
+        """
+        super().initialize_non_live_display(microscope_state, camera_parameters)
+        self.revision = -1
+        self.render_widgets["channel"].widget["values"] = self.selected_channels
+        if isinstance(self.selected_channels, list) and len(self.selected_channels) > 0:
+            self.render_widgets["channel"].set(self.selected_channels[0])
+        self.image = None
+        if isinstance(self.overview, OverviewMosaic):
+            _, self.original_image_height, self.original_image_width = (
+                self.overview.shape
+            )
+            self.update_canvas_size()
+            self.reset_display(False, False)
+
+    def get_channel_index(self):
+        """Get the index of the selected channel.
+
+        Returns
+        -------
+        channel_idx : Optional[int]
+            Index of the channel in the overview, or None if none is selected.
+        """
+        channel = self.render_widgets["channel"].get()
+        if not self.selected_channels or channel not in self.selected_channels:
+            return None
+        return self.selected_channels.index(channel)
+
+    def try_to_display_image(self, image):
+        """Refresh the display if a new tile was added to the overview.
+
+        Parameters
+        ----------
+        image : numpy.ndarray
+            Image data, unused. The overview is read from shared memory.
+        """
+        if self.overview is None or self.display_enabled.get() is False:
+            return
+        if int(self.overview.revision[0]) == self.revision:
+            return
+        super().try_to_display_image(image)
+
+    def display_image(self, image):
+        """Display the overview.
+
+        Parameters
+        ----------
+        image : numpy.ndarray
+            Image data, unused. The overview is read from shared memory.
+        """
+        self.revision = int(self.overview.revision[0])
+        self.display_overview_image()
+        with self.is_displaying_image as is_displaying_image:
+            is_displaying_image.value = False
+
+    def display_overview_image(self, *_):
+        """Display the selected channel of the overview."""
+        channel_idx = self.get_channel_index()
+        if self.overview is None or channel_idx is None:
+            return
+        self.image = self.overview.levels[0][channel_idx]
+        self.process_image()
+
+    def digital_zoom(self):
+        """Apply digital zoom, reading the coarsest sufficient pyramid level.
+
+        Returns
+        -------
+        image : np.ndarray
+            Region of the overview in the zoom rectangle.
+        """
+        self.zoom_rect = self.zoom_rect - self.zoom_offset
+        self.zoom_rect = self.zoom_rect * self.zoom_value
+        self.zoom_rect = self.zoom_rect + self.zoom_offset
+        self.zoom_offset.fill(0)
+        self.zoom_value = 1
+
+        if self.zoom_rect[0][0] > 0 or self.zoom_rect[1][0] > 0:
+            self.reset_display(False, False)
+
+        x_start_index = int(-self.zoom_rect[0][0] / self.zoom_scale)
+        y_start_index = int(-self.zoom_rect[1][0] / self.zoom_scale)
+        return self.overview.region(
+            self.get_channel_index() or 0,
+            int(y_start_index * self.canvas_height_scale),
+            int(x_start_index * self.canvas_width_scale),
+            int((y_start_index + self.zoom_height) * self.canvas_height_scale),
+            int((x_start_index + self.zoom_width) * self.canvas_width_scale),
+            self.canvas_height,
+            self.canvas_width,
+        )
+
+    def start_pan(self, event):
+        """Start panning the zoomed overview.
+
+        Parameters
+        ----------
+        event : tkinter.Event
+            Mouse button press.
+        """
+        self.pan_start = (event.x, event.y)
+
+    def pan(self, event):
+        """Pan the zoomed overview with the mouse, within the canvas.
+
+        Parameters
+        ----------
+        event : tkinter.Event
+            Mouse motion with the button pressed.
+        """
+        if self.pan_start is None or self.image is None:
+            return
+        dx, dy = event.x - self.pan_start[0], event.y - self.pan_start[1]
+        self.pan_start = (event.x, event.y)
+        dx = min(
+            max(dx, self.canvas_width - self.zoom_rect[0][1]), -self.zoom_rect[0][0]
+        )
+        dy = min(
+            max(dy, self.canvas_height - self.zoom_rect[1][1]), -self.zoom_rect[1][0]
+        )
+        self.zoom_rect = self.zoom_rect + np.array([[dx], [dy]])
+        self.process_image()
+
+
 class SpooledImageLoader:
     """A class to lazily load images from disk using a spooled temporary file."""
 
@@ -72,6 +72,9 @@ class KeystrokeController(GUIController):
         #: MIPViewController: MIP Setting Controller
         self.mip_controller = parent_controller.mip_setting_controller
 
+        #: OverviewViewController: Overview Controller
+        self.overview_controller = parent_controller.overview_controller
+
         #: MultiPositionController: Multiposition Table Controller
         self.multi_controller = parent_controller.multiposition_tab_controller
 
@@ -122,6 +125,28 @@ class KeystrokeController(GUIController):
         else:
             self.mip_view.canvas.bind("<Button-3>", self.mip_controller.popup_menu)
 
+        """Keystrokes for Overview"""
+        #: OverviewTab: Overview
+        self.overview_view = main_view.camera_waveform.overview_tab
+        self.overview_view.canvas.bind(
+            "<Button-1>", self.overview_controller.start_pan
+        )
+        self.overview_view.canvas.bind("<B1-Motion>", self.overview_controller.pan)
+        self.overview_view.canvas.bind(
+            "<Enter>", self.overview_controller_mouse_wheel_enter
+        )
+        self.overview_view.canvas.bind(
+            "<Leave>", self.overview_controller_mouse_wheel_leave
+        )
+        if platform.system() == "Darwin":
+            self.overview_view.canvas.bind(
+                "<Button-2>", self.overview_controller.popup_menu
+            )
+        else:
+            self.overview_view.canvas.bind(
+                "<Button-3>", self.overview_controller.popup_menu
+            )
+
         """Keystrokes for Multi-Position Table"""
         #: MultipositionTable: Multiposition Table
         self.multi_table = main_view.settings.multiposition_tab.multipoint_list.pt
@@ -201,6 +226,37 @@ class KeystrokeController(GUIController):
             self.mip_view.canvas.unbind("<Button-5>")
         self.view.root.bind("<MouseWheel>", self.view.scroll_frame.mouse_wheel)
 
+    def overview_controller_mouse_wheel_enter(self, event: tkinter.Event) -> None:
+        """Mouse wheel binding for overview
+
+        Parameters
+        ----------
+        event : tkinter.Event
+            Mouse wheel event
+        """
+        self.view.root.unbind("<MouseWheel>")
+        canvas = self.overview_view.canvas
+        if platform.system() != "Linux":
+            canvas.bind("<MouseWheel>", self.overview_controller.mouse_wheel)
+        else:
+            canvas.bind("<Button-4>", self.overview_controller.mouse_wheel)
+            canvas.bind("<Button-5>", self.overview_controller.mouse_wheel)
+
+    def overview_controller_mouse_wheel_leave(self, event: tkinter.Event) -> None:
+        """Mouse wheel binding for overview
+
+        Parameters
+        ----------
+        event : tkinter.Event
+            Mouse wheel event
+        """
+        if platform.system() != "Linux":
+            self.overview_view.canvas.unbind("<MouseWheel>")
+        else:
+            self.overview_view.canvas.unbind("<Button-4>")
+            self.overview_view.canvas.unbind("<Button-5>")
+        self.view.root.bind("<MouseWheel>", self.view.scroll_frame.mouse_wheel)
+
     def switch_tab(self, event: tkinter.Event) -> None:
         """Switches between tabs
 
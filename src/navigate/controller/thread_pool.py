@@ -29,13 +29,10 @@
 # IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
-#
 
 # Standard Library Imports
-import os
 import threading
-import ctypes
-import sys
+import time
 from collections import deque
 import logging
 import traceback
@@ -48,120 +45,71 @@ import traceback
 p = __name__.split(".")[1]
 logger = logging.getLogger(p)
 
+#: threading.local: The task running on the current worker thread.
+_worker_state = threading.local()
 
-class SelfLockThread(threading.Thread):
-    """A custom thread class with self-locking capabilities.
 
-    This class extends the functionality of the Python threading.Thread class by
-    providing the ability to lock and unlock the thread explicitly. It is useful
-    in scenarios where thread synchronization and control are required.
+class TaskCancelled(Exception):
+    """Raised by CancellationToken.check() in a cancelled task."""
 
-    Note
-    ----
-    - This class provides additional control over thread execution using the
-      `wait()` and `unlock()` methods.
-    - It allows checking whether the thread is currently locked using the `isLocked()`
-      method.
+    pass
+
+
+class CancellationToken:
+    """A cooperative cancellation flag shared by a task and the thread pool.
+
+    Tasks are never interrupted. A long-running target checks its token, e.g.
+    between steps, and returns early once it is cancelled.
     """
 
-    def __init__(
-        self, group=None, target=None, name=None, args=(), kwargs={}, *, daemon=None
-    ):
-        """Initialize the SelfLockThread.
+    def __init__(self):
+        """Initialize the CancellationToken."""
+        #: threading.Event: Set when the task is cancelled.
+        self.cancelEvent = threading.Event()
 
-        Parameters
-        ----------
-        group : ThreadGroup, optional
-            The thread group, by default None
-        target : callable, optional
-            The target function of the thread, by default None
-        name : str, optional
-            The name of the thread, by default None
-        args : tuple, optional
-            The arguments of the target function, by default ()
-        kwargs : dict, optional
-            The keyword arguments of the target function, by default {}
-        daemon : bool, optional
-            Whether the thread is daemon, by default None
-        """
-        super().__init__(group, target, name, args, kwargs, daemon=daemon)
-        #: threading.Lock: The lock of the thread.
-        self.selfLock = threading.Lock()
-        # lock itself
-        self.selfLock.acquire()
+    def cancel(self):
+        """Cancel the task."""
+        self.cancelEvent.set()
 
-    def run(self):
-        """Run the thread."""
-        self._kwargs["thread"] = self
-        if self._target:
-            try:
-                self._target(*self._args, **self._kwargs)
-            except Exception as e:
-                logger.exception(
-                    f"{self.name} thread ended because of exception!: {e}",
-                    traceback.format_exc(),
-                )
-            finally:
-                pass
-
-    def wait(self):
-        """Wait for the thread to finish."""
-        self.selfLock.acquire()
-
-    def unlock(self):
-        """Unlock the thread."""
-        if self.selfLock.locked():
-            self.selfLock.release()
-
-    def isLocked(self):
-        """Check if the thread is locked.
+    @property
+    def cancelled(self):
+        """Whether the task is cancelled.
 
         Returns
         -------
         bool
-            Whether the thread is locked.
+            Whether the task is cancelled.
         """
-        return self.selfLock.locked()
+        return self.cancelEvent.is_set()
 
+    def check(self):
+        """Raise TaskCancelled if the task is cancelled.
 
-class SynchronizedThreadPool:
-    """
-    A custom thread pool with synchronization and control features.
+        Raises
+        ------
+        TaskCancelled
+            If the task is cancelled.
+        """
+        if self.cancelEvent.is_set():
+            raise TaskCancelled()
 
-    This class provides a thread pool for managing threads associated with different
-    resources. It allows registering resources, creating threads, wrapping thread tasks,
-    removing threads, and other thread-related operations with explicit control and
-    synchronization.
 
-    Note
-    ----
-    - This class provides explicit control over thread creation, removal,
-    and synchronization.
-    - It allows managing threads associated with different resources efficiently.
-    - The `clear` method moves threads to the `toDeleteList` for later deletion.
+def get_cancellation_token():
+    """Get the cancellation token of the task running on the current thread.
 
+    Returns
+    -------
+    CancellationToken or None
+        The token, or None if the current thread is not a worker of the pool.
     """
+    task = getattr(_worker_state, "task", None)
+    return task.token if task else None
 
-    def __init__(self):
-        """Initialize the SynchronizedThreadPool."""
-
-        #: dict: The resources of the thread pool.
-        self.resources = {}
-        #: dict: The toDeleteList of the thread pool.
-        self.toDeleteList = {}
-
-    def registerResource(self, resourceName):
-        """Register a resource to the pool.
 
-        Parameters
-        ----------
-        resourceName : str
-            The name of the resource.
-        """
-        if resourceName not in self.resources:
-            self.resources[resourceName] = ThreadWaitlist()
+class PoolTask:
+    """A task submitted to a resource of the SynchronizedThreadPool."""
 
-    def createThread(
+    def __init__(
         self,
         resourceName,
         target,
@@ -171,300 +119,413 @@ class SynchronizedThreadPool:
         callback=None,
         cbArgs=(),
         cbKargs={},
+        coalesceKey=None,
     ):
-        """Create a thread and add it to the waitlist of the resource.
+        """Initialize the PoolTask.
 
         Parameters
         ----------
         resourceName : str
             The name of the resource.
         target : callable
-            The target function of the thread.
+            The target function of the task.
         args : tuple, optional
             The arguments of the target function, by default ()
         kwargs : dict, optional
             The keyword arguments of the target function, by default {}
         callback : callable, optional
-            The callback function of the thread, by default None
+            The callback function of the task, by default None
         cbArgs : tuple, optional
             The arguments of the callback function, by default ()
         cbKargs : dict, optional
             The keyword arguments of the callback function, by default {}
-
-        Returns
-        -------
-        SelfLockThread
-            The created thread.
+        coalesceKey : str, optional
+            A waiting task with the same key is replaced by this task, by default
+            None
         """
+        #: str: The name of the resource.
+        self.name = resourceName
+        #: callable: The target function of the task.
+        self.target = target
+        #: tuple: The arguments of the target function.
+        self.args = args
+        #: dict: The keyword arguments of the target function.
+        self.kwargs = kwargs
+        #: callable: The callback function of the task.
+        self.callback = callback
+        #: tuple: The arguments of the callback function.
+        self.cbArgs = cbArgs
+        #: dict: The keyword arguments of the callback function.
+        self.cbKargs = cbKargs
+        #: str: Key of the tasks that replace each other while waiting.
+        self.coalesceKey = coalesceKey
+        #: CancellationToken: The cancellation token of the task.
+        self.token = CancellationToken()
+        #: float: The time the task was submitted.
+        self.submitTime = time.perf_counter()
+        #: float: The time the task started to run.
+        self.startTime = None
+        #: float: The time the task finished.
+        self.endTime = None
+        self._done = threading.Event()
+
+    def cancel(self):
+        """Cancel the task.
+
+        A waiting task will not run. A running task is asked to stop through its
+        cancellation token.
+        """
+        self.token.cancel()
 
-        if resourceName not in self.resources:
-            self.registerResource(resourceName)
-        task = self.threadTaskWrapping(
-            resourceName, target, callback=callback, cbArgs=cbArgs, cbKargs=cbKargs
-        )
-        taskThread = SelfLockThread(None, task, resourceName, args, kwargs, daemon=True)
-        taskThread.start()
-        return taskThread
+    def run(self):
+        """Run the target and the callback of the task."""
+        self.startTime = time.perf_counter()
+        _worker_state.task = self
+        try:
+            if not self.token.cancelled and callable(self.target):
+                try:
+                    self.target(*self.args, **self.kwargs)
+                except TaskCancelled:
+                    logger.debug(f"{self.name} task is cancelled.")
+                except Exception as e:
+                    logger.exception(
+                        f"{self.name} thread exception happened!: {e}\n"
+                        f"{traceback.format_exc()}"
+                    )
+            if self.callback and not self.token.cancelled:
+                self.callback(*self.cbArgs, **self.cbKargs)
+        finally:
+            _worker_state.task = None
+            self.endTime = time.perf_counter()
+            self._done.set()
 
-    def threadTaskWrapping(
-        self, resourceName, target, *, callback=None, cbArgs=(), cbKargs={}
-    ):
-        """Wrap the target function of the thread.
+    def finish(self):
+        """Mark a task that will not run as finished."""
+        self.endTime = time.perf_counter()
+        self._done.set()
+
+    def join(self, timeout=None):
+        """Wait for the task to finish.
 
         Parameters
         ----------
-        resourceName : str
-            The name of the resource.
-        target : callable
-            The target function of the thread.
-        callback : callable, optional
-            The callback function of the thread, by default None
-        cbArgs : tuple, optional
-            The arguments of the callback function, by default ()
-        cbKargs : dict, optional
-            The keyword arguments of the callback function, by default {}
+        timeout : float, optional
+            The maximum time to wait in seconds, by default None
 
         Returns
         -------
-        callable
-            The wrapped target function.
+        bool
+            Whether the task has finished.
         """
+        return self._done.wait(timeout)
 
-        def func(*args, **kwargs):
-            thread = kwargs.get("thread", None)
-            if not thread:
-                return
-            del kwargs["thread"]
-            # add thread to the waitlist of the resource
-            with self.resources[resourceName] as resource:
-                resource.waitlist.append(thread)
-                if len(resource.waitlist) == 1:
-                    thread.unlock()
-            # wait for it's turn
-            thread.wait()
-            # run itself
-            if callable(target):
-                try:
-                    target(*args, **kwargs)
-                except Exception as e:
-                    logger.exception(
-                        threading.current_thread().name,
-                        "thread exception happened!",
-                        e,
-                        traceback.format_exc(),
-                    )
+    def is_alive(self):
+        """Check if the task is waiting or running.
 
-            # wake up next thread if any
-            with self.resources[resourceName] as resource:
-                resource.waitlist.popleft()
-                if len(resource.waitlist) > 0:
-                    resource.waitlist[0].unlock()
-            # run callback
-            if callback:
-                callback(*cbArgs, **cbKargs)
+        Returns
+        -------
+        bool
+            Whether the task has not finished.
+        """
+        return not self._done.is_set()
 
-        return func
 
-    def removeThread(self, resourceName, taskThread):
-        """Remove a thread from the waitlist of the resource.
+class ResourceWorker:
+    """A long-lived worker thread that runs the tasks of one resource in order.
+
+    Tasks run in submission order. A new task replaces the waiting tasks that share
+    its coalesce key.
+    """
+
+    def __init__(self, resourceName):
+        """Initialize the ResourceWorker.
 
         Parameters
         ----------
         resourceName : str
             The name of the resource.
-        taskThread : SelfLockThread
-            The thread to remove.
+        """
+        #: str: The name of the resource.
+        self.name = resourceName
+        #: deque: The waiting tasks.
+        self.waitlist = deque()
+        #: PoolTask: The running task.
+        self.runningTask = None
+        #: threading.Condition: Guards the waitlist.
+        self.condition = threading.Condition()
+        #: dict: Timing metrics of the resource.
+        self.metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+            "run_time_total": 0.0,
+            "run_time_max": 0.0,
+        }
+        self._stopped = False
+        #: threading.Thread: The worker thread.
+        self.thread = threading.Thread(target=self.run, name=resourceName, daemon=True)
+        self.thread.start()
+
+    def submit(self, task):
+        """Add a task to the waitlist.
+
+        Parameters
+        ----------
+        task : PoolTask
+            The task.
+        """
+        with self.condition:
+            if self._stopped:
+                task.cancel()
+                task.finish()
+                return
+            for waiting in list(self.waitlist):
+                if task.coalesceKey is not None and (
+                    waiting.coalesceKey == task.coalesceKey
+                ):
+                    self.waitlist.remove(waiting)
+                    self._drop(waiting)
+            self.waitlist.append(task)
+            self.metrics["submitted"] += 1
+            self.condition.notify()
+
+    def remove(self, task):
+        """Remove a waiting task.
+
+        Parameters
+        ----------
+        task : PoolTask
+            The task.
 
         Returns
         -------
         bool
-            Whether the thread is removed.
+            Whether the task is removed. A running task is not removed.
         """
-        # can only remove waiting threads
-        # do not remove running threading
-        # if no such resource
-        if resourceName not in self.resources:
-            return False
-        with self.resources[resourceName] as resource:
-            # if it is the current running one, kill it and wake up next thread if any
-            if resource.waitlist[0] != taskThread:
-                # add the thread to toDeleteList
-                self.moveToDelete(resourceName, taskThread)
-                resource.waitlist.remove(taskThread)
-                return
+        with self.condition:
+            if task not in self.waitlist:
+                return False
+            self.waitlist.remove(task)
+            self._drop(task)
+            return True
 
-    def moveToDelete(self, resourceName, taskThread):
-        """Move a thread to the toDeleteList.
+    def stop(self, timeout=1.0):
+        """Cancel all the tasks and stop the worker thread.
 
         Parameters
         ----------
-        resourceName : str
-            The name of the resource.
-        taskThread : SelfLockThread
-            The thread to move.
+        timeout : float, optional
+            The maximum time to wait for the running task in seconds, by default 1.0
         """
-        if resourceName not in self.toDeleteList:
-            self.toDeleteList[resourceName] = ThreadWaitlist()
-        with self.toDeleteList[resourceName] as temp:
-            temp.waitlist.append(taskThread)
+        with self.condition:
+            self._stopped = True
+            while self.waitlist:
+                self._drop(self.waitlist.popleft())
+            if self.runningTask:
+                self.runningTask.cancel()
+            self.condition.notify()
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout)
 
-    def getRunningThread(self, resourceName):
-        """Get the running thread of the resource.
+    def run(self):
+        """Run the waiting tasks until the worker is stopped."""
+        while True:
+            with self.condition:
+                while not self.waitlist and not self._stopped:
+                    self.condition.wait()
+                if self._stopped:
+                    return
+                task = self.waitlist.popleft()
+                self.runningTask = task
+            task.run()
+            with self.condition:
+                self.runningTask = None
+                self._record(task)
+
+    def _drop(self, task):
+        """Cancel a task that will not run.
 
         Parameters
         ----------
-        resourceName : str
-            The name of the resource.
+        task : PoolTask
+            The task.
+        """
+        task.cancel()
+        task.finish()
+        self.metrics["cancelled"] += 1
 
-        Returns
-        -------
-        SelfLockThread
-            The running thread.
+    def _record(self, task):
+        """Record the timing of a finished task.
+
+        Parameters
+        ----------
+        task : PoolTask
+            The task.
         """
-        if (
-            resourceName not in self.resources
-            or len(self.resources[resourceName].waitlist) < 1
-        ):
-            return None
-        return self.resources[resourceName].waitlist[0]
+        queue_wait = task.startTime - task.submitTime
+        run_time = task.endTime - task.startTime
+        self.metrics["completed"] += 1
+        self.metrics["queue_wait_total"] += queue_wait
+        self.metrics["queue_wait_max"] = max(self.metrics["queue_wait_max"], queue_wait)
+        self.metrics["run_time_total"] += run_time
+        self.metrics["run_time_max"] = max(self.metrics["run_time_max"], run_time)
+        logger.debug(
+            f"{self.name} task finished, queue wait: {queue_wait:.4f} s, "
+            f"run time: {run_time:.4f} s"
+        )
 
-    def clear(self):
-        """Clear all the threads in the pool."""
-
-        # move all the threads except first one to toDeleteList
-        sys.settrace(self.globaltrace)
-        for resourceName in self.resources:
-            with self.resources[resourceName] as temp:
-                headThread = temp.waitlist[0] if len(temp.waitlist) > 0 else None
-                for i in range(1, len(temp.waitlist)):
-                    self.moveToDelete(resourceName, temp.waitlist[i])
-            if headThread:
-                self._raiseError(headThread.native_id)
-            self.killThreadInList(resourceName, self.toDeleteList)
-
-    def killThreadInList(self, resourceName, threadList):
-        """Kill all the threads in the threadList.
+
+class SynchronizedThreadPool:
+    """
+    A thread pool with one long-lived worker per resource.
+
+    Tasks submitted to the same resource run one at a time, in submission order.
+    Waiting tasks can be removed or coalesced, and all tasks are cancelled
+    cooperatively when the pool is cleared.
+
+    Note
+    ----
+    - Running tasks are never interrupted. A target that should stop early checks
+      its CancellationToken, see get_cancellation_token(). The token lives in the
+      controller process, so a call that is already running in the model
+      subprocess is not cancelled by it.
+    - Timing metrics (queue wait and run time) are kept for each resource.
+    """
+
+    def __init__(self):
+        """Initialize the SynchronizedThreadPool."""
+
+        #: dict: The workers of the resources.
+        self.resources = {}
+        #: threading.Lock: Guards the resources.
+        self.resourcesLock = threading.Lock()
+
+    def registerResource(self, resourceName):
+        """Register a resource to the pool.
 
         Parameters
         ----------
         resourceName : str
             The name of the resource.
-        threadList : dict
-            The threadList to kill.
         """
-        sys.settrace(self.globaltrace)
-        # remove all the threads in threadList
-        if resourceName in threadList:
-            with threadList[resourceName] as temp:
-                while temp.waitlist:
-                    thread = temp.waitlist[0]
-                    thread.unlock()
-                    self._raiseError(thread.native_id)
-                    thread.join(1)
-                    if not thread.is_alive():
-                        # move it from the list
-                        temp.waitlist.popleft()
-                    else:
-                        thread.wait()
-                        # move the thread to the end of the list
-                        temp.waitlist.popleft()
-                        temp.waitlist.append(thread)
-
-    def globaltrace(self, frame, event, arg):
-        """Global trace function.
+        with self.resourcesLock:
+            if resourceName not in self.resources:
+                self.resources[resourceName] = ResourceWorker(resourceName)
+
+    def createThread(
+        self,
+        resourceName,
+        target,
+        args=(),
+        kwargs={},
+        *,
+        callback=None,
+        cbArgs=(),
+        cbKargs={},
+        coalesceKey=None,
+    ):
+        """Submit a task to the worker of the resource.
 
         Parameters
         ----------
-        frame : frame
-            The frame of the thread.
-        event : str
-            The event of the thread.
-        arg : any
-            The argument of the thread.
+        resourceName : str
+            The name of the resource.
+        target : callable
+            The target function of the task.
+        args : tuple, optional
+            The arguments of the target function, by default ()
+        kwargs : dict, optional
+            The keyword arguments of the target function, by default {}
+        callback : callable, optional
+            The callback function of the task, by default None
+        cbArgs : tuple, optional
+            The arguments of the callback function, by default ()
+        cbKargs : dict, optional
+            The keyword arguments of the callback function, by default {}
+        coalesceKey : str, optional
+            A waiting task of the resource with the same key is replaced by this
+            task, by default None
 
         Returns
         -------
-        callable
-            The local trace function if the event is "call", otherwise None.
+        PoolTask
+            The submitted task.
         """
+        if resourceName not in self.resources:
+            self.registerResource(resourceName)
+        task = PoolTask(
+            resourceName,
+            target,
+            args,
+            kwargs,
+            callback=callback,
+            cbArgs=cbArgs,
+            cbKargs=cbKargs,
+            coalesceKey=coalesceKey,
+        )
+        self.resources[resourceName].submit(task)
+        return task
 
-        if event == "call":
-            return self.localtrace
-        else:
-            return None
-
-    def localtrace(self, frame, event, arg):
-        """Local trace function.
+    def removeThread(self, resourceName, taskThread):
+        """Remove a waiting task from the resource.
 
         Parameters
         ----------
-        frame : frame
-            The frame of the thread.
-        event : str
-            The event of the thread.
-        arg : any
-            The argument of the thread.
+        resourceName : str
+            The name of the resource.
+        taskThread : PoolTask
+            The task to remove.
 
         Returns
         -------
-        callable
-            The local trace function if the event is "exception", otherwise None.
+        bool
+            Whether the task is removed. A running task is not removed.
         """
+        if resourceName not in self.resources:
+            return False
+        return self.resources[resourceName].remove(taskThread)
 
-        if event == "exception":
-            if os.getenv("GITHUB_ACTIONS") == "true":
-                return
-
-            # Silence traceback to avoid printing to console.
-            sys.tracebacklimit = 0
-            raise SystemExit()
-        return self.localtrace
-
-    def _raiseError(self, threadId):
-        """Raise error in the thread.
+    def getRunningThread(self, resourceName):
+        """Get the running task of the resource.
 
         Parameters
         ----------
-        threadId : int
-            The id of the thread.
-        """
-
-        ctypes.pythonapi.PyThreadState_SetAsyncExc(
-            ctypes.c_ulong(threadId), ctypes.py_object(SystemExit)
-        )
-
-
-class ThreadWaitlist:
-    """A custom thread waitlist with synchronization capabilities."""
-
-    def __init__(self):
-        """Initialize the ThreadWaitlist."""
-        #: threading.Lock: The lock of the waitlist.
-        self.waitlistLock = threading.Lock()
-        #: deque: The waitlist.
-        self.waitlist = deque()
-
-    def __enter__(self):
-        """Enter the context.
+        resourceName : str
+            The name of the resource.
 
         Returns
         -------
-        ThreadWaitlist
-            The waitlist.
+        PoolTask
+            The running task.
         """
-        self.waitlistLock.acquire()
-        return self
+        if resourceName not in self.resources:
+            return None
+        return self.resources[resourceName].runningTask
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Exit the context.
+    def getMetrics(self, resourceName=None):
+        """Get the timing metrics of the resources.
 
         Parameters
         ----------
-        exc_type : type
-            The type of the exception.
-        exc_val : any
-            The value of the exception.
-        exc_tb : traceback
-            The traceback of the exception.
+        resourceName : str, optional
+            The name of the resource. All resources if None.
+
+        Returns
+        -------
+        dict
+            The number of submitted, completed and cancelled tasks, and the total
+            and maximum queue wait and run time in seconds.
         """
-        self.waitlistLock.release()
+        if resourceName is not None:
+            return dict(self.resources[resourceName].metrics)
+        return {name: dict(r.metrics) for name, r in self.resources.items()}
+
+    def clear(self):
+        """Cancel all the tasks and stop the workers."""
+        with self.resourcesLock:
+            workers = list(self.resources.values())
+            self.resources = {}
+        for worker in workers:
+            worker.stop()
@@ -38,10 +38,10 @@ import os
 # Third Party Imports
 
 # Local Imports
-from navigate.controller.controller import Controller
-from navigate.controller.configurator import Configurator
 from navigate.log_files.log_functions import log_setup
 from navigate.view.splash_screen import SplashScreen
+from navigate.tools.startup_profiler import profiler
+from navigate.tools.tracing import tracer
 from navigate.tools.main_functions import (
     evaluate_parser_input_arguments,
     create_parser,
@@ -70,6 +70,8 @@ def main():
         --waveform-templates-file
         --logging-confi
         --configurator
+        --profile-startup
+        --trace
     """
     if platform.system() != "Windows":
         print(
@@ -108,9 +110,22 @@ def main():
 
     log_setup("logging.yml", logging_path)
 
+    if args.profile_startup:
+        profiler.enable()
+
+    # Enable before the model subprocess is started, so it traces too.
+    if args.trace:
+        tracer.enable()
+
+    # The controller imports the model, its features and devices, which is
+    # slow. Import them after the splash screen is shown.
     if args.configurator:
+        from navigate.controller.configurator import Configurator
+
         Configurator(root, splash_screen)
     else:
+        from navigate.controller.controller import Controller
+
         Controller(
             root,
             splash_screen,
@@ -124,6 +139,9 @@ def main():
             args,
         )
 
+    if args.profile_startup:
+        print(profiler.report("controller"))
+
     root.mainloop()
 
 
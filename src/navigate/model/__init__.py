@@ -1,2 +1,11 @@
 """Communicates with microscope hardware and runs acquisition routines."""
-from .model import Model  # noqa
+
+
+def __getattr__(name):
+    # Importing the model loads every feature and device module. Only do so
+    # when it is used, not whenever a submodule of navigate.model is imported.
+    if name == "Model":
+        from .model import Model
+
+        return Model
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
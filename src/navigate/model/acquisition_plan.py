@@ -0,0 +1,399 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard library imports
+import logging
+from typing import List, Optional, Union
+
+# Third-party imports
+import numpy as np
+import numpy.typing as npt
+
+# Local application imports
+from navigate.model.concurrency.concurrency_tools import SharedNDArray
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+#: np.dtype: One row per planned frame.
+PLAN_DTYPE = np.dtype(
+    [
+        ("channel", "<i4"),
+        ("slice", "<i4"),
+        ("timepoint", "<i4"),
+        ("position", "<i4"),
+        ("x", "<f8"),
+        ("y", "<f8"),
+        ("z", "<f8"),
+        ("theta", "<f8"),
+        ("f", "<f8"),
+        ("exposure", "<f4"),
+        ("start_time", "<f8"),
+    ]
+)
+
+
+def frame_indices(
+    frame_id: Union[int, npt.ArrayLike],
+    shape_c: int,
+    shape_z: int,
+    shape_t: int,
+    positions: int,
+    per_stack: bool = True,
+) -> tuple:
+    """Figure out where we are in the acquisition from the frame number.
+
+    per_stack indicates if we move through z (per_stack=True) or c fastest.
+    we move through positions slower than z or c. we move through time slower
+    than z, c or p.
+
+    Works on a single frame number or on an array of frame numbers.
+
+    Parameters
+    ----------
+    frame_id : Union[int, npt.ArrayLike]
+        Frame number(s) in the acquisition.
+    shape_c : int
+        Number of channels.
+    shape_z : int
+        Number of z-slices.
+    shape_t : int
+        Number of timepoints.
+    positions : int
+        Number of positions.
+    per_stack : bool
+        Are we acquiring images along z before c? See experiment.yml.
+
+    Returns
+    -------
+    c : int
+        Index of channel
+    z : int
+        Index of z position
+    t : int
+        Index of time position
+    p : int
+        Index of multi-position position.
+    """
+    # If z-stacking, if multi-position
+    if shape_z > 1:
+        # We're z-stacking, make z, c vary faster than t
+        if per_stack:
+            c = (frame_id // shape_z) % shape_c
+            z = frame_id % shape_z
+        else:
+            c = frame_id % shape_c
+            z = (frame_id // shape_c) % shape_z
+
+        # NOTE: Uncomment this if we want time to vary faster than positions
+        t = (frame_id // (shape_c * shape_z)) % shape_t
+        p = frame_id // (shape_c * shape_z * shape_t)
+
+        # NOTE: Uncomment this if we want positions to vary faster than time
+        # t = frame_id // (shape_c * shape_z * positions)
+        # p = (frame_id // (shape_c * shape_z)) % positions
+
+    else:
+        # Timepoint acquisition, only c varies faster than t
+        c = frame_id % shape_c
+        t = (frame_id // shape_c) % shape_t
+        z = (frame_id // (shape_c * shape_t)) % shape_z
+        p = frame_id // (shape_c * shape_t * shape_z)
+
+    return c, z, t, p
+
+
+class AcquisitionPlan:
+    """Table of every frame an acquisition is expected to produce.
+
+    Built once when the acquisition is prepared, the plan maps each frame number to
+    its channel, slice, timepoint and position indices, the stage position the
+    frame is expected at, its exposure time and its planned start time. The table
+    lives in shared memory, so the model, the image writer and the controller all
+    index the same rows instead of re-deriving them from the configuration.
+    """
+
+    #: int: Plans with more frames than this are not built.
+    max_frames = 2**20
+
+    def __init__(
+        self,
+        shape_c: int,
+        shape_z: int,
+        shape_t: int,
+        positions: int,
+        per_stack: bool = True,
+        shared: bool = True,
+    ) -> None:
+        """Initialize the acquisition plan.
+
+        Parameters
+        ----------
+        shape_c : int
+            Number of channels.
+        shape_z : int
+            Number of z-slices.
+        shape_t : int
+            Number of timepoints.
+        positions : int
+            Number of positions.
+        per_stack : bool
+            Are we acquiring images along z before c?
+        shared : bool
+            Allocate the table in shared memory.
+        """
+        #: int: Number of channels.
+        self.shape_c = max(int(shape_c), 1)
+
+        #: int: Number of z-slices.
+        self.shape_z = max(int(shape_z), 1)
+
+        #: int: Number of timepoints.
+        self.shape_t = max(int(shape_t), 1)
+
+        #: int: Number of positions.
+        self.positions = max(int(positions), 1)
+
+        #: bool: Are we acquiring images along z before c?
+        self.per_stack = bool(per_stack)
+
+        n_frames = self.shape_c * self.shape_z * self.shape_t * self.positions
+        allocate = SharedNDArray if shared else np.zeros
+
+        #: npt.NDArray: The plan, one row of dtype PLAN_DTYPE per frame.
+        self.table = allocate(shape=(n_frames,), dtype=PLAN_DTYPE)
+
+        c, z, t, p = frame_indices(
+            np.arange(n_frames),
+            self.shape_c,
+            self.shape_z,
+            self.shape_t,
+            self.positions,
+            self.per_stack,
+        )
+        self.table["channel"] = c
+        self.table["slice"] = z
+        self.table["timepoint"] = t
+        self.table["position"] = p
+
+    @classmethod
+    def from_configuration(
+        cls,
+        configuration: dict,
+        shared: bool = True,
+        channel_order: Optional[List[int]] = None,
+    ) -> Optional["AcquisitionPlan"]:
+        """Build the plan of a z-stack or single acquisition.
+
+        Parameters
+        ----------
+        configuration : dict
+            Navigate configuration, with the experiment to plan.
+        shared : bool
+            Allocate the table in shared memory.
+        channel_order : Optional[List[int]]
+            Index of each channel in acquisition order among the selected
+            channels, if they are not acquired in configuration order.
+
+        Returns
+        -------
+        plan : Optional[AcquisitionPlan]
+            The plan, or None if the frames of this imaging mode are not known in
+            advance (live, customized) or if there are too many of them.
+        """
+        state = configuration["experiment"]["MicroscopeState"]
+        image_mode = state["image_mode"]
+        if image_mode not in ("z-stack", "single"):
+            return None
+
+        channels = [
+            channel for channel in state["channels"].values() if channel["is_selected"]
+        ]
+        shape_z = int(state["number_z_steps"]) if image_mode == "z-stack" else 1
+        if bool(state["is_multiposition"]):
+            stage_positions = [
+                list(position) for position in configuration["multi_positions"]
+            ]
+        else:
+            stage = configuration["experiment"]["StageParameters"]
+            stage_positions = [[stage[axis] for axis in ("x", "y", "z", "theta", "f")]]
+            if image_mode == "z-stack":
+                stage_positions[0][2] = state.get("stack_z_origin", stage["z"])
+                stage_positions[0][4] = state.get("stack_focus_origin", stage["f"])
+
+        shape = (len(channels), shape_z, int(state["timepoints"]), len(stage_positions))
+        if np.prod([max(n, 1) for n in shape]) > cls.max_frames:
+            logger.info(f"Acquisition of shape {shape} is too large to plan.")
+            return None
+        per_stack = (
+            state["stack_cycling_mode"] == "per_stack" and image_mode != "single"
+        )
+        plan = cls(*shape, per_stack=per_stack, shared=shared)
+        if len(channels) == 0:
+            return plan
+
+        table = plan.table
+        if channel_order is not None:
+            table["channel"] = np.asarray(channel_order)[table["channel"]]
+        c, z, p = table["channel"], table["slice"], table["position"]
+
+        # Expected stage targets
+        stage_positions = np.asarray(stage_positions, dtype=float)[:, :5]
+        for i, axis in enumerate(("x", "y", "z", "theta", "f")):
+            table[axis] = stage_positions[p, i]
+        if image_mode == "z-stack":
+            start_focus = float(state["start_focus"])
+            focus_step = (float(state["end_focus"]) - start_focus) / plan.shape_z
+            defocus = np.array([float(ch.get("defocus", 0)) for ch in channels])
+            table["z"] += float(state["start_position"]) + z * float(
+                state["step_size"]
+            )
+            table["f"] += start_focus + z * focus_step + defocus[c]
+
+        # Exposure times and planned start times, in seconds
+        exposures = np.array(
+            [float(ch["camera_exposure_time"]) / 1000 for ch in channels]
+        )
+        table["exposure"] = exposures[c]
+        table["start_time"][1:] = np.cumsum(table["exposure"][:-1], dtype=float)
+        return plan
+
+    def __len__(self) -> int:
+        """Number of planned frames."""
+        return len(self.table)
+
+    def matches(
+        self,
+        shape_c: int,
+        shape_z: int,
+        shape_t: int,
+        positions: int,
+        per_stack: bool = True,
+    ) -> bool:
+        """Check whether the plan has the requested dimensions and frame order.
+
+        Parameters
+        ----------
+        shape_c : int
+            Number of channels.
+        shape_z : int
+            Number of z-slices.
+        shape_t : int
+            Number of timepoints.
+        positions : int
+            Number of positions.
+        per_stack : bool
+            Are we acquiring images along z before c?
+
+        Returns
+        -------
+        bool
+            True if every frame of such an acquisition is in the plan.
+        """
+        return (
+            self.shape_c == int(shape_c)
+            and self.shape_z == int(shape_z)
+            and self.shape_t == int(shape_t)
+            and self.positions == int(positions)
+            and (self.shape_z == 1 or self.per_stack == bool(per_stack))
+        )
+
+    def indices(self, frame_id: int) -> tuple:
+        """Get the channel, slice, timepoint and position index of a frame.
+
+        Parameters
+        ----------
+        frame_id : int
+            Frame number in the acquisition.
+
+        Returns
+        -------
+        tuple
+            (c, z, t, p) indices of the frame.
+        """
+        row = self.table[frame_id]
+        return (
+            int(row["channel"]),
+            int(row["slice"]),
+            int(row["timepoint"]),
+            int(row["position"]),
+        )
+
+    def channel_and_slice(self, frame_id: int) -> tuple:
+        """Get the channel and slice index of a frame.
+
+        Frame numbers past the end of the plan wrap around.
+
+        Parameters
+        ----------
+        frame_id : int
+            Frame number in the acquisition.
+
+        Returns
+        -------
+        channel_idx : int
+            The channel index.
+        slice_idx : int
+            The slice index.
+        """
+        row = self.table[frame_id % len(self.table)]
+        return int(row["channel"]), int(row["slice"])
+
+    def remaining_time(
+        self, frames_done: int, elapsed_time: Optional[float] = None
+    ) -> float:
+        """Estimate the time left in the acquisition.
+
+        Parameters
+        ----------
+        frames_done : int
+            Number of frames acquired so far.
+        elapsed_time : Optional[float]
+            Time since the start of the acquisition, in seconds. If given, the
+            planned time is scaled by how long the frames so far actually took,
+            which accounts for stage moves, readout and other overheads.
+
+        Returns
+        -------
+        float
+            Estimated time left, in seconds.
+        """
+        if frames_done >= len(self.table):
+            return 0.0
+        start_time = self.table["start_time"]
+        total_time = start_time[-1] + self.table["exposure"][-1]
+        planned_done = start_time[frames_done]
+        seconds_left = float(total_time - planned_done)
+        if elapsed_time is not None and planned_done > 0:
+            seconds_left *= elapsed_time / planned_done
+        return seconds_left
@@ -31,14 +31,18 @@
 
 # Standard library imports
 import math
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
-from itertools import product
 
 # Third party imports
 from skimage import filters
 from skimage.transform import downscale_local_mean
 from skimage import measure
+from scipy import ndimage
 from scipy.ndimage import median_filter, binary_fill_holes
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 
 import numpy as np
 import numpy.typing as npt
@@ -473,6 +477,212 @@ def find_cell_boundary_3d(z_stack_image):
     return cell_labels
 
 
+def find_cell_boundary_3d_chunked(
+    z_stack_image, downsample=1, slab_size=16, max_workers=None, histogram_step=1
+):
+    """Label a volume like find_cell_boundary_3d, in z-slabs across threads
+
+    The median filter runs on z-slabs with a one plane halo, the Otsu threshold is
+    taken from the histogram accumulated over the slabs, and holes are filled and
+    cells labeled by labeling each slab and merging the labels that touch across
+    slab boundaries. With the default arguments, the labels are the same as the
+    ones of find_cell_boundary_3d.
+
+    Parameters
+    ----------
+    z_stack_image : ndarray
+        A 3d array image data
+    downsample : int
+        Decimation factor in y and x. The labels are computed on every
+        downsample-th pixel and scaled back to the size of z_stack_image.
+    slab_size : int
+        Number of z planes per slab
+    max_workers : int
+        Number of threads. Chosen by ThreadPoolExecutor if None.
+    histogram_step : int
+        Only every histogram_step-th pixel is counted in the Otsu histogram.
+
+    Returns
+    -------
+    labels : ndarray
+        Labeled array
+    """
+    image = z_stack_image[:, ::downsample, ::downsample]
+    slabs = [
+        slice(start, min(start + slab_size, image.shape[0]))
+        for start in range(0, image.shape[0], slab_size)
+    ]
+    is_unsigned = np.issubdtype(image.dtype, np.unsignedinteger)
+    denoised_image = np.empty(image.shape, image.dtype)
+
+    def denoise(slab):
+        halo = slice(max(slab.start - 1, 0), min(slab.stop + 1, image.shape[0]))
+        denoised = median_filter(image[halo], size=3)
+        start = slab.start - halo.start
+        denoised_image[slab] = denoised[start : start + slab.stop - slab.start]
+        if not is_unsigned:
+            return []
+        # plane by plane, bincount copies its input to intp
+        return [
+            np.bincount(plane.ravel()[::histogram_step])
+            for plane in denoised_image[slab]
+        ]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        histograms = sum(executor.map(denoise, slabs), [])
+        if is_unsigned:
+            counts = np.zeros(max(len(h) for h in histograms), dtype=np.int64)
+            for histogram in histograms:
+                counts[: len(histogram)] += histogram
+            values = np.flatnonzero(counts)
+            if len(values) == 1:
+                threshold = values[0]
+            else:
+                threshold = filters.threshold_otsu(
+                    hist=(counts, np.arange(len(counts)))
+                )
+        else:
+            threshold = filters.threshold_otsu(
+                denoised_image.ravel()[::histogram_step]
+            )
+
+        thresholded_image = np.empty(image.shape, dtype=bool)
+        list(
+            executor.map(
+                lambda slab: np.greater(
+                    denoised_image[slab], threshold, out=thresholded_image[slab]
+                ),
+                slabs,
+            )
+        )
+        del denoised_image
+
+        # holes are the background components that do not touch the border.
+        background = ~thresholded_image
+        background_labels, components = _label_slabs(
+            background, slabs, ndimage.generate_binary_structure(3, 1), executor
+        )
+        del background
+        border = np.zeros(components.max() + 1, dtype=bool)
+        for face in [
+            background_labels[0],
+            background_labels[-1],
+            background_labels[:, [0, -1]],
+            background_labels[:, :, [0, -1]],
+        ]:
+            border[components[face]] = True
+        border[0] = True
+
+        def fill_holes(slab):
+            thresholded_image[slab] |= ~border[components[background_labels[slab]]]
+
+        list(executor.map(fill_holes, slabs))
+        del background_labels
+
+        cell_labels, components = _label_slabs(
+            thresholded_image, slabs, np.ones((3, 3, 3), dtype=bool), executor
+        )
+
+        def relabel(slab):
+            cell_labels[slab] = components[cell_labels[slab]]
+
+        list(executor.map(relabel, slabs))
+
+    if downsample > 1:
+        cell_labels = np.repeat(np.repeat(cell_labels, downsample, 1), downsample, 2)
+        cell_labels = cell_labels[:, : z_stack_image.shape[1], : z_stack_image.shape[2]]
+    return cell_labels
+
+
+def _label_slabs(mask, slabs, structure, executor):
+    """Label the z-slabs of a mask and merge the labels across slab boundaries
+
+    Parameters
+    ----------
+    mask : ndarray
+        A 3d boolean array
+    slabs : list[slice]
+        Consecutive z ranges that cover the mask
+    structure : ndarray
+        3 x 3 x 3 connectivity of the labels
+    executor : concurrent.futures.Executor
+        Executor the slabs are labeled on
+
+    Returns
+    -------
+    labels : ndarray
+        Labels of each slab, unique across slabs
+    components : ndarray
+        Merged label of each slab label, numbered in the order the labels first
+        appear in the volume, as measure.label does. 0 is the background.
+    """
+    labels = np.empty(mask.shape, dtype=np.int32)
+    counts = list(
+        executor.map(
+            lambda slab: ndimage.label(mask[slab], structure, output=labels[slab]),
+            slabs,
+        )
+    )
+    offsets = np.cumsum([0] + counts)
+
+    def add_offset(i):
+        slab_labels = labels[slabs[i]]
+        np.add(slab_labels, offsets[i], out=slab_labels, where=slab_labels > 0)
+
+    list(executor.map(add_offset, range(1, len(slabs))))
+
+    # pairs of labels connected across the slab boundaries
+    height, width = mask.shape[1:]
+    first, second = [], []
+    for slab in slabs[1:]:
+        above, below = labels[slab.start - 1], labels[slab.start]
+        # the pixel (y, x) above touches the pixel (y + dy, x + dx) below
+        for dy, dx in zip(*np.nonzero(structure[2])):
+            y, x = _overlap_slices(dy - 1, height), _overlap_slices(dx - 1, width)
+            a, b = above[y[0], x[0]], below[y[1], x[1]]
+            connected = (a > 0) & (b > 0)
+            first.append(a[connected])
+            second.append(b[connected])
+
+    number_of_labels = offsets[-1] + 1
+    first = np.concatenate(first) if first else np.zeros(0, dtype=np.int32)
+    second = np.concatenate(second) if second else np.zeros(0, dtype=np.int32)
+    graph = coo_matrix(
+        (np.ones(len(first), dtype=bool), (first, second)),
+        shape=(number_of_labels, number_of_labels),
+    )
+    number_of_components, components = connected_components(graph, directed=False)
+
+    # labels are numbered in raster order within a slab, so the smallest label
+    # of a component is the first one to appear in the volume.
+    first_labels = np.full(number_of_components, number_of_labels)
+    np.minimum.at(first_labels, components, np.arange(number_of_labels))
+    order = np.empty(number_of_components, dtype=np.int32)
+    order[np.argsort(first_labels)] = np.arange(number_of_components)
+    return labels, order[components]
+
+
+def _overlap_slices(shift, size):
+    """Slices of two axes of length size that overlap when one is shifted by shift
+
+    Parameters
+    ----------
+    shift : int
+        Shift of the second axis
+    size : int
+        Length of the axes
+
+    Returns
+    -------
+    first, second : slice
+        Overlapping ranges of the first and the second axis
+    """
+    return (
+        slice(max(-shift, 0), size - max(shift, 0)),
+        slice(max(shift, 0), size - max(-shift, 0)),
+    )
+
+
 def map_labels(
     labeled_image,
     position,
@@ -544,8 +754,6 @@ def map_labels(
     x_direction_index = 0 if x_direction[-1] == "x" else 1
     y_direction_index = 1 - x_direction_index
 
-    target_num = np.max(labeled_image)
-    position_table = []
     x, y, z, theta, f = position
 
     center_x = current_image_width // 2
@@ -554,120 +762,150 @@ def map_labels(
     x_pixel = int(target_image_width * target_pixel_size / current_pixel_size)
     y_pixel = int(target_image_height * target_pixel_size / current_pixel_size)
 
-    regionprops = measure.regionprops(labeled_image)
-    z_range = 1
+    # bounding boxes of the labels, in the order of their label values
+    objects = [s for s in ndimage.find_objects(labeled_image) if s is not None]
+    if not objects:
+        return 1, [], []
+    bbox = np.array(
+        [[s.start for s in slices] + [s.stop for s in slices] for slices in objects]
+    )
+    min_z, min_y, min_x, max_z, max_y, max_x = bbox.T
+
+    # do not need to calculate the position
+    # if the label area is smaller than filter_pixel_number in x or y.
+    target_labels_index = np.flatnonzero(
+        ((max_x - min_x) >= filter_pixel_number)
+        & ((max_y - min_y) >= filter_pixel_number)
+    )
+    if len(target_labels_index) == 0:
+        return 1, [], []
+
+    # centroids, in one pass over the labeled pixels
+    _, coord_y, coord_x = np.nonzero(labeled_image)
+    pixel_values = labeled_image[labeled_image > 0]
+    pixel_labels = np.searchsorted(np.unique(pixel_values), pixel_values)
+    counts = np.bincount(pixel_labels, minlength=len(objects))
+    centroid_y = np.bincount(pixel_labels, coord_y, len(objects)) / counts
+    centroid_x = np.bincount(pixel_labels, coord_x, len(objects)) / counts
+    centroids = np.stack(
+        [centroid_x[target_labels_index], centroid_y[target_labels_index]], axis=1
+    )
+
+    # find the appoximation shortest path in (x, y), starting from the label
+    # closest to the upper left corner.
+    start = int(np.argmin(centroids[:, 0] + centroids[:, 1]))
+    target_labels = target_labels_index[nearest_neighbour_path(centroids, start)]
+
+    min_z, min_y, min_x = bbox[target_labels, :3].T
+    max_z, max_y, max_x = bbox[target_labels, 3:].T
+
+    z_range = max(1, int(np.max(max_z - min_z)))
+
+    num_x = np.ceil((max_x - min_x) / (x_pixel * (1 - overlap))).astype(int)
+    shift_x = (num_x * x_pixel - (max_x - min_x)) // 2
+
+    num_y = np.ceil((max_y - min_y) / (y_pixel * (1 - overlap))).astype(int)
+    shift_y = (num_y * y_pixel - (max_y - min_y)) // 2
+
+    min_x = min_x - shift_x
+    min_y = min_y - shift_y
+
+    z_pos = z + z_start + min_z * z_step
+
+    # every tile after the first one of a label is one step from the first one.
+    x_start = (
+        position[x_direction_index]
+        + x_direction_alignment
+        * (min_x + x_pixel / 2 - center_x)
+        * current_pixel_size
+    )
+    x_next = x_start + x_direction_alignment * (
+        x_pixel * (1 - overlap) * current_pixel_size
+    )
+    y_start = (
+        position[y_direction_index]
+        + y_direction_alignment
+        * (min_y + y_pixel / 2 - center_y)
+        * current_pixel_size
+    )
+    y_next = y_start + y_direction_alignment * (
+        y_pixel * (1 - overlap) * current_pixel_size
+    )
+
+    # num_x * num_y tiles per label, with y changing fastest
+    tiles = num_x * num_y
+    label = np.repeat(np.arange(len(target_labels)), tiles)
+    tile = np.arange(len(label)) - np.repeat(np.cumsum(tiles) - tiles, tiles)
+    x_index, y_index = tile // num_y[label], tile % num_y[label]
+    x_positions = np.where(x_index > 0, x_next[label], x_start[label])
+    y_positions = np.where(y_index > 0, y_next[label], y_start[label])
+
+    if x_direction_index == 1:
+        x_positions, y_positions = y_positions, x_positions
+    position_table = [
+        [x_pos, y_pos, z_pos, theta, f]
+        for x_pos, y_pos, z_pos in zip(
+            x_positions.tolist(), y_positions.tolist(), z_pos[label].tolist()
+        )
+    ]
 
-    target_labels_index = []
-    start = -1
-    end = -1
-    start_weight = current_image_width + current_image_height
-    end_weight = 0
+    return z_range, position_table, target_labels.tolist()
 
-    for i in range(target_num):
-        min_z, min_y, min_x, max_z, max_y, max_x = regionprops[i].bbox
 
-        # do not need to calculate the position
-        # if the label area is smaller than filter_pixel_number in x or y.
-        if (max_x - min_x) < filter_pixel_number or (
-            max_y - min_y
-        ) < filter_pixel_number:
-            continue
+def nearest_neighbour_path(points, start=0):
+    """Order points by a nearest neighbour traversal.
 
-        target_labels_index.append(i)
-        # find the start and end position
-        centroid_z, centroid_y, centroid_x = regionprops[i].centroid 
-        if start < 0:
-            start = len(target_labels_index) - 1
-            start_weight = centroid_x + centroid_y
-        elif centroid_x + centroid_y < start_weight:
-            if end_weight < start_weight:
-                end = start
-                end_weight = start_weight
-            start = len(target_labels_index) - 1
-            start_weight = centroid_x + centroid_y
-        elif centroid_x + centroid_y > end_weight:
-            end = len(target_labels_index) - 1
-            end_weight = centroid_x + centroid_y
-
-    # build a graph
-    weight_graph = [[0 for i in range(len(target_labels_index))] for _ in range(len(target_labels_index))]
-    for i in range(len(target_labels_index)):
-        centroid_z_i, centroid_y_i, centroid_x_i = regionprops[target_labels_index[i]].centroid
-        for j in range(len(target_labels_index)):
-            if i == j:
-                weight_graph[j][i] = weight_graph[i][j] = current_image_width + current_image_height
-                continue
-            centroid_z_j, centroid_y_j, centroid_x_j = regionprops[target_labels_index[j]].centroid
-            weight_graph[i][j] = abs(centroid_x_i - centroid_x_j) + abs(centroid_y_i - centroid_y_j)
-            weight_graph[j][i] = weight_graph[i][j]
-    # find the appoximation shortest path in (x, y).
-    visited_num = 1
-    target_labels = [target_labels_index[start]]
-    pre = start
-    visited = [False] * len(target_labels_index)
-    visited[start] = True
-    while visited_num < len(target_labels_index):
-        while True:
-            idx = weight_graph[pre].index(min(weight_graph[pre]))
-            weight_graph[pre][idx] = weight_graph[idx][pre] = current_image_width + current_image_height
-            if not visited[idx]:
-                break
-        target_labels.append(target_labels_index[idx])
-        pre = idx
-        visited[idx] = True
-        visited_num += 1
-    
-    for i in target_labels:
-        min_z, min_y, min_x, max_z, max_y, max_x = regionprops[i].bbox
+    From the start point, the path always continues to the closest point that has
+    not been visited yet, in Manhattan distance. Ties go to the lowest index. The
+    closest points are found with a KD-tree, which is rebuilt from the points not
+    visited yet whenever more than half of its points have been visited.
 
-        num_x = math.ceil((max_x - min_x) / (x_pixel * (1 - overlap)))
-        shift_x = (num_x * x_pixel - (max_x - min_x)) // 2
-
-        num_y = math.ceil((max_y - min_y) / (y_pixel * (1 - overlap)))
-        shift_y = (num_y * y_pixel - (max_y - min_y)) // 2
-
-        z_range = max(z_range, (max_z - min_z))
+    Parameters
+    ----------
+    points : ndarray
+        N x 2 array of (x, y) coordinates.
+    start : int
+        Index of the first point.
 
-        min_x -= shift_x
-        min_y -= shift_y
+    Returns
+    -------
+    path : ndarray
+        Indices of the points in the order they are visited.
+    """
+    number_of_points = len(points)
+    path = np.empty(number_of_points, dtype=int)
+    path[0] = current = start
+    visited = np.zeros(number_of_points, dtype=bool)
+    visited[start] = True
 
-        z_pos = z + z_start + min_z * z_step
+    tree, tree_indices, visited_in_tree = None, None, 0
+    for i in range(1, number_of_points):
+        if tree is None or 2 * visited_in_tree > len(tree_indices):
+            tree_indices = np.flatnonzero(~visited)
+            tree = cKDTree(points[tree_indices])
+            visited_in_tree = 0
 
-        x_start = (
-            position[x_direction_index]
-            + x_direction_alignment
-            * (min_x + x_pixel / 2 - center_x)
-            * current_pixel_size
-        )
-        x_positions = [x_start]
-        for _ in range(1, num_x):
-            x_positions.append(
-                x_start
-                + x_direction_alignment * (x_pixel * (1 - overlap) * current_pixel_size)
-            )
-
-        y_start = (
-            position[y_direction_index]
-            + y_direction_alignment
-            * (min_y + y_pixel / 2 - center_y)
-            * current_pixel_size
-        )
-        y_positions = [y_start]
-        for _ in range(1, num_y):
-            y_positions.append(
-                y_start
-                + y_direction_alignment * (y_pixel * (1 - overlap) * current_pixel_size)
-            )
+        k = min(8, len(tree_indices))
+        while True:
+            distances, candidates = tree.query(points[current], k=k, p=1)
+            candidates = tree_indices[np.atleast_1d(candidates)]
+            not_visited = ~visited[candidates]
+            if not_visited.any():
+                # exact distances, the KD-tree may round differently
+                exact = np.abs(points[candidates, 0] - points[current, 0]) + np.abs(
+                    points[candidates, 1] - points[current, 1]
+                )
+                distance = np.min(exact[not_visited])
+                # all points as close as the closest one are among the candidates
+                if k == len(tree_indices) or np.atleast_1d(distances)[-1] > (
+                    distance + 1e-6 * (1 + distance)
+                ):
+                    current = np.min(candidates[not_visited & (exact == distance)])
+                    break
+            k = min(2 * k, len(tree_indices))
 
-        if x_direction_index == 0:
-            position_table += [
-                [x_pos, y_pos] + [z_pos, theta, f]
-                for x_pos, y_pos in product(x_positions, y_positions)
-            ]
-        else:
-            position_table += [
-                [y_pos, x_pos] + [z_pos, theta, f]
-                for x_pos, y_pos in product(x_positions, y_positions)
-            ]
+        path[i] = current
+        visited[current] = True
+        visited_in_tree += 1
 
-    return z_range, position_table, target_labels
+    return path
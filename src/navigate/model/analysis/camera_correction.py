@@ -0,0 +1,276 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard library imports
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# Third-party imports
+import numpy as np
+import numpy.typing as npt
+
+# Local application imports
+
+
+def flatfield_gain_table(flatfield: npt.ArrayLike, gain_bits: int = 12) -> np.ndarray:
+    """Convert a flat-field map to a fixed-point gain table.
+
+    Parameters
+    ----------
+    flatfield : npt.ArrayLike
+        YX flat-field map, e.g. from compute_flatfield_map. Pixels are divided by it.
+    gain_bits : int
+        Number of fractional bits of the gains.
+
+    Returns
+    -------
+    gain : np.ndarray
+        YX uint16 table of round(2**gain_bits / flatfield). Pixels with a
+        non-positive or non-finite flat-field keep a unit gain.
+    """
+    flatfield = np.asarray(flatfield, dtype=np.float64)
+    unit = float(2**gain_bits)
+    valid = np.isfinite(flatfield) & (flatfield > 0)
+    gain = np.full(flatfield.shape, unit)
+    np.divide(unit, flatfield, out=gain, where=valid)
+    return np.rint(np.clip(gain, 0, np.iinfo(np.uint16).max)).astype(np.uint16)
+
+
+class CameraCorrection:
+    """In-place dark offset and flat-field correction of uint16 frames.
+
+    Each frame is corrected as clip(frame - offset, 0) * 2**gain_bits / flatfield
+    with integer arithmetic. The offset subtraction stays in uint16 and the gain
+    product is taken in a uint32 scratch buffer, one band of rows at a time so
+    the scratch stays cache resident. Bands can be spread over worker threads, as
+    NumPy releases the GIL in its ufuncs.
+    """
+
+    def __init__(
+        self,
+        offset: Optional[npt.ArrayLike] = None,
+        flatfield: Optional[npt.ArrayLike] = None,
+        gain_bits: int = 12,
+        workers: int = 1,
+        band_height: int = 64,
+    ) -> None:
+        """Initialize the correction.
+
+        Parameters
+        ----------
+        offset : Optional[npt.ArrayLike]
+            YX dark offset map, in counts.
+        flatfield : Optional[npt.ArrayLike]
+            YX flat-field map, in the frame of the offset-corrected image.
+        gain_bits : int
+            Number of fractional bits of the gain table. Gains up to
+            2**(16 - gain_bits) are represented.
+        workers : int
+            Number of threads correcting bands of rows.
+        band_height : int
+            Number of rows corrected at once.
+        """
+        #: np.ndarray: YX uint16 dark offset map, or None.
+        self.offset = None if offset is None else self._to_uint16(offset)
+
+        #: int: Number of fractional bits of the gain table.
+        self.gain_bits = gain_bits
+
+        #: np.ndarray: YX uint16 fixed-point gain table, or None.
+        self.gain = (
+            None if flatfield is None else flatfield_gain_table(flatfield, gain_bits)
+        )
+
+        if self.offset is not None and self.gain is not None:
+            if self.offset.shape != self.gain.shape:
+                raise ValueError(
+                    f"Offset map {self.offset.shape} and flat-field map "
+                    f"{self.gain.shape} have different shapes."
+                )
+
+        #: int: Number of threads correcting bands of rows.
+        self.workers = max(int(workers), 1)
+
+        #: int: Number of rows corrected at once.
+        self.band_height = max(int(band_height), 1)
+
+        #: ThreadPoolExecutor: Corrects bands of rows, created on first use.
+        self.executor = None
+
+        #: dict: uint32 scratch buffer of each thread, keyed by band start row.
+        self._scratch = {}
+
+    @staticmethod
+    def _to_uint16(image: npt.ArrayLike) -> np.ndarray:
+        image = np.asarray(image)
+        if image.dtype != np.uint16:
+            image = np.rint(np.clip(image, 0, np.iinfo(np.uint16).max)).astype(
+                np.uint16
+            )
+        return np.ascontiguousarray(image)
+
+    @property
+    def shape(self) -> Optional[tuple]:
+        """YX shape of the maps, None if there are none."""
+        for image in (self.offset, self.gain):
+            if image is not None:
+                return image.shape
+        return None
+
+    @property
+    def is_active(self) -> bool:
+        """Whether there is anything to correct."""
+        return self.shape is not None
+
+    def crop(self, top: int, left: int, height: int, width: int) -> "CameraCorrection":
+        """Get the correction of a region of interest of the maps.
+
+        Parameters
+        ----------
+        top : int
+            First row of the region.
+        left : int
+            First column of the region.
+        height : int
+            Number of rows.
+        width : int
+            Number of columns.
+
+        Returns
+        -------
+        correction : CameraCorrection
+            Correction of the region.
+
+        Raises
+        ------
+        ValueError
+            If the region is not inside the maps.
+        """
+        shape = self.shape
+        if (
+            shape is None
+            or top < 0
+            or left < 0
+            or top + height > shape[0]
+            or left + width > shape[1]
+        ):
+            raise ValueError(
+                f"Region {height}x{width} at ({top}, {left}) is outside of the "
+                f"camera maps {shape}."
+            )
+        rows, cols = slice(top, top + height), slice(left, left + width)
+        correction = CameraCorrection(
+            gain_bits=self.gain_bits,
+            workers=self.workers,
+            band_height=self.band_height,
+        )
+        if self.offset is not None:
+            correction.offset = np.ascontiguousarray(self.offset[rows, cols])
+        if self.gain is not None:
+            correction.gain = np.ascontiguousarray(self.gain[rows, cols])
+        return correction
+
+    def correct_band(self, image: np.ndarray, start: int, stop: int) -> None:
+        """Correct rows start to stop of a frame in place.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            YX uint16 frame.
+        start : int
+            First row.
+        stop : int
+            Row after the last one.
+        """
+        band = image[start:stop]
+        if self.offset is not None:
+            offset = self.offset[start:stop]
+            # saturating subtraction: max(a, b) - b never wraps around
+            np.maximum(band, offset, out=band)
+            np.subtract(band, offset, out=band)
+        if self.gain is not None:
+            scratch = self._scratch.get(start, None)
+            if scratch is None or scratch.shape != band.shape:
+                scratch = np.empty(band.shape, dtype=np.uint32)
+                self._scratch[start] = scratch
+            np.multiply(band, self.gain[start:stop], out=scratch, dtype=np.uint32)
+            # round to nearest, then drop the fractional bits
+            np.add(scratch, 1 << (self.gain_bits - 1), out=scratch)
+            np.right_shift(scratch, self.gain_bits, out=scratch)
+            np.minimum(scratch, np.iinfo(np.uint16).max, out=scratch)
+            np.copyto(band, scratch, casting="unsafe")
+
+    def __call__(self, image: np.ndarray) -> np.ndarray:
+        """Correct a frame in place.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            YX uint16 frame, with the shape of the maps.
+
+        Returns
+        -------
+        image : np.ndarray
+            The corrected frame.
+        """
+        if not self.is_active:
+            return image
+        if image.shape != self.shape:
+            raise ValueError(
+                f"Frame {image.shape} does not match the camera maps {self.shape}."
+            )
+        starts = range(0, image.shape[0], self.band_height)
+        if self.workers == 1:
+            for start in starts:
+                self.correct_band(image, start, start + self.band_height)
+            return image
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="CameraCorrection"
+            )
+        # bands are disjoint, each one has its own scratch buffer
+        list(
+            self.executor.map(
+                lambda start: self.correct_band(
+                    image, start, start + self.band_height
+                ),
+                starts,
+            )
+        )
+        return image
+
+    def close(self) -> None:
+        """Stop the worker threads."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
@@ -0,0 +1,370 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard library imports
+import logging
+from typing import Callable, Optional
+
+# Third-party imports
+import numpy as np
+import numpy.typing as npt
+
+# Local application imports
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+#: str: Axis names in array (plane, row, column) order.
+AXES = "zyx"
+
+#: str: Axis names in the (x, y, z) order of BigDataViewer affine transforms.
+BDV_AXES = "xyz"
+
+
+class StreamingDeskew:
+    """Deskew a sheared z-stack plane by plane while it is acquired.
+
+    Every voxel is displaced along one axis by ``factor`` times its index along a
+    second axis. The displacement is split into an integer and a fractional part
+    once, and each incoming plane is scattered into the output volume with linear
+    interpolation between the two neighbouring output voxels.
+
+    When planes are displaced along z, every row of a plane lands in a different
+    output plane. Only the output planes that can still receive data are held in
+    a ring buffer, and an output plane is passed to the sink as soon as no later
+    input plane can contribute to it. Memory is bounded by the shear extent, not
+    by the number of planes in the stack. All other shears are computed within a
+    single plane, which is passed to the sink immediately.
+    """
+
+    def __init__(
+        self,
+        shape_z: int,
+        shape_y: int,
+        shape_x: int,
+        factor: float,
+        displaced: str = "y",
+        source: str = "z",
+        dtype: npt.DTypeLike = "uint16",
+        sink: Optional[Callable[[npt.NDArray], None]] = None,
+    ) -> None:
+        """Initialize the deskew stage.
+
+        Parameters
+        ----------
+        shape_z : int
+            Number of planes in the raw stack.
+        shape_y : int
+            Number of rows in a raw plane.
+        shape_x : int
+            Number of columns in a raw plane.
+        factor : float
+            Displacement along the displaced axis, in voxels, per voxel along the
+            source axis.
+        displaced : str
+            Axis along which voxels are displaced: "z", "y" or "x".
+        source : str
+            Axis whose index sets the displacement: "z", "y" or "x".
+        dtype : npt.DTypeLike
+            Data type of the output planes.
+        sink : Optional[Callable[[npt.NDArray], None]]
+            Called with every completed output plane, in order.
+
+        Raises
+        ------
+        ValueError
+            If the axes are unknown or identical.
+        """
+        displaced, source = displaced.lower(), source.lower()
+        if displaced not in AXES or source not in AXES or displaced == source:
+            raise ValueError(f"Cannot shear {displaced} along {source}.")
+
+        #: tuple: Shape of the raw stack (z, y, x).
+        self.raw_shape = (int(shape_z), int(shape_y), int(shape_x))
+
+        #: float: Displacement in voxels per voxel along the source axis.
+        self.factor = float(factor)
+
+        #: int: Index of the displaced axis in (z, y, x).
+        self.displaced = AXES.index(displaced)
+
+        #: int: Index of the source axis in (z, y, x).
+        self.source = AXES.index(source)
+
+        #: np.dtype: Data type of the output planes.
+        self.dtype = np.dtype(dtype)
+
+        #: Callable: Receives every completed output plane.
+        self.sink = sink
+
+        shifts = self.factor * np.arange(self.raw_shape[self.source])
+        shifts -= min(shifts.min(), 0)
+        # Ignore rounding errors of the shear, e.g. cos(60°) * 2 != 1.
+        shifts = np.round(shifts, 6)
+
+        #: npt.NDArray: Integer part of the displacement of each source index.
+        self.shift_index = np.floor(shifts).astype(np.intp)
+
+        #: npt.NDArray: Fractional part of the displacement of each source index.
+        self.shift_fraction = (shifts - self.shift_index).astype(np.float32)
+
+        extent = int(np.max(self.shift_index + (self.shift_fraction > 0)))
+        shape = list(self.raw_shape)
+        shape[self.displaced] += extent
+
+        #: tuple: Shape of the deskewed stack (z, y, x).
+        self.shape = tuple(shape)
+
+        #: int: Number of output planes held until they are complete.
+        self.depth = extent + 1 if self.displaced == 0 else 1
+
+        # Pad in-plane shears by one voxel, so the interpolation of the last
+        # line never needs bounds checks.
+        padded = [self.depth] + list(self.shape[1:])
+        if self.displaced != 0:
+            padded[self.displaced] += 1
+
+        #: npt.NDArray: Ring buffer of the output planes that are not complete.
+        self.window = np.zeros(padded, dtype=np.float32)
+
+        if self.dtype.kind in "ui":
+            info = np.iinfo(self.dtype)
+            #: tuple: Range of values representable in the output data type.
+            self._limits = (info.min, info.max)
+        else:
+            self._limits = None
+
+        #: int: Index of the next raw plane.
+        self.z_in = 0
+
+        #: int: Index of the next output plane.
+        self.z_out = 0
+
+    @classmethod
+    def from_shear_transform(
+        cls,
+        transform: npt.ArrayLike,
+        shape_z: int,
+        shape_y: int,
+        shape_x: int,
+        **kwargs,
+    ) -> "StreamingDeskew":
+        """Build the deskew stage from a BigDataViewer shear transform.
+
+        Parameters
+        ----------
+        transform : npt.ArrayLike
+            (3, 4) or (4, 4) affine transform in (x, y, z) voxel coordinates, e.g.
+            BigDataViewerMetadata.shear_transform.
+        shape_z : int
+            Number of planes in the raw stack.
+        shape_y : int
+            Number of rows in a raw plane.
+        shape_x : int
+            Number of columns in a raw plane.
+        **kwargs
+            Passed to StreamingDeskew.
+
+        Returns
+        -------
+        StreamingDeskew
+            The deskew stage. A transform without shear gives an identity stage.
+
+        Raises
+        ------
+        ValueError
+            If the transform shears along more than one axis pair.
+        """
+        shear = np.array(transform, dtype=float)[:3, :3] - np.eye(3)
+        rows, cols = np.nonzero(shear)
+        if len(rows) > 1:
+            raise ValueError("Only a single shear component can be deskewed.")
+        if len(rows) == 0:
+            return cls(shape_z, shape_y, shape_x, 0, **kwargs)
+        return cls(
+            shape_z,
+            shape_y,
+            shape_x,
+            shear[rows[0], cols[0]],
+            displaced=BDV_AXES[rows[0]],
+            source=BDV_AXES[cols[0]],
+            **kwargs,
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        """Have all the output planes of the current stack been emitted?
+
+        Returns
+        -------
+        bool
+            True until the first plane of a stack is pushed.
+        """
+        return self.z_in == 0
+
+    def push(self, image: npt.ArrayLike) -> int:
+        """Scatter the next raw plane into the output stack.
+
+        The stack is flushed automatically after its last plane.
+
+        Parameters
+        ----------
+        image : npt.ArrayLike
+            (y, x) raw plane.
+
+        Returns
+        -------
+        int
+            Number of output planes passed to the sink.
+        """
+        z = self.z_in
+        if self.displaced == 0:
+            self._scatter_planes(image, z)
+        else:
+            self._scatter_in_plane(image, z)
+        self.z_in += 1
+
+        emitted = self._emit(z + 1)
+        if self.z_in == self.raw_shape[0]:
+            emitted += self.flush()
+        return emitted
+
+    def flush(self) -> int:
+        """Emit the remaining output planes and start a new stack.
+
+        Called automatically after the last plane of a stack. Call it directly to
+        finish a stack that was stopped early, which emits only the output planes
+        that received data.
+
+        Returns
+        -------
+        int
+            Number of output planes passed to the sink.
+        """
+        if self.z_in == 0:
+            return 0
+        stop = self.z_in
+        if self.displaced == 0:
+            stop = min(self.z_in + self.depth - 1, self.shape[0])
+        try:
+            return self._emit(stop)
+        finally:
+            self.window[:] = 0
+            self.z_in, self.z_out = 0, 0
+
+    def _emit(self, stop: int) -> int:
+        """Pass the output planes before ``stop`` to the sink.
+
+        Parameters
+        ----------
+        stop : int
+            Index of the first output plane that is not complete.
+
+        Returns
+        -------
+        int
+            Number of output planes passed to the sink.
+        """
+        emitted = 0
+        while self.z_out < stop:
+            slot = self.window[self.z_out % self.depth]
+            plane = slot[: self.shape[1], : self.shape[2]]
+            if self._limits is not None:
+                np.rint(plane, out=plane)
+                np.clip(plane, *self._limits, out=plane)
+            if self.sink is not None:
+                self.sink(plane.astype(self.dtype))
+            slot[:] = 0
+            self.z_out += 1
+            emitted += 1
+        return emitted
+
+    def _scatter_planes(self, image: npt.ArrayLike, z: int) -> None:
+        """Scatter the rows or columns of a plane over the output planes.
+
+        Parameters
+        ----------
+        image : npt.ArrayLike
+            (y, x) raw plane.
+        z : int
+            Index of the raw plane.
+        """
+        image = np.asarray(image, dtype=np.float32)
+        if self.source == 2:
+            # Columns are displaced. Advanced indexing puts them first.
+            image = image.T
+        lines = np.arange(image.shape[0])
+        planes = (z + self.shift_index) % self.depth
+        weight = self.shift_fraction[:, None]
+        index = (planes, lines) if self.source == 1 else (planes, slice(None), lines)
+        self.window[index] += (1 - weight) * image
+        index = (
+            ((planes + 1) % self.depth, lines)
+            if self.source == 1
+            else ((planes + 1) % self.depth, slice(None), lines)
+        )
+        self.window[index] += weight * image
+
+    def _scatter_in_plane(self, image: npt.ArrayLike, z: int) -> None:
+        """Shift a plane, or its rows or columns, within the output plane.
+
+        Parameters
+        ----------
+        image : npt.ArrayLike
+            (y, x) raw plane.
+        z : int
+            Index of the raw plane.
+        """
+        image = np.asarray(image, dtype=np.float32)
+        out = self.window[0]
+        ny, nx = image.shape
+        if self.source == 0:
+            shift, weight = self.shift_index[z], self.shift_fraction[z]
+            for offset, w in ((0, 1 - weight), (1, weight)):
+                start = shift + offset
+                if self.displaced == 1:
+                    out[start : start + ny, :nx] += w * image
+                else:
+                    out[:ny, start : start + nx] += w * image
+            return
+
+        # Displacement within the plane, e.g. x shifted by y.
+        rows, cols = np.arange(ny)[:, None], np.arange(nx)[None, :]
+        if self.displaced == 2:
+            shift, weight = self.shift_index[:, None], self.shift_fraction[:, None]
+            out[rows, cols + shift] += (1 - weight) * image
+            out[rows, cols + shift + 1] += weight * image
+        else:
+            shift, weight = self.shift_index[None, :], self.shift_fraction[None, :]
+            out[rows + shift, cols] += (1 - weight) * image
+            out[rows + shift + 1, cols] += weight * image
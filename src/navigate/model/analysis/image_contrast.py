@@ -36,7 +36,6 @@ import logging
 
 # Third Party Imports
 import numpy as np
-from scipy.fftpack import dctn
 
 # Local Imports
 
@@ -61,6 +60,8 @@ def fast_normalized_dct_shannon_entropy(input_array, psf_support_diameter_xy):
         Entropy value.
     """
 
+    from scipy.fftpack import dctn
+
     dct_array = dctn(input_array, type=2)
     abs_array = np.abs(dct_array / np.linalg.norm(dct_array))
     yh = int(input_array.shape[1] // psf_support_diameter_xy)
@@ -0,0 +1,256 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard library imports
+from typing import Optional
+
+# Third-party imports
+import numpy as np
+import numpy.typing as npt
+
+# Local application imports
+from navigate.model.concurrency.concurrency_tools import SharedNDArray
+
+
+class MIPAccumulator:
+    """Orthogonal maximum intensity projections accumulated frame by frame.
+
+    Holds the XY, ZY and ZX projections for every channel of a z-stack. The
+    projections live in shared memory, so the model can update them once per frame
+    while the image writer saves them and the controller displays them without
+    repeating the reduction.
+    """
+
+    def __init__(
+        self,
+        number_of_channels: int,
+        number_of_slices: int,
+        img_height: int,
+        img_width: int,
+        stack_cycling_mode: Optional[str] = "per_stack",
+        shared: bool = True,
+    ) -> None:
+        """Initialize the MIP accumulator.
+
+        Parameters
+        ----------
+        number_of_channels : int
+            Number of channels in the stack.
+        number_of_slices : int
+            Number of z-slices in the stack.
+        img_height : int
+            Number of pixels in the y-dimension.
+        img_width : int
+            Number of pixels in the x-dimension.
+        stack_cycling_mode : Optional[str]
+            'per_stack', 'per_z', or None. Controls how frames are mapped to
+            channels and slices in add_frame. None places every frame in channel 0.
+        shared : bool
+            Allocate the projections in shared memory.
+        """
+        #: int: Number of channels.
+        self.number_of_channels = max(int(number_of_channels), 1)
+
+        #: int: Number of z-slices.
+        self.number_of_slices = max(int(number_of_slices), 1)
+
+        #: int: Image height.
+        self.img_height = int(img_height)
+
+        #: int: Image width.
+        self.img_width = int(img_width)
+
+        #: str: Stack cycling mode.
+        self.stack_cycling_mode = stack_cycling_mode
+
+        #: list: Index of each channel in acquisition order, None if the channels
+        #: are acquired in order.
+        self.channel_order = None
+
+        #: int: Number of frames added through add_frame.
+        self.frame_count = 0
+
+        #: int: Number of rows reduced at once. Keeps each band cache resident.
+        self.band_height = 64
+
+        allocate = SharedNDArray if shared else np.zeros
+
+        #: npt.ArrayLike: XY projection, shape (channels, height, width).
+        self.xy = allocate(
+            shape=(self.number_of_channels, self.img_height, self.img_width),
+            dtype="uint16",
+        )
+
+        #: npt.ArrayLike: ZY projection, shape (channels, slices, width).
+        self.zy = allocate(
+            shape=(self.number_of_channels, self.number_of_slices, self.img_width),
+            dtype="uint16",
+        )
+
+        #: npt.ArrayLike: ZX projection, shape (channels, slices, height).
+        self.zx = allocate(
+            shape=(self.number_of_channels, self.number_of_slices, self.img_height),
+            dtype="uint16",
+        )
+        self.reset()
+
+    def matches(
+        self,
+        number_of_channels: int,
+        number_of_slices: int,
+        img_height: int,
+        img_width: int,
+    ) -> bool:
+        """Check whether the accumulator has the requested dimensions.
+
+        Parameters
+        ----------
+        number_of_channels : int
+            Number of channels in the stack.
+        number_of_slices : int
+            Number of z-slices in the stack.
+        img_height : int
+            Number of pixels in the y-dimension.
+        img_width : int
+            Number of pixels in the x-dimension.
+
+        Returns
+        -------
+        bool
+            True if the projections have the requested shape.
+        """
+        return self.xy.shape == (
+            max(int(number_of_channels), 1),
+            int(img_height),
+            int(img_width),
+        ) and self.zy.shape[1] == max(int(number_of_slices), 1)
+
+    def reset(self) -> None:
+        """Clear the projections and the frame counter."""
+        self.frame_count = 0
+        self.xy.fill(0)
+        self.zy.fill(0)
+        self.zx.fill(0)
+
+    def locate(self, frame_count: int) -> tuple:
+        """Map a frame count to its channel and slice index.
+
+        Parameters
+        ----------
+        frame_count : int
+            Number of frames received before this one.
+
+        Returns
+        -------
+        channel_idx : int
+            The channel index.
+        slice_idx : int
+            The slice index.
+        """
+        if self.stack_cycling_mode == "per_stack":
+            channel_idx = (frame_count // self.number_of_slices) % (
+                self.number_of_channels
+            )
+            slice_idx = frame_count % self.number_of_slices
+        elif self.stack_cycling_mode == "per_z":
+            channel_idx = frame_count % self.number_of_channels
+            slice_idx = (frame_count // self.number_of_channels) % (
+                self.number_of_slices
+            )
+        else:
+            channel_idx = 0
+            slice_idx = frame_count % self.number_of_slices
+        if self.channel_order is not None:
+            channel_idx = self.channel_order[channel_idx]
+        return channel_idx, slice_idx
+
+    def add_frame(self, image: npt.ArrayLike) -> tuple:
+        """Add the next frame of the acquisition to the projections.
+
+        Parameters
+        ----------
+        image : npt.ArrayLike
+            YX image.
+
+        Returns
+        -------
+        channel_idx : int
+            The channel index the frame was added to.
+        slice_idx : int
+            The slice index the frame was added to.
+        """
+        channel_idx, slice_idx = self.locate(self.frame_count)
+        self.update(image, channel_idx, slice_idx)
+        self.frame_count += 1
+        return channel_idx, slice_idx
+
+    def update(self, image: npt.ArrayLike, channel_idx: int, slice_idx: int) -> None:
+        """Update the projections of one channel with a new slice.
+
+        The frame is reduced in row bands so that every pixel is read from main
+        memory once, and all three projections are updated in place. The first
+        slice of a stack overwrites the XY projection instead of accumulating into
+        it, which starts a new stack without a separate clearing pass.
+
+        Parameters
+        ----------
+        image : npt.ArrayLike
+            YX image.
+        channel_idx : int
+            The channel index.
+        slice_idx : int
+            The slice index.
+        """
+        if image.dtype != self.xy.dtype:
+            image = image.astype(self.xy.dtype)
+        xy = self.xy[channel_idx]
+        zy = self.zy[channel_idx, slice_idx]
+        zx = self.zx[channel_idx, slice_idx]
+        height = min(image.shape[0], self.img_height)
+        width = min(image.shape[1], self.img_width)
+        if width < self.img_width:
+            zy[width:] = 0
+        if height < self.img_height:
+            zx[height:] = 0
+
+        for start in range(0, height, self.band_height):
+            stop = min(start + self.band_height, height)
+            band = image[start:stop, :width]
+            if slice_idx == 0:
+                xy[start:stop, :width] = band
+            else:
+                np.maximum(xy[start:stop, :width], band, out=xy[start:stop, :width])
+            np.max(band, axis=1, out=zx[start:stop])
+            if start == 0:
+                np.max(band, axis=0, out=zy[:width])
+            else:
+                np.maximum(zy[:width], np.max(band, axis=0), out=zy[:width])
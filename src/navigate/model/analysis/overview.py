@@ -0,0 +1,434 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard library imports
+import math
+from typing import Optional
+
+# Third-party imports
+import numpy as np
+import numpy.typing as npt
+
+# Local application imports
+from navigate.model.concurrency.concurrency_tools import SharedNDArray
+
+
+class OverviewMosaic:
+    """Low-resolution overview of a tiled acquisition, built tile by tile.
+
+    Each tile is the XY maximum intensity projection of a stack, down-sampled to
+    the resolution of the canvas and max-blended at its stage position. The canvas
+    is kept as a pyramid of levels, each half the size of the previous one, and
+    only the region covered by a new tile is updated. The levels live in shared
+    memory, so the controller can pan and zoom while the model adds tiles.
+
+    The canvas uses stage coordinates: columns follow the x axis and rows the y
+    axis, with tiles centred at their stage positions.
+    """
+
+    def __init__(
+        self,
+        number_of_channels: int,
+        origin: tuple,
+        extent: tuple,
+        tile_size: tuple,
+        um_per_pixel: float,
+        number_of_levels: int = 4,
+        max_size: int = 4096,
+        flip_x: bool = False,
+        flip_y: bool = False,
+        shared: bool = True,
+    ) -> None:
+        """Initialize the overview canvas.
+
+        Parameters
+        ----------
+        number_of_channels : int
+            Number of channels in the acquisition.
+        origin : tuple
+            (x, y) stage position of the top-left corner of the canvas, in microns.
+        extent : tuple
+            (width, height) of the canvas, in microns.
+        tile_size : tuple
+            (width, height) of the field of view, in microns.
+        um_per_pixel : float
+            Requested resolution of the canvas, in microns per pixel.
+        number_of_levels : int
+            Maximum number of pyramid levels, including the full-size canvas.
+        max_size : int
+            Maximum width or height of the canvas. The resolution is reduced to fit.
+        flip_x : bool
+            Flip the tiles horizontally, as the camera display does.
+        flip_y : bool
+            Flip the tiles vertically, as the camera display does.
+        shared : bool
+            Allocate the canvas in shared memory.
+        """
+        #: int: Number of channels.
+        self.number_of_channels = max(int(number_of_channels), 1)
+
+        #: tuple: Stage position of the top-left corner of the canvas (x, y).
+        self.origin = (float(origin[0]), float(origin[1]))
+
+        #: tuple: Size of the canvas in microns (width, height).
+        self.extent = (float(extent[0]), float(extent[1]))
+
+        #: tuple: Size of a tile in microns (width, height).
+        self.tile_size = (float(tile_size[0]), float(tile_size[1]))
+
+        #: dict: Flip flags of the tiles.
+        self.flip_flags = {"x": bool(flip_x), "y": bool(flip_y)}
+
+        #: tuple: Normalized parameters the canvas was built with.
+        self.parameters = self._key(
+            number_of_channels,
+            origin,
+            extent,
+            tile_size,
+            um_per_pixel,
+            number_of_levels,
+            max_size,
+            flip_x,
+            flip_y,
+        )
+
+        largest = max(self.extent) / um_per_pixel
+        if largest > max_size:
+            um_per_pixel *= largest / max_size
+
+        #: float: Resolution of the full-size canvas, in microns per pixel.
+        self.um_per_pixel = float(um_per_pixel)
+
+        width = max(math.ceil(self.extent[0] / self.um_per_pixel), 1)
+        height = max(math.ceil(self.extent[1] / self.um_per_pixel), 1)
+
+        allocate = SharedNDArray if shared else np.zeros
+
+        #: list: Pyramid levels, each of shape (channels, height, width).
+        self.levels = []
+        for _ in range(max(int(number_of_levels), 1)):
+            self.levels.append(
+                allocate(shape=(self.number_of_channels, height, width), dtype="uint16")
+            )
+            if height == 1 or width == 1:
+                break
+            height, width = math.ceil(height / 2), math.ceil(width / 2)
+
+        #: npt.ArrayLike: Number of tiles added, polled by the display.
+        self.revision = allocate(shape=(1,), dtype="int64")
+        self.reset()
+
+    @staticmethod
+    def parameters_from_configuration(
+        configuration: dict,
+        microscope_name: str,
+        number_of_channels: int,
+        um_per_pixel: Optional[float] = None,
+    ) -> dict:
+        """Canvas parameters of the acquisition described by the configuration.
+
+        The canvas covers the fields of view of every position of the
+        multi-position table, or of the current position.
+
+        Parameters
+        ----------
+        configuration : dict
+            Navigate configuration, with the experiment and the multi-position table.
+        microscope_name : str
+            Name of the microscope acquiring the tiles.
+        number_of_channels : int
+            Number of channels in the acquisition.
+        um_per_pixel : Optional[float]
+            Resolution of the canvas. By default, a tile spans 128 pixels.
+
+        Returns
+        -------
+        dict
+            Keyword arguments of OverviewMosaic.
+        """
+        experiment = configuration["experiment"]
+        state = experiment["MicroscopeState"]
+        camera = experiment["CameraParameters"][microscope_name]
+        scope = configuration["configuration"]["microscopes"][microscope_name]
+        pixel_size = float(scope["zoom"]["pixel_size"].get(state["zoom"], 1))
+        tile_size = (
+            float(camera["x_pixels"]) * pixel_size,
+            float(camera["y_pixels"]) * pixel_size,
+        )
+
+        if state.get("is_multiposition", False) and configuration["multi_positions"]:
+            positions = np.array(
+                [position[:2] for position in configuration["multi_positions"]],
+                dtype=float,
+            )
+        else:
+            stage = experiment["StageParameters"]
+            positions = np.array([[stage["x"], stage["y"]]], dtype=float)
+
+        start = positions.min(axis=0) - np.divide(tile_size, 2)
+        stop = positions.max(axis=0) + np.divide(tile_size, 2)
+        camera_config = scope["camera"]
+        return {
+            "number_of_channels": number_of_channels,
+            "origin": tuple(start),
+            "extent": tuple(stop - start),
+            "tile_size": tile_size,
+            "um_per_pixel": float(um_per_pixel or tile_size[0] / 128),
+            "flip_x": camera_config.get("flip_x", False),
+            "flip_y": camera_config.get("flip_y", False),
+        }
+
+    @staticmethod
+    def _key(
+        number_of_channels: int,
+        origin: tuple,
+        extent: tuple,
+        tile_size: tuple,
+        um_per_pixel: float,
+        number_of_levels: int = 4,
+        max_size: int = 4096,
+        flip_x: bool = False,
+        flip_y: bool = False,
+        **_,
+    ) -> tuple:
+        """Normalized canvas parameters, for comparison.
+
+        Returns
+        -------
+        tuple
+            The parameters that determine the canvas.
+        """
+        return (
+            max(int(number_of_channels), 1),
+            tuple(np.round(np.array([*origin, *extent, *tile_size], dtype=float), 6)),
+            round(float(um_per_pixel), 6),
+            int(number_of_levels),
+            int(max_size),
+            bool(flip_x),
+            bool(flip_y),
+        )
+
+    def matches(self, **parameters) -> bool:
+        """Check whether the canvas was built with the given parameters.
+
+        Parameters
+        ----------
+        **parameters
+            Keyword arguments of OverviewMosaic, see parameters_from_configuration.
+
+        Returns
+        -------
+        bool
+            True if the canvas can be reused.
+        """
+        return self._key(**parameters) == self.parameters
+
+    @property
+    def shape(self) -> tuple:
+        """Shape of the full-size canvas.
+
+        Returns
+        -------
+        tuple
+            (channels, height, width).
+        """
+        return self.levels[0].shape
+
+    def reset(self) -> None:
+        """Clear the canvas."""
+        for level in self.levels:
+            level.fill(0)
+        self.revision[0] = 0
+
+    def downsample(self, image: npt.ArrayLike, height: int, width: int) -> np.ndarray:
+        """Down-sample a tile to its size on the canvas.
+
+        The tile is first binned by the largest integer factor that keeps it at
+        least as large as the target, then resampled to the exact size.
+
+        Parameters
+        ----------
+        image : npt.ArrayLike
+            YX tile.
+        height : int
+            Height of the tile on the canvas.
+        width : int
+            Width of the tile on the canvas.
+
+        Returns
+        -------
+        np.ndarray
+            The down-sampled uint16 tile.
+        """
+        factor = max(min(image.shape[0] // height, image.shape[1] // width), 1)
+        rows, cols = image.shape[0] // factor, image.shape[1] // factor
+        binned = (
+            np.asarray(image[: rows * factor, : cols * factor], dtype=np.float32)
+            .reshape(rows, factor, cols, factor)
+            .mean(axis=(1, 3))
+        )
+        row_index = (np.arange(height) * rows) // height
+        col_index = (np.arange(width) * cols) // width
+        return binned[row_index[:, None], col_index[None, :]].astype(np.uint16)
+
+    def add_tile(
+        self, image: npt.ArrayLike, x: float, y: float, channel: int = 0
+    ) -> Optional[tuple]:
+        """Blend the projection of a stack into the canvas.
+
+        Parameters
+        ----------
+        image : npt.ArrayLike
+            YX maximum intensity projection of the stack.
+        x : float
+            Stage position of the stack in x, in microns.
+        y : float
+            Stage position of the stack in y, in microns.
+        channel : int
+            Channel index.
+
+        Returns
+        -------
+        Optional[tuple]
+            (top, left, bottom, right) region of the full-size canvas that was
+            updated, or None if the tile is outside of the canvas.
+        """
+        height = max(round(self.tile_size[1] / self.um_per_pixel), 1)
+        width = max(round(self.tile_size[0] / self.um_per_pixel), 1)
+        top = round((y - self.origin[1]) / self.um_per_pixel - height / 2)
+        left = round((x - self.origin[0]) / self.um_per_pixel - width / 2)
+
+        canvas = self.levels[0][channel]
+        bottom, right = min(top + height, canvas.shape[0]), min(
+            left + width, canvas.shape[1]
+        )
+        clipped_top, clipped_left = max(top, 0), max(left, 0)
+        if clipped_top >= bottom or clipped_left >= right:
+            return None
+
+        tile = self.downsample(image, height, width)
+        if self.flip_flags["x"]:
+            tile = tile[:, ::-1]
+        if self.flip_flags["y"]:
+            tile = tile[::-1, :]
+        tile = tile[
+            clipped_top - top : bottom - top, clipped_left - left : right - left
+        ]
+        region = canvas[clipped_top:bottom, clipped_left:right]
+        np.maximum(region, tile, out=region)
+
+        self.update_levels(channel, clipped_top, clipped_left, bottom, right)
+        self.revision[0] += 1
+        return clipped_top, clipped_left, bottom, right
+
+    def update_levels(
+        self, channel: int, top: int, left: int, bottom: int, right: int
+    ) -> None:
+        """Propagate a region of the full-size canvas to the coarser levels.
+
+        Parameters
+        ----------
+        channel : int
+            Channel index.
+        top : int
+            First row of the region.
+        left : int
+            First column of the region.
+        bottom : int
+            Row after the region.
+        right : int
+            Column after the region.
+        """
+        for finer, coarser in zip(self.levels[:-1], self.levels[1:]):
+            top, left = top // 2, left // 2
+            bottom, right = math.ceil(bottom / 2), math.ceil(right / 2)
+            source = np.asarray(
+                finer[channel, 2 * top : 2 * bottom, 2 * left : 2 * right],
+                dtype=np.float32,
+            )
+            # Repeat the last row and column of odd-sized canvases.
+            pad = (
+                (0, 2 * (bottom - top) - source.shape[0]),
+                (0, 2 * (right - left) - source.shape[1]),
+            )
+            if any(after for _, after in pad):
+                source = np.pad(source, pad, mode="edge")
+            coarser[channel, top:bottom, left:right] = source.reshape(
+                bottom - top, 2, right - left, 2
+            ).mean(axis=(1, 3))
+
+    def region(
+        self,
+        channel: int,
+        top: int,
+        left: int,
+        bottom: int,
+        right: int,
+        height: int,
+        width: int,
+    ) -> np.ndarray:
+        """Get a region of the canvas from the coarsest sufficient level.
+
+        Parameters
+        ----------
+        channel : int
+            Channel index.
+        top : int
+            First row of the region in the full-size canvas.
+        left : int
+            First column of the region in the full-size canvas.
+        bottom : int
+            Row after the region in the full-size canvas.
+        right : int
+            Column after the region in the full-size canvas.
+        height : int
+            Height of the display.
+        width : int
+            Width of the display.
+
+        Returns
+        -------
+        np.ndarray
+            The region, with at least height x width pixels where the canvas
+            resolution allows it.
+        """
+        level = 0
+        while (
+            level + 1 < len(self.levels)
+            and (bottom - top) >> (level + 1) >= height
+            and (right - left) >> (level + 1) >= width
+        ):
+            level += 1
+        top, left = top >> level, left >> level
+        bottom = max(bottom >> level, top + 1)
+        right = max(right >> level, left + 1)
+        return self.levels[level][channel, top:bottom, left:right]
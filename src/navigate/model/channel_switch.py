@@ -0,0 +1,278 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple
+
+# Third Party Imports
+
+# Local Imports
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+#: type: A named device operation, the devices it uses, and the function to call.
+Operation = Tuple[str, Sequence[Any], Callable[[], Any]]
+
+
+def device_resource(device: Any) -> Any:
+    """Get the resource a device operation has exclusive use of.
+
+    Devices that share a connection, e.g. a filter wheel and a stage on the same
+    ASI controller, or a galvo stage driven by the DAQ, share its resource.
+
+    Parameters
+    ----------
+    device : Any
+        Navigate device.
+
+    Returns
+    -------
+    resource : Any
+        The device connection, or the device itself if it has none.
+    """
+    connection = getattr(device, "device_connection", None)
+    return device if connection is None else connection
+
+
+def order_channels(
+    channels: List[Hashable],
+    travel: Callable[[Hashable, Hashable], float],
+    cyclic: bool = True,
+    max_exhaustive: int = 8,
+) -> List[Hashable]:
+    """Order channels to minimize the travel between consecutive channels.
+
+    The first channel is kept in place. Up to max_exhaustive channels, every
+    order is evaluated, beyond that the nearest channel is picked greedily. Ties
+    keep the given order.
+
+    Parameters
+    ----------
+    channels : List[Hashable]
+        Channels in their configured order.
+    travel : Callable[[Hashable, Hashable], float]
+        Cost of switching from one channel to another.
+    cyclic : bool
+        Count the switch from the last channel back to the first one, which is
+        made between z positions or timepoints.
+    max_exhaustive : int
+        Largest number of channels to order exhaustively.
+
+    Returns
+    -------
+    ordered : List[Hashable]
+        The channels in acquisition order.
+    """
+    channels = list(channels)
+    if len(channels) < 3:
+        return channels
+
+    def cost(order):
+        pairs = list(zip(order[:-1], order[1:]))
+        if cyclic:
+            pairs.append((order[-1], order[0]))
+        return sum(travel(a, b) for a, b in pairs)
+
+    first, rest = channels[0], channels[1:]
+    if len(channels) <= max_exhaustive:
+        best, best_cost = channels, cost(channels)
+        for permutation in itertools.permutations(rest):
+            order = [first, *permutation]
+            order_cost = cost(order)
+            if order_cost < best_cost:
+                best, best_cost = order, order_cost
+        return best
+
+    ordered = [first]
+    while rest:
+        nearest = min(rest, key=lambda c: travel(ordered[-1], c))
+        rest.remove(nearest)
+        ordered.append(nearest)
+    return ordered if cost(ordered) < cost(channels) else channels
+
+
+class ChannelSwitchPlanner:
+    """Runs the device operations of a channel switch concurrently.
+
+    Operations are grouped in lanes. Operations that use a common resource are
+    placed in the same lane and run in the order they were given, lanes run in
+    parallel. The switch returns once every lane has finished, and the duration
+    of each operation is recorded.
+    """
+
+    def __init__(self, max_workers: int = 4) -> None:
+        """Initialize the planner.
+
+        Parameters
+        ----------
+        max_workers : int
+            Number of worker threads. 0 runs every operation in the calling thread.
+        """
+        #: int: Number of worker threads.
+        self.max_workers = max_workers
+
+        #: ThreadPoolExecutor: Runs the lanes, created on first use.
+        self.executor = None
+
+        #: dict: Duration of each operation of the last switch, in seconds.
+        self.timings = {}
+
+        #: float: Duration of the last switch, in seconds.
+        self.switch_time = 0.0
+
+    @staticmethod
+    def plan(operations: List[Operation]) -> List[List[Operation]]:
+        """Group operations in lanes of operations that share resources.
+
+        Parameters
+        ----------
+        operations : List[Operation]
+            Operations as (name, resources, function).
+
+        Returns
+        -------
+        lanes : List[List[Operation]]
+            Lanes, each in the order its operations were given.
+        """
+        lanes, lane_resources = [], []
+        for operation in operations:
+            resources = {id(resource) for resource in operation[1]}
+            shared = [i for i, used in enumerate(lane_resources) if used & resources]
+            lane = [operation]
+            for i in reversed(shared):
+                resources |= lane_resources.pop(i)
+                lane = lanes.pop(i) + lane
+            lanes.append(lane)
+            lane_resources.append(resources)
+        # merged lanes keep the original order of their operations
+        order = {id(operation): i for i, operation in enumerate(operations)}
+        for lane in lanes:
+            lane.sort(key=lambda operation: order[id(operation)])
+        return lanes
+
+    def run_lane(self, lane: List[Operation]) -> dict:
+        """Run the operations of a lane in order.
+
+        Parameters
+        ----------
+        lane : List[Operation]
+            Operations as (name, resources, function).
+
+        Returns
+        -------
+        timings : dict
+            Duration of each operation, in seconds.
+        """
+        timings = {}
+        for name, _, function in lane:
+            start = time.perf_counter()
+            try:
+                function()
+            finally:
+                timings[name] = time.perf_counter() - start
+        return timings
+
+    def run(self, operations: List[Operation], timeout: Optional[float] = None) -> None:
+        """Run the operations of a channel switch and wait for all of them.
+
+        Parameters
+        ----------
+        operations : List[Operation]
+            Operations as (name, resources, function).
+        timeout : Optional[float]
+            Longest time to wait for the operations, in seconds.
+
+        Raises
+        ------
+        TimeoutError
+            If the operations did not finish within timeout.
+        Exception
+            The first exception raised by an operation, once every lane finished.
+        """
+        start = time.perf_counter()
+        lanes = self.plan(operations)
+        self.timings = {}
+        if len(lanes) <= 1 or self.max_workers <= 0:
+            try:
+                for lane in lanes:
+                    self.timings.update(self.run_lane(lane))
+            finally:
+                self.switch_time = time.perf_counter() - start
+            self.log_timings()
+            return
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="ChannelSwitch"
+            )
+        # the longest lane is run in this thread while the others run in workers
+        lanes.sort(key=len)
+        futures = [self.executor.submit(self.run_lane, lane) for lane in lanes[:-1]]
+        error = None
+        try:
+            self.timings.update(self.run_lane(lanes[-1]))
+        except Exception as e:
+            error = e
+        done, not_done = wait(futures, timeout=timeout)
+        self.switch_time = time.perf_counter() - start
+        if not_done:
+            raise TimeoutError(
+                f"Channel switch did not finish within {timeout} s: "
+                f"{[lane[0][0] for lane, f in zip(lanes, futures) if f in not_done]}"
+            )
+        for future in futures:
+            if future.exception() is not None:
+                error = error or future.exception()
+            else:
+                self.timings.update(future.result())
+        if error is not None:
+            raise error
+        self.log_timings()
+
+    def log_timings(self) -> None:
+        """Log the duration of the last switch and of each of its operations."""
+        logger.debug(
+            f"Channel switch took {self.switch_time * 1000:.1f} ms: "
+            + ", ".join(f"{k} {v * 1000:.1f} ms" for k, v in self.timings.items())
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
@@ -43,16 +43,18 @@ logger = logging.getLogger(p)
 
 """ File type specific data sources. """
 
-FILE_TYPES = ["TIFF", "OME-TIFF", "H5", "N5", "OME-Zarr"]
+FILE_TYPES = ["TIFF", "OME-TIFF", "H5", "N5", "OME-Zarr", "Raw"]
 
 
-def get_data_source(file_type: str):
+def get_data_source(file_type: str, fan_out: bool = False):
     """Get the data source class for the given file type.
 
     Parameters
     ----------
     file_type : str
         File type to get the data source for.
+    fan_out : bool
+        Write H5 and N5 files through several processes.
 
     Returns
     -------
@@ -65,6 +67,11 @@ def get_data_source(file_type: str):
 
         return TiffDataSource
 
+    elif ((file_type == "H5") or file_type == "N5") and fan_out:
+        from .bdv_fan_out_data_source import BigDataViewerFanOutDataSource
+
+        return BigDataViewerFanOutDataSource
+
     elif (file_type == "H5") or file_type == "N5":
         from .bdv_data_source import BigDataViewerDataSource
 
@@ -75,6 +82,11 @@ def get_data_source(file_type: str):
 
         return OMEZarrDataSource
 
+    elif file_type == "Raw":
+        from .raw_stream_data_source import RawStreamDataSource
+
+        return RawStreamDataSource
+
     else:
         logger.error(f"Unknown file type {file_type}. Cannot open.")
         raise NotImplementedError(f"Unknown file type {file_type}. Cannot open.")
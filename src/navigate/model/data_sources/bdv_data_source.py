@@ -42,6 +42,7 @@ import numpy.typing as npt
 
 # Local imports
 from .pyramidal_data_source import PyramidalDataSource
+from .pose_log import PoseLog
 from ..metadata_sources.bdv_metadata import BigDataViewerMetadata
 
 # Logger Setup
@@ -64,7 +65,9 @@ class BigDataViewerDataSource(PyramidalDataSource):
     supports both HDF5 and N5 file formats.
     """
 
-    def __init__(self, file_name: str = None, mode: str = "w") -> None:
+    def __init__(
+        self, file_name: str = None, mode: str = "w", setups: list = None
+    ) -> None:
         """Initializes the BigDataViewerDataSource.
 
         Parameters
@@ -73,12 +76,19 @@ class BigDataViewerDataSource(PyramidalDataSource):
             The name of the file to write to.
         mode : str
             The mode to open the file in. Must be "w" for write or "r" for read.
+        setups : list
+            Setups to write. By default, all of them are written.
         """
         #: np.array: The image.
         self.image = None
 
-        #: list: The views.
-        self._views = []
+        #: list: Setups written by this data source, or None for all of them. A
+        #: data source writing only some setups shares its N5 container with the
+        #: data sources writing the others, and leaves the XML to its owner.
+        self.setups = setups
+
+        #: PoseLog: Stage pose of each frame.
+        self._views = PoseLog()
 
         #: zarr.N5Store: The N5 store.
         self.__store = None
@@ -169,8 +179,39 @@ class BigDataViewerDataSource(PyramidalDataSource):
         if not (z or c or t or pos):
             self.setup()
 
+        self._write_plane(data, c, z, t, pos)
+        if len(kw) > 0:
+            self._views.append(self._current_frame, c, z, t, pos, **kw)
+
+        self._current_frame += 1
+
+        # Check if this was the last frame to write
+        c, z, t, pos = self._cztp_indices(self._current_frame, self.metadata.per_stack)
+        if (z == 0) and (c == 0) and ((t >= self.shape_t) or (pos >= self.positions)):
+            self.setup(
+                self.shape_c * self.positions,
+                self.shape_c * (pos + 1),
+                create_flag=False,
+            )
+            self.positions = pos + 1
+
+    def _write_plane(self, data: npt.ArrayLike, c: int, z: int, t: int, pos: int):
+        """Write a 2D image to every resolution level of its dataset.
+
+        Parameters
+        ----------
+        data : npt.ArrayLike
+            The data to write.
+        c : int
+            The channel.
+        z : int
+            The z index.
+        t : int
+            The timepoint.
+        pos : int
+            The position.
+        """
         ds_name = self.ds_name(t, c, pos)
-        is_kw = len(kw) > 0
         for i in range(self.subdivisions.shape[0]):
             dx, dy, dz = self.resolutions[i, ...]
 
@@ -183,26 +224,12 @@ class BigDataViewerDataSource(PyramidalDataSource):
                 try:
                     # Down-sample in X and Y.
                     self.image[dataset_name][zs, ...] = data[::dy, ::dx].astype(self.dtype)
-                    if is_kw and (i == 0):
-                        self._views.append(kw)
                 except OSError as e:
                     if e.errno == 28:
                         logger.error("No disk space left on device. Closing the file.")
                         self.close()
                         raise Exception("No disk space left on device.")
 
-        self._current_frame += 1
-
-        # Check if this was the last frame to write
-        c, z, t, pos = self._cztp_indices(self._current_frame, self.metadata.per_stack)
-        if (z == 0) and (c == 0) and ((t >= self.shape_t) or (pos >= self.positions)):
-            self.setup(
-                self.shape_c * self.positions,
-                self.shape_c * (pos + 1),
-                create_flag=False,
-            )
-            self.positions = pos + 1
-
     def _h5_ds_name(self, t, c, p):
         """Get the HDF5 dataset name for the given timepoint, channel, and position.
 
@@ -279,6 +306,8 @@ class BigDataViewerDataSource(PyramidalDataSource):
 
         # Create setups
         for i in range(setup_start, setup_end):
+            if not self._owns_setup(i):
+                continue
             setup_group_name = f"s{i:02}"
             if setup_group_name in self.image:
                 del self.image[setup_group_name]
@@ -303,6 +332,8 @@ class BigDataViewerDataSource(PyramidalDataSource):
         for t in range(self.shape_t):
             time_group_name = f"t{t:05}"
             for i in range(setup_start, setup_end):
+                if not self._owns_setup(i):
+                    continue
                 setup_group_name = f"s{i:02}"
                 for j in range(self.subdivisions.shape[0]):
                     dataset_name = "/".join(
@@ -345,13 +376,17 @@ class BigDataViewerDataSource(PyramidalDataSource):
         """
         if create_flag:
             self.__store = zarr.N5Store(self.file_name)
-            self.image = zarr.group(store=self.__store, overwrite=True)
+            self.image = zarr.group(
+                store=self.__store, overwrite=self.setups is None
+            )
 
         setup_start, setup_end = 0, self.shape_c * self.positions
         if len(args) >= 2:
             setup_start, setup_end = args[0], args[1]
 
         for i in range(setup_start, setup_end):
+            if not self._owns_setup(i):
+                continue
             setup_group_name = f"setup{i}"
             setup = self.image.create_group(setup_group_name)
             setup.attrs["downsamplingFactors"] = self.resolutions.tolist()
@@ -371,6 +406,21 @@ class BigDataViewerDataSource(PyramidalDataSource):
                     sx.attrs["dimensions"] = list(shape)
         # print(self.image.tree())
 
+    def _owns_setup(self, setup: int) -> bool:
+        """Is the setup written by this data source?
+
+        Parameters
+        ----------
+        setup : int
+            The setup index.
+
+        Returns
+        -------
+        bool
+            True if the setup is written by this data source.
+        """
+        return self.setups is None or setup in self.setups
+
     def close(self) -> None:
         """Close the image file."""
         if self._closed:
@@ -380,6 +430,7 @@ class BigDataViewerDataSource(PyramidalDataSource):
             self.__store.close()
         else:
             self.image.close()
-        if self.mode != "r":
+        if self.mode != "r" and self.setups is None:
             self.metadata.write_xml(self.file_name, views=self._views)
+        self._views.close()
         self._closed = True
@@ -0,0 +1,396 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+#  Standard Imports
+import os
+import queue
+import logging
+import multiprocessing as mp
+from traceback import format_exc
+
+# Third Party Imports
+import h5py
+import numpy as np
+import numpy.typing as npt
+
+# Local imports
+from .bdv_data_source import BigDataViewerDataSource
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class BigDataViewerFanOutDataSource(BigDataViewerDataSource):
+    """BigDataViewer data source that writes through several processes.
+
+    Planes are routed by position or by channel to writer processes. Each writer
+    owns the setups routed to it. For HDF5, it writes them to its own file, which
+    the main file links to. For N5, it writes their subtrees of the shared
+    container. Frames in shared memory are passed to the writers by reference.
+    """
+
+    def __init__(
+        self,
+        file_name: str = None,
+        mode: str = "w",
+        processes: int = 2,
+        route_by: str = "position",
+        max_pending: int = 8,
+    ) -> None:
+        """Initializes the BigDataViewerFanOutDataSource.
+
+        Parameters
+        ----------
+        file_name : str
+            The name of the file to write to.
+        mode : str
+            The mode to open the file in. Must be "w" for write or "r" for read.
+        processes : int
+            The maximum number of writer processes.
+        route_by : str
+            Route planes to the writers by "position" or by "channel".
+        max_pending : int
+            The number of planes the writers may have pending before write()
+            blocks. Bounds how far the writers lag behind, so that the frame buffer
+            is not overwritten before they read it.
+        """
+        if route_by not in ["position", "channel"]:
+            error_statement = f"Unknown fan-out route {route_by}."
+            logger.error(error_statement)
+            raise ValueError(error_statement)
+
+        #: int: The maximum number of writer processes.
+        self.processes = max(1, int(processes))
+
+        #: str: Route planes to the writers by "position" or by "channel".
+        self.route_by = route_by
+
+        #: int: The number of planes the writers may have pending.
+        self.max_pending = max(1, int(max_pending))
+
+        #: str: The file type.
+        self._file_type = os.path.splitext(file_name)[-1][1:].lower()
+
+        #: list: The writer processes and their task queues.
+        self._writers = []
+
+        #: mp.Queue: Errors reported by the writers.
+        self._errors = None
+
+        #: mp.Semaphore: Released by the writers for every plane they are done with.
+        self._pending = None
+
+        super().__init__(file_name=file_name, mode=mode)
+
+    @property
+    def number_of_writers(self) -> int:
+        """Number of writer processes used for the current shape.
+
+        Returns
+        -------
+        int
+            The number of writers.
+        """
+        keys = self.positions if self.route_by == "position" else self.shape_c
+        return max(1, min(self.processes, keys))
+
+    def writer_index(self, c: int, pos: int) -> int:
+        """Index of the writer that owns a channel and position.
+
+        Parameters
+        ----------
+        c : int
+            The channel.
+        pos : int
+            The position.
+
+        Returns
+        -------
+        int
+            The writer index.
+        """
+        key = pos if self.route_by == "position" else c
+        return key % self.number_of_writers
+
+    def writer_setups(self) -> list:
+        """Setups owned by each writer.
+
+        Returns
+        -------
+        list
+            A list of setup indices for each writer.
+        """
+        setups = [[] for _ in range(self.number_of_writers)]
+        for c in range(self.shape_c):
+            for pos in range(self.positions):
+                setups[self.writer_index(c, pos)].append(c * self.positions + pos)
+        return [sorted(x) for x in setups]
+
+    def writer_file_name(self, index: int) -> str:
+        """File written by a writer.
+
+        HDF5 writers each write a partition next to the main file, while N5
+        writers share the main container.
+
+        Parameters
+        ----------
+        index : int
+            The writer index.
+
+        Returns
+        -------
+        str
+            The file name.
+        """
+        if self._file_type == "n5":
+            return self.file_name
+        root, ext = os.path.splitext(self.file_name)
+        return f"{root}-{index:02}{ext}"
+
+    def _start_writers(self) -> None:
+        """Create the main file and start one writer process per setup group."""
+        self._stop_writers()
+
+        if self._file_type == "n5":
+            # Start from an empty container. The writers create their setups.
+            self.setup(0, 0)
+        else:
+            self.image.close()
+            self.image = h5py.File(self.file_name, "w")
+
+        state = {
+            "shape_x": self.shape_x,
+            "shape_y": self.shape_y,
+            "shape_z": self.shape_z,
+            "shape_c": self.shape_c,
+            "shape_t": self.shape_t,
+            "positions": self.positions,
+            "dx": self.dx,
+            "dy": self.dy,
+            "dz": self.dz,
+            "dtype": self.dtype,
+            "_resolutions": self.resolutions,
+            "_shapes": self.shapes,
+            "_subdivisions": self.subdivisions,
+        }
+        self._errors = mp.Queue()
+        self._pending = mp.Semaphore(self.max_pending)
+        for index, setups in enumerate(self.writer_setups()):
+            file_name = self.writer_file_name(index)
+            if self._file_type == "h5":
+                if os.path.exists(file_name):
+                    os.remove(file_name)
+                self._link_setups(os.path.basename(file_name), setups)
+            tasks = mp.Queue()
+            process = mp.Process(
+                target=_write_setups,
+                name=f"BigDataViewerWriter{index}",
+                args=(file_name, state, setups, tasks, self._pending, self._errors),
+                daemon=True,
+            )
+            process.start()
+            self._writers.append((process, tasks))
+        logger.info(
+            f"Writing {self.file_name} with {len(self._writers)} processes, "
+            f"routed by {self.route_by}."
+        )
+
+    def _link_setups(self, file_name: str, setups: list) -> None:
+        """Link the setups of a writer's HDF5 file into the main file.
+
+        Parameters
+        ----------
+        file_name : str
+            The writer's file, relative to the main file.
+        setups : list
+            The setups written to it.
+        """
+        for i in setups:
+            setup_group_name = f"s{i:02}"
+            names = [setup_group_name] + [
+                f"t{t:05}/{setup_group_name}" for t in range(self.shape_t)
+            ]
+            for name in names:
+                self.image[name] = h5py.ExternalLink(file_name, "/" + name)
+
+    def _dispatch(self, index: int, task: tuple) -> None:
+        """Queue a plane for a writer, waiting while too many planes are pending.
+
+        Parameters
+        ----------
+        index : int
+            The writer index.
+        task : tuple
+            The plane and its channel, z, timepoint and position indices.
+        """
+        process, tasks = self._writers[index]
+        while not self._pending.acquire(timeout=1):
+            if not all(writer.is_alive() for writer, _ in self._writers):
+                self._check_writers()
+                error_statement = "A BigDataViewer writer process stopped."
+                logger.error(error_statement)
+                raise Exception(error_statement)
+        tasks.put(task)
+
+    def _check_writers(self) -> None:
+        """Raise the first error reported by a writer."""
+        if self._errors is None:
+            return
+        try:
+            error = self._errors.get_nowait()
+        except queue.Empty:
+            return
+        logger.error(f"BigDataViewer writer failed: {error}")
+        raise Exception(f"BigDataViewer writer failed: {error}")
+
+    def _stop_writers(self) -> None:
+        """Wait for the writers to finish their queues and exit."""
+        for process, tasks in self._writers:
+            tasks.put(None)
+        for process, tasks in self._writers:
+            process.join()
+            tasks.close()
+        self._writers = []
+
+    def write(self, data: npt.ArrayLike, **kw) -> None:
+        """Queues a 2D image for the writer that owns its setup.
+
+        Parameters
+        ----------
+        data : npt.ArrayLike
+            The data to write. Shared memory arrays are passed by reference, so
+            they must not be overwritten before the writer has read them.
+        kw : dict
+            The keyword arguments to write.
+        """
+        self.mode = "w"
+
+        c, z, t, pos = self._cztp_indices(self._current_frame, self.metadata.per_stack)
+
+        if not (z or c or t or pos):
+            self._start_writers()
+
+        self._check_writers()
+        if t >= self.shape_t or pos >= self.positions:
+            logger.warning(
+                f"Frame {self._current_frame} is beyond the expected shape. "
+                "Skipping it."
+            )
+        else:
+            if not hasattr(data, "shared_memory"):
+                # Queues serialize in the background, so copy data we don't own.
+                data = np.array(data)
+            self._dispatch(self.writer_index(c, pos), (data, c, z, t, pos))
+            if len(kw) > 0:
+                self._views.append(self._current_frame, c, z, t, pos, **kw)
+
+        self._current_frame += 1
+
+    def close(self) -> None:
+        """Wait for the writers, then close the main file and write the XML."""
+        if self._closed:
+            return
+        try:
+            self._stop_writers()
+        finally:
+            super().close()
+        self._check_writers()
+        self._errors = None
+        self._pending = None
+
+
+def _write_setups(
+    file_name: str,
+    state: dict,
+    setups: list,
+    tasks: mp.Queue,
+    pending: mp.Semaphore,
+    errors: mp.Queue,
+) -> None:
+    """Write planes of some setups of a BigDataViewer file.
+
+    Runs in a writer process until it receives None.
+
+    Parameters
+    ----------
+    file_name : str
+        The file to write to.
+    state : dict
+        Shape, voxel size and pyramid of the data set.
+    setups : list
+        The setups to write.
+    tasks : mp.Queue
+        The planes, with their channel, z, timepoint and position indices.
+    pending : mp.Semaphore
+        Released for every plane, once it has been written.
+    errors : mp.Queue
+        Queue to report errors to.
+    """
+    data_source = None
+    try:
+        data_source = BigDataViewerDataSource(file_name, setups=[])
+        for key, value in state.items():
+            setattr(data_source, key, value)
+        data_source.setups = setups
+        data_source.setup()
+    except Exception:
+        errors.put(format_exc())
+        data_source = None
+
+    while True:
+        try:
+            task = tasks.get()
+        except Exception:
+            # E.g. the frame buffer was released before the plane was read.
+            errors.put(format_exc())
+            pending.release()
+            continue
+        if task is None:
+            break
+        try:
+            if data_source is not None:
+                data_source._write_plane(*task)
+        except Exception:
+            errors.put(format_exc())
+            data_source.close()
+            data_source = None
+        finally:
+            # Keep draining after a failure so the main process doesn't block.
+            del task
+            pending.release()
+
+    if data_source is not None:
+        try:
+            data_source.close()
+        except Exception:
+            errors.put(format_exc())
@@ -39,6 +39,8 @@ import abc
 import numpy.typing as npt
 
 # Local Imports
+from .pose_log import PoseLog
+from ..acquisition_plan import frame_indices
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -120,6 +122,9 @@ class DataSource:
         #: int: Number of positions in the data source.
         self.positions = 1
 
+        #: AcquisitionPlan: Plan of the acquisition being written, if any.
+        self._plan = None
+
         # Set the mode using the getters/setters below
         self.mode = mode
 
@@ -244,7 +249,8 @@ class DataSource:
         Parameters
         ----------
         metadata_config : dict
-            shape configuration: "c", "z", "t", "p", "is_dynamic", "per_stack"
+            shape configuration: "x", "y", "c", "z", "t", "p", "is_dynamic",
+            "per_stack"
         """
         self.metadata.set_from_dict(metadata_config)
         self.get_shape_from_metadata()
@@ -265,6 +271,8 @@ class DataSource:
     def _cztp_indices(self, frame_id: int, per_stack: bool = True) -> tuple:
         """Figure out where we are in the stack from the frame number.
 
+        Uses the acquisition plan if one was set, see set_acquisition_plan().
+
         per_stack indicates if we move through z (per_stack=True) or c fastest.
         we move through positions slower than z or c. we move through time slower
         than z, c or p.
@@ -287,32 +295,38 @@ class DataSource:
         p : int
             Index of multi-position position.
         """
-        # If z-stacking, if multi-position
-        if self.shape_z > 1:
-            # We're z-stacking, make z, c vary faster than t
-            if per_stack:
-                c = (frame_id // self.shape_z) % self.shape_c
-                z = frame_id % self.shape_z
-            else:
-                c = frame_id % self.shape_c
-                z = (frame_id // self.shape_c) % self.shape_z
+        if self._plan is not None and 0 <= frame_id < len(self._plan):
+            return self._plan.indices(frame_id)
+        return frame_indices(
+            frame_id,
+            self.shape_c,
+            self.shape_z,
+            self.shape_t,
+            self.positions,
+            per_stack,
+        )
 
-            # NOTE: Uncomment this if we want time to vary faster than positions
-            t = (frame_id // (self.shape_c * self.shape_z)) % self.shape_t
-            p = frame_id // (self.shape_c * self.shape_z * self.shape_t)
+    def set_acquisition_plan(self, plan) -> None:
+        """Index frames through an acquisition plan.
 
-            # NOTE: Uncomment this if we want positions to vary faster than time
-            # t = frame_id // (self.shape_c * self.shape_z * self.positions)
-            # p = (frame_id // (self.shape_c * self.shape_z)) % self.positions
+        The plan is only used if it has the shape and frame order of this data
+        source.
 
+        Parameters
+        ----------
+        plan : Optional[AcquisitionPlan]
+            The plan of the acquisition, or None to compute the indices.
+        """
+        if plan is not None and plan.matches(
+            self.shape_c,
+            self.shape_z,
+            self.shape_t,
+            self.positions,
+            self.metadata.per_stack,
+        ):
+            self._plan = plan
         else:
-            # Timepoint acquisition, only c varies faster than t
-            c = frame_id % self.shape_c
-            t = (frame_id // self.shape_c) % self.shape_t
-            z = (frame_id // (self.shape_c * self.shape_t)) % self.shape_z
-            p = frame_id // (self.shape_c * self.shape_t * self.shape_z)
-
-        return c, z, t, p
+            self._plan = None
 
     def _check_shape(self, max_frame: int = 0, per_stack: bool = True):
         """Check if we've closed this prior to completion.
@@ -337,12 +351,19 @@ class DataSource:
         ):
             # If we have, update our shape accordingly
             maxc, maxz, maxt, maxp = 0, 0, 0, 0
-            for idx in range(max_frame + 1):
-                c, z, t, p = self._cztp_indices(idx, per_stack)
-                maxc = max(maxc, c)
-                maxz = max(maxz, z)
-                maxt = max(maxt, t)
-                maxp = max(maxp, p)
+            if self._plan is not None and 0 <= max_frame < len(self._plan):
+                rows = self._plan.table[: max_frame + 1]
+                maxc, maxz, maxt, maxp = (
+                    int(rows[key].max())
+                    for key in ("channel", "slice", "timepoint", "position")
+                )
+            else:
+                for idx in range(max_frame + 1):
+                    c, z, t, p = self._cztp_indices(idx, per_stack)
+                    maxc = max(maxc, c)
+                    maxz = max(maxz, z)
+                    maxt = max(maxt, t)
+                    maxp = max(maxp, p)
             self.shape_c, self.shape_z = maxc + 1, maxz + 1
             self.shape_t, self.positions = maxt + 1, maxp + 1
             if self.metadata is not None:
@@ -359,7 +380,9 @@ class DataSource:
         self.close()  # if anything was already open, close it
         if self._write_mode:
             self._current_frame = 0
-            self._views = []
+            if hasattr(self, "_views"):
+                self._views.close()
+            self._views = PoseLog()
             self.setup()
         else:
             self.read()
@@ -0,0 +1,261 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+#  Standard Imports
+import os
+import time
+import tempfile
+import logging
+from typing import Optional, Union
+
+# Third Party Imports
+import numpy as np
+import numpy.typing as npt
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+#: np.dtype: One record per acquired frame.
+POSE_DTYPE = np.dtype(
+    [
+        ("frame", "<u8"),
+        ("channel", "<u4"),
+        ("slice", "<u4"),
+        ("timepoint", "<u4"),
+        ("position", "<u4"),
+        ("x", "<f8"),
+        ("y", "<f8"),
+        ("z", "<f8"),
+        ("theta", "<f8"),
+        ("f", "<f8"),
+        ("timestamp", "<f8"),
+        ("exposure", "<f4"),
+    ]
+)
+
+#: tuple: Stage axes stored in each record.
+POSE_AXES = ("x", "y", "z", "theta", "f")
+
+
+class PoseLog:
+    """Append-only log of the stage pose of each frame written to a data source.
+
+    Records are stored in fixed-size blocks of a structured array, so appending
+    never copies earlier records. Once more than max_blocks blocks are held in
+    memory, the records are spilled to a sidecar file, which the metadata writers
+    read back as a memory map.
+
+    Indexing follows NumPy: an integer returns a single record, a slice returns a
+    structured array and a field name (e.g. "x") returns a column.
+    """
+
+    def __init__(
+        self,
+        block_size: int = 4096,
+        max_blocks: int = 64,
+        spill_path: Optional[str] = None,
+    ) -> None:
+        """Initialize the pose log.
+
+        Parameters
+        ----------
+        block_size : int
+            Number of records per block.
+        max_blocks : int
+            Number of blocks kept in memory before spilling to disk.
+        spill_path : Optional[str]
+            Path of the sidecar file. If None, a temporary file is created when
+            needed and deleted on close.
+        """
+        #: int: Number of records per block.
+        self.block_size = block_size
+
+        #: int: Number of blocks kept in memory before spilling to disk.
+        self.max_blocks = max_blocks
+
+        #: str: Path of the sidecar file.
+        self.spill_path = spill_path
+
+        #: bool: Delete the sidecar file on close.
+        self._temporary = spill_path is None
+
+        #: list: In-memory blocks of records.
+        self._blocks = []
+
+        #: int: Total number of records.
+        self._size = 0
+
+        #: int: Number of records written to the sidecar file.
+        self._spilled = 0
+
+        #: np.memmap: Memory map of the sidecar file.
+        self._memmap = None
+
+    def __len__(self) -> int:
+        """Number of records in the log."""
+        return self._size
+
+    def __getitem__(self, key: Union[int, slice, str]):
+        """Get a record, a range of records or a field of all records."""
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += self._size
+            if not 0 <= key < self._size:
+                raise IndexError(f"Record {key} is out of range.")
+            if key < self._spilled:
+                return self._spilled_records()[key]
+            block, offset = divmod(key - self._spilled, self.block_size)
+            return self._blocks[block][offset]
+        return self.records()[key]
+
+    def append(
+        self,
+        frame: int,
+        channel: int = 0,
+        slice: int = 0,
+        timepoint: int = 0,
+        position: int = 0,
+        timestamp: Optional[float] = None,
+        exposure: float = np.nan,
+        **pose,
+    ) -> None:
+        """Append the record of a frame.
+
+        Parameters
+        ----------
+        frame : int
+            Frame index.
+        channel : int
+            Channel index.
+        slice : int
+            Z-slice index.
+        timepoint : int
+            Time point index.
+        position : int
+            Position index.
+        timestamp : Optional[float]
+            Time the frame was written. Defaults to now.
+        exposure : float
+            Camera exposure time of the frame in ms.
+        **pose : dict
+            Stage positions, keyed by axis (x, y, z, theta, f).
+        """
+        offset = (self._size - self._spilled) % self.block_size
+        if offset == 0:
+            if len(self._blocks) >= self.max_blocks:
+                self.flush()
+            self._blocks.append(np.zeros(self.block_size, dtype=POSE_DTYPE))
+
+        record = self._blocks[-1][offset]
+        record["frame"] = frame
+        record["channel"] = channel
+        record["slice"] = slice
+        record["timepoint"] = timepoint
+        record["position"] = position
+        for axis in POSE_AXES:
+            record[axis] = pose.get(axis, 0)
+        record["timestamp"] = time.time() if timestamp is None else timestamp
+        record["exposure"] = exposure
+        self._size += 1
+
+    def flush(self) -> None:
+        """Append the records held in memory to the sidecar file."""
+        n_records = self._size - self._spilled
+        if n_records == 0:
+            return
+        if self.spill_path is None:
+            fd, self.spill_path = tempfile.mkstemp(suffix=".poses")
+            os.close(fd)
+            logger.debug(f"Spilling frame poses to {self.spill_path}")
+        with open(self.spill_path, "ab") as f:
+            f.write(self._in_memory_records().tobytes())
+        self._spilled = self._size
+        self._blocks = []
+        self._memmap = None
+
+    def records(self) -> npt.NDArray:
+        """Get all records.
+
+        Returns
+        -------
+        npt.NDArray
+            Structured array of dtype POSE_DTYPE. A read-only memory map if the
+            log was spilled to disk.
+        """
+        if self._spilled > 0:
+            self.flush()
+            return self._spilled_records()
+        return self._in_memory_records()
+
+    def close(self) -> None:
+        """Release the records and delete a temporary sidecar file."""
+        self._blocks = []
+        self._memmap = None
+        if self._temporary and self.spill_path is not None:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                logger.debug(f"Could not remove {self.spill_path}")
+            self.spill_path = None
+        self._size = self._spilled = 0
+
+    @classmethod
+    def load(cls, spill_path: str) -> npt.NDArray:
+        """Memory-map the records of a sidecar file.
+
+        Parameters
+        ----------
+        spill_path : str
+            Path of the sidecar file.
+
+        Returns
+        -------
+        npt.NDArray
+            Read-only structured array of dtype POSE_DTYPE.
+        """
+        if os.path.getsize(spill_path) == 0:
+            return np.zeros(0, dtype=POSE_DTYPE)
+        return np.memmap(spill_path, dtype=POSE_DTYPE, mode="r")
+
+    def _in_memory_records(self) -> npt.NDArray:
+        """Concatenate the in-memory blocks, without the unused tail."""
+        n_records = self._size - self._spilled
+        if len(self._blocks) == 0:
+            return np.zeros(0, dtype=POSE_DTYPE)
+        return np.concatenate(self._blocks)[:n_records]
+
+    def _spilled_records(self) -> npt.NDArray:
+        """Memory map of the records in the sidecar file."""
+        if self._memmap is None or len(self._memmap) != self._spilled:
+            self._memmap = self.load(self.spill_path)
+        return self._memmap
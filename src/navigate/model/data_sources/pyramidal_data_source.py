@@ -152,6 +152,15 @@ class PyramidalDataSource(DataSource):
             // 8
         ).sum()
 
+    def get_shape_from_metadata(self):
+        """Get the shape of the data source from the metadata.
+
+        Clears the pyramid shapes and subdivisions computed for the previous shape.
+        """
+        self._subdivisions = None
+        self._shapes = None
+        super().get_shape_from_metadata()
+
     def set_metadata_from_configuration_experiment(
         self, configuration: Dict[str, Any], microscope_name: str = None
     ) -> None:
@@ -0,0 +1,591 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+#  Standard Imports
+import os
+import json
+import mmap
+import logging
+from typing import Any, Dict, Optional
+
+# Third Party Imports
+import numpy as np
+import numpy.typing as npt
+
+# Local imports
+from .data_source import DataSource
+from .pose_log import PoseLog, POSE_AXES
+from ..metadata_sources.metadata import Metadata
+from ...tools.common_functions import copy_proxy_object
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+#: int: Alignment of frames in the file, in bytes.
+PAGE_SIZE = mmap.PAGESIZE
+
+
+class RawStreamDataSource(DataSource):
+    """Data source that streams frames to preallocated flat files.
+
+    Each frame is written with a single page-aligned write, in acquisition order,
+    with no formatting. Frames can be striped across several directories, round
+    robin, and written with O_DIRECT where the platform supports it. The stage
+    pose and indices of every frame are stored in a sidecar file, and a JSON
+    header describes the layout. Use convert_raw_stream() to convert the data to
+    another file type after the acquisition.
+    """
+
+    def __init__(
+        self,
+        file_name: str = None,
+        mode: str = "w",
+        stripe_directories: Optional[list] = None,
+        direct_io: bool = False,
+    ) -> None:
+        """Initializes the RawStreamDataSource.
+
+        Parameters
+        ----------
+        file_name : str
+            The name of the file to write to.
+        mode : str
+            The mode to open the file in. Must be "w" for write or "r" for read.
+        stripe_directories : Optional[list]
+            Additional directories to stripe the frames across.
+        direct_io : bool
+            Bypass the operating system cache with O_DIRECT, if available.
+        """
+        #: list: Additional directories to stripe the frames across.
+        self.stripe_directories = list(stripe_directories or [])
+
+        #: bool: Bypass the operating system cache with O_DIRECT.
+        self.direct_io = direct_io
+
+        #: list: Files the frames are striped across.
+        self.stripes = []
+
+        #: list: Open file descriptors of the stripes, when writing.
+        self._fds = []
+
+        #: list: Memory maps of the stripes, when reading.
+        self._memmaps = []
+
+        #: mmap.mmap: Page-aligned staging buffer for O_DIRECT writes.
+        self._buffer = None
+
+        #: dict: Configuration the data was acquired with, for the conversion.
+        self.configuration = None
+
+        #: PoseLog: Stage pose and indices of each frame, when writing.
+        self._views = PoseLog()
+
+        #: np.ndarray: Records of the frames, when reading.
+        self.poses = None
+
+        #: dict: Frame index of each (channel, z, timepoint, position).
+        self._index = {}
+
+        #: int: Number of frames in the file.
+        self.frames = 0
+
+        #: Metadata: The metadata.
+        self.metadata = Metadata()
+
+        super().__init__(file_name=file_name, mode=mode)
+
+    @property
+    def header_file_name(self) -> str:
+        """Name of the JSON header."""
+        return os.path.splitext(self.file_name)[0] + ".json"
+
+    @property
+    def poses_file_name(self) -> str:
+        """Name of the sidecar file with the frame records."""
+        return os.path.splitext(self.file_name)[0] + ".poses"
+
+    @property
+    def frame_bytes(self) -> int:
+        """Size of a frame in bytes."""
+        return self.shape_x * self.shape_y * np.dtype(self.dtype).itemsize
+
+    @property
+    def frame_stride(self) -> int:
+        """Size of a frame in the file, padded to a whole number of pages."""
+        return -(-self.frame_bytes // PAGE_SIZE) * PAGE_SIZE
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the preallocated files in bytes.
+
+        Returns
+        -------
+        int
+            The size of the data source in bytes.
+        """
+        return (
+            self.shape_z
+            * self.shape_t
+            * self.shape_c
+            * self.positions
+            * self.frame_stride
+        )
+
+    def set_metadata_from_configuration_experiment(
+        self, configuration: Dict[str, Any], microscope_name: str = None
+    ) -> None:
+        """Sets the metadata from according to the microscope configuration.
+
+        Keeps a copy of the configuration of the microscope, which is stored in
+        the header for the conversion.
+
+        Parameters
+        ----------
+        configuration : Dict[str, Any]
+            The configuration experiment.
+        microscope_name : str
+            The microscope name
+        """
+        super().set_metadata_from_configuration_experiment(
+            configuration, microscope_name
+        )
+        microscope_name = self.metadata.active_microscope
+        self.configuration = {
+            "experiment": copy_proxy_object(configuration["experiment"]),
+            "configuration": {
+                "microscopes": {
+                    microscope_name: copy_proxy_object(
+                        configuration["configuration"]["microscopes"][
+                            microscope_name
+                        ]
+                    )
+                }
+            },
+            "multi_positions": copy_proxy_object(
+                configuration.get("multi_positions", [])
+            ),
+        }
+
+    def setup(self) -> None:
+        """Create the stripes and preallocate them for the expected frames."""
+        self._close_stripes()
+
+        root, ext = os.path.splitext(os.path.basename(self.file_name))
+        self.stripes = [self.file_name]
+        for i, directory in enumerate(self.stripe_directories):
+            os.makedirs(directory, exist_ok=True)
+            self.stripes.append(os.path.join(directory, f"{root}-{i + 1:02}{ext}"))
+
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        direct_io = self.direct_io and hasattr(os, "O_DIRECT")
+        if self.direct_io and not direct_io:
+            logger.warning("O_DIRECT is not available. Writing through the cache.")
+
+        n_frames = self.nbytes // self.frame_stride
+        for i, stripe in enumerate(self.stripes):
+            fd = None
+            if direct_io:
+                try:
+                    fd = os.open(stripe, flags | os.O_DIRECT)
+                except OSError as e:
+                    logger.warning(f"Cannot open {stripe} with O_DIRECT: {e}")
+            if fd is None:
+                fd = os.open(stripe, flags)
+            self._fds.append(fd)
+
+            size = len(range(i, n_frames, len(self.stripes))) * self.frame_stride
+            try:
+                os.posix_fallocate(fd, 0, size)
+            except (AttributeError, OSError):
+                os.ftruncate(fd, size)
+
+        if direct_io:
+            # O_DIRECT needs page-aligned memory, which mmap provides.
+            self._buffer = mmap.mmap(-1, self.frame_stride)
+
+        if os.path.exists(self.poses_file_name):
+            os.remove(self.poses_file_name)
+        self._views.close()
+        self._views = PoseLog(spill_path=self.poses_file_name)
+
+    def write(self, data: npt.ArrayLike, **kw) -> None:
+        """Writes 2D image to the data source.
+
+        Parameters
+        ----------
+        data : npt.ArrayLike
+            The data to write.
+        kw : dict
+            The stage positions of the frame.
+        """
+        self.mode = "w"
+
+        c, z, t, pos = self._cztp_indices(self._current_frame, self.metadata.per_stack)
+
+        if self._current_frame == 0:
+            self.setup()
+
+        stripe, row = self._stripe_and_row(self._current_frame)
+        image = np.ascontiguousarray(data, dtype=self.dtype)
+        if self._buffer is not None:
+            np.frombuffer(self._buffer, dtype=self.dtype, count=image.size)[
+                :
+            ] = image.ravel()
+            buffer = self._buffer
+        else:
+            buffer = memoryview(image).cast("B")
+
+        try:
+            _write_at(self._fds[stripe], buffer, row * self.frame_stride)
+        except OSError as e:
+            if e.errno == 28:
+                logger.error("No disk space left on device. Closing the file.")
+                self.close()
+                raise Exception("No disk space left on device.")
+            raise
+
+        self._views.append(self._current_frame, c, z, t, pos, **kw)
+        self._current_frame += 1
+
+    def _stripe_and_row(self, frame: int) -> tuple:
+        """Stripe a frame is stored in, and its index in the stripe.
+
+        Parameters
+        ----------
+        frame : int
+            The frame index.
+
+        Returns
+        -------
+        tuple
+            The stripe and row indices.
+        """
+        return frame % len(self.stripes), frame // len(self.stripes)
+
+    def _close_stripes(self) -> None:
+        """Close the file descriptors and memory maps of the stripes."""
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+        self._memmaps = []
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+    def _write_header(self) -> None:
+        """Write the JSON header and the frame records."""
+        self._views.flush()
+        directory = os.path.dirname(os.path.abspath(self.file_name))
+        stripes = []
+        for stripe in self.stripes:
+            path = os.path.abspath(stripe)
+            if os.path.dirname(path) == directory:
+                path = os.path.basename(path)
+            stripes.append(path)
+
+        header = {
+            "version": 1,
+            "dtype": np.dtype(self.dtype).name,
+            "shape": {
+                "x": self.shape_x,
+                "y": self.shape_y,
+                "c": self.shape_c,
+                "z": self.shape_z,
+                "t": self.shape_t,
+                "p": self.positions,
+            },
+            "per_stack": self.metadata.per_stack,
+            "voxel_size": [self.dx, self.dy, self.dz],
+            "frame_stride": self.frame_stride,
+            "frames": self._current_frame,
+            "stripes": stripes,
+            "poses": os.path.basename(self.poses_file_name)
+            if len(self._views) > 0
+            else None,
+            "microscope_name": self.metadata.active_microscope,
+            "configuration": self.configuration,
+        }
+        with open(self.header_file_name, "w") as f:
+            json.dump(header, f, indent=4, default=str)
+
+    def read(self) -> None:
+        """Reads the header and memory-maps the stripes."""
+        self.mode = "r"
+        with open(self.header_file_name, "r") as f:
+            header = json.load(f)
+
+        self.dtype = header["dtype"]
+        self.metadata.set_from_dict(
+            dict(header["shape"], per_stack=header["per_stack"])
+        )
+        self.metadata.dx, self.metadata.dy, self.metadata.dz = header["voxel_size"]
+        self.metadata.active_microscope = header["microscope_name"]
+        self.get_shape_from_metadata()
+        self.configuration = header["configuration"]
+        self.frames = header["frames"]
+
+        directory = os.path.dirname(os.path.abspath(self.file_name))
+        self.stripes = [os.path.join(directory, x) for x in header["stripes"]]
+        self._memmaps = [
+            np.memmap(x, dtype="uint8", mode="r") if os.path.getsize(x) > 0 else None
+            for x in self.stripes
+        ]
+
+        if header["poses"] is not None:
+            self.poses = PoseLog.load(os.path.join(directory, header["poses"]))
+        else:
+            self.poses = None
+
+        self._index = {}
+        for frame in range(self.frames):
+            if self.poses is not None:
+                record = self.poses[frame]
+                key = tuple(
+                    int(record[k])
+                    for k in ["channel", "slice", "timepoint", "position"]
+                )
+            else:
+                key = self._cztp_indices(frame, self.metadata.per_stack)
+            self._index[key] = frame
+
+    def get_frame(self, frame: int) -> npt.ArrayLike:
+        """Read a frame.
+
+        Parameters
+        ----------
+        frame : int
+            The frame index, in acquisition order.
+
+        Returns
+        -------
+        npt.ArrayLike
+            YX image, memory-mapped from the file.
+        """
+        if not 0 <= frame < self.frames:
+            raise IndexError(f"Frame {frame} is out of range.")
+        stripe, row = self._stripe_and_row(frame)
+        return np.frombuffer(
+            self._memmaps[stripe],
+            dtype=self.dtype,
+            count=self.shape_x * self.shape_y,
+            offset=row * self.frame_stride,
+        ).reshape(self.shape_y, self.shape_x)
+
+    def get_frame_index(
+        self, channel: int = 0, z: int = 0, timepoint: int = 0, position: int = 0
+    ) -> Optional[int]:
+        """Index of the frame acquired at a channel, z, timepoint and position.
+
+        Parameters
+        ----------
+        channel : int
+            The channel.
+        z : int
+            The z index.
+        timepoint : int
+            The timepoint.
+        position : int
+            The position.
+
+        Returns
+        -------
+        Optional[int]
+            The frame index, or None if it was not acquired.
+        """
+        return self._index.get((channel, z, timepoint, position), None)
+
+    def get_data(
+        self,
+        timepoint: int = 0,
+        position: int = 0,
+        channel: int = 0,
+        z: int = -1,
+        resolution: int = 1,
+    ) -> npt.ArrayLike:
+        """Get data according to timepoint, position, channel and z-axis id
+
+        Parameters
+        ----------
+        timepoint : int
+            The timepoint value
+        position : int
+            The position id in multi-position table
+        channel : int
+            The channel id
+        z : int
+            The index of Z in a Z-stack.
+            Return all z if -1.
+        resolution : int
+            values from 1, 2, 4, 8
+
+        Returns
+        -------
+        data : npt.ArrayLike
+            Image data
+        """
+        self.mode = "r"
+        zs = range(self.shape_z) if z == -1 else [z]
+        stack = []
+        for i in zs:
+            frame = self.get_frame_index(channel, i, timepoint, position)
+            if frame is None:
+                break
+            stack.append(self.get_frame(frame)[::resolution, ::resolution])
+        if len(stack) == 0:
+            return None
+        return np.stack(stack) if z == -1 else stack[0]
+
+    def close(self) -> None:
+        """Close the stripes and write the header."""
+        if self._closed:
+            return
+        if self.mode == "w":
+            self._check_shape(self._current_frame - 1, self.metadata.per_stack)
+            # Release the space preallocated for frames that were not acquired.
+            for i, fd in enumerate(self._fds):
+                rows = len(range(i, self._current_frame, len(self._fds)))
+                os.ftruncate(fd, rows * self.frame_stride)
+            self._close_stripes()
+            self._write_header()
+        else:
+            self._close_stripes()
+            self.poses = None
+        self._views.close()
+        self._closed = True
+
+
+def _write_at(fd: int, buffer, offset: int) -> None:
+    """Write a whole buffer to a file descriptor at an offset.
+
+    Parameters
+    ----------
+    fd : int
+        The file descriptor.
+    buffer : bytes-like
+        The data to write.
+    offset : int
+        The offset in the file, in bytes.
+    """
+    buffer = memoryview(buffer)
+    if not hasattr(os, "pwrite"):
+        os.lseek(fd, offset, os.SEEK_SET)
+    while len(buffer) > 0:
+        if hasattr(os, "pwrite"):
+            n = os.pwrite(fd, buffer, offset)
+        else:
+            n = os.write(fd, buffer)
+        buffer = buffer[n:]
+        offset += n
+
+
+def convert_raw_stream(
+    file_name: str,
+    file_type: str = "TIFF",
+    output_file_name: Optional[str] = None,
+    low_priority: bool = False,
+    remove: bool = False,
+) -> str:
+    """Convert a raw stream to another file type.
+
+    Frames are written in the order of the target data source, so acquisitions
+    with an optimized channel order or striped across directories are converted
+    the same way. Conversion stops at the first frame that was not acquired.
+
+    Parameters
+    ----------
+    file_name : str
+        The raw stream to convert.
+    file_type : str
+        The file type to convert to, see FILE_TYPES.
+    output_file_name : Optional[str]
+        The file to write. By default, next to the raw stream.
+    low_priority : bool
+        Lower the priority of the calling process, to convert in idle time.
+    remove : bool
+        Delete the raw stream once it is converted.
+
+    Returns
+    -------
+    str
+        The name of the converted file.
+    """
+    from . import get_data_source
+
+    if low_priority and hasattr(os, "nice"):
+        os.nice(10)
+
+    source = RawStreamDataSource(file_name, mode="r")
+    if output_file_name is None:
+        ext = "." + file_type.lower().replace(" ", ".").replace("-", ".")
+        output_file_name = os.path.splitext(file_name)[0] + ext
+    logger.info(f"Converting {file_name} to {output_file_name}")
+
+    target = get_data_source(file_type)(file_name=output_file_name)
+    if source.configuration is not None:
+        target.set_metadata_from_configuration_experiment(
+            source.configuration, source.metadata.active_microscope
+        )
+    target.metadata.dx, target.metadata.dy, target.metadata.dz = source.voxel_size
+    target.set_metadata(
+        {
+            "x": source.shape_x,
+            "y": source.shape_y,
+            "c": source.shape_c,
+            "z": source.shape_z,
+            "t": source.shape_t,
+            "p": source.positions,
+            "per_stack": source.metadata.per_stack,
+        }
+    )
+    if hasattr(target, "set_bigtiff"):
+        target.set_bigtiff(target.nbytes > 2**32)
+
+    n_frames = source.shape_c * source.shape_z * source.shape_t * source.positions
+    for i in range(n_frames):
+        c, z, t, pos = target._cztp_indices(i, target.metadata.per_stack)
+        frame = source.get_frame_index(c, z, t, pos)
+        if frame is None:
+            break
+        pose = {}
+        if source.poses is not None:
+            pose = {axis: float(source.poses[frame][axis]) for axis in POSE_AXES}
+        target.write(source.get_frame(frame), **pose)
+    target.close()
+
+    stripes = source.stripes
+    source.close()
+    if remove:
+        for name in stripes + [source.header_file_name, source.poses_file_name]:
+            if os.path.exists(name):
+                os.remove(name)
+    return output_file_name
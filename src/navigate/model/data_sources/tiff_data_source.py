@@ -33,16 +33,18 @@
 #  Standard Imports
 import os
 import uuid
+from collections import OrderedDict
 from pathlib import Path
 import logging
 
 # Third Party Imports
 import tifffile
+import numpy as np
 import numpy.typing as npt
-from numpy import stack
 
 # Local imports
 from .data_source import DataSource, DataReader
+from .pose_log import PoseLog
 from ..metadata_sources.metadata import Metadata
 from ..metadata_sources.ome_tiff_metadata import OMETIFFMetadata
 
@@ -74,7 +76,15 @@ class TiffDataSource(DataSource):
         """
         #: np.ndarray: Image data
         self.image = None
-        self._views = []
+
+        #: PoseLog: Stage pose of each frame.
+        self._views = PoseLog()
+
+        #: int: Maximum number of files kept open by get_data.
+        self.max_open_files = 8
+
+        #: OrderedDict: Open TiffReaders, least recently used first.
+        self._readers = OrderedDict()
 
         super().__init__(file_name=file_name, mode=mode)
 
@@ -157,11 +167,12 @@ class TiffDataSource(DataSource):
         self.image = tifffile.TiffFile(self.file_name)
 
         # TODO: Parse metadata
-        for i, ax in enumerate(list(self.image.series[0].axes)):
+        series = self.image.series[0]
+        for i, ax in enumerate(list(series.axes)):
             if ax == "Q":
                 # TODO: This is a hack for tifffile. Find a way to remove this.
                 ax = "Z"
-            setattr(self, f"shape_{ax.lower()}", self.data.shape[i])
+            setattr(self, f"shape_{ax.lower()}", series.shape[i])
 
     def get_data(
         self,
@@ -191,7 +202,7 @@ class TiffDataSource(DataSource):
         Returns
         -------
         data : npt.ArrayLike
-            Image data
+            Image data, or a TiffStackView of the z-stack if z is -1.
         """
         # TODO: may need to support .tif
         file_suffix = ".ome.tiff" if self.is_ome else ".tiff"
@@ -204,16 +215,50 @@ class TiffDataSource(DataSource):
         if not os.path.exists(filename):
             return None
 
-        image = tifffile.TiffFile(filename)
         if z < 0:
-            return TiffReader(image)
+            return TiffStackView(self, filename)
 
-        z_num = len(image.pages)
-        if z < z_num:
-            return image.pages[z].asarray()
+        reader = self.get_reader(filename)
+        if z < reader.shape[0]:
+            return reader[z]
 
         return None
 
+    def get_reader(self, filename: str) -> "TiffReader":
+        """Get a TiffReader of a file, reusing open files.
+
+        A file is reopened if it has changed since it was opened. At most
+        max_open_files files are kept open, and the readers are closed when they
+        are evicted or the data source is closed. Use get_data to get a z-stack
+        that outlives them.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the TIFF file.
+
+        Returns
+        -------
+        reader : TiffReader
+            Reader of the file.
+        """
+        stat = os.stat(filename)
+        file_id = (stat.st_mtime_ns, stat.st_size)
+
+        reader = self._readers.pop(filename, None)
+        if reader is not None and reader.file_id != file_id:
+            reader.close()
+            reader = None
+        if reader is None:
+            reader = TiffReader(tifffile.TiffFile(filename))
+            reader.file_id = file_id
+        self._readers[filename] = reader
+
+        while len(self._readers) > self.max_open_files:
+            _, evicted = self._readers.popitem(last=False)
+            evicted.close()
+        return reader
+
     def write(self, data: npt.ArrayLike, **kw) -> None:
         """Writes 2D image to the data source.
 
@@ -245,7 +290,14 @@ class TiffDataSource(DataSource):
             ome_xml = None
 
         if len(kw) > 0:
-            self._views.append(kw)
+            self._views.append(
+                self._current_frame,
+                c,
+                z,
+                self._current_time,
+                self._current_position,
+                **kw,
+            )
 
         if self.is_ome:
             self.image[c].write(data, description=ome_xml, contiguous=True)
@@ -314,7 +366,7 @@ class TiffDataSource(DataSource):
         self.image = []
         self.file_name = []
         self.uid = []
-        self._views = []
+        self._views.close()
 
         if self.metadata._multiposition:
             position_directory = os.path.join(
@@ -344,6 +396,10 @@ class TiffDataSource(DataSource):
         internal : bool
             Internal flag. Do not close if True.
         """
+        if not internal:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
         if self._closed and not internal:
             return
         if self.image is None:
@@ -370,58 +426,159 @@ class TiffDataSource(DataSource):
         else:
             self.image.close()
         if not internal:
+            self._views.close()
             self._closed = True
 
 
+class TiffStackView(DataReader):
+    """Z-stack of a file opened through TiffDataSource.get_data.
+
+    The view does not own an open file. Every access goes through the data
+    source's open readers, so the file is reopened if its reader was evicted,
+    closed, or the file has changed.
+    """
+
+    def __init__(self, data_source: TiffDataSource, filename: str):
+        """Initialize a z-stack view.
+
+        Parameters
+        ----------
+        data_source : TiffDataSource
+            Data source that keeps the open files.
+        filename : str
+            Path to the TIFF file.
+        """
+        #: TiffDataSource: Data source that keeps the open files.
+        self.data_source = data_source
+
+        #: str: Path to the TIFF file.
+        self.filename = filename
+
+    @property
+    def reader(self) -> "TiffReader":
+        """TiffReader: Open reader of the file."""
+        return self.data_source.get_reader(self.filename)
+
+    @property
+    def shape(self):
+        return self.reader.shape
+
+    def __getitem__(self, index):
+        return self.reader[index]
+
+    def __array__(self):
+        return np.asarray(self.reader)
+
+
 class TiffReader(DataReader):
-    def __init__(self, tiff_file: tifffile.TiffFile):
+    """Read z-stacks from a TIFF file.
+
+    Uncompressed files with contiguous image data are memory-mapped, so reading a
+    region of interest only touches the bytes that are needed. Otherwise, decoded
+    pages are kept in a cache of at most cache_size bytes.
+    """
+
+    def __init__(self, tiff_file: tifffile.TiffFile, cache_size: int = 2**28):
+        """Initialize a TIFF reader.
+
+        Parameters
+        ----------
+        tiff_file : tifffile.TiffFile
+            Opened TIFF file.
+        cache_size : int
+            Maximum size of the decoded pages in bytes.
+        """
+        #: tifffile.TiffFile: Opened TIFF file.
         self.tiff = tiff_file
 
+        #: tuple: Identifies the version of the file that was opened.
+        self.file_id = None
+
+        #: int: Maximum size of the decoded pages in bytes.
+        self.cache_size = cache_size
+
+        #: OrderedDict: Decoded pages, least recently used first.
+        self._pages = OrderedDict()
+        self._cached_bytes = 0
+
+        page_number = len(self.tiff.pages)
+        y, x = self.tiff.pages[0].shape
+        self._shape = (page_number, y, x)
+
+        #: np.memmap: Memory-mapped image data, None if not memory-mappable.
+        self.memmap = None
+        series = self.tiff.series[0]
+        if (
+            series.dataoffset is not None
+            and series.size == page_number * y * x
+            and self.tiff.filehandle.is_file
+        ):
+            self.memmap = np.memmap(
+                self.tiff.filehandle.path,
+                dtype=np.dtype(self.tiff.byteorder + series.dtype.char),
+                mode="r",
+                offset=series.dataoffset,
+                shape=self._shape,
+            )
+
     @property
     def shape(self):
-        page_number = len(self.tiff.pages)
+        return self._shape
 
-        x, y = self.tiff.pages[0].shape
+    def page(self, index: int) -> npt.ArrayLike:
+        """Return a decoded page.
 
-        return (page_number, x, y)
+        Parameters
+        ----------
+        index : int
+            Page index.
+
+        Returns
+        -------
+        page : npt.ArrayLike
+            Decoded page.
+        """
+        if self.memmap is not None:
+            return self.memmap[index]
+
+        page = self._pages.pop(index, None)
+        if page is None:
+            page = self.tiff.pages[index].asarray()
+            self._cached_bytes += page.nbytes
+            while self._pages and self._cached_bytes > self.cache_size:
+                _, evicted = self._pages.popitem(last=False)
+                self._cached_bytes -= evicted.nbytes
+        self._pages[index] = page
+        return page
 
     def __getitem__(self, index):
+        if not isinstance(index, tuple):
+            index = (index,)
+        if len(index) > 3 or not isinstance(index[0], (int, np.integer, slice)):
+            logger.debug(f"TiffReader: Invalid indexing format. {index}")
+            return None
 
-        if isinstance(index, int):
-            # Return the entire page as a NumPy array
-            return self.tiff.pages[index].asarray()
+        if self.memmap is not None:
+            return np.array(self.memmap[index])
 
-        elif isinstance(index, slice):
-            # Handle case for slicing all pages
+        if isinstance(index[0], slice):
             pages = [
-                self.tiff.pages[i].asarray() for i in range(index.start, index.stop)
+                self.page(i)[index[1:]]
+                for i in range(*index[0].indices(self._shape[0]))
             ]
-            return stack(pages, axis=0)
-
-        elif isinstance(index, tuple):
-            # Check if the first index is an integer (page index)
-            if isinstance(index[0], int):
-                page_index = index[0]
-                if len(index) == 2:
-                    return self.tiff.pages[page_index].asarray()[index[1]]
-                elif len(index) == 3:
-                    return self.tiff.pages[page_index].asarray()[index[1], index[2]]
-            elif isinstance(index[0], slice):
-                if len(index) == 2:
-                    pages = [
-                        self.tiff.pages[i].asarray()[index[1]]
-                        for i in range(index.start, index.stop)
-                    ]
-
-                elif len(index) == 3:
-                    pages = [
-                        self.tiff.pages[i].asarray()[index[1], index[2]]
-                        for i in range(index.start, index.stop)
-                    ]
-                return stack(pages, axis=0)
-
-        logger.debug(f"TiffReader: Invalid indexing format. {index}")
-        return None
+            return np.stack(pages, axis=0)
+
+        # copy, so that the cached page can not be changed
+        return np.array(self.page(index[0])[index[1:]])
 
     def __array__(self):
+        if self.memmap is not None:
+            return np.array(self.memmap)
         return self.tiff.asarray()
+
+    def close(self):
+        """Close the file."""
+        self.memmap = None
+        self._pages.clear()
+        self._cached_bytes = 0
+        self.tiff.close()
@@ -41,6 +41,7 @@ from typing import Callable, Tuple, Any, Type, Dict, Optional
 
 # Local Imports
 from navigate.tools.common_functions import build_ref_name
+from navigate.tools.startup_profiler import profiler
 from navigate.model.devices.camera.base import CameraBase
 from navigate.model.devices.daq.base import DAQBase
 from navigate.model.devices.filter_wheel.base import FilterWheelBase
@@ -1516,17 +1517,18 @@ def load_devices(
         for id, device in enumerate(
             configuration["configuration"]["hardware"]["camera"]
         ):
-            try:
-                camera = load_camera_connection(configuration, id, is_synthetic)
-            except RuntimeError as e:  # noqa
-                if "camera" in plugin_devices:
-                    camera = plugin_devices["camera"]["load_device"](
-                        configuration, id, is_synthetic
-                    )
-                else:
-                    error_statement = f"Error loading camera: {e}"
-                    logger.error(error_statement)
-                    raise Exception(error_statement)
+            with profiler.time("connect", f"camera {device['type']}"):
+                try:
+                    camera = load_camera_connection(configuration, id, is_synthetic)
+                except RuntimeError as e:  # noqa
+                    if "camera" in plugin_devices:
+                        camera = plugin_devices["camera"]["load_device"](
+                            configuration, id, is_synthetic
+                        )
+                    else:
+                        error_statement = f"Error loading camera: {e}"
+                        logger.error(error_statement)
+                        raise Exception(error_statement)
 
             if (not is_synthetic) and device["type"].startswith("Hamamatsu"):
                 camera_serial_number = str(camera._serial_number)
@@ -1549,20 +1551,25 @@ def load_devices(
         devices["mirror"] = {}
         device = configuration["configuration"]["hardware"]["mirror"]
         device_ref_name = build_ref_name("_", device["type"])
-        devices["mirror"][device_ref_name] = load_mirror(configuration, is_synthetic)
+        with profiler.time("connect", f"mirror {device_ref_name}"):
+            devices["mirror"][device_ref_name] = load_mirror(
+                configuration, is_synthetic
+            )
 
     # load zoom
     if "zoom" in configuration["configuration"]["hardware"].keys():
         devices["zoom"] = {}
         device = configuration["configuration"]["hardware"]["zoom"]
         device_ref_name = build_ref_name("_", device["type"], device["servo_id"])
-        devices["zoom"][device_ref_name] = load_zoom_connection(
-            configuration, is_synthetic, plugin_devices
-        )
+        with profiler.time("connect", f"zoom {device_ref_name}"):
+            devices["zoom"][device_ref_name] = load_zoom_connection(
+                configuration, is_synthetic, plugin_devices
+            )
 
     # load daq
     if "daq" in configuration["configuration"]["hardware"].keys():
-        devices["daq"] = start_daq(configuration, is_synthetic)
+        with profiler.time("connect", "daq"):
+            devices["daq"] = start_daq(configuration, is_synthetic)
 
     # load filter wheels
     if "filter_wheel" in configuration["configuration"]["hardware"].keys():
@@ -1572,15 +1579,19 @@ def load_devices(
             device_ref_name = build_ref_name(
                 "_", filter_wheel_config["type"], filter_wheel_config["wheel_number"]
             )
-            devices["filter_wheel"][device_ref_name] = load_filter_wheel_connection(
-                filter_wheel_config, is_synthetic, plugin_devices
-            )
+            with profiler.time("connect", f"filter_wheel {device_ref_name}"):
+                devices["filter_wheel"][device_ref_name] = (
+                    load_filter_wheel_connection(
+                        filter_wheel_config, is_synthetic, plugin_devices
+                    )
+                )
 
     # load stage
     if "stage" in configuration["configuration"]["hardware"].keys():
         device_config = configuration["configuration"]["hardware"]["stage"]
         devices["stages"] = {}
-        stages = load_stages(configuration, is_synthetic, plugin_devices)
+        with profiler.time("connect", "stages"):
+            stages = load_stages(configuration, is_synthetic, plugin_devices)
         for i, stage in enumerate(stages):
             device_ref_name = build_ref_name(
                 "_", device_config[i]["type"], device_config[i]["serial_number"]
@@ -44,6 +44,7 @@ from serial import STOPBITS_ONE
 from serial.tools import list_ports
 
 # Local Imports
+from navigate.model.devices.APIs.serial_transport import SerialTransport
 
 # Logging setup
 p = __name__.split(".")[1]
@@ -113,8 +114,8 @@ class TigerController:
             If True, will print out messages to the console
 
         """
-        #: Serial: Serial port object
-        self.serial_port = Serial()
+        #: SerialTransport: Command framing and response matching
+        self.transport = SerialTransport(Serial())
 
         #: str: COM port of the Tiger Controller
         self.com_port = com_port
@@ -137,8 +138,14 @@ class TigerController:
         #: threading.Event.set(): Set the safe_to_write event
         self.safe_to_write.set()
 
-        #: float: Last time a command was sent to the Tiger Controller
-        self._last_cmd_send_time = time.perf_counter()
+    @property
+    def serial_port(self):
+        """Serial: Serial port object"""
+        return self.transport.port
+
+    @serial_port.setter
+    def serial_port(self, port):
+        self.transport.port = port
 
     @staticmethod
     def scan_ports() -> list[str]:
@@ -268,10 +275,7 @@ class TigerController:
         aa : float
             Hardware potentiometer value
         """
-        self.send_command(f"AA {axis}={aa}\r")
-        self.read_response()
-        self.send_command(f"AZ {axis}\r")
-        self.read_response()
+        self.send_commands([f"AA {axis}={aa}", f"AZ {axis}"])
 
     def set_backlash(self, axis, val):
         """Enable/disable stage backlash correction.
@@ -382,22 +386,46 @@ class TigerController:
         cmd : str
             Serial command to send to the device
         """
-        # always reset the buffers before a new command is sent
+        # the transport drops stale input before the command is sent
         self.safe_to_write.wait()
         self.safe_to_write.clear()
-        self.serial_port.read_all()
-        self.serial_port.reset_input_buffer()
-        self.serial_port.reset_output_buffer()
 
         # send the serial command to the controller
         self.report_to_console(cmd)
-        command = bytes(f"{cmd}\r", encoding="ascii")
         try:
-            self.serial_port.write(command)
+            self.transport.write(cmd)
         except SerialTimeoutException as e:
+            self.transport.clear_pending()
             print(f"Tiger Controller -- SerialTimeoutException: {e}")
             pass
 
+    def send_commands(self, cmds: list[str]) -> list[str]:
+        """Send several serial commands with one write and read their responses.
+
+        Parameters
+        ----------
+        cmds : list[str]
+            Serial commands to send to the device
+
+        Returns
+        -------
+        list[str]
+            Responses, in the order of the commands
+        """
+        self.safe_to_write.wait()
+        self.safe_to_write.clear()
+        self.report_to_console(" | ".join(cmds))
+        try:
+            responses = self.transport.query_many(cmds)
+        finally:
+            self.safe_to_write.set()
+        for response in responses:
+            self.report_to_console(f"Received Response: {response.strip()}")
+            if response.startswith(":N"):
+                logger.error(f"{str(self)}, Error code received: {response}")
+                raise TigerException(response.strip())
+        return responses
+
     def read_response(self) -> str:
         """Read a line from the serial response.
 
@@ -406,24 +434,18 @@ class TigerController:
         str
             Response from the serial port
         """
-        response = self.serial_port.readline()
+        # Undecodable responses, e.g. after low-frequency serial communication
+        # errors, are returned as ""
+        response = self.transport.read()
         self.safe_to_write.set()
-
-        try:
-            response = response.decode(encoding="ascii")
-        except UnicodeDecodeError:
-            """
-            Low-Frequency Serial Communication error:
-            utf-8' codec can't decode byte 0x8c in position 0:
-            invalid start byte
-            """
+        if response == "":
             return ""
 
         # Remove leading and trailing empty spaces
         self.report_to_console(f"Received Response: {response.strip()}")
         if response.startswith(":N"):
             logger.error(f"{str(self)}, Error code received: {response}")
-            raise TigerException(response)
+            raise TigerException(response.strip())
         return response  # in case we want to read the response
 
     def moverel(self, x: int = 0, y: int = 0, z: int = 0) -> None:
@@ -612,26 +634,43 @@ class TigerController:
         res = self.read_response()
         return "B" in res
 
-    def wait_for_device(self, timeout: float = 1.75) -> None:
+    def wait_for_device(
+        self, timeout: float = 1.75, poll_interval: float = 0.001
+    ) -> None:
         """Waits for the all motors to stop moving.
 
+        Parameters
+        ----------
         timeout : float
             Timeout in seconds. Default is 1.75 seconds.
+        poll_interval : float
+            Sleep between two status queries in seconds. Default is 1 ms.
         """
         if self.verbose:
             print("Waiting for device...")
+        start = time.perf_counter()
         busy = self.is_device_busy()
-        waiting_time = 0.0
 
         while busy:
-            waiting_time += 0.005
-            if waiting_time >= timeout:
+            if time.perf_counter() - start >= timeout:
                 break
-            time.sleep(0.001)
+            time.sleep(poll_interval)
             busy = self.is_device_busy()
 
         if self.verbose:
-            print(f"Waited {waiting_time:.2f} s")
+            print(f"Waited {time.perf_counter() - start:.2f} s")
+
+    def get_max_speeds(self) -> dict:
+        """Maximum speed of each axis, as measured by set_speed_as_percent_max
+
+        Returns
+        -------
+        dict
+            Maximum speed of each axis in mm/s. Empty if it was never measured.
+        """
+        if self.default_axes_sequence is None or self._max_speeds is None:
+            return {}
+        return dict(zip(self.default_axes_sequence, self._max_speeds))
 
     def stop(self):
         """Stop all stage movement immediately"""
@@ -820,14 +859,6 @@ class TigerController:
             True if any axis is moving. False if not.
         """
 
-        # Calculate duration of time since last command.
-        time_since_last_cmd = time.perf_counter() - self._last_cmd_send_time
-
-        # Wait 50 milliseconds before pinging controller again.
-        sleep_time = 0.050 - time_since_last_cmd
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-
         self.send_command("/")
         response = self.read_response().rstrip().rstrip("\r\n")
         if response == "ACK":
@@ -0,0 +1,457 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Imports
+import logging
+import threading
+import time
+
+# Third Party Imports
+
+# Local Imports
+
+# Logging setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class SerialEmulator:
+    """In-process stand-in for serial.Serial.
+
+    Bytes written to the emulator are handed to handle(), which appends the
+    responses of the emulated device to the input buffer. Subclasses implement
+    handle() for a specific protocol. Responses are available immediately, so
+    device APIs can be tested, and benchmarked, without hardware.
+    """
+
+    def __init__(self, port: str = "EMULATOR", baudrate: int = 115200, **kwargs):
+        """Initialize the emulator.
+
+        Parameters
+        ----------
+        port : str
+            Name of the port.
+        baudrate : int
+            Baud rate. Only stored.
+        **kwargs
+            Other serial.Serial settings. Only stored.
+        """
+        #: str: Name of the port.
+        self.port = port
+
+        #: int: Baud rate.
+        self.baudrate = baudrate
+
+        #: float: Read timeout in seconds.
+        self.timeout = kwargs.pop("timeout", 1.0)
+
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+        #: bool: Is the port open?
+        self.is_open = False
+
+        #: list[bytes]: Everything written to the port.
+        self.written = []
+
+        #: bytearray: Bytes received from the device and not read yet.
+        self._input = bytearray()
+
+        #: bytearray: Bytes written and not handled by the device yet.
+        self._output = bytearray()
+
+        #: threading.Condition: Signals new input.
+        self._input_ready = threading.Condition()
+
+    def open(self) -> None:
+        """Open the port."""
+        self.is_open = True
+
+    def close(self) -> None:
+        """Close the port."""
+        self.is_open = False
+
+    def set_buffer_size(self, rx_size: int = 4096, tx_size: int = None) -> None:
+        """Accept the buffer size, which is unlimited."""
+        pass
+
+    @property
+    def in_waiting(self) -> int:
+        """int: Number of bytes waiting to be read."""
+        return len(self._input)
+
+    def reset_input_buffer(self) -> None:
+        """Drop unread input."""
+        with self._input_ready:
+            self._input.clear()
+
+    def reset_output_buffer(self) -> None:
+        """Drop output the device has not handled yet."""
+        self._output.clear()
+
+    def flush(self) -> None:
+        """Wait until all output is written."""
+        pass
+
+    def write(self, data: bytes) -> int:
+        """Send bytes to the emulated device.
+
+        Parameters
+        ----------
+        data : bytes
+            Bytes to send.
+
+        Returns
+        -------
+        int
+            Number of bytes written.
+        """
+        self.written.append(bytes(data))
+        self._output += data
+        consumed = self.handle(bytes(self._output))
+        del self._output[:consumed]
+        return len(data)
+
+    def respond(self, data: bytes) -> None:
+        """Queue bytes for the host to read.
+
+        Parameters
+        ----------
+        data : bytes
+            Response of the device.
+        """
+        with self._input_ready:
+            self._input += data
+            self._input_ready.notify_all()
+
+    def handle(self, data: bytes) -> int:
+        """Handle the bytes the device has received.
+
+        Parameters
+        ----------
+        data : bytes
+            Bytes received and not handled yet.
+
+        Returns
+        -------
+        int
+            Number of bytes handled. The rest is passed again with the next write.
+        """
+        raise NotImplementedError
+
+    def _read(self, size: int = None, terminator: bytes = None) -> bytes:
+        deadline = time.perf_counter() + (self.timeout or 0)
+        with self._input_ready:
+            while True:
+                if terminator is not None and terminator in self._input:
+                    end = self._input.index(terminator) + len(terminator)
+                    if size is not None:
+                        end = min(end, size)
+                    break
+                if size is not None and len(self._input) >= size:
+                    end = size
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    end = len(self._input) if size is None else min(
+                        size, len(self._input)
+                    )
+                    break
+                self._input_ready.wait(remaining)
+            data = bytes(self._input[:end])
+            del self._input[:end]
+        return data
+
+    def read(self, size: int = 1) -> bytes:
+        """Read bytes, waiting up to timeout for them to arrive."""
+        return self._read(size=size)
+
+    def read_until(self, expected: bytes = b"\n", size: int = None) -> bytes:
+        """Read until expected is found, waiting up to timeout."""
+        return self._read(size=size, terminator=expected)
+
+    def readline(self) -> bytes:
+        """Read until a line feed, waiting up to timeout."""
+        return self._read(terminator=b"\n")
+
+    def read_all(self) -> bytes:
+        """Read all bytes waiting without blocking."""
+        return self._read(size=self.in_waiting)
+
+
+class ASIEmulator(SerialEmulator):
+    """Emulates the serial protocol of ASI Tiger and MS2000 controllers.
+
+    Commands are ASCII lines terminated by a carriage return. Replies end with
+    a carriage return and line feed. Positions are in tenths of microns.
+    Moves take move_time seconds, during which the status command returns B.
+    """
+
+    def __init__(self, axes=("X", "Y", "Z", "M", "N"), move_time=0.0, **kwargs):
+        """Initialize the emulator.
+
+        Parameters
+        ----------
+        axes : tuple[str]
+            Motor axes of the controller.
+        move_time : float
+            Duration of every move in seconds.
+        **kwargs
+            Passed to SerialEmulator.
+        """
+        super().__init__(**kwargs)
+
+        #: list[str]: Motor axes.
+        self.axes = list(axes)
+
+        #: float: Duration of every move in seconds.
+        self.move_time = move_time
+
+        #: dict[str, float]: Position of each axis in tenths of microns.
+        self.position = {axis: 0.0 for axis in self.axes}
+
+        #: dict[str, float]: Speed of each axis in mm/s.
+        self.speed = {axis: 1.0 for axis in self.axes}
+
+        #: float: Time the current move ends.
+        self.busy_until = 0.0
+
+        #: int: Selected filter wheel.
+        self.filter_wheel = 0
+
+        #: dict[int, int]: Position of each filter wheel.
+        self.filter_wheel_position = {}
+
+    def handle(self, data: bytes) -> int:
+        consumed = 0
+        while True:
+            end = data.find(b"\r", consumed)
+            if end < 0:
+                return consumed
+            line = data[consumed:end].decode("ascii").strip()
+            consumed = end + 1
+            if line:
+                self.respond(self.reply(line).encode("ascii") + b"\r\n")
+
+    def _axis_values(self, args):
+        values = {}
+        for arg in args:
+            axis, _, value = arg.partition("=")
+            if axis.endswith("?"):
+                axis, value = axis[:-1], "?"
+            if axis.upper() not in self.axes:
+                return None
+            values[axis.upper()] = value
+        return values
+
+    def _move(self):
+        self.busy_until = time.perf_counter() + self.move_time
+
+    def reply(self, line: str) -> str:
+        """Reply to one command.
+
+        Parameters
+        ----------
+        line : str
+            Command, without terminator.
+
+        Returns
+        -------
+        str
+            Reply, without terminator.
+        """
+        command, *args = line.split()
+        command = command.upper()
+        busy = time.perf_counter() < self.busy_until
+
+        if command in ("/", "STATUS"):
+            return "B" if busy else "N"
+        if command == "RS":
+            return ":A " + ("B" if busy else "N")
+        if command in ("WHERE", "W"):
+            axes = [a.upper() for a in args] or self.axes
+            if any(a not in self.axes for a in axes):
+                return ":N-2"
+            return ":A " + " ".join(
+                f"{self.position[a]:.1f}" for a in self.axes if a in axes
+            )
+        if command in ("MOVE", "M", "MOVREL", "R"):
+            values = self._axis_values(args)
+            if values is None:
+                return ":N-2"
+            for axis, value in values.items():
+                value = float(value)
+                if command in ("MOVREL", "R"):
+                    value += self.position[axis]
+                self.position[axis] = value
+            self._move()
+            return ":A"
+        if command in ("SPEED", "S"):
+            values = self._axis_values(args)
+            if values is None:
+                return ":N-2"
+            queried = []
+            for axis, value in values.items():
+                if value.endswith("?") or value == "":
+                    queried.append(f"{axis}={self.speed[axis]:.6f}")
+                else:
+                    self.speed[axis] = float(value)
+            return ":A " + " ".join(queried) if queried else ":A"
+        if command == "CNTS":
+            values = self._axis_values(args)
+            if values is None:
+                return ":N-2"
+            return ":A " + " ".join(f"{axis}=10000.0" for axis in values)
+        if command in ("HALT", "\\"):
+            self.busy_until = 0.0
+            return ":A"
+        if command in ("AA", "AZ", "B", "PC", "E", "TTL", "SCAN", "SCANR", "SCANV"):
+            return ":A"
+        if command == "BU":
+            return (
+                "TIGER_COMM\rMotor Axes: "
+                + " ".join(self.axes)
+                + "\rAxis Types: "
+                + " ".join("x" for _ in self.axes)
+                + "\rAxis Addr: "
+                + " ".join("1" for _ in self.axes)
+            )
+        if command == "FW":
+            self.filter_wheel = int(args[0]) if args else self.filter_wheel
+            return str(self.filter_wheel)
+        if command == "MP":
+            if args:
+                self.filter_wheel_position[self.filter_wheel] = int(args[0])
+            return str(self.filter_wheel_position.get(self.filter_wheel, 0))
+        if command in ("HO", "SV", "HA"):
+            return str(self.filter_wheel)
+        return ":N-1"
+
+
+class SutterMP285Emulator(SerialEmulator):
+    """Emulates the binary serial protocol of the Sutter MP-285.
+
+    Commands are a command byte, binary arguments, and a carriage return. Every
+    command is acknowledged with a carriage return, after the data it returns.
+    Positions are in microsteps.
+    """
+
+    #: dict[int, int]: Length of each command, including the terminator.
+    command_lengths = {
+        ord("c"): 2,
+        ord("m"): 14,
+        ord("V"): 4,
+        ord("a"): 2,
+        ord("b"): 2,
+        ord("n"): 2,
+        ord("r"): 2,
+        ord("s"): 2,
+        0x03: 1,
+    }
+
+    def __init__(self, **kwargs):
+        """Initialize the emulator.
+
+        Parameters
+        ----------
+        **kwargs
+            Passed to SerialEmulator.
+        """
+        super().__init__(**kwargs)
+
+        #: list[int]: X, Y and Z position in microsteps.
+        self.position = [0, 0, 0]
+
+        #: int: Resolution bit and velocity.
+        self.velocity = 0
+
+        #: bool: Are positions absolute?
+        self.absolute = True
+
+    def handle(self, data: bytes) -> int:
+        consumed = 0
+        while consumed < len(data):
+            command = data[consumed]
+            length = self.command_lengths.get(command, None)
+            if length is None:
+                # unknown byte, skip it
+                consumed += 1
+                continue
+            if len(data) - consumed < length:
+                break
+            args = data[consumed + 1 : consumed + length - 1]
+            consumed += length
+            self.respond(self.reply(command, args))
+        return consumed
+
+    def reply(self, command: int, args: bytes) -> bytes:
+        """Reply to one command.
+
+        Parameters
+        ----------
+        command : int
+            Command byte.
+        args : bytes
+            Arguments, without the terminator.
+
+        Returns
+        -------
+        bytes
+            Reply, including the task-complete indicator.
+        """
+        if command == ord("c"):
+            return (
+                b"".join(
+                    v.to_bytes(4, byteorder="little", signed=True)
+                    for v in self.position
+                )
+                + b"\r"
+            )
+        if command == ord("m"):
+            steps = [
+                int.from_bytes(args[i : i + 4], byteorder="little", signed=True)
+                for i in range(0, 12, 4)
+            ]
+            if self.absolute:
+                self.position = steps
+            else:
+                self.position = [p + s for p, s in zip(self.position, steps)]
+            return b"\r"
+        if command == ord("V"):
+            self.velocity = int.from_bytes(args, byteorder="little", signed=False)
+            return b"\r"
+        if command in (ord("a"), ord("b")):
+            self.absolute = command == ord("a")
+            return b"\r"
+        if command == ord("s"):
+            return bytes(32) + b"\r"
+        return b"\r"
@@ -0,0 +1,304 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Imports
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+# Third Party Imports
+
+# Local Imports
+
+# Logging setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class LatencyHistogram:
+    """Histogram of command round trip times.
+
+    Bins are logarithmically spaced from 100 us to 10 s, four per decade.
+    """
+
+    #: list[float]: Upper edges of the bins in seconds.
+    edges = [10 ** (e / 4) for e in range(-16, 5)]
+
+    def __init__(self) -> None:
+        #: list[int]: Number of round trips per bin. The last bin is overflow.
+        self.counts = [0] * (len(self.edges) + 1)
+
+        #: int: Number of round trips.
+        self.count = 0
+
+        #: float: Sum of the round trip times in seconds.
+        self.total = 0.0
+
+        #: float: Longest round trip time in seconds.
+        self.max = 0.0
+
+        #: int: Number of commands that did not get a response in time.
+        self.timeouts = 0
+
+    def add(self, seconds: float) -> None:
+        """Add a round trip time.
+
+        Parameters
+        ----------
+        seconds : float
+            Round trip time in seconds.
+        """
+        self.counts[bisect.bisect_left(self.edges, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        """float: Mean round trip time in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Estimate a percentile from the bins.
+
+        Parameters
+        ----------
+        q : float
+            Percentile, 0-100.
+
+        Returns
+        -------
+        float
+            Upper edge of the bin holding the percentile, in seconds.
+        """
+        if self.count == 0:
+            return 0.0
+        target = q / 100 * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            cumulative += n
+            if cumulative >= target and n > 0:
+                return self.edges[i] if i < len(self.edges) else self.max
+        return self.max
+
+
+class SerialTransport:
+    """Line-based command/response transport shared by serial device APIs.
+
+    Commands are ASCII strings framed with a terminator. Each command gets one
+    response, terminated by response_terminator, in the order the commands were
+    written. Several queries can be written at once with query_many(), which saves
+    one round trip per command. The round trip time of every command is recorded
+    in a histogram per command name.
+
+    The port can be a serial.Serial object or anything with the same interface,
+    such as the emulators in navigate.model.devices.APIs.serial_emulator.
+    """
+
+    def __init__(
+        self,
+        port=None,
+        command_terminator: str = "\r",
+        response_terminator: str = "\n",
+        encoding: str = "ascii",
+        discard_stale_input: bool = True,
+    ) -> None:
+        """Initialize the transport.
+
+        Parameters
+        ----------
+        port : serial.Serial
+            Serial port, opened and configured by the device API.
+        command_terminator : str
+            Appended to every command.
+        response_terminator : str
+            Last character of every response.
+        encoding : str
+            Encoding of commands and responses.
+        discard_stale_input : bool
+            Drop unread input before writing a command, so that a response left
+            over from an earlier, timed out command can not be mistaken for the
+            response of the new one.
+        """
+        #: serial.Serial: Serial port.
+        self.port = port
+
+        #: str: Appended to every command.
+        self.command_terminator = command_terminator
+
+        #: str: Last character of every response.
+        self.response_terminator = response_terminator
+
+        #: str: Encoding of commands and responses.
+        self.encoding = encoding
+
+        #: bool: Drop unread input before writing a command.
+        self.discard_stale_input = discard_stale_input
+
+        #: dict[str, LatencyHistogram]: Round trip times by command name.
+        self.latency = {}
+
+        #: threading.RLock: Keeps the commands and responses of a query together.
+        self.lock = threading.RLock()
+
+        #: deque: (command name, time written) of commands awaiting a response.
+        self._pending = deque()
+
+    def frame(self, command: str) -> bytes:
+        """Frame a command.
+
+        Terminators already present at the end of the command are replaced, so
+        the device never receives an extra, empty command.
+
+        Parameters
+        ----------
+        command : str
+            Command.
+
+        Returns
+        -------
+        bytes
+            Framed command.
+        """
+        command = command.rstrip("\r\n") + self.command_terminator
+        return command.encode(self.encoding)
+
+    def write(self, *commands: str) -> None:
+        """Write one or more commands with a single write call.
+
+        Parameters
+        ----------
+        *commands : str
+            Commands to write.
+        """
+        if self.discard_stale_input and not self._pending:
+            self.port.reset_input_buffer()
+        data = b"".join(self.frame(command) for command in commands)
+        now = time.perf_counter()
+        for command in commands:
+            name = command.split(" ", 1)[0].strip() or command
+            self._pending.append((name, now))
+        self.port.write(data)
+
+    def read(self) -> str:
+        """Read the response to the oldest command awaiting one.
+
+        Returns
+        -------
+        str
+            Response, including the terminator. Empty if the read timed out or
+            the response could not be decoded.
+        """
+        if self.response_terminator == "\n":
+            response = self.port.readline()
+        else:
+            response = self.port.read_until(
+                self.response_terminator.encode(self.encoding)
+            )
+        name, start = self._pending.popleft() if self._pending else ("", None)
+        histogram = self.latency.setdefault(name, LatencyHistogram())
+        if not response:
+            histogram.timeouts += 1
+            logger.debug(f"No response to {name}")
+            return ""
+        if start is not None:
+            histogram.add(time.perf_counter() - start)
+        try:
+            return response.decode(encoding=self.encoding)
+        except UnicodeDecodeError:
+            logger.debug(f"Could not decode the response to {name}: {response}")
+            return ""
+
+    def query(self, command: str) -> str:
+        """Write a command and read its response.
+
+        Parameters
+        ----------
+        command : str
+            Command.
+
+        Returns
+        -------
+        str
+            Response.
+        """
+        with self.lock:
+            self.write(command)
+            return self.read()
+
+    def query_many(self, commands: list) -> list:
+        """Write several commands at once and read their responses.
+
+        Parameters
+        ----------
+        commands : list[str]
+            Commands.
+
+        Returns
+        -------
+        list[str]
+            Responses, in the order of the commands.
+        """
+        with self.lock:
+            self.write(*commands)
+            return [self.read() for _ in commands]
+
+    def clear_pending(self) -> None:
+        """Forget the commands awaiting a response, e.g. after a timeout."""
+        self._pending.clear()
+
+    def latency_report(self, name: Optional[str] = None) -> str:
+        """Summarize the round trip times.
+
+        Parameters
+        ----------
+        name : str
+            Name of the device, used as the title.
+
+        Returns
+        -------
+        str
+            One line per command: count, mean, median, 99th percentile, maximum,
+            and timeouts.
+        """
+        lines = [f"{name or 'Serial'} command latency (ms)"]
+        for command, h in sorted(self.latency.items(), key=lambda x: -x[1].total):
+            lines.append(
+                f"  {command:<10} n={h.count:<6} mean={h.mean * 1000:8.2f} "
+                f"p50={h.percentile(50) * 1000:8.2f} "
+                f"p99={h.percentile(99) * 1000:8.2f} "
+                f"max={h.max * 1000:8.2f} timeouts={h.timeouts}"
+            )
+        return "\n".join(lines)
@@ -141,6 +141,9 @@ class CameraBase:
         self._offset, self._variance = None, None
         self.get_offset_variance_maps()
 
+        #: np.ndarray: Flat-field map, loaded on first use
+        self._flatfield = None
+
     def __str__(self):
         """Return string representation of CameraBase."""
         return "CameraBase"
@@ -174,6 +177,41 @@ class CameraBase:
             self._offset, self._variance = None, None
         return self._offset, self._variance
 
+    def get_flatfield_map(self):
+        """Get the flat-field map from file.
+
+        The map is read from camera_maps/{serial_number}_flat.tiff, next to the
+        offset and variance maps. Pixels are divided by it.
+
+        Returns
+        -------
+        flatfield : np.ndarray
+            Flat-field map, or None if there is no map.
+        """
+        serial_number = self.camera_parameters["hardware"]["serial_number"]
+        map_path = os.path.join(get_navigate_path(), "camera_maps")
+        try:
+            self._flatfield = tifffile.imread(
+                os.path.join(map_path, f"{serial_number}_flat.tiff")
+            )
+        except FileNotFoundError:
+            logger.info(f"{str(self)}, Flat-field map not found in {map_path}")
+            self._flatfield = None
+        return self._flatfield
+
+    @property
+    def flatfield(self):
+        """Return flat-field map. If not present, load from file.
+
+        Returns
+        -------
+        flatfield : np.ndarray
+            Flat-field map.
+        """
+        if self._flatfield is None:
+            self.get_flatfield_map()
+        return self._flatfield
+
     @property
     def offset(self):
         """Return offset map. If not present, load from file.
@@ -41,6 +41,7 @@ from typing import Union, Dict, Any
 import nidaqmx
 import nidaqmx.constants
 import nidaqmx.task
+from nidaqmx.stream_writers import AnalogUnscaledWriter
 import numpy as np
 
 # Local Imports
@@ -53,6 +54,40 @@ p = __name__.split(".")[1]
 logger = logging.getLogger(p)
 
 
+def volts_to_int16(
+    waveform: np.ndarray, coefficients: list, out: np.ndarray, scratch: np.ndarray
+) -> None:
+    """Convert a waveform in volts to raw int16 DAC codes.
+
+    The waveform is repeated until it fills out. No arrays are allocated.
+
+    Parameters
+    ----------
+    waveform : np.ndarray
+        Waveform in volts.
+    coefficients : list
+        Polynomial coefficients, lowest order first, scaling volts to DAC codes.
+        Reported by the ao_dev_scaling_coeff property of an analog output channel.
+    out : np.ndarray
+        int16 row to fill.
+    scratch : np.ndarray
+        float64 work array at least as long as out.
+    """
+    n = min(len(waveform), len(out))
+    work = scratch[:n]
+    # Horner's method
+    work.fill(coefficients[-1])
+    for c in coefficients[-2::-1]:
+        work *= waveform[:n]
+        work += c
+    np.rint(work, out=work)
+    np.clip(work, np.iinfo(np.int16).min, np.iinfo(np.int16).max, out=work)
+    np.copyto(out[:n], work, casting="unsafe")
+    for start in range(n, len(out), n):
+        stop = min(start + n, len(out))
+        out[start:stop] = out[: stop - start]
+
+
 @log_initialization
 class NIDAQ(DAQBase):
     """NIDAQ class for Control of NI Data Acquisition Cards."""
@@ -92,6 +127,10 @@ class NIDAQ(DAQBase):
         #: dict: NI DAQmx tasks for analog output.
         self.analog_output_tasks = {}
 
+        #: dict: Preallocated int16 (channels x samples) buffer of each board, the
+        #: waveforms it was converted from, the scaling coefficients and the writer.
+        self.analog_output_buffers = {}
+
         #: float: Number of samples.
         self.n_sample = None
 
@@ -384,23 +423,78 @@ class NIDAQ(DAQBase):
             # )
             # TODO: may change this later to automatically expand the waveform to the
             #  longest
-            for k, v in self.analog_outputs.items():
-                if (
-                    k.split("/")[0] == board
-                    and len(v["waveform"][channel_key]) < max_sample
-                ):
-                    v["waveform"][channel_key] = np.hstack(
-                        [v["waveform"][channel_key]] * self.waveform_expand_num
-                    )
-            # Write values to board
-            waveforms = np.vstack(
-                [
-                    v["waveform"][channel_key][:max_sample]
-                    for k, v in self.analog_outputs.items()
-                    if k.split("/")[0] == board
-                ]
-            ).squeeze()
-            self.analog_output_tasks[board].write(waveforms)
+            # Write values to board. Waveforms shorter than max_sample are repeated.
+            buffer = self.get_analog_output_buffer(board, max_sample)
+            buffer["writer"] = AnalogUnscaledWriter(
+                self.analog_output_tasks[board].out_stream
+            )
+            coefficients = [
+                list(channel.ao_dev_scaling_coeff)
+                for channel in self.analog_output_tasks[board].ao_channels
+            ]
+            if coefficients != buffer["coefficients"]:
+                buffer["coefficients"] = coefficients
+                buffer["waveforms"] = [None] * len(buffer["channels"])
+            self.write_analog_output_buffer(board, channel_key)
+
+    def get_analog_output_buffer(self, board: str, n_samples: int) -> dict:
+        """Get the int16 buffer of a board, allocating it if its shape changed.
+
+        Parameters
+        ----------
+        board : str
+            Name of the board.
+        n_samples : int
+            Number of samples per channel.
+
+        Returns
+        -------
+        buffer : dict
+            The buffer of the board.
+        """
+        channels = [k for k in self.analog_outputs.keys() if k.split("/")[0] == board]
+        buffer = self.analog_output_buffers.get(board, None)
+        if (
+            buffer is None
+            or buffer["channels"] != channels
+            or buffer["data"].shape[1] != n_samples
+        ):
+            buffer = {
+                "channels": channels,
+                "data": np.zeros((len(channels), n_samples), dtype=np.int16),
+                "scratch": np.empty(n_samples, dtype=np.float64),
+                "waveforms": [None] * len(channels),
+                "coefficients": None,
+                "writer": None,
+            }
+            self.analog_output_buffers[board] = buffer
+        return buffer
+
+    def write_analog_output_buffer(self, board: str, channel_key: str) -> None:
+        """Write the waveforms of a channel to a board.
+
+        Only rows whose waveform changed since the last write are converted.
+
+        Parameters
+        ----------
+        board : str
+            Name of the board.
+        channel_key : str
+            Channel key of the waveforms.
+        """
+        buffer = self.analog_output_buffers[board]
+        for i, channel in enumerate(buffer["channels"]):
+            waveform = self.analog_outputs[channel]["waveform"][channel_key]
+            if buffer["waveforms"][i] is waveform:
+                continue
+            volts_to_int16(
+                waveform,
+                buffer["coefficients"][i],
+                buffer["data"][i],
+                buffer["scratch"],
+            )
+            buffer["waveforms"][i] = waveform
+        buffer["writer"].write_int16(buffer["data"])
 
     def prepare_acquisition(self, channel_key: str) -> None:
         """Prepare the acquisition.
@@ -516,6 +610,7 @@ class NIDAQ(DAQBase):
             self.microscope_name = microscope_name
             self.analog_outputs = {}
             self.analog_output_tasks = {}
+            self.analog_output_buffers = {}
 
         self.camera_delay = (
             float(self.waveform_constants["other_constants"].get("camera_delay", 5))
@@ -578,14 +673,7 @@ class NIDAQ(DAQBase):
             self.analog_output_tasks[board_name].stop()
 
             # Write values to board
-            waveforms = np.vstack(
-                [
-                    v["waveform"][self.current_channel_key][: self.n_sample]
-                    for k, v in self.analog_outputs.items()
-                    if k.split("/")[0] == board_name
-                ]
-            ).squeeze()
-            self.analog_output_tasks[board_name].write(waveforms)
+            self.write_analog_output_buffer(board_name, self.current_channel_key)
         except Exception:
             logger.debug(f"Could not update analog task: {traceback.format_exc()}")
             for board in self.analog_output_tasks.keys():
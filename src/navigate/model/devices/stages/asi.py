@@ -138,6 +138,9 @@ class ASIStage(StageBase):
                 for axis, self.stage_feedback in zip(self.asi_axes, self.stage_feedback)
             }
 
+        #: dict: Accelerations from the configuration, kept when speeds change.
+        self._configured_acceleration = dict(self.motion_profile.acceleration)
+
         self.tiger_controller = device_connection
         if device_connection is not None:
             # Set feedback alignment values
@@ -275,7 +278,10 @@ class ASIStage(StageBase):
             return False
 
         if wait_until_done:
-            self.tiger_controller.wait_for_device()
+            self.motion_profile.wait(
+                self.get_move_distances({axis: axis_abs}),
+                self.tiger_controller.is_device_busy,
+            )
         return True
 
     def verify_move(self, move_dictionary):
@@ -344,7 +350,10 @@ class ASIStage(StageBase):
             logger.exception("ASI Stage Exception", e)
             return False
         if wait_until_done:
-            self.tiger_controller.wait_for_device()
+            self.motion_profile.wait(
+                self.get_move_distances(abs_pos_dict),
+                self.tiger_controller.is_device_busy,
+            )
 
         return True
 
@@ -375,12 +384,17 @@ class ASIStage(StageBase):
         if percent is not None:
             try:
                 self.tiger_controller.set_speed_as_percent_max(percent)
+                max_speeds = self.tiger_controller.get_max_speeds()
+                self.update_motion_profile(
+                    {axis: percent * speed for axis, speed in max_speeds.items()}
+                )
             except TigerException as e:
                 print(f"ASI Controller failed to set speed as a percent: {e}")
                 return False
         else:
             try:
                 self.tiger_controller.set_speed(velocity_dict)
+                self.update_motion_profile(velocity_dict)
             except TigerException:
                 return False
             except KeyError as e:
@@ -388,6 +402,28 @@ class ASIStage(StageBase):
                 return False
         return True
 
+    def update_motion_profile(self, speed_dict, ramp_time=0.07):
+        """Update the stage motion profile from the controller speeds.
+
+        Axes with a configured acceleration keep it, the others ramp to their
+        speed in the default ASI ramp time.
+
+        Parameters
+        ----------
+        speed_dict : dict
+            Speed of each ASI axis in mm/s.
+        ramp_time : float
+            Acceleration ramp time in seconds.
+        """
+        for asi_axis, speed in speed_dict.items():
+            axis = self.asi_axes.get(asi_axis, None)
+            if axis is None or speed <= 0:
+                continue
+            velocity = speed * 1000
+            self.motion_profile.velocity[axis] = velocity
+            if self._configured_acceleration.get(axis, None) is None:
+                self.motion_profile.acceleration[axis] = velocity / ramp_time
+
     def get_speed(self, axis):
         """Get scan velocity of the axis.
 
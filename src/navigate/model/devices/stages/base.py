@@ -40,6 +40,7 @@ from typing import Any, Dict
 
 # Local Imports
 from navigate.tools.decorators import log_initialization
+from navigate.model.devices.stages.motion_profile import MotionProfile
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -77,6 +78,7 @@ class StageBase:
             microscope_name
         ]["stage"]
         if type(stage_configuration["hardware"]) == ListProxy:
+            device_config = stage_configuration["hardware"][device_id]
 
             #: list: List of stage axes available.
             self.axes = list(stage_configuration["hardware"][device_id]["axes"])
@@ -90,6 +92,7 @@ class StageBase:
                 "feedback_alignment", None
             )
         else:
+            device_config = stage_configuration["hardware"]
             self.axes = list(stage_configuration["hardware"]["axes"])
             device_axes = stage_configuration["hardware"].get("axes_mapping", [])
             self.stage_feedback = stage_configuration["hardware"].get(
@@ -121,6 +124,27 @@ class StageBase:
         #: bool: Whether the stage has limits enabled or not. Default is True.
         self.stage_limits = True
 
+        #: MotionProfile: Model of the stage motion used to wait for moves.
+        self.motion_profile = MotionProfile.from_config(device_config, self.axes)
+
+    def get_move_distances(self, abs_pos_dict):
+        """Return the distance each axis travels to reach a position.
+
+        Parameters
+        ----------
+        abs_pos_dict : dict
+            Absolute position of each axis, keyed by axis name.
+
+        Returns
+        -------
+        dict
+            Distance of each axis from its last known position.
+        """
+        return {
+            axis: abs(pos - getattr(self, f"{axis}_pos", pos))
+            for axis, pos in abs_pos_dict.items()
+        }
+
     def __del__(self):
         """Destructor for the StageBase class."""
         pass
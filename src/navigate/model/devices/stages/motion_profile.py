@@ -0,0 +1,289 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Imports
+import logging
+import math
+import time
+from typing import Callable, Dict, Optional
+
+# Third Party Imports
+
+# Local Imports
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class MotionProfile:
+    """Trapezoidal motion model used to predict how long a stage move takes.
+
+    Each axis accelerates at a constant rate up to its velocity, cruises, and
+    decelerates at the same rate. A settle time is added at the end of every
+    move. Axes move simultaneously, so the duration of a move is the duration of
+    its slowest axis.
+
+    Axes without a velocity are not predicted, and waiting on them starts
+    polling immediately.
+    """
+
+    def __init__(
+        self,
+        velocity: Optional[Dict[str, float]] = None,
+        acceleration: Optional[Dict[str, float]] = None,
+        settle: Optional[Dict[str, float]] = None,
+        poll_fraction: float = 0.8,
+        learning_rate: float = 0.2,
+    ) -> None:
+        """Initialize the motion profile.
+
+        Parameters
+        ----------
+        velocity : dict, optional
+            Velocity of each axis in microns (degrees for theta) per second.
+        acceleration : dict, optional
+            Acceleration of each axis in microns (degrees for theta) per second
+            squared. Axes without an acceleration reach their velocity instantly.
+        settle : dict, optional
+            Settle time of each axis in seconds.
+        poll_fraction : float
+            Fraction of the predicted duration to sleep before polling.
+        learning_rate : float
+            Weight of the latest measurement when refining the model.
+        """
+        #: dict: Velocity of each axis in microns per second.
+        self.velocity = dict(velocity or {})
+
+        #: dict: Acceleration of each axis in microns per second squared.
+        self.acceleration = dict(acceleration or {})
+
+        #: dict: Settle time of each axis in seconds.
+        self.settle = dict(settle or {})
+
+        #: float: Fraction of the predicted duration to sleep before polling.
+        self.poll_fraction = poll_fraction
+
+        #: float: Weight of the latest measurement when refining the model.
+        self.learning_rate = learning_rate
+
+        #: dict: Measured-to-modelled duration ratio of each axis.
+        self.scale = {}
+
+    @classmethod
+    def from_config(cls, config, axes=None):
+        """Build a motion profile from a stage hardware configuration.
+
+        The optional ``motion_profile`` entry holds ``velocity`` (um/s),
+        ``acceleration`` (um/s^2) and ``settle_ms``, each either a number shared
+        by all axes or a dictionary keyed by axis.
+
+        Parameters
+        ----------
+        config : dict
+            Stage hardware configuration.
+        axes : list, optional
+            Axes a shared value applies to.
+
+        Returns
+        -------
+        MotionProfile
+            The motion profile.
+        """
+        axes = list(axes or [])
+        profile = config.get("motion_profile", None) or {}
+
+        def per_axis(key, factor=1.0):
+            value = profile.get(key, None)
+            if value is None:
+                return {}
+            if isinstance(value, (int, float)):
+                return {axis: float(value) * factor for axis in axes}
+            return {axis: float(v) * factor for axis, v in dict(value).items()}
+
+        return cls(
+            velocity=per_axis("velocity"),
+            acceleration=per_axis("acceleration"),
+            settle=per_axis("settle_ms", 0.001),
+            poll_fraction=float(profile.get("poll_fraction", 0.8)),
+        )
+
+    def axis_duration(self, axis: str, distance: float) -> float:
+        """Modelled duration of a move along one axis, without settling.
+
+        Parameters
+        ----------
+        axis : str
+            Axis name.
+        distance : float
+            Move distance in microns (degrees for theta).
+
+        Returns
+        -------
+        float
+            Duration in seconds, 0 if the axis velocity is unknown.
+        """
+        velocity = self.velocity.get(axis, None)
+        distance = abs(distance)
+        if not velocity or distance == 0:
+            return 0.0
+        acceleration = self.acceleration.get(axis, None)
+        if not acceleration:
+            return distance / velocity
+        if distance < velocity**2 / acceleration:
+            # triangular profile, the axis never reaches its velocity
+            return 2 * math.sqrt(distance / acceleration)
+        return distance / velocity + velocity / acceleration
+
+    def limiting_axis(self, distances: Dict[str, float]) -> Optional[str]:
+        """Axis with the longest modelled move.
+
+        Parameters
+        ----------
+        distances : dict
+            Move distance of each axis.
+
+        Returns
+        -------
+        str or None
+            The slowest moving axis, None if no axis moves.
+        """
+        durations = {
+            axis: self.axis_duration(axis, d) * self.scale.get(axis, 1.0)
+            + self.settle.get(axis, 0.0)
+            for axis, d in distances.items()
+            if d != 0
+        }
+        if not durations:
+            return None
+        return max(durations, key=durations.get)
+
+    def predict(self, distances: Dict[str, float]) -> float:
+        """Predicted duration of a move, including settling.
+
+        Parameters
+        ----------
+        distances : dict
+            Move distance of each axis.
+
+        Returns
+        -------
+        float
+            Duration in seconds.
+        """
+        axis = self.limiting_axis(distances)
+        if axis is None:
+            return 0.0
+        return self.axis_duration(axis, distances[axis]) * self.scale.get(
+            axis, 1.0
+        ) + self.settle.get(axis, 0.0)
+
+    def wait(
+        self,
+        distances: Dict[str, float],
+        is_busy: Optional[Callable[[], bool]] = None,
+        poll_interval: float = 0.001,
+        timeout: float = 1.75,
+    ) -> float:
+        """Wait for a move to finish.
+
+        Sleeps for most of the predicted duration and only then polls the
+        device. Without a busy check the full predicted duration is slept.
+        The predicted and measured durations are logged and used to refine the
+        model.
+
+        Parameters
+        ----------
+        distances : dict
+            Move distance of each axis.
+        is_busy : callable, optional
+            Returns True while the device is moving.
+        poll_interval : float
+            Sleep between two busy checks in seconds.
+        timeout : float
+            Time to poll past the predicted duration in seconds.
+
+        Returns
+        -------
+        float
+            Measured duration in seconds.
+        """
+        start = time.perf_counter()
+        predicted = self.predict(distances)
+        if is_busy is None:
+            if predicted > 0:
+                time.sleep(predicted)
+            return time.perf_counter() - start
+
+        if predicted > 0:
+            time.sleep(self.poll_fraction * predicted)
+        deadline = start + predicted + timeout
+        while is_busy():
+            if time.perf_counter() >= deadline:
+                logger.warning(
+                    f"Stage move did not finish within {predicted + timeout:.3f} s."
+                )
+                return time.perf_counter() - start
+            time.sleep(poll_interval)
+        elapsed = time.perf_counter() - start
+
+        axis = self.limiting_axis(distances)
+        if axis is not None and predicted > 0:
+            logger.debug(
+                f"Stage move along {axis}: predicted {predicted * 1000:.1f} ms, "
+                f"measured {elapsed * 1000:.1f} ms"
+            )
+            # a move that already finished at the first poll only bounds the
+            # duration, which still pulls an overestimating model down
+            self.refine(axis, distances[axis], elapsed)
+        return elapsed
+
+    def refine(self, axis: str, distance: float, elapsed: float) -> None:
+        """Update the duration scale of an axis from a measured move.
+
+        Parameters
+        ----------
+        axis : str
+            Axis name.
+        distance : float
+            Move distance.
+        elapsed : float
+            Measured duration in seconds, including settling.
+        """
+        modelled = self.axis_duration(axis, distance)
+        if modelled <= 0:
+            return
+        ratio = max(elapsed - self.settle.get(axis, 0.0), 0.0) / modelled
+        scale = self.scale.get(axis, 1.0)
+        self.scale[axis] = (
+            1 - self.learning_rate
+        ) * scale + self.learning_rate * ratio
@@ -34,7 +34,6 @@
 import logging
 import traceback
 from multiprocessing.managers import ListProxy
-import time
 from typing import Any, Dict
 
 # Third Party Imports
@@ -120,6 +119,11 @@ class GalvoNIStage(StageBase):
                 device_config.get("settle_duration_ms", 20) / 1000
             )
 
+        # The galvo follows its command voltage and only has to settle.
+        self.motion_profile.settle.setdefault(
+            self.axes[0], self.stage_settle_duration
+        )
+
         #: dict: Mapping of software axes to hardware axes.
         self.axes_mapping = {self.axes[0]: self.axes_channels[0]}
 
@@ -261,7 +265,7 @@ class GalvoNIStage(StageBase):
             and (self.distance_threshold is not None)
             and (delta_position >= self.distance_threshold)
         ):
-            time.sleep(self.stage_settle_duration)
+            self.motion_profile.wait({axis: delta_position})
 
         setattr(self, f"{axis}_pos", axis_abs)
 
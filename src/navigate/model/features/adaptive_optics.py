@@ -39,7 +39,6 @@ import time
 
 # Third Party Imports
 import numpy as np
-from scipy.optimize import curve_fit
 
 # Local imports
 from navigate.model.features.feature_container import load_features
@@ -500,6 +499,8 @@ class TonyWilson:
         mode : str, optional
             Fitting mode, by default "poly"
         """
+        from scipy.optimize import curve_fit
+
         self.y = self.plot_data
 
         if mode == "poly":
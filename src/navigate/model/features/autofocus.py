@@ -36,8 +36,6 @@ import threading
 
 # Third Party Imports
 import numpy as np
-from scipy.optimize import curve_fit
-from scipy.stats import linregress
 
 # Local imports
 from navigate.model.features.feature_container import load_features
@@ -513,6 +511,10 @@ class Autofocus:
             R-Squared value
         """
 
+        # scipy is slow to import, only load it once it is needed.
+        from scipy.optimize import curve_fit
+        from scipy.stats import linregress
+
         # Convert plot data to numpy array
         x_data = np.asarray(self.plot_data)[:, 0]
         y_data = np.asarray(self.plot_data)[:, 1]
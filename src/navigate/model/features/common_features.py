@@ -1059,10 +1059,11 @@ class ZStackAcquisition:
         #  different kinds of stage devices.
         self.stage_distance_threshold = 1000
 
+        # in acquisition order, which differs from the configuration order when
+        # the channel order is optimized.
         self.defocus = [
-            v["defocus"]
-            for v in microscope_state["channels"].values()
-            if v["is_selected"]
+            microscope_state["channels"][f"channel_{c}"]["defocus"]
+            for c in self.model.active_microscope.available_channels
         ]
 
     def signal_func(self):
@@ -34,6 +34,8 @@
 import logging
 import traceback
 import inspect
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Third Party Imports
 
@@ -296,6 +298,10 @@ class DataNode(TreeNode):
 
     - The `is_marked` attribute can be used to mark the node for special handling or
       to indicate its status.
+
+    - The `asynchronous` attribute indicates whether the main function runs in a
+      worker thread of the node instead of the data thread. The frames are processed
+      in order, and the results are handed back to the DataContainer.
     """
 
     def __init__(
@@ -306,6 +312,7 @@ class DataNode(TreeNode):
         node_type="one-step",
         device_related=False,
         need_response=False,
+        asynchronous=False,
         **kwargs,
     ):
         """Initialize the DataNode object.
@@ -327,8 +334,9 @@ class DataNode(TreeNode):
         need_response : bool, optional
             A boolean indicating whether a response is needed from this node. Default is
             False.
-        is_marked : bool, optional
-            A boolean indicating whether the node is marked. Default is False.
+        asynchronous : bool, optional
+            A boolean indicating whether the main function runs in a worker thread.
+            Default is False.
         """
         super().__init__(
             feature_name,
@@ -339,6 +347,13 @@ class DataNode(TreeNode):
         )
         #: bool: A boolean indicating whether the node is marked.
         self.is_marked = False
+        #: bool: A boolean indicating whether the main function runs in a worker.
+        self.asynchronous = asynchronous
+        #: ThreadPoolExecutor or None: The worker of an asynchronous node.
+        self.executor = None
+        #: bool: A boolean indicating whether the node has ended since it was
+        # initialized.
+        self.is_finished = False
 
     def run(self, *args):
         """Execute the data processing functions associated with this node.
@@ -358,7 +373,8 @@ class DataNode(TreeNode):
         tuple
             A tuple containing the result of executing the main data processing
             function and a boolean indicating whether the node execution is complete
-            (True if complete, otherwise False).
+            (True if complete, otherwise False). For an asynchronous node, the
+            result is a Future of that tuple.
         """
 
         if self.is_marked:
@@ -368,20 +384,57 @@ class DataNode(TreeNode):
         if not self.is_initialized:
             self.node_funcs["init"]()
             self.is_initialized = True
+            self.is_finished = False
 
         # to decide whether it is the target frame
         if not self.node_funcs["pre-main"](*args):
             return False, False
 
+        if self.asynchronous:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"DataNode {self.node_name}"
+                )
+            return self.executor.submit(self.run_main, *args), False
+
+        result, is_end = self.run_main(*args)
+        if is_end:
+            # erase flag when exit the node
+            self.is_initialized = False
+        return result, is_end
+
+    def run_main(self, *args):
+        """Execute the main function, and the end function of a multi-step node.
+
+        Parameters:
+        ----------
+        *args : any
+            Additional arguments to pass to the data processing functions.
+
+        Returns:
+        -------
+        tuple
+            The result of the main function and whether the node execution is
+            complete. Both are None if the node has already ended on an earlier
+            frame, which only happens to frames queued for an asynchronous node.
+        """
+        if self.is_finished:
+            return None, None
+
         result = self.node_funcs["main"](*args)
 
         if self.node_type == "multi-step" and not self.node_funcs["end"]():
             return result, False
 
-        # erase flag when exit the node
-        self.is_initialized = False
+        self.is_finished = True
         return result, True
 
+    def shutdown(self):
+        """Stop the worker of an asynchronous node."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
 
 class Container:
     """Container class for managing a control sequence tree.
@@ -600,9 +653,14 @@ class DataContainer(Container):
     - The `run` method is responsible for executing the data-based control sequence
       nodes in the order defined by the control sequence tree. It handles transitions
       between nodes and manages node cleanup when necessary.
+
+    - The frames handed to an asynchronous node stay leased until its result is
+      collected. The results are collected in frame order at the beginning of the
+      next `run`, and the data thread waits for a result once its frames are
+      `lease_frames` frames old, before their buffer slots are reused.
     """
 
-    def __init__(self, root=None, cleanup_list=[]):
+    def __init__(self, root=None, cleanup_list=[], lease_frames=None):
         """Initialize the DataContainer object.
 
         Parameters:
@@ -612,9 +670,38 @@ class DataContainer(Container):
         cleanup_list : list of TreeNode, optional
             A list of nodes containing 'cleanup' functions to be executed when the
             container is closed. Default is an empty list.
+        lease_frames : int or None, optional
+            The number of frames after which the result of an asynchronous node is
+            waited for. Default is None, never wait.
         """
         super().__init__(root, cleanup_list)
 
+        #: deque: Pending results of the current asynchronous node, in frame order.
+        # Each item is (Future, args, frame_count).
+        self.pending = deque()
+
+        #: int: The number of frames received.
+        self.frame_count = 0
+
+        #: int or None: The number of frames the result of an asynchronous node may
+        # lag behind.
+        self.lease_frames = lease_frames
+
+        #: list of DataNode: The asynchronous nodes that have been run.
+        self.async_nodes = []
+
+    def reset(self):
+        """Reset the container's state, discarding pending asynchronous results."""
+        self.drop_pending()
+        super().reset()
+
+    def cleanup(self):
+        """Wait for the asynchronous nodes, then execute the 'cleanup' functions."""
+        self.drop_pending()
+        for node in self.async_nodes:
+            node.shutdown()
+        super().cleanup()
+
     def run(self, *args):
         """Run the data-based control sequence.
 
@@ -635,55 +722,159 @@ class DataContainer(Container):
         - It handles transitions between nodes, waits for responses if necessary,
           and performs cleanup for nodes marked as not needing a response and having
           a 'one-step' node type.
+
+        - The results of asynchronous nodes are collected first, so the frames are
+          seen by the nodes in the same order as without asynchronous nodes.
         """
 
         if self.end_flag or not self.root:
             return
+        if args and isinstance(args[0], (list, tuple)):
+            self.frame_count += len(args[0])
+        else:
+            self.frame_count += 1
         if not self.curr_node:
             self.curr_node = self.root
-        while self.curr_node:
+
+        self.collect()
+        self.traverse(*args)
+
+    def traverse(self, *args):
+        """Run the nodes from the current node on with the same arguments.
+
+        Parameters:
+        -----------
+        *args : arguments
+            Optional arguments to pass to the control sequence nodes.
+        """
+        while self.curr_node and not self.end_flag:
             try:
                 result, is_end = self.curr_node.run(*args)
             except Exception:
                 logger.debug(f"DataContainer - {traceback.format_exc()}")
-                if (
-                    self.curr_node.need_response is False
-                    and self.curr_node.node_type == "one-step"
-                ):
-                    try:
-                        logger.debug(
-                            f"Datacontainer cleanup node {self.curr_node.node_name}"
-                        )
-                        self.curr_node.node_funcs.get("cleanup", dummy_func)()
-                    except Exception:
-                        logger.debug(
-                            f"The node({self.curr_node.node_name}) is not closed "
-                            f"correctly! Please check the cleanup function"
-                        )
-                        pass
-                    self.curr_node.is_marked = True
-                    result, is_end = False, True
-                else:
-                    # terminate the container.
-                    # the signal container may stuck there waiting a response,
-                    # the cleanup function of that node should give it a fake
-                    # response to make it stop
-                    self.end_flag = True
-                    self.cleanup()
+                if not self.handle_error():
                     return
+                result, is_end = False, True
+            if isinstance(result, Future):
+                if self.curr_node not in self.async_nodes:
+                    self.async_nodes.append(self.curr_node)
+                self.pending.append((result, args, self.frame_count))
+                return
             if not is_end:
                 return
-            if result and self.curr_node.child:
-                self.curr_node = self.curr_node.child
-            elif self.curr_node.sibling:
-                self.curr_node = self.curr_node.sibling
-            else:
-                self.curr_node = None
-                self.end_flag = True
+            if not self.next_node(result):
                 return
 
-            if self.curr_node.device_related or self.curr_node.need_response:
+    def collect(self):
+        """Handle the finished results of the asynchronous node in frame order.
+
+        Waits for a result once its frames are `lease_frames` frames old. If a
+        result ends the node, the frames queued after it are run by the next nodes.
+        """
+        while self.pending:
+            future, args, frame_count = self.pending[0]
+            is_leased = (
+                self.lease_frames is None
+                or self.frame_count - frame_count < self.lease_frames
+            )
+            if not future.done() and is_leased:
                 return
+            self.pending.popleft()
+            try:
+                result, is_end = future.result()
+            except Exception:
+                logger.debug(f"DataContainer - {traceback.format_exc()}")
+                skipped = self.drop_pending()
+                if not self.handle_error():
+                    return
+                result = False
+            else:
+                if not is_end:
+                    continue
+                skipped = self.drop_pending()
+                # erase flag when exit the node
+                self.curr_node.is_initialized = False
+
+            if self.next_node(result):
+                self.traverse(*args)
+            for args in skipped:
+                self.traverse(*args)
+
+    def drop_pending(self):
+        """Wait for the pending asynchronous results and discard them.
+
+        Returns:
+        -------
+        list
+            The arguments of the discarded results, in frame order.
+        """
+        skipped = []
+        while self.pending:
+            future, args, _ = self.pending.popleft()
+            try:
+                future.result()
+            except Exception:
+                logger.debug(f"DataContainer - {traceback.format_exc()}")
+            skipped.append(args)
+        return skipped
+
+    def handle_error(self):
+        """Handle an exception raised by the current node.
+
+        A one-step node without response is cleaned up and marked, so it is skipped
+        from now on. Otherwise, the container is terminated.
+
+        Returns:
+        -------
+        bool
+            True if the control sequence continues with the next node.
+        """
+        if self.curr_node.need_response is False and self.curr_node.node_type == (
+            "one-step"
+        ):
+            try:
+                logger.debug(f"Datacontainer cleanup node {self.curr_node.node_name}")
+                self.curr_node.node_funcs.get("cleanup", dummy_func)()
+            except Exception:
+                logger.debug(
+                    f"The node({self.curr_node.node_name}) is not closed "
+                    f"correctly! Please check the cleanup function"
+                )
+                pass
+            self.curr_node.is_marked = True
+            return True
+
+        # terminate the container.
+        # the signal container may stuck there waiting a response,
+        # the cleanup function of that node should give it a fake
+        # response to make it stop
+        self.end_flag = True
+        self.cleanup()
+        return False
+
+    def next_node(self, result):
+        """Move to the next node after the current node ended.
+
+        Parameters:
+        -----------
+        result : any
+            The result of the current node. The child node is next if it is True.
+
+        Returns:
+        -------
+        bool
+            True if the next node runs on the same frames.
+        """
+        if result and self.curr_node.child:
+            self.curr_node = self.curr_node.child
+        elif self.curr_node.sibling:
+            self.curr_node = self.curr_node.sibling
+        else:
+            self.curr_node = None
+            self.end_flag = True
+            return False
+
+        return not (self.curr_node.device_related or self.curr_node.need_response)
 
 
 def get_registered_funcs(feature_module, func_type="signal"):
@@ -1031,8 +1222,12 @@ def load_features(model, feature_list):
     for node in break_list:
         if node[0] == "child":
             node[1].child, node[2].child = create_node({"name": DummyFeature})
+    # the results of asynchronous nodes are waited for before the data thread
+    # has gone through half of the data buffer.
+    number_of_frames = getattr(model, "number_of_frames", None)
+    lease_frames = number_of_frames // 2 if type(number_of_frames) is int else None
     return SignalContainer(signal_root, signal_cleanup_list), DataContainer(
-        data_root, data_cleanup_list
+        data_root, data_cleanup_list, lease_frames=lease_frames
     )
 
 
@@ -35,18 +35,24 @@
 import os
 import logging
 import shutil
+import multiprocessing as mp
+import threading
 import time
 from typing import Optional
 from datetime import datetime
 
 # Third Party Imports
-import numpy as np
 from tifffile import imsave
 
 # Local imports
 import navigate
 from navigate.model import data_sources
+from navigate.model.acquisition_plan import frame_indices
+from navigate.model.analysis.deskew import StreamingDeskew
+from navigate.model.analysis.mip import MIPAccumulator
 from navigate.model.concurrency.concurrency_tools import SharedNDArray
+from navigate.model.data_sources.raw_stream_data_source import convert_raw_stream
+from navigate.tools.linear_algebra import affine_shear
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -65,6 +71,7 @@ class ImageWriter:
         image_name: Optional[str] = None,
         saving_flags: Optional[list[bool]] = None,
         saving_config: Optional[dict] = None,
+        mip: Optional[MIPAccumulator] = None,
     ):
         """Class for saving acquired data to disk.
 
@@ -83,6 +90,10 @@ class ImageWriter:
             A list of flags indicating whether to save each frame.
         saving_config : Optional[dict]
             Dictionary of saving configuration
+        mip : Optional[MIPAccumulator]
+            Maximum intensity projections updated by the model for every frame. If
+            not specified, or if its shape does not match the data, the ImageWriter
+            accumulates its own.
         """
 
         #: str: Name of the microscope.
@@ -109,12 +120,21 @@ class ImageWriter:
         #: str : Directory for saving data to disk.
         self.save_directory = ""
 
-        #: np.ndarray : Maximum intensity projection image.
+        #: MIPAccumulator : Maximum intensity projections provided by the model.
+        self.shared_mip = mip
+
+        #: MIPAccumulator : Maximum intensity projections saved by the ImageWriter.
         self.mip = None
 
+        #: bool : Are the maximum intensity projections updated by the model?
+        self.is_mip_shared = False
+
         #: str : Directory for saving maximum intensity projection images.
         self.mip_directory = ""
 
+        #: list : Camera exposure time in ms of each selected channel.
+        self.exposure_times = []
+
         #: str : Sub-directory for saving data to disk.
         self.sub_dir = sub_dir
 
@@ -136,6 +156,24 @@ class ImageWriter:
         #: DataSource: Data source
         self.data_source = None
 
+        #: StreamingDeskew: Deskews sheared stacks before they are written.
+        self.deskew = None
+
+        #: int: Number of slices in an acquired stack.
+        self.shape_z = 1
+
+        #: int: Number of frames received by the deskew stage.
+        self._raw_frame = 0
+
+        #: dict: Stage position of the last frame received by the deskew stage.
+        self._raw_position = {}
+
+        #: mp.Process: Conversion of the last raw stream, if any.
+        self.conversion = None
+
+        #: threading.Thread: Joins the conversion and logs its exit code.
+        self.conversion_watcher = None
+
         # camera flip flags
         if self.microscope_name is None:
             self.microscope_name = self.model.active_microscope_name
@@ -195,51 +233,35 @@ class ImageWriter:
                 self.saving_flags[idx] = False
 
             # Identify channel, z, time, and position indices
-            c_idx, z_idx, t_idx, p_idx = self.data_source._cztp_indices(
-                self.data_source._current_frame, self.data_source.metadata.per_stack
-            )
-
-            if c_idx == 0 and z_idx == 0:
-                # Initialize MIP array with same number of channels as the data
-                self.mip = np.ndarray(
-                    (
-                        int(self.data_source.shape_c),
-                        int(self.data_source.shape_y),
-                        int(self.data_source.shape_x),
-                    )
-                ).astype(np.uint16)
+            c_idx, z_idx, t_idx, p_idx = self.frame_indices()
 
             # flip image if necessary
-            if self.flip_flags["x"] and self.flip_flags["y"]:
-                image = self.data_buffer[idx][::-1, ::-1]
-            elif self.flip_flags["x"]:
-                image = self.data_buffer[idx][:, ::-1]
-            elif self.flip_flags["y"]:
-                image = self.data_buffer[idx][::-1, :]
-            else:
-                image = self.data_buffer[idx]
+            image = self.flip_image(self.data_buffer[idx])
+            axes = ["x", "y", "z", "theta", "f"]
+            position = dict(zip(axes, self.model.data_buffer_positions[idx]))
+            if c_idx < len(self.exposure_times):
+                position["exposure"] = self.exposure_times[c_idx]
             # Save data to disk
             try:
                 start_time = time.time()
-                self.data_source.write(
-                    image,
-                    x=self.model.data_buffer_positions[idx][0],
-                    y=self.model.data_buffer_positions[idx][1],
-                    z=self.model.data_buffer_positions[idx][2],
-                    theta=self.model.data_buffer_positions[idx][3],
-                    f=self.model.data_buffer_positions[idx][4],
-                )
+                if self.deskew is None:
+                    self.data_source.write(image, **position)
+                else:
+                    self._raw_position = position
+                    self._raw_frame += 1
+                    self.deskew.push(image)
                 logger.info(
                     f"C: {c_idx}, Z:{z_idx}, T:{t_idx}, P:{p_idx}, Write Time:"
                     f" {time.time() - start_time}"
                 )
 
-                # Update MIP
-                self.mip[c_idx, :, :] = np.maximum(self.mip[c_idx, :, :], image)
+                # Update MIP, unless the model already did.
+                if not self.is_mip_shared:
+                    self.mip.update(self.data_buffer[idx], c_idx, z_idx)
 
                 # Save the MIP
                 if (c_idx == self.data_source.shape_c - 1) and (
-                    z_idx == self.data_source.shape_z - 1
+                    z_idx == self.shape_z - 1
                 ):
                     for c_save_idx in range(self.data_source.shape_c):
                         mip_name = (
@@ -254,7 +276,7 @@ class ImageWriter:
                         )
                         imsave(
                             os.path.join(self.mip_directory, mip_name),
-                            self.mip[c_save_idx, :, :],
+                            self.flip_image(self.mip.xy[c_save_idx]),
                         )
             except Exception as e:
                 from traceback import format_exc
@@ -268,6 +290,252 @@ class ImageWriter:
                 logger.debug(f"Error - ImageWriter: {e}")
                 return
 
+    def frame_indices(self):
+        """Channel, z, time and position indices of the next frame to save.
+
+        Returns
+        -------
+        tuple
+            (c, z, t, p) indices of the next acquired frame.
+        """
+        if self.deskew is None:
+            return self.data_source._cztp_indices(
+                self.data_source._current_frame, self.data_source.metadata.per_stack
+            )
+        # The data source counts deskewed planes, not acquired frames.
+        return frame_indices(
+            self._raw_frame,
+            self.data_source.shape_c,
+            self.shape_z,
+            self.data_source.shape_t,
+            self.data_source.positions,
+            self.data_source.metadata.per_stack,
+        )
+
+    def write_deskewed(self, image):
+        """Write a deskewed plane to the data source.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            YX deskewed plane.
+        """
+        self.data_source.write(image, **self._raw_position)
+
+    def prepare_deskew(self):
+        """Deskew sheared stacks while they are written, if requested.
+
+        Enabled by ``deskew: True`` next to the shear parameters in
+        ``experiment["BDVParameters"]["shear"]``. The data source is resized to the
+        deskewed stack and no longer records the shear as metadata.
+        """
+        self.deskew = None
+        self._raw_frame = 0
+        shear = (
+            self.model.configuration["experiment"]
+            .get("BDVParameters", {})
+            .get("shear", {})
+        )
+        if not (shear.get("shear_data", False) and shear.get("deskew", False)):
+            return
+
+        state = self.model.configuration["experiment"]["MicroscopeState"]
+        if self.shape_z < 2:
+            return
+        if not self.data_source.metadata.per_stack or state.get(
+            "optimize_channel_order", False
+        ):
+            logger.warning(
+                "Deskewing requires stacks acquired one channel at a time. "
+                "Saving the sheared data instead."
+            )
+            return
+
+        transform = affine_shear(
+            self.data_source.dz,
+            self.data_source.dy,
+            self.data_source.dx,
+            dimension=shear.get("shear_dimension", "YZ"),
+            angle=shear.get("shear_angle", 0),
+        )
+        try:
+            self.deskew = StreamingDeskew.from_shear_transform(
+                transform,
+                self.shape_z,
+                self.data_source.shape_y,
+                self.data_source.shape_x,
+                dtype=self.data_source.dtype,
+                sink=self.write_deskewed,
+            )
+        except ValueError as e:
+            logger.warning(f"Cannot deskew: {e}. Saving the sheared data instead.")
+            return
+
+        shape_z, shape_y, shape_x = self.deskew.shape
+        self.data_source.set_metadata({"x": shape_x, "y": shape_y, "z": shape_z})
+        if hasattr(self.data_source.metadata, "shear_data"):
+            self.data_source.metadata.shear_data = False
+        logger.info(f"Deskewing stacks to {self.deskew.shape} (z, y, x).")
+
+    def fan_out_parameters(self):
+        """Parameters for writing H5 and N5 files through several processes.
+
+        Enabled by ``processes`` greater than 1 in
+        ``experiment["BDVParameters"]["fan_out"]``, where ``route_by`` chooses
+        whether planes are routed to the writers by "position" or by "channel".
+        The writers read frames from the data buffer, so the number of frames
+        pending for them is limited to half of it.
+
+        Returns
+        -------
+        dict
+            Keyword arguments of the fan-out data source, or an empty dict.
+        """
+        fan_out = (
+            self.model.configuration["experiment"]
+            .get("BDVParameters", {})
+            .get("fan_out", {})
+        )
+        processes = int(fan_out.get("processes", 1))
+        if self.file_type not in ["H5", "N5"] or processes < 2:
+            return {}
+        return {
+            "processes": processes,
+            "route_by": fan_out.get("route_by", "position"),
+            "max_pending": max(1, self.number_of_frames // 2),
+        }
+
+    def raw_stream_parameters(self):
+        """Parameters for writing raw streams.
+
+        ``raw_stripe_directories`` in ``experiment["Saving"]`` lists additional
+        directories to stripe the frames across, and ``raw_direct_io`` writes them
+        with O_DIRECT.
+
+        Returns
+        -------
+        dict
+            Keyword arguments of the raw stream data source, or an empty dict.
+        """
+        if self.file_type != "Raw":
+            return {}
+        saving = self.model.configuration["experiment"]["Saving"]
+        return {
+            "stripe_directories": list(saving.get("raw_stripe_directories", [])),
+            "direct_io": bool(saving.get("raw_direct_io", False)),
+        }
+
+    def convert_raw_stream(self):
+        """Convert a raw stream after the acquisition, if requested.
+
+        ``raw_convert_to`` in ``experiment["Saving"]`` is the file type to convert
+        to. The conversion runs at low priority in a separate process, which a
+        watcher thread joins so that a failed conversion is logged.
+        """
+        file_type = self.model.configuration["experiment"]["Saving"].get(
+            "raw_convert_to", None
+        )
+        if (
+            self.file_type != "Raw"
+            or file_type not in data_sources.FILE_TYPES
+            or file_type == "Raw"
+            or self.data_source._current_frame == 0
+        ):
+            return
+        # only one conversion per writer at a time
+        self.wait_for_conversion()
+        self.conversion = mp.Process(
+            target=convert_raw_stream,
+            name="RawStreamConversion",
+            args=(self.data_source.file_name, file_type),
+            kwargs={"low_priority": True},
+        )
+        self.conversion.start()
+        logger.info(f"Converting {self.data_source.file_name} to {file_type}.")
+        self.conversion_watcher = threading.Thread(
+            target=self.watch_conversion,
+            name="RawStreamConversionWatcher",
+            args=(self.conversion, self.data_source.file_name),
+            daemon=True,
+        )
+        self.conversion_watcher.start()
+
+    @staticmethod
+    def watch_conversion(conversion, file_name):
+        """Wait for a raw stream conversion to end and log its exit code.
+
+        Parameters
+        ----------
+        conversion : mp.Process
+            Conversion process.
+        file_name : str
+            Raw stream being converted.
+        """
+        conversion.join()
+        if conversion.exitcode != 0:
+            logger.error(
+                f"Conversion of {file_name} failed with exit code "
+                f"{conversion.exitcode}."
+            )
+        else:
+            logger.info(f"Converted {file_name}.")
+
+    def wait_for_conversion(self, timeout=None):
+        """Wait for the raw stream conversion, if any, to end.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Seconds to wait. Waits until the conversion ends if None.
+
+        Returns
+        -------
+        bool
+            True if no conversion is running.
+        """
+        if self.conversion_watcher is None:
+            return True
+        self.conversion_watcher.join(timeout)
+        return not self.conversion_watcher.is_alive()
+
+    def flip_image(self, image):
+        """Flip an image according to the camera flip flags.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            YX image.
+
+        Returns
+        -------
+        np.ndarray
+            Flipped view of the image.
+        """
+        if self.flip_flags["x"] and self.flip_flags["y"]:
+            return image[::-1, ::-1]
+        elif self.flip_flags["x"]:
+            return image[:, ::-1]
+        elif self.flip_flags["y"]:
+            return image[::-1, :]
+        return image
+
+    def prepare_mip(self):
+        """Use the model's maximum intensity projections if they match the data
+        source, otherwise allocate private ones."""
+        shape = (
+            int(self.data_source.shape_c),
+            int(self.shape_z),
+            int(self.data_source.shape_y),
+            int(self.data_source.shape_x),
+        )
+        self.is_mip_shared = self.shared_mip is not None and self.shared_mip.matches(
+            *shape
+        )
+        if self.is_mip_shared:
+            self.mip = self.shared_mip
+        else:
+            self.mip = MIPAccumulator(*shape, shared=False)
+
     def generate_image_name(self, current_channel, ext=".tif"):
         """Generates a string for the filename, e.g., CH00_000000.tif.
 
@@ -298,7 +566,13 @@ class ImageWriter:
 
     def close(self):
         """Close the data source we are writing to."""
+        if self.deskew is not None:
+            # Finish a stack that was stopped early.
+            self.deskew.flush()
+        is_open = not self.data_source._closed
         self.data_source.close()
+        if is_open:
+            self.convert_raw_stream()
 
     def calculate_and_check_disk_space(self):
         """Estimate the size of the data that will be written to disk, and confirm
@@ -409,9 +683,10 @@ class ImageWriter:
 
         # Initialize data source, pointing to the new file name
         #: navigate.model.data_sources.DataSource : Data source for saving data to disk.
-        self.data_source = data_sources.get_data_source(self.file_type)(
-            file_name=file_name,
-        )
+        fan_out = self.fan_out_parameters()
+        self.data_source = data_sources.get_data_source(
+            self.file_type, fan_out=bool(fan_out)
+        )(file_name=file_name, **fan_out, **self.raw_stream_parameters())
 
         # Pass experiment and configuration to metadata
         self.data_source.set_metadata_from_configuration_experiment(
@@ -419,6 +694,19 @@ class ImageWriter:
         )
 
         self.data_source.set_metadata(self.saving_config)
+        self.shape_z = int(self.data_source.shape_z)
+        self.exposure_times = [
+            float(channel["camera_exposure_time"])
+            for channel in self.model.configuration["experiment"]["MicroscopeState"][
+                "channels"
+            ].values()
+            if channel["is_selected"]
+        ]
+        self.prepare_deskew()
+        self.data_source.set_acquisition_plan(
+            getattr(self.model, "acquisition_plan", None)
+        )
+        self.prepare_mip()
 
         # Make sure that there is enough disk space to save the data.
         self.calculate_and_check_disk_space()
@@ -37,7 +37,6 @@ from queue import Queue
 # Third Party Imports
 
 # Local Imports
-from navigate.model.analysis.boundary_detect import find_tissue_boundary_2d
 
 
 def detect_tissue(image_data, percentage=0.0):
@@ -89,6 +88,9 @@ def detect_tissue(image_data, percentage=0.0):
     image (10 out of 20 squares) is greater than or equal to 0.5.
     """
 
+    # skimage and scipy.ndimage are slow to import, load them on first use.
+    from navigate.model.analysis.boundary_detect import find_tissue_boundary_2d
+
     width = 50
     boundary = find_tissue_boundary_2d(image_data, width)
     tissue_squares = 0
@@ -351,6 +353,8 @@ class DetectTissueInStackAndReturn(DetectTissueInStack):
         self.detect_tissue_queue = Queue()
         self.result_sent_flag = False
         self.config_table["signal"]["main-response"] = self.signal_response_func
+        # the signal node waits for the detection, run it off the data thread.
+        self.config_table["node"]["asynchronous"] = True
 
     def pre_func_data(self):
         """Initialization function for data processing.
@@ -33,9 +33,12 @@
 
 # Standard Library Imports
 import base64
-import requests
 import numpy
 import json
+import struct
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from math import ceil
 import logging
@@ -43,11 +46,70 @@ import logging
 # Third Party Imports
 
 # Local Imports
+from navigate.model.concurrency.concurrency_tools import SharedNDArray
 
 # Logger Setup
 p = __name__.split(".")[1]
 logger = logging.getLogger(p)
 
+#: struct.Struct: Header of a binary frame payload: magic, count, height, width.
+FRAME_HEADER = struct.Struct("<4sIII")
+
+#: bytes: Magic bytes of a binary frame payload.
+FRAME_MAGIC = b"NVFR"
+
+
+def pack_frames(frames):
+    """Pack uint16 frames into a binary payload.
+
+    The payload is a 16-byte little-endian header (magic, number of frames, height,
+    width) followed by the raw uint16 frames in C order.
+
+    Parameters
+    ----------
+    frames : list[numpy.ndarray]
+        2D frames of identical shape.
+
+    Returns
+    -------
+    bytes
+        Binary payload.
+    """
+    height, width = frames[0].shape
+    payload = bytearray(FRAME_HEADER.size + len(frames) * height * width * 2)
+    FRAME_HEADER.pack_into(payload, 0, FRAME_MAGIC, len(frames), height, width)
+    body = numpy.frombuffer(payload, dtype="<u2", offset=FRAME_HEADER.size)
+    body = body.reshape(len(frames), height, width)
+    for i, frame in enumerate(frames):
+        body[i] = frame
+    return bytes(payload)
+
+
+def unpack_frames(payload):
+    """Unpack a binary payload created by pack_frames.
+
+    Parameters
+    ----------
+    payload : bytes
+        Binary payload.
+
+    Returns
+    -------
+    numpy.ndarray
+        Frames, shape (count, height, width).
+
+    Raises
+    ------
+    ValueError
+        If the payload is not a binary frame payload.
+    """
+    magic, count, height, width = FRAME_HEADER.unpack_from(payload, 0)
+    if magic != FRAME_MAGIC:
+        raise ValueError("Not a binary frame payload.")
+    return numpy.frombuffer(
+        payload, dtype="<u2", count=count * height * width, offset=FRAME_HEADER.size
+    ).reshape(count, height, width)
+
 
 def prepare_service(service_url, **kwargs):
     """Prepare service for Ilastik segmentation
@@ -65,6 +127,8 @@ def prepare_service(service_url, **kwargs):
     dict
         response from the server
     """
+    import requests
+
     service_url = service_url.rstrip("/")
     if service_url.endswith("ilastik"):
         r = requests.get(f"{service_url}/load?project={kwargs['project_file']}")
@@ -83,6 +147,12 @@ class IlastikSegmentation:
     def __init__(self, model, microscope_name="Nanoscale", zoom_value="N/A"):
         """Initialize Ilastik segmentation class.
 
+        The transport is configured in rest_api_config.yml. 'transport' is 'json'
+        (base64 encoded frames, default) or 'binary' (see pack_frames), and
+        'pipeline_depth' is the number of requests that may be in flight while the
+        data thread continues. Masks are delivered to the controller through a
+        shared memory buffer.
+
         Parameters
         ----------
         model : Model
@@ -92,8 +162,31 @@ class IlastikSegmentation:
         #: navigate.model.Model: Model object
         self.model = model
 
+        ilastik_config = self.model.configuration["rest_api_config"]["Ilastik"]
+
         #: str: url of the service
-        self.service_url = self.model.configuration["rest_api_config"]["Ilastik"]["url"]
+        self.service_url = ilastik_config["url"]
+
+        #: str: 'json' or 'binary'
+        self.transport = ilastik_config.get("transport", "json")
+
+        #: int: number of segmentation requests in flight
+        self.pipeline_depth = max(int(ilastik_config.get("pipeline_depth", 1)), 1)
+
+        #: int: number of masks in the shared memory buffer
+        self.mask_buffer_size = self.pipeline_depth + 2
+
+        #: int: index of the next mask in the shared memory buffer
+        self.mask_index = 0
+
+        #: threading.local: keep-alive session of each sending thread
+        self.local = threading.local()
+
+        #: ThreadPoolExecutor: sends requests when pipelining
+        self.executor = None
+
+        #: deque: pending requests, in frame order
+        self.pending = deque()
 
         #: str: project file for Ilastik segmentation
         self.project_file = None
@@ -117,7 +210,13 @@ class IlastikSegmentation:
         self.high_res_zoom_value = zoom_value
 
         #: dict: configuration table
-        self.config_table = {"data": {"init": self.init_func, "main": self.data_func}}
+        self.config_table = {
+            "data": {
+                "init": self.init_func,
+                "main": self.data_func,
+                "cleanup": self.cleanup_func,
+            }
+        }
 
     def init_func(self, *args):
         """Initialize Ilastik segmentation.
@@ -140,38 +239,194 @@ class IlastikSegmentation:
     def data_func(self, frame_ids):
         """Perform Ilastik segmentation.
 
+        The frames are copied out of the data buffer before this function returns.
+        If pipelining is enabled, the request is sent in the background and the
+        results of earlier requests are handled in frame order.
+
         Parameters
         ----------
         frame_ids : list
             list of frame ids
         """
         # Ilastik process multiple images in sequence.
+        request = self.encode_frames(frame_ids)
+
+        if self.pipeline_depth == 1:
+            self.handle_response(self.send_request(request))
+            return
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.pipeline_depth, thread_name_prefix="Ilastik"
+            )
+        self.pending.append(self.executor.submit(self.send_request, request))
+
+        # handle finished requests, and wait if too many are in flight.
+        while self.pending and (
+            self.pending[0].done() or len(self.pending) >= self.pipeline_depth
+        ):
+            self.handle_response(self.pending.popleft().result())
+
+    def cleanup_func(self):
+        """Handle pending segmentation requests and close the connections."""
+        while self.pending:
+            try:
+                self.handle_response(self.pending.popleft().result())
+            except Exception as e:
+                logger.debug(f"Ilastik segmentation failed: {e}")
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        session = getattr(self.local, "session", None)
+        if session is not None:
+            session.close()
+            self.local.session = None
+
+    def encode_frames(self, frame_ids):
+        """Encode the frames for the configured transport.
+
+        Parameters
+        ----------
+        frame_ids : list
+            list of frame ids
+
+        Returns
+        -------
+        dict
+            keyword arguments of the segmentation request
+        """
+        if self.transport == "binary":
+            return {
+                "data": pack_frames([self.model.data_buffer[idx] for idx in frame_ids]),
+                "headers": {"Content-Type": "application/octet-stream"},
+            }
+
         img_data = [base64.b64encode(self.model.data_buffer[idx]) for idx in frame_ids]
         json_data = {
             "dtype": "uint16",
             "shape": (self.model.img_height, self.model.img_width),
             "image": [img.decode("utf-8") for img in img_data],
         }
+        return {"json": json_data}
 
-        response = requests.post(
-            f"{self.service_url}/segmentation", json=json_data, stream=True
+    def get_session(self):
+        """Get the keep-alive session of the current thread.
+
+        Returns
+        -------
+        requests.Session
+            HTTP session
+        """
+        session = getattr(self.local, "session", None)
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            self.local.session = session
+        return session
+
+    def send_request(self, request):
+        """Send a segmentation request.
+
+        Parameters
+        ----------
+        request : dict
+            keyword arguments of the segmentation request
+
+        Returns
+        -------
+        segmentation_mask : numpy.lib.npyio.NpzFile or None
+            dictionary like object with keys 'arr_0', 'arr_1'..., or None if the
+            segmentation failed.
+        """
+        response = self.get_session().post(
+            f"{self.service_url}/segmentation", stream=True, **request
         )
-        if response.status_code == 200:
-            # segmentation_mask is a dictionary like object with keys 'arr_0',
-            # 'arr_1'...
-            segmentation_mask = numpy.load(BytesIO(response.raw.read()))
+        if response.status_code != 200:
+            return None
+        return numpy.load(BytesIO(response.raw.read()))
+
+    def handle_response(self, segmentation_mask):
+        """Display segmentation masks and mark positions.
+
+        Parameters
+        ----------
+        segmentation_mask : numpy.lib.npyio.NpzFile or None
+            dictionary like object with keys 'arr_0', 'arr_1'...
+        """
+        if segmentation_mask is None:
+            print("There is something wrong!")
+            return
+
+        for idx in range(len(segmentation_mask)):
+            mask = segmentation_mask["arr_{}".format(idx)]
             # display segmentation
-            for idx in range(len(segmentation_mask)):
-                segmentation_id = "arr_{}".format(idx)
-                if self.model.display_ilastik_segmentation:
-                    self.model.event_queue.put(
-                        ("ilastik_mask", segmentation_mask[segmentation_id])
-                    )
-                # mark position
-                if self.model.mark_ilastik_position:
-                    self.mark_position(segmentation_mask[segmentation_id])
+            if self.model.display_ilastik_segmentation:
+                shared_mask = self.share_mask(mask)
+                if shared_mask is not None:
+                    self.model.event_queue.put(("ilastik_mask", shared_mask))
+            # mark position
+            if self.model.mark_ilastik_position:
+                self.mark_position(mask)
+
+    def share_mask(self, mask):
+        """Copy a mask into the shared memory mask buffer.
+
+        Only a reference to the shared memory is pickled when the mask is put in
+        the event queue. A slot is reused once the controller has acknowledged it
+        by clearing its pending flag, and the mask is dropped if every slot is
+        still waiting for the controller. Buffers replaced after a change of shape
+        or dtype are kept alive until the controller has read all their masks.
+
+        Parameters
+        ----------
+        mask : numpy.ndarray
+            segmentation mask
+
+        Returns
+        -------
+        tuple or None
+            (mask buffer, pending flags, slot index) in shared memory, or None if
+            no slot is free.
+        """
+        mask_buffers = [
+            (mask_buffer, mask_pending)
+            for mask_buffer, mask_pending in self.model.ilastik_mask_buffers[:-1]
+            if mask_pending.any()
+        ] + self.model.ilastik_mask_buffers[-1:]
+        if (
+            not mask_buffers
+            or mask_buffers[-1][0].shape != (self.mask_buffer_size,) + mask.shape
+            or mask_buffers[-1][0].dtype != mask.dtype
+        ):
+            if mask_buffers and not mask_buffers[-1][1].any():
+                mask_buffers.pop()
+            mask_buffers.append(
+                (
+                    SharedNDArray(
+                        shape=(self.mask_buffer_size,) + mask.shape, dtype=mask.dtype
+                    ),
+                    SharedNDArray(shape=(self.mask_buffer_size,), dtype="uint8"),
+                )
+            )
+            mask_buffers[-1][1][:] = 0
+            self.mask_index = 0
+        # the model keeps the buffers alive while the controller reads them.
+        self.model.ilastik_mask_buffers = mask_buffers
+
+        mask_buffer, mask_pending = mask_buffers[-1]
+        for i in range(self.mask_buffer_size):
+            idx = (self.mask_index + i) % self.mask_buffer_size
+            if not mask_pending[idx]:
+                break
         else:
-            print("There is something wrong!")
+            logger.debug("Ilastik mask dropped, the controller has not read the masks")
+            return None
+
+        mask_buffer[idx] = mask
+        mask_pending[idx] = 1
+        self.mask_index = (idx + 1) % self.mask_buffer_size
+        return mask_buffer, mask_pending, idx
 
     def update_setting(self):
         """Update Ilastik segmentation settings."""
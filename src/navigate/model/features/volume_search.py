@@ -35,16 +35,11 @@ import numpy as np
 from tifffile import imwrite
 from os import path
 
-from navigate.model.analysis.boundary_detect import (
-    find_tissue_boundary_2d,
-    binary_detect,
-    map_boundary,
-    find_cell_boundary_3d,
-    map_labels,
-)
 from navigate.tools.multipos_table_tools import(
     write_to_csv_file
 )
+from navigate.model.acquisition_plan import frame_indices
+from navigate.model.features.common_features import ZStackAcquisition
 
 
 def draw_box(img, xl, yl, xu, yu, fill=65535):
@@ -195,7 +190,11 @@ class VolumeSearch:
                 "end": self.end_data_func,
                 "cleanup": self.cleanup,
             },
-            "node": {"node_type": "multi-step", "device_related": True},
+            "node": {
+                "node_type": "multi-step",
+                "device_related": True,
+                "asynchronous": True,
+            },
         }
 
         #: bool: True if debug mode is enabled
@@ -378,6 +377,12 @@ class VolumeSearch:
         bool
             True if the data function should be called again.
         """
+        # skimage and scipy.ndimage are slow to import, load them on first use.
+        from navigate.model.analysis.boundary_detect import (
+            find_tissue_boundary_2d,
+            binary_detect,
+        )
+
         for idx in frame_ids:
             img_data = self.model.data_buffer[idx]
             # TODO: make sure set the right threshold_value in
@@ -425,6 +430,8 @@ class VolumeSearch:
             True if the search is complete.
         """
         if self.end_flag:
+            from navigate.model.analysis.boundary_detect import map_boundary
+
             direction = True
             positions = []
             for z_index in sorted(self.boundary.keys()):
@@ -472,6 +479,12 @@ class VolumeSearch:
 
 
 class VolumeSearch3D:
+    """Acquire a z-stack and map the cells found in it to a multi-position table
+
+    The frames of the searched position are accumulated from data_buffer while the
+    z-stack is acquired, so the search does not depend on saving.
+    """
+
     def __init__(
         self,
         model,
@@ -485,6 +498,8 @@ class VolumeSearch3D:
         analysis_function=None,
         current_pixel_size=1.0,
         filter_pixel_number=10,
+        downsample=1,
+        binning=1,
     ):
         """Initialize VolumeSearch
 
@@ -509,6 +524,10 @@ class VolumeSearch3D:
             The current pixel size
         filter_pixel_number : int
             The pixel number to filter a label
+        downsample : int
+            Decimation factor in x and y of the default analysis function
+        binning : int
+            Binning in x and y of the accumulated z-stack
         """
 
         #: navigate.model.model.Model: Navigate Model
@@ -534,10 +553,8 @@ class VolumeSearch3D:
         #: float: The overlap ratio
         self.overlap = overlap
 
-        #: function: analysis function
-        self.analysis_function = (
-            analysis_function if analysis_function else find_cell_boundary_3d
-        )
+        #: function: analysis function, defaults to find_cell_boundary_3d_chunked
+        self.analysis_function = analysis_function
 
         #: float: The current pixel size
         self.current_pixel_size = current_pixel_size
@@ -545,58 +562,137 @@ class VolumeSearch3D:
         #: int: The filter pixel number
         self.filter_pixel_number = filter_pixel_number
 
+        #: int: Decimation factor in x and y of the default analysis function
+        self.downsample = downsample
+
+        #: int: Binning in x and y of the accumulated z-stack
+        self.binning = max(1, int(binning))
+
+        #: ZStackAcquisition: Acquires the z-stack that is searched
+        self.z_stack = ZStackAcquisition(model)
+
+        #: np.ndarray: The z-stack of the first channel at the searched position
+        self.z_stack_data = None
+
         #: dict: Feature configuration
         self.config_table = {
+            "signal": self.z_stack.config_table["signal"],
             "data": {
+                "init": self.pre_data_func,
                 "main": self.data_func,
+                "end": self.end_data_func,
                 "cleanup": self.cleanup,
-            }
+            },
+            "node": {"node_type": "multi-step", "device_related": True},
         }
 
+    def pre_data_func(self):
+        """Preallocate the z-stack of the searched position"""
+        self.z_stack.pre_data_func()
+        if self.position_id >= len(self.z_stack.positions):
+            self.position_id = 0
+        self.z_stack_data = np.zeros(
+            (
+                self.z_stack.number_z_steps,
+                self.model.img_height // self.binning,
+                self.model.img_width // self.binning,
+            ),
+            dtype=self.model.data_buffer[0].dtype,
+        )
+
     def data_func(self, frame_ids):
+        """Copy the frames of the searched position from data_buffer
+
+        Parameters
+        ----------
+        frame_ids : list
+            Frame ids in data_buffer
+        """
+        c, z, _, p = frame_indices(
+            np.arange(len(frame_ids)) + self.z_stack.received_frames,
+            self.z_stack.channels,
+            self.z_stack.number_z_steps,
+            1,
+            len(self.z_stack.positions),
+            self.z_stack.stack_cycling_mode == "per_stack",
+        )
+        self.z_stack.in_data_func(frame_ids)
+
+        height, width = self.z_stack_data.shape[1:]
+        for i, frame_id in enumerate(frame_ids):
+            if c[i] != 0 or p[i] != self.position_id:
+                continue
+            frame = self.model.data_buffer[frame_id][
+                : height * self.binning, : width * self.binning
+            ]
+            if self.binning > 1:
+                frame = frame.reshape(height, self.binning, width, self.binning).mean(
+                    axis=(1, 3)
+                )
+            self.z_stack_data[z[i]] = frame
 
+    def end_data_func(self):
+        """Search the volume once the z-stack is acquired
+
+        Returns
+        -------
+        bool
+            Whether the z-stack is acquired
+        """
+        if not self.z_stack.end_data_func():
+            return False
+        self.search_volume()
+        return True
+
+    def search_volume(self):
+        """Label the cells in the z-stack and map them to a multi-position table"""
         self.model.logger.info("Starting 3D Volume Search")
 
         microscope_state_config = self.model.configuration["experiment"][
             "MicroscopeState"
         ]
+        save_directory = self.model.configuration["experiment"]["Saving"][
+            "save_directory"
+        ]
 
-        if self.position_id > len(self.model.configuration["multi_positions"]):
-            self.position_id = 0
-
-        z_stack_data = self.model.image_writer.data_source.get_data(
-            position=self.position_id
+        from navigate.model.analysis.boundary_detect import (
+            find_cell_boundary_3d_chunked,
+            map_labels,
         )
-        labeled_image = self.analysis_function(z_stack_data)
+
+        if self.analysis_function:
+            labeled_image = self.analysis_function(self.z_stack_data)
+        else:
+            labeled_image = find_cell_boundary_3d_chunked(
+                self.z_stack_data, downsample=self.downsample
+            )
 
         # save labels
-        imwrite(
-            file=path.join(
-                self.model.configuration["experiment"]["Saving"]["save_directory"],
-                "labels.tiff",
-            ),
-            data=labeled_image.astype(np.uint16),
-        )
+        if self.model.is_save:
+            imwrite(
+                path.join(save_directory, "labels.tiff"),
+                labeled_image.astype(np.uint16),
+            )
 
         # map labeled cells
         z_start = microscope_state_config["start_position"]
         z_end = microscope_state_config["end_position"]
         z_step = microscope_state_config["step_size"]
 
-        if len(self.model.configuration["multi_positions"]) == 0:
+        if len(self.model.configuration["multi_positions"]) <= self.position_id:
             pos_dict = self.model.get_stage_position()
             position = [
                 pos_dict[f"{axis}_pos"] for axis in ["x", "y", "z", "theta", "f"]
             ]
         else:
-            position = self.model.configuration["multi_positions"][
-                self.position_id
-            ]
+            position = list(
+                self.model.configuration["multi_positions"][self.position_id]
+            )
         # current stage position is the end of z
         position[2] -= z_end
 
         current_microscope_name = self.model.active_microscope_name
-        current_zoom_value = self.model.active_microscope.zoom.zoomvalue
+        current_zoom_value = microscope_state_config["zoom"]
         # offset
         if self.target_resolution != current_microscope_name:
             current_stage_offset = self.model.configuration["configuration"][
@@ -652,6 +748,7 @@ class VolumeSearch3D:
             "CameraParameters"
         ][self.target_resolution]["img_y_pixels"]
 
+        # the labels are in binned pixels
         z_range, positions, target_labels = map_labels(
             labeled_image,
             position,
@@ -659,29 +756,23 @@ class VolumeSearch3D:
             z_step,
             self.x_direction,
             self.y_direction,
-            self.current_pixel_size,
-            current_image_width,
-            current_image_height,
+            self.current_pixel_size * self.binning,
+            current_image_width // self.binning,
+            current_image_height // self.binning,
             target_pixel_size,
             target_image_width,
             target_image_height,
             overlap=self.overlap,
-            filter_pixel_number=self.filter_pixel_number,
+            filter_pixel_number=max(1, self.filter_pixel_number // self.binning),
         )
 
-        # save positions
-        write_to_csv_file(positions, path.join(
-            self.model.configuration["experiment"]["Saving"]["save_directory"],
-            "positions.csv",
-        ),)
-        # save target label index sequences
-        target_labels_file = path.join(
-            self.model.configuration["experiment"]["Saving"]["save_directory"],
-            "target_labels.txt"
-        )
-        with open(target_labels_file, "w") as f:
-            for idx in target_labels:
-                f.write(f"{idx}\n")
+        if self.model.is_save:
+            # save positions
+            write_to_csv_file(positions, path.join(save_directory, "positions.csv"))
+            # save target label index sequences
+            with open(path.join(save_directory, "target_labels.txt"), "w") as f:
+                for idx in target_labels:
+                    f.write(f"{idx}\n")
 
         self.model.event_queue.put(("multiposition", positions))
         self.model.configuration["multi_positions"] = positions
@@ -698,7 +789,10 @@ class VolumeSearch3D:
             f" with step_size {self.z_step}"
         )
 
-        self.model.image_writer.initialize_saving(sub_dir=str(self.target_resolution))
+        if self.model.is_save:
+            self.model.image_writer.initialize_saving(
+                sub_dir=str(self.target_resolution)
+            )
 
         self.model.logger.info(f"Volume Search 3D completed!")
 
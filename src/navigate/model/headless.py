@@ -0,0 +1,513 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import argparse
+from pathlib import Path
+from multiprocessing import Manager
+from typing import Optional, TextIO, Union
+
+# Third Party Imports
+
+# Local Imports
+from navigate.model.model import Model
+from navigate.config.config import (
+    get_navigate_path,
+    load_configs,
+    update_config_dict,
+    verify_configuration,
+    verify_experiment_config,
+    verify_waveform_constants,
+    verify_positions_config,
+)
+from navigate.tools.file_functions import load_yaml_file
+from navigate.tools.tracing import tracer
+from navigate.tools.main_functions import (
+    create_parser,
+    evaluate_parser_input_arguments,
+)
+from navigate.log_files.log_functions import log_setup
+
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+
+class HeadlessRunner:
+    """Run acquisitions without the graphical user interface.
+
+    The model is constructed in this process, without the controller, its display
+    threads or Tk. Progress and metrics are written as one JSON record per line.
+    """
+
+    def __init__(
+        self,
+        args: argparse.Namespace,
+        configuration_path: Union[str, Path],
+        experiment_path: Union[str, Path],
+        waveform_constants_path: Union[str, Path],
+        rest_api_path: Union[str, Path],
+        waveform_templates_path: Union[str, Path],
+        multi_positions_path: Union[str, Path],
+        output: Optional[TextIO] = None,
+        report_every: int = 1,
+    ) -> None:
+        """Initialize the HeadlessRunner.
+
+        Parameters
+        ----------
+        args : argparse.Namespace
+            Command line arguments. Only synthetic_hardware is used.
+        configuration_path : Union[str, Path]
+            Path to the configuration file.
+        experiment_path : Union[str, Path]
+            Path to the experiment file.
+        waveform_constants_path : Union[str, Path]
+            Path to the waveform constants file.
+        rest_api_path : Union[str, Path]
+            Path to the REST API configuration file.
+        waveform_templates_path : Union[str, Path]
+            Path to the waveform templates file.
+        multi_positions_path : Union[str, Path]
+            Path to the multi-position file.
+        output : Optional[TextIO]
+            Stream the progress records are written to. Defaults to stdout.
+        report_every : int
+            Write a progress record every report_every frames.
+        """
+        start_time = time.perf_counter()
+
+        #: TextIO: Stream the progress records are written to.
+        self.output = sys.stdout if output is None else output
+
+        #: int: Write a progress record every report_every frames.
+        self.report_every = max(1, int(report_every))
+
+        #: Manager: A shared memory manager
+        self.manager = Manager()
+
+        #: dict: Configuration dictionary
+        self.configuration = load_configs(
+            self.manager,
+            configuration=configuration_path,
+            experiment=experiment_path,
+            waveform_constants=waveform_constants_path,
+            rest_api_config=rest_api_path,
+            waveform_templates=waveform_templates_path,
+        )
+        verify_configuration(self.manager, self.configuration)
+        verify_experiment_config(self.manager, self.configuration)
+        verify_waveform_constants(self.manager, self.configuration)
+
+        positions = load_yaml_file(multi_positions_path)
+        positions = verify_positions_config(positions)
+        self.configuration["multi_positions"] = positions
+
+        #: queue.Queue: Queue for retrieving events ('event_name', value) from model
+        self.event_queue = queue.Queue()
+
+        #: Model: Model object, running in this process.
+        self.model = Model(args, self.configuration, event_queue=self.event_queue)
+        self.update_buffer()
+
+        #: int: Index of the feature list run in the customized mode, 0 if none.
+        self.feature_id = 0
+
+        #: multiprocessing.connection.Connection: Pipe for the acquired frame ids.
+        self.show_img_pipe = self.model.create_pipe("show_img_pipe")
+
+        #: bool: The model was terminated because an acquisition did not stop.
+        self.terminated = False
+
+        self.report("ready", startup_time=time.perf_counter() - start_time)
+
+    def report(self, event: str, **values) -> None:
+        """Write a progress record.
+
+        Parameters
+        ----------
+        event : str
+            Name of the record.
+        **values
+            Values of the record. They must be serializable to JSON.
+        """
+        record = {"event": event, "time": time.time(), **values}
+        self.output.write(json.dumps(record, default=str) + "\n")
+        self.output.flush()
+
+    def load_experiment(self, experiment_path: Union[str, Path]) -> None:
+        """Replace the experiment settings with the content of a file.
+
+        Parameters
+        ----------
+        experiment_path : Union[str, Path]
+            Path to the experiment file.
+        """
+        if not update_config_dict(
+            self.manager, self.configuration, "experiment", str(experiment_path)
+        ):
+            raise FileNotFoundError(f"Experiment file not valid: {experiment_path}")
+        verify_experiment_config(self.manager, self.configuration)
+        self.model.get_active_microscope()
+        self.update_buffer()
+        self.report("experiment", path=str(experiment_path))
+
+    def update_buffer(self) -> None:
+        """Size the data buffer of the model to the camera of the experiment."""
+        microscope_name = self.configuration["experiment"]["MicroscopeState"][
+            "microscope_name"
+        ]
+        camera_parameters = self.configuration["experiment"]["CameraParameters"][
+            microscope_name
+        ]
+        self.model.get_data_buffer(
+            int(camera_parameters["img_x_pixels"]),
+            int(camera_parameters["img_y_pixels"]),
+        )
+
+    def load_feature_list(self, feature_list: str) -> None:
+        """Load a feature list for the customized acquisition mode.
+
+        Parameters
+        ----------
+        feature_list : str
+            Path to a feature list yaml file, as saved in the feature_lists folder,
+            or the feature list string itself.
+        """
+        if os.path.isfile(feature_list):
+            feature_list = load_yaml_file(feature_list)["feature_list"]
+        self.model.load_feature_list_from_str(feature_list)
+        self.feature_id = len(self.model.feature_list)
+        self.configuration["experiment"]["MicroscopeState"]["image_mode"] = "customized"
+        self.report("feature_list", feature_list=feature_list)
+
+    def acquire(
+        self,
+        image_mode: Optional[str] = None,
+        is_save: Optional[bool] = None,
+        save_directory: Optional[str] = None,
+        timeout: float = 60,
+    ) -> dict:
+        """Run an acquisition and wait until it ends.
+
+        Parameters
+        ----------
+        image_mode : Optional[str]
+            Acquisition mode. Defaults to the mode of the experiment.
+        is_save : Optional[bool]
+            Save the data? Defaults to the setting of the experiment.
+        save_directory : Optional[str]
+            Directory the data is saved to. Defaults to the experiment setting.
+        timeout : float
+            Stop the acquisition if no frame arrives for timeout seconds. If it has
+            not stopped after another timeout seconds, the model is terminated.
+
+        Returns
+        -------
+        summary : dict
+            Number of frames, duration and frame rate of the acquisition.
+        """
+        if self.terminated:
+            raise RuntimeError("The model was terminated by an earlier acquisition.")
+
+        microscope_state = self.configuration["experiment"]["MicroscopeState"]
+        if image_mode is not None:
+            microscope_state["image_mode"] = image_mode
+        if is_save is not None:
+            microscope_state["is_save"] = is_save
+        if save_directory is not None:
+            self.configuration["experiment"]["Saving"]["save_directory"] = str(
+                save_directory
+            )
+        image_mode = microscope_state["image_mode"]
+        if image_mode == "customized":
+            # the model drops the feature list at the end of every acquisition
+            self.model.run_command("load_feature", self.feature_id)
+
+        self.report("start", image_mode=image_mode, is_save=microscope_state["is_save"])
+        start_time = time.perf_counter()
+        frames = 0
+        timed_out = False
+        stalled = False
+
+        self.model.run_command("acquire")
+        try:
+            while True:
+                if not self.show_img_pipe.poll(timeout):
+                    if timed_out:
+                        # the acquisition did not stop either
+                        stalled = True
+                        self.report("stall", frames=frames)
+                        logger.error(
+                            f"Acquisition did not stop within {timeout} s, "
+                            "terminating the model."
+                        )
+                        self.terminate()
+                        break
+                    timed_out = True
+                    self.model.run_command("stop")
+                    self.report("timeout", frames=frames)
+                    continue
+                image_id = self.show_img_pipe.recv()
+                if image_id == "stop":
+                    break
+                frames += 1
+                if frames % self.report_every == 0:
+                    elapsed = time.perf_counter() - start_time
+                    self.report(
+                        "frame",
+                        frame_id=image_id,
+                        frames=frames,
+                        elapsed=elapsed,
+                        fps=frames / elapsed,
+                    )
+                self.report_events()
+        except KeyboardInterrupt:
+            self.model.run_command("stop")
+            raise
+        finally:
+            if self.model.data_thread is not None:
+                # a stalled data thread is not waited for
+                self.model.data_thread.join(timeout if stalled else None)
+
+        self.report_events()
+        elapsed = time.perf_counter() - start_time
+        summary = {
+            "image_mode": image_mode,
+            "frames": frames,
+            "elapsed": elapsed,
+            "fps": frames / elapsed if elapsed > 0 else 0,
+            "timed_out": timed_out,
+            "stalled": stalled,
+        }
+        self.report("done", **summary)
+        return summary
+
+    def report_events(self) -> None:
+        """Write the events the model sent since the last call."""
+        while True:
+            try:
+                event, value = self.event_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                json.dumps(value)
+            except TypeError:
+                # waveforms and other arrays are too large to report
+                value = None
+            self.report("model_event", name=event, value=value)
+
+    def terminate(self) -> None:
+        """Terminate the devices of the model, once."""
+        if not self.terminated:
+            self.terminated = True
+            self.model.terminate()
+
+    def close(self) -> None:
+        """Release the pipe and terminate the devices."""
+        self.model.release_pipe("show_img_pipe")
+        self.terminate()
+        self.manager.shutdown()
+        self.report("closed")
+
+
+def create_headless_parser() -> argparse.ArgumentParser:
+    """Add the headless arguments to the navigate ArgumentParser.
+
+    Returns
+    -------
+    parser : argparse.ArgumentParser
+        ArgumentParser with the navigate and headless arguments.
+    """
+    parser = create_parser()
+    parser.description = "navigate Headless Acquisition"
+
+    headless_args = parser.add_argument_group("Headless Arguments")
+
+    headless_args.add_argument(
+        "--mode",
+        required=False,
+        default=None,
+        help="Acquisition mode, e.g. single or z-stack. Defaults to the mode of the "
+        "experiment file, or customized if a feature list is given.",
+    )
+
+    headless_args.add_argument(
+        "--feature-list",
+        required=False,
+        default=None,
+        help="Feature list yaml file or feature list string to run in the "
+        "customized mode.",
+    )
+
+    headless_args.add_argument(
+        "--repeat",
+        type=int,
+        required=False,
+        default=1,
+        help="Number of times the acquisition is run.",
+    )
+
+    headless_args.add_argument(
+        "--save",
+        required=False,
+        default=None,
+        action=argparse.BooleanOptionalAction,
+        help="Save the data. Defaults to the setting of the experiment file.",
+    )
+
+    headless_args.add_argument(
+        "--save-directory",
+        type=Path,
+        required=False,
+        default=None,
+        help="Directory the data is saved to.",
+    )
+
+    headless_args.add_argument(
+        "--metrics-file",
+        type=Path,
+        required=False,
+        default=None,
+        help="File the progress records are written to. Defaults to stdout.",
+    )
+
+    headless_args.add_argument(
+        "--report-every",
+        type=int,
+        required=False,
+        default=1,
+        help="Write a progress record every N frames.",
+    )
+
+    headless_args.add_argument(
+        "--trace-file",
+        type=Path,
+        required=False,
+        default=None,
+        help="File the traced spans are written to, as Chrome trace JSON. Implies "
+        "--trace.",
+    )
+
+    headless_args.add_argument(
+        "--timeout",
+        type=float,
+        required=False,
+        default=60,
+        help="Stop an acquisition if no frame arrives for this many seconds.",
+    )
+
+    return parser
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Headless acquisitions with navigate.
+
+    Runs the acquisitions of an experiment file, without the graphical user
+    interface, and writes progress and metrics as JSON lines.
+
+    Parameters
+    ----------
+    argv : Optional[list]
+        Command line arguments. Defaults to sys.argv.
+
+    Returns
+    -------
+    exit_code : int
+        0, or 1 if an acquisition did not stop and the model was terminated.
+    """
+    parser = create_headless_parser()
+    args = parser.parse_args(argv)
+
+    (
+        configuration_path,
+        experiment_path,
+        waveform_constants_path,
+        rest_api_path,
+        waveform_templates_path,
+        logging_path,
+        _,
+        _,
+        multi_positions_path,
+    ) = evaluate_parser_input_arguments(args)
+
+    log_setup("logging.yml", logging_path)
+
+    if args.trace or args.trace_file:
+        tracer.enable()
+
+    output = open(args.metrics_file, "a") if args.metrics_file else None
+    runner = HeadlessRunner(
+        args,
+        configuration_path,
+        experiment_path,
+        waveform_constants_path,
+        rest_api_path,
+        waveform_templates_path,
+        multi_positions_path,
+        output=output,
+        report_every=args.report_every,
+    )
+    exit_code = 0
+    try:
+        if args.feature_list:
+            runner.load_feature_list(args.feature_list)
+        for _ in range(args.repeat):
+            summary = runner.acquire(
+                image_mode=args.mode,
+                is_save=args.save,
+                save_directory=args.save_directory,
+                timeout=args.timeout,
+            )
+            if summary["stalled"]:
+                exit_code = 1
+                break
+    finally:
+        runner.close()
+        if tracer.enabled:
+            trace_file = args.trace_file or os.path.join(
+                get_navigate_path(),
+                "traces",
+                f"trace_{time.strftime('%Y%m%d-%H%M%S')}.json",
+            )
+            os.makedirs(os.path.dirname(os.path.abspath(trace_file)), exist_ok=True)
+            tracer.export_chrome_trace(trace_file, "headless")
+        if output:
+            output.close()
+
+    return exit_code
@@ -130,15 +130,16 @@ class BigDataViewerMetadata(XMLMetadata):
         ----------
         file_name : str
             The file name of the file to be written.
-        views : list
-            A list of dictionaries containing metadata for each view.
+        views : list or PoseLog
+            A list of dictionaries or a PoseLog containing metadata for each view.
         **kw
             Additional keyword arguments.
 
         Returns
         -------
         dict
-            A dictionary containing the XML metadata.
+            A dictionary containing the XML metadata. The view registrations are a
+            generator, so the dictionary can be converted to XML once.
 
         """
         # Header
@@ -253,80 +254,54 @@ class BigDataViewerMetadata(XMLMetadata):
             "text": self.shape_t - 1
         }
 
-        # View registrations
-        bdv_dict["ViewRegistrations"] = {"ViewRegistration": []}
-        for t in range(self.shape_t):
-            for p in range(self.positions):
-                for c in range(self.shape_c):
-                    view_id = c * self.positions + p
-                    mat = np.zeros((3, 4), dtype=float)
-                    for z in range(self.shape_z):
-                        matrix_id = (
-                            z
-                            + self.shape_z * c
-                            + p * self.shape_c * self.shape_z
-                            + t * self.shape_c * self.shape_z * self.positions
-                        )
-
-                        # Construct centroid of volume matrix
-                        # print(matrix_id, views[matrix_id])
-                        try:
-                            mat += (
-                                self.stage_positions_to_affine_matrix(
-                                    **views[matrix_id]
-                                )
-                                / self.shape_z
-                            )
-                        except IndexError:
-                            # We have most likely canceled in the middle of
-                            # an acquisition.
-                            pass
-
-                    view_transforms = [
-                        {
-                            "type": "affine",
-                            "Name": "Translation to Regular Grid",
-                            "affine": {
-                                "text": " ".join([f"{x:.6f}" for x in mat.ravel()])
-                            },
-                        }
-                    ]
-
-                    if self.shear_data:
-                        view_transforms.append(
-                            {
-                                "type": "affine",
-                                "Name": "Shearing Transform",
-                                "affine": {
-                                    "text": " ".join(
-                                        [
-                                            f"{x:.6f}"
-                                            for x in self.shear_transform.ravel()
-                                        ]
-                                    )
-                                },
-                            }
-                        )
+        # View registrations. The transforms of all views are computed at once,
+        # and the registrations are generated while the XML is written.
+        affine_matrices = self.bdv_view_affine_matrices(views)
+        affine_format = " ".join(["{:.6f}"] * 12)
+        extra_transforms = []
+        if self.shear_data:
+            extra_transforms.append(
+                {
+                    "type": "affine",
+                    "Name": "Shearing Transform",
+                    "affine": {
+                        "text": affine_format.format(*self.shear_transform.ravel())
+                    },
+                }
+            )
+        if self.rotate_data:
+            extra_transforms.append(
+                {
+                    "type": "affine",
+                    "Name": "Rotation Transform",
+                    "affine": {
+                        "text": affine_format.format(*self.rotate_transform.ravel())
+                    },
+                }
+            )
 
-                    if self.rotate_data:
-                        view_transforms.append(
+        def view_registrations():
+            for t in range(self.shape_t):
+                for p in range(self.positions):
+                    for c in range(self.shape_c):
+                        view_transforms = [
                             {
                                 "type": "affine",
-                                "Name": "Rotation Transform",
+                                "Name": "Translation to Regular Grid",
                                 "affine": {
-                                    "text": " ".join(
-                                        [
-                                            f"{x:.6f}"
-                                            for x in self.rotate_transform.ravel()
-                                        ]
+                                    "text": affine_format.format(
+                                        *affine_matrices[t, p, c].ravel()
                                     )
                                 },
                             }
+                        ] + extra_transforms
+                        yield dict(
+                            timepoint=t,
+                            setup=c * self.positions + p,
+                            ViewTransform=view_transforms,
                         )
 
-                    d = dict(timepoint=t, setup=view_id, ViewTransform=view_transforms)
-
-                    bdv_dict["ViewRegistrations"]["ViewRegistration"].append(d)
+        bdv_dict["ViewRegistrations"] = {"ViewRegistration": view_registrations()}
 
         bdv_dict["Misc"] = {
             "Entry": {"Key": "Note", "text": self.misc}
@@ -391,6 +366,90 @@ class BigDataViewerMetadata(XMLMetadata):
 
         return arr
 
+    def stage_positions_to_translations(self, views: list) -> npt.NDArray:
+        """Convert the stage positions of many views to translations in pixels.
+
+        Vectorized version of the translation in stage_positions_to_affine_matrix().
+
+        Parameters
+        ----------
+        views : list or npt.NDArray
+            A list of dictionaries containing the stage positions of each view, or
+            a structured array of records with fields x, y, z, theta and f.
+
+        Returns
+        -------
+        npt.NDArray
+            Translations (y, x, z) in pixels, shape (len(views), 3).
+        """
+
+        def positions(axis):
+            if getattr(views, "dtype", None) is not None:
+                return np.asarray(views[axis], dtype=float)
+            return np.fromiter(
+                (view[axis] for view in views), dtype=float, count=len(views)
+            )
+
+        xp = positions("x") / self.dx
+        yp = positions("y") / self.dy
+        zp = positions("z") / self.dz
+
+        # Allow additional axes (e.g. f) to couple onto existing axes (e.g. z)
+        if self._coupled_axes is not None:
+            for leader, follower in self._coupled_axes.items():
+                if leader.lower() not in "xyz":
+                    print(
+                        f"Unrecognized coupled axis {leader}. "
+                        "Not gonna do anything with this."
+                    )
+                    continue
+                elif leader.lower() == "x":
+                    xp += positions(follower.lower()) / self.dx
+                elif leader.lower() == "y":
+                    yp += positions(follower.lower()) / self.dy
+                elif leader.lower() == "z":
+                    zp += positions(follower.lower()) / self.dz
+
+        return np.stack([yp, xp, zp], axis=-1)
+
+    def bdv_view_affine_matrices(self, views: list) -> npt.NDArray:
+        """Calculate the affine matrix of every view setup and timepoint.
+
+        The matrix of a view is the mean of the affine matrices of its z-slices.
+        Slices that were not acquired, e.g. because the acquisition was stopped,
+        contribute zeros.
+
+        Parameters
+        ----------
+        views : list or PoseLog
+            A list of dictionaries or a PoseLog containing the stage positions of
+            each frame.
+
+        Returns
+        -------
+        npt.NDArray
+            Affine matrices, shape (shape_t, positions, shape_c, 3, 4).
+        """
+        shape = (self.shape_t, self.positions, self.shape_c, self.shape_z)
+        n_frames = int(np.prod(shape))
+        n_views = min(len(views), n_frames)
+
+        translations = np.zeros((n_frames, 3))
+        acquired = np.zeros(n_frames)
+        if n_views > 0:
+            translations[:n_views] = self.stage_positions_to_translations(
+                views[:n_views]
+            )
+            acquired[:n_views] = 1
+
+        translations = (translations.reshape(shape + (3,)) / self.shape_z).sum(axis=3)
+        acquired = (acquired.reshape(shape) / self.shape_z).sum(axis=3)
+
+        matrices = np.zeros(shape[:3] + (3, 4))
+        matrices[..., :3] = np.eye(3) * acquired[..., None, None]
+        matrices[..., 3] = translations
+        return matrices
+
     def affine_matrix_to_stage_positions(self, mat: npt.ArrayLike) -> tuple:
         """
         Convert affine matrix back into stage positions.
@@ -558,8 +617,8 @@ class BigDataViewerMetadata(XMLMetadata):
         ----------
         file_name : str
             The file name of the file to be written.
-        views : list
-            A list of dictionaries containing metadata for each view.
+        views : list or PoseLog
+            A list of dictionaries or a PoseLog containing metadata for each view.
 
         """
 
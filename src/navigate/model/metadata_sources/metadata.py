@@ -140,8 +140,11 @@ class Metadata:
         Parameters
         ----------
         metadata_config : dict
-            dictionary of metadata: "c", "z", "t", "p", "is_dynamic", "per_stack"
+            dictionary of metadata: "x", "y", "c", "z", "t", "p", "is_dynamic",
+            "per_stack"
         """
+        self.shape_x = metadata_config.get("x", self.shape_x)
+        self.shape_y = metadata_config.get("y", self.shape_y)
         self.shape_c = metadata_config.get("c", self.shape_c)
         self.shape_z = metadata_config.get("z", self.shape_z)
         self.shape_t = metadata_config.get("t", self.shape_t)
@@ -219,7 +222,9 @@ class Metadata:
         # print(f"Coupled axes: {self._coupled_axes} {type(self._coupled_axes)}")
 
         # safety
-        assert (self._coupled_axes is None) or isinstance(self._coupled_axes, DictProxy)
+        assert (self._coupled_axes is None) or isinstance(
+            self._coupled_axes, (dict, DictProxy)
+        )
 
         # If we have additional axes, create self.d{axis} for each
         # additional axis, to ensure we keep track of the step size
@@ -304,10 +309,13 @@ class XMLMetadata(Metadata):
         )
         # TODO: should os.path.basename be the default? Added this for BigDataViewer's
         # relative path.
-        xml += self.to_xml(file_type, root, file_name=os.path.basename(file_name), **kw)
+        d = self.xml_dict(file_type, file_name=os.path.basename(file_name), **kw)
         file_name = os.path.splitext(file_name)[0] + ".xml"
         with open(file_name, "w") as fp:
             fp.write(xml)
+            if d is not None:
+                # Stream the document, rather than building it in memory.
+                xml_tools.write_dict_to_xml(fp, d, root)
 
     def to_xml(self, file_type: str, root: Optional[str] = None, **kw) -> str:
         """
@@ -327,15 +335,33 @@ class XMLMetadata(Metadata):
         str
             XML string
         """
-        xml = ""
+        d = self.xml_dict(file_type, **kw)
+        if d is None:
+            return ""
+        return xml_tools.dict_to_xml(d, root)
+
+    def xml_dict(self, file_type: str, **kw) -> Optional[dict]:
+        """Get the nested metadata dictionary of a file type.
+
+        Parameters
+        ----------
+        file_type : str
+            File type
+        **kw
+            Keyword arguments of {file_type}_xml_dict()
+
+        Returns
+        -------
+        Optional[dict]
+            Nested metadata dictionary, None if the file type is not supported.
+        """
         try:
-            d = getattr(
+            return getattr(
                 self, f"{file_type.lower().replace(' ','_').replace('-','_')}_xml_dict"
             )(**kw)
-            xml = xml_tools.dict_to_xml(d, root)
         except AttributeError:
             logging.debug(
                 f"Metadata Writer - I do not know how to export {file_type} "
                 f"metadata to XML."
             )
-        return xml
+            return None
@@ -69,7 +69,7 @@ class OMETIFFMetadata(XMLMetadata):
         uid : Union[str, list, None]
             Unique identifier or list of unique identifiers, by default None
         views : Optional[list], optional
-            List of views, by default None
+            List of views or a PoseLog, by default None
         kw : dict, optional
             Additional keyword arguments, by default None
 
@@ -195,14 +195,15 @@ class OMETIFFMetadata(XMLMetadata):
             for i in range(self.shape_c):
                 view_idx = i * self.shape_z
                 view = views[view_idx]
-                x, y, z = view["x"], view["y"], view["z"]
+                position = {axis: float(view[axis]) for axis in ("x", "y", "z")}
                 # Allow additional axes (e.g. f) to couple onto existing axes (e.g. z)
-                # if they are both moving along the same physical dimension
+                # if they are both moving along the same physical dimension. The
+                # view itself is not modified, it may be backed by the pose log.
                 if self._coupled_axes is not None:
-                    for leader, follower in self._coupled_axes:
-                        view[leader] += view[follower] / float(
-                            getattr(self, f"d{follower.lower()}")
-                        )
+                    for leader, follower in self._coupled_axes.items():
+                        if leader.lower() in position:
+                            position[leader.lower()] += float(view[follower.lower()])
+                x, y, z = position["x"], position["y"], position["z"]
 
                 d = {
                     "DeltaT": dt,
@@ -34,14 +34,22 @@ import logging
 import importlib  # noqa: F401
 from multiprocessing.managers import ListProxy
 import reprlib
+from functools import partial
 from typing import Any, Dict, List, Optional
 
 # Third-party imports
 import numpy as np
 
 # Local application imports
+from navigate.model.analysis.camera_correction import CameraCorrection
+from navigate.model.channel_switch import (
+    ChannelSwitchPlanner,
+    device_resource,
+    order_channels,
+)
 from navigate.model.device_startup_functions import start_stage
 from navigate.tools.common_functions import build_ref_name
+from navigate.tools.startup_profiler import profiler
 
 # Set up logging
 p = __name__.split(".")[1]
@@ -154,6 +162,12 @@ class Microscope:
         #: dict: Dictionary of plugin devices
         self.plugin_devices = {}
 
+        #: ChannelSwitchPlanner: Runs the device changes of a channel switch.
+        self.channel_switch = ChannelSwitchPlanner()
+
+        #: CameraCorrection: Offset and flat-field correction of acquired frames.
+        self.camera_correction = None
+
         if is_virtual:
             return
 
@@ -274,16 +288,19 @@ class Microscope:
                     device_connection = self.daq
 
                 # LOAD AND START DEVICES
-                self.load_and_start_devices(
-                    device_name=device_name,
-                    is_list=is_list,
-                    device_name_list=device_name_list,
-                    device_ref_name=device_ref_name,
-                    device_connection=device_connection,
-                    name=name,
-                    i=i,
-                    plugin_devices=devices_dict["__plugins__"],
-                )
+                with profiler.time(
+                    "start", f"{self.microscope_name} {device_name} {device_ref_name}"
+                ):
+                    self.load_and_start_devices(
+                        device_name=device_name,
+                        is_list=is_list,
+                        device_name_list=device_name_list,
+                        device_ref_name=device_ref_name,
+                        device_connection=device_connection,
+                        name=name,
+                        i=i,
+                        plugin_devices=devices_dict["__plugins__"],
+                    )
 
                 if device_connection is None and device_ref_name is not None:
                     if device_name not in devices_dict:
@@ -346,14 +363,17 @@ class Microscope:
                     self.microscope_name
                 ]["stage"]["has_ni_galvo_stage"] = True
 
-            stage = start_stage(
-                microscope_name=self.microscope_name,
-                device_connection=devices_dict["stages"][device_ref_name],
-                configuration=self.configuration,
-                id=i,
-                is_synthetic=is_synthetic,
-                plugin_devices=devices_dict["__plugins__"],
-            )
+            with profiler.time(
+                "start", f"{self.microscope_name} stage {device_ref_name}"
+            ):
+                stage = start_stage(
+                    microscope_name=self.microscope_name,
+                    device_connection=devices_dict["stages"][device_ref_name],
+                    configuration=self.configuration,
+                    id=i,
+                    is_synthetic=is_synthetic,
+                    plugin_devices=devices_dict["__plugins__"],
+                )
             for axis in device_config["axes"]:
                 self.stages[axis] = stage
                 self.info[f"stage_{axis}"] = device_ref_name
@@ -444,6 +464,7 @@ class Microscope:
                 "binning"
             ]
         )
+        self.prepare_camera_correction()
         logger.debug(f"Running microscope {self.microscope_name}")
         self.report_camera_settings()
         # Initialize Image Series - Attaches camera buffer and start imaging
@@ -530,6 +551,70 @@ class Microscope:
         ]["center_y"]
         self.camera.set_ROI(img_width, img_height, center_x, center_y)
 
+    def prepare_camera_correction(self) -> None:
+        """Prepare the offset and flat-field correction of the acquired frames.
+
+        The correction is enabled by the ``correction`` entry of the camera
+        configuration, e.g. ``correction: {offset: True, flatfield: True,
+        workers: 2}``. It uses the camera offset and flat-field maps, cropped to
+        the camera ROI, and is only applied to unbinned frames.
+        """
+        if self.camera_correction is not None:
+            self.camera_correction.close()
+        self.camera_correction = None
+
+        settings = self.configuration["configuration"]["microscopes"][
+            self.microscope_name
+        ]["camera"].get("correction", None)
+        if settings is None or settings is False:
+            return
+        if settings is True:
+            settings = {}
+
+        camera_parameters = self.configuration["experiment"]["CameraParameters"][
+            self.microscope_name
+        ]
+        if camera_parameters["binning"] != "1x1":
+            logger.info("Camera correction is only applied to unbinned frames.")
+            return
+
+        offset, flatfield = None, None
+        if settings.get("offset", True):
+            offset = getattr(self.camera, "offset", None)
+        if settings.get("flatfield", True):
+            flatfield = getattr(self.camera, "flatfield", None)
+        if offset is None and flatfield is None:
+            logger.info("No camera maps found, frames are not corrected.")
+            return
+
+        width = int(camera_parameters["x_pixels"])
+        height = int(camera_parameters["y_pixels"])
+        try:
+            correction = CameraCorrection(
+                offset, flatfield, workers=int(settings.get("workers", 1))
+            )
+            self.camera_correction = correction.crop(
+                int(camera_parameters["center_y"]) - height // 2,
+                int(camera_parameters["center_x"]) - width // 2,
+                height,
+                width,
+            )
+        except ValueError as e:
+            logger.warning(f"Frames are not corrected: {e}")
+
+    def correct_frames(self, frame_ids: List[int]) -> None:
+        """Apply the camera correction to acquired frames, in place.
+
+        Parameters
+        ----------
+        frame_ids : List[int]
+            Indices of the frames in the data buffer.
+        """
+        if self.camera_correction is None:
+            return
+        for idx in frame_ids:
+            self.camera_correction(self.data_buffer[idx])
+
     def end_acquisition(self) -> None:
         """End the acquisition.
 
@@ -738,11 +823,13 @@ class Microscope:
 
         This function, `prepare_next_channel`, is responsible for configuring various
         hardware components for the next imaging channel in an experimental setup.
-        It sequentially selects the next available channel, sets the filter wheel,
-        camera exposure time, laser power, and other parameters based on the selected
+        It selects the next available channel, sets the filter wheel, camera
+        exposure time, laser power, and other parameters based on the selected
         channel's configuration. Additionally, it stops data acquisition, prepares the
         data acquisition system for the new channel, and adjusts the focus position as
         necessary, ensuring the hardware is ready for imaging the selected channel.
+        Devices that do not share a connection are changed concurrently, and the
+        function returns once all of them are ready.
 
         Parameters
         ----------
@@ -765,33 +852,47 @@ class Microscope:
         channel = self.configuration["experiment"]["MicroscopeState"]["channels"][
             channel_key
         ]
+        # Devices are changed concurrently, each one as soon as its connection is
+        # free. Operations sharing a connection run in the order listed here.
+        operations = []
+
         # Filter Wheel Settings.
         for k in self.filter_wheel:
-            self.filter_wheel[k].set_filter(channel[k])
+            operations.append(
+                (
+                    f"filter_wheel {k}",
+                    [device_resource(self.filter_wheel[k])],
+                    partial(self.filter_wheel[k].set_filter, channel[k]),
+                )
+            )
 
         # Camera Settings
-        self.set_camera_exposure_time(channel)
+        operations.append(
+            (
+                "camera",
+                [device_resource(self.camera)],
+                partial(self.set_camera_exposure_time, channel),
+            )
+        )
 
         # Laser Settings
         self.current_laser_index = channel["laser_index"]
-        for k in self.lasers:
-            self.lasers[k].turn_off()
-        self.lasers[str(self.laser_wavelength[self.current_laser_index])].set_power(
-            channel["laser_power"]
-        )
-        logger.info(
-            f"{self.laser_wavelength[self.current_laser_index]} "
-            f"nm laser power set to {channel['laser_power']}"
+        operations.append(
+            (
+                "lasers",
+                [device_resource(laser) for laser in self.lasers.values()],
+                partial(self.set_laser_power, channel),
+            )
         )
-        # self.lasers[str(self.laser_wavelength[self.current_laser_index])].turn_on()
 
         # stop daq before writing new waveform
         # When called the first time, throws an error.
         # choose to not update the waveform is very useful when running ZStack
         # if there is a NI Galvo stage in the system.
         if update_daq_task_flag:
-            self.daq.stop_acquisition()
-            self.daq.prepare_acquisition(channel_key)
+            operations.append(
+                ("daq", [self.daq], partial(self.prepare_daq_channel, channel_key))
+            )
 
         # Add Defocus term
         # Assume wherever we start is the central focus
@@ -799,12 +900,78 @@ class Microscope:
         if self.central_focus is None:
             self.central_focus = self.get_stage_position().get("f_pos")
         if self.central_focus is not None:
-            self.move_stage(
-                {"f_abs": self.central_focus + float(channel["defocus"])},
-                wait_until_done=True,
-                update_focus=False,
+            operations.append(
+                (
+                    "defocus",
+                    [device_resource(self.stages.get("f", None))],
+                    partial(
+                        self.move_stage,
+                        {"f_abs": self.central_focus + float(channel["defocus"])},
+                        wait_until_done=True,
+                        update_focus=False,
+                    ),
+                )
             )
 
+        self.channel_switch.run(operations)
+
+    def set_laser_power(self, channel: dict) -> None:
+        """Turn off all lasers and set the power of the channel's laser.
+
+        Parameters
+        ----------
+        channel : dict
+            Dictionary of channel parameters.
+        """
+        for k in self.lasers:
+            self.lasers[k].turn_off()
+        self.lasers[str(self.laser_wavelength[channel["laser_index"]])].set_power(
+            channel["laser_power"]
+        )
+        logger.info(
+            f"{self.laser_wavelength[channel['laser_index']]} "
+            f"nm laser power set to {channel['laser_power']}"
+        )
+        # self.lasers[str(self.laser_wavelength[self.current_laser_index])].turn_on()
+
+    def prepare_daq_channel(self, channel_key: str) -> None:
+        """Stop the DAQ and prepare its tasks for a channel.
+
+        Parameters
+        ----------
+        channel_key : str
+            Channel key, e.g. channel_1.
+        """
+        self.daq.stop_acquisition()
+        self.daq.prepare_acquisition(channel_key)
+
+    def optimize_channel_order(self) -> List[int]:
+        """Reorder the available channels to minimize filter wheel travel.
+
+        Returns
+        -------
+        channel_order : List[int]
+            For each channel in acquisition order, its index among the selected
+            channels in configuration order.
+        """
+        channels = self.configuration["experiment"]["MicroscopeState"]["channels"]
+
+        def travel(a, b):
+            channel_a, channel_b = channels[f"channel_{a}"], channels[f"channel_{b}"]
+            return sum(
+                abs(
+                    int(wheel.filter_dictionary.get(channel_a[k], 0))
+                    - int(wheel.filter_dictionary.get(channel_b[k], 0))
+                )
+                for k, wheel in self.filter_wheel.items()
+            )
+
+        configured = list(self.available_channels)
+        self.available_channels = order_channels(configured, travel)
+        if self.available_channels != configured:
+            logger.info(f"Channels are acquired in order {self.available_channels}.")
+        return [configured.index(c) for c in self.available_channels]
+
     def set_camera_exposure_time(self, channel: dict) -> None:
         """Set the camera exposure time.
 
@@ -1076,6 +1243,10 @@ class Microscope:
         for stage, _ in self.stages_list:
             del stage
 
+        self.channel_switch.shutdown()
+        if self.camera_correction is not None:
+            self.camera_correction.close()
+
     def run_command(self, command: str, *args) -> None:
         """Run command.
 
@@ -43,6 +43,9 @@ import numpy as np
 
 # Local Imports
 from navigate.model.concurrency.concurrency_tools import SharedNDArray
+from navigate.model.analysis.mip import MIPAccumulator
+from navigate.model.analysis.overview import OverviewMosaic
+from navigate.model.acquisition_plan import AcquisitionPlan
 from navigate.model.features.autofocus import Autofocus
 from navigate.model.features.adaptive_optics import TonyWilson
 from navigate.model.features.image_writer import ImageWriter
@@ -78,6 +81,8 @@ from navigate.model.device_startup_functions import load_devices
 from navigate.model.microscope import Microscope
 from navigate.config.config import get_navigate_path
 from navigate.model.plugins_model import PluginsModel
+from navigate.tools.startup_profiler import profiler
+from navigate.tools.tracing import tracer
 
 
 # Logger Setup
@@ -117,7 +122,8 @@ class Model:
 
         # Plugins
         plugins = PluginsModel()
-        plugin_devices, plugin_acquisition_modes = plugins.load_plugins()
+        with profiler.time("load", "plugins"):
+            plugin_devices, plugin_acquisition_modes = plugins.load_plugins()
 
         #: dict: Dictionary of plugin acquisition modes
         self.plugin_acquisition_modes = plugin_acquisition_modes
@@ -134,9 +140,13 @@ class Model:
         #: dict: Dictionary of physical microscopes.
         self.microscopes = {}
         for microscope_name in configuration["configuration"]["microscopes"].keys():
-            self.microscopes[microscope_name] = Microscope(
-                microscope_name, configuration, devices_dict, args.synthetic_hardware
-            )
+            with profiler.time("load", f"microscope {microscope_name}"):
+                self.microscopes[microscope_name] = Microscope(
+                    microscope_name,
+                    configuration,
+                    devices_dict,
+                    args.synthetic_hardware,
+                )
             self.microscopes[microscope_name].output_event_queue = event_queue
         # register device commands if there is any.
 
@@ -197,6 +207,25 @@ class Model:
         #: array: saving flags for a frame
         self.data_buffer_saving_flags = None
 
+        #: MIPAccumulator: Orthogonal maximum intensity projections in shared memory.
+        self.mip = None
+
+        #: AcquisitionPlan: Frame table of the current acquisition.
+        self.acquisition_plan = None
+
+        #: list: Ilastik segmentation mask buffers and their pending flags, shared
+        #: with the controller. The last one is in use.
+        self.ilastik_mask_buffers = []
+
+        #: bool: Update the maximum intensity projections in the data thread?
+        self.is_mip_enabled = False
+
+        #: OverviewMosaic: Overview of the stacks of a tiled acquisition.
+        self.overview = None
+
+        #: bool: Add every completed stack to the overview in the data thread?
+        self.is_overview_enabled = False
+
         #: bool: Is the model acquiring?
         self.is_acquiring = False
 
@@ -396,6 +425,11 @@ class Model:
 
         self.load_feature_records()
 
+        if profiler.enabled:
+            report = profiler.report("model")
+            self.logger.info(report)
+            print(report)
+
     def update_data_buffer(self, img_width: int = 512, img_height: int = 512) -> None:
         """Update the Data Buffer
 
@@ -452,6 +486,130 @@ class Model:
             self.update_data_buffer(img_width, img_height)
         return self.data_buffer
 
+    def prepare_mip(self) -> None:
+        """Prepare the maximum intensity projections for an acquisition.
+
+        The projections are reused between acquisitions as long as the number of
+        channels, slices and the image size are unchanged.
+        """
+        microscope_state = self.configuration["experiment"]["MicroscopeState"]
+        display_enabled = (
+            self.configuration.get("gui", {})
+            .get("mip_display", {})
+            .get("enabled", True)
+        )
+        self.is_mip_enabled = self.imaging_mode != "live" and (
+            self.is_save or display_enabled
+        )
+        if not self.is_mip_enabled:
+            return
+
+        number_of_channels = len(
+            [
+                channel
+                for channel in microscope_state["channels"].values()
+                if channel["is_selected"]
+            ]
+        )
+        number_of_slices = int(microscope_state["number_z_steps"])
+        if self.mip is None or not self.mip.matches(
+            number_of_channels, number_of_slices, self.img_height, self.img_width
+        ):
+            self.mip = MIPAccumulator(
+                number_of_channels, number_of_slices, self.img_height, self.img_width
+            )
+        else:
+            self.mip.reset()
+
+        if self.imaging_mode == "customized":
+            self.mip.stack_cycling_mode = None
+        else:
+            self.mip.stack_cycling_mode = microscope_state["stack_cycling_mode"]
+
+    def prepare_overview(self) -> None:
+        """Prepare the overview canvas for a z-stack acquisition.
+
+        The XY projection of every stack is blended into the canvas at its stage
+        position, so the projections must be enabled. The canvas resolution is set
+        by ``um_per_pixel`` in ``gui["overview_display"]``, and the canvas is reused
+        as long as the positions and the resolution are unchanged.
+        """
+        display = self.configuration.get("gui", {}).get("overview_display", {})
+        self.is_overview_enabled = (
+            self.is_mip_enabled
+            and self.imaging_mode == "z-stack"
+            and display.get("enabled", True)
+        )
+        if not self.is_overview_enabled:
+            return
+
+        parameters = OverviewMosaic.parameters_from_configuration(
+            self.configuration,
+            self.active_microscope_name,
+            self.mip.number_of_channels,
+            display.get("um_per_pixel", None),
+        )
+        if self.overview is None or not self.overview.matches(**parameters):
+            self.overview = OverviewMosaic(**parameters)
+        else:
+            self.overview.reset()
+
+    def get_overview_buffer(self) -> Optional[OverviewMosaic]:
+        """Get the overview canvas of the current acquisition.
+
+        Returns
+        -------
+        overview : Optional[OverviewMosaic]
+            Shared memory canvas, or None if it is not being updated.
+        """
+        return self.overview if self.is_overview_enabled else None
+
+    def prepare_acquisition_plan(self) -> None:
+        """Build the frame table of the acquisition.
+
+        Only z-stack and single acquisitions are planned. Their frames are known
+        before the acquisition starts, unlike live or customized acquisitions.
+
+        If the experiment asks for it, the channels of a planned acquisition are
+        reordered to minimize filter wheel travel. The plan then maps each frame
+        to its configured channel.
+        """
+        microscope_state = self.configuration["experiment"]["MicroscopeState"]
+        channel_order = None
+        if microscope_state.get("optimize_channel_order", False) and (
+            self.imaging_mode in ("z-stack", "single")
+        ):
+            channel_order = self.active_microscope.optimize_channel_order()
+        self.acquisition_plan = AcquisitionPlan.from_configuration(
+            self.configuration, channel_order=channel_order
+        )
+        if self.acquisition_plan is None and channel_order is not None:
+            # without a plan, frames are indexed in acquisition order
+            self.active_microscope.get_available_channels()
+            channel_order = None
+        if self.mip is not None:
+            self.mip.channel_order = channel_order
+
+    def get_acquisition_plan(self) -> Optional[AcquisitionPlan]:
+        """Get the frame table of the current acquisition.
+
+        Returns
+        -------
+        acquisition_plan : Optional[AcquisitionPlan]
+            Shared memory frame table, or None if the acquisition is not planned.
+        """
+        return self.acquisition_plan
+
+    def get_mip_buffer(self) -> Optional[MIPAccumulator]:
+        """Get the maximum intensity projections of the current acquisition.
+
+        Returns
+        -------
+        mip : Optional[MIPAccumulator]
+            Shared memory projections, or None if they are not being updated.
+        """
+        return self.mip if self.is_mip_enabled else None
+
     def create_pipe(self, pipe_name: str) -> multiprocessing.Pipe:
         """Create a data pipe.
 
@@ -548,6 +706,9 @@ class Model:
 
             # Calculate waveforms, turn on lasers, etc.
             self.prepare_acquisition()
+            self.prepare_mip()
+            self.prepare_overview()
+            self.prepare_acquisition_plan()
 
             # load features
             if self.imaging_mode == "customized":
@@ -582,6 +743,9 @@ class Model:
                     model=self,
                     saving_flags=self.data_buffer_saving_flags,
                     saving_config=saving_config,
+                    mip=self.mip
+                    if self.is_mip_enabled and self.data_buffer_saving_flags is None
+                    else None,
                 )
 
                 self.data_thread = threading.Thread(
@@ -863,6 +1027,8 @@ class Model:
         Sets the current channel to 0, clears the signal and data containers,
         disconnects buffer in live mode and closes the shutters."""
         self.is_acquiring = False
+        self.is_mip_enabled = False
+        self.is_overview_enabled = False
 
         self.active_microscope.end_acquisition()
         for microscope_name in self.virtual_microscopes:
@@ -886,6 +1052,22 @@ class Model:
         #: obj: Add on feature.
         self.addon_feature = None
 
+    @staticmethod
+    def run_data_func(data_func: callable, frame_ids: list) -> None:
+        """Run the data function on a batch of frames.
+
+        Parameters
+        ----------
+        data_func : callable
+            Function to run on the acquired data.
+        frame_ids : list
+            Indices of the frames in the data buffer.
+        """
+        with tracer.span(
+            getattr(data_func, "__qualname__", "data_func"), frames=frame_ids
+        ):
+            data_func(frame_ids)
+
     def run_data_process(
         self, num_of_frames: Optional[int] = 0, data_func: Optional[callable] = None
     ) -> None:
@@ -911,7 +1093,8 @@ class Model:
                 self.pause_data_ready_lock.release()
                 self.pause_data_event.clear()
                 self.pause_data_event.wait()
-            frame_ids = self.active_microscope.camera.get_new_frame()
+            with tracer.span("camera.get_new_frame"):
+                frame_ids = self.active_microscope.camera.get_new_frame()
             self.logger.info(f"Running data process, getting frames {frame_ids}")
             # if there is at least one frame available
             if not frame_ids:
@@ -936,9 +1119,32 @@ class Model:
 
             wait_num = self.camera_wait_iterations
 
+            # Offset and flat-field correction, in place, before anything reads
+            # the frames.
+            self.active_microscope.correct_frames(frame_ids)
+
+            # Orthogonal maximum intensity projections, shared with the
+            # ImageWriter and the controller. The first slice of a stack overwrites
+            # the XY projection, so the frames are handed to data_func up to the
+            # end of each stack before the next stack is accumulated.
+            segment_start = 0
+            for i, idx in enumerate(frame_ids if self.is_mip_enabled else []):
+                channel_idx, slice_idx = self.mip.add_frame(self.data_buffer[idx])
+                if slice_idx < self.mip.number_of_slices - 1:
+                    continue
+
+                # The projection of a stack is complete, add it to the overview.
+                if self.is_overview_enabled:
+                    x, y = self.data_buffer_positions[idx][:2]
+                    self.overview.add_tile(self.mip.xy[channel_idx], x, y, channel_idx)
+
+                if data_func and i < len(frame_ids) - 1:
+                    self.run_data_func(data_func, frame_ids[segment_start : i + 1])
+                    segment_start = i + 1
+
             # ImageWriter to save images
             if data_func:
-                data_func(frame_ids)
+                self.run_data_func(data_func, frame_ids[segment_start:])
 
             if hasattr(self, "data_container") and not self.data_container.end_flag:
                 if self.data_container.is_closed:
@@ -946,11 +1152,13 @@ class Model:
                     self.stop_acquisition = True
                     break
 
-                self.data_container.run(frame_ids)
+                with tracer.span("DataContainer.run", frames=frame_ids):
+                    self.data_container.run(frame_ids)
 
             # show image
             self.logger.info(f"Image delivered to controller: {frame_ids[0]}")
-            self.show_img_pipe.send(frame_ids[-1])
+            with tracer.span("show_img_pipe.send", frame=frame_ids[-1]):
+                self.show_img_pipe.send(frame_ids[-1])
 
             if count_frame and acquired_frame_num >= num_of_frames:
                 self.logger.info("Loop stop condition met.")
@@ -1019,6 +1227,8 @@ class Model:
             if not frame_ids:
                 continue
 
+            microscope.correct_frames(frame_ids)
+
             # Leave it here for now to work with current ImageWriter workflow
             # Will move it feature container later
             if data_func:
@@ -1443,6 +1653,16 @@ class Model:
             data_buffer[i].shared_memory.unlink()
         del data_buffer
 
+    def get_trace_events(self) -> list:
+        """Get the spans traced in the model process.
+
+        Returns
+        -------
+        events : list
+            Chrome trace events of the model process.
+        """
+        return tracer.chrome_trace_events("model")
+
     def terminate(self) -> None:
         """Terminate the model."""
         self.active_microscope.terminate()
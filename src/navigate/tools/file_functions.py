@@ -35,15 +35,28 @@ from datetime import datetime
 import os
 import json
 import yaml
+import hashlib
+import logging
+import pickle
 from pathlib import Path
 import psutil
-from typing import Union
+from typing import Any, Optional, Union
 
 # Third party imports
 
 # Local application imports
 from navigate.tools.common_functions import copy_proxy_object
 
+# Logger Setup
+p = __name__.split(".")[1]
+logger = logging.getLogger(p)
+
+#: yaml.Loader: libyaml accelerated loader if PyYAML was built with it.
+YAML_LOADER = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
+#: str: Directory of the parsed YAML cache. Defaults to .navigate/cache/yaml.
+YAML_CACHE_DIRECTORY = None
+
 
 def get_ram_info() -> tuple:
     """Get computer RAM information.
@@ -134,6 +147,101 @@ def create_save_path(saving_settings: dict) -> str:
     return save_directory
 
 
+def get_yaml_cache_path(file_path: Union[str, Path]) -> Optional[Path]:
+    """Get the path of the parsed cache of a YAML file.
+
+    Parameters
+    ----------
+    file_path : str
+        String or path of the yaml file.
+
+    Returns
+    -------
+    cache_path : Optional[Path]
+        Path of the cache file, or None if the cache directory can't be created.
+    """
+    cache_directory = YAML_CACHE_DIRECTORY
+    try:
+        if cache_directory is None:
+            from navigate.config.config import get_navigate_path
+
+            cache_directory = os.path.join(get_navigate_path(), "cache", "yaml")
+        os.makedirs(cache_directory, exist_ok=True)
+    except (OSError, TypeError):
+        return None
+    name = hashlib.sha1(str(Path(file_path).resolve()).encode()).hexdigest()
+    return Path(cache_directory, f"{name}.pickle")
+
+
+def parse_yaml_file(file_path: Union[str, Path], use_cache: bool = True) -> Any:
+    """Parse a YAML file, using a binary cache of previously parsed files.
+
+    The cache entry is keyed by the file path, modification time, size and a hash
+    of the content, so any change to the file invalidates it.
+
+    Parameters
+    ----------
+    file_path : str
+        String or path of the yaml file.
+    use_cache : bool
+        Read and update the parsed cache.
+
+    Returns
+    -------
+    config_data : Any
+        Content of the yaml file.
+
+    Raises
+    ------
+    yaml.YAMLError
+        If the yaml file can't be parsed.
+    """
+    file_path = Path(file_path)
+    try:
+        stat = file_path.stat()
+    except OSError:
+        stat = None
+
+    with open(file_path) as f:
+        if stat is None or not use_cache:
+            return yaml.load(f, Loader=YAML_LOADER)
+        content = f.read()
+
+    key = {
+        "path": str(file_path.resolve()),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "digest": hashlib.blake2b(
+            content.encode("utf-8", "surrogatepass"), digest_size=16
+        ).hexdigest(),
+    }
+    cache_path = get_yaml_cache_path(file_path)
+    if cache_path is not None and cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                cache = pickle.load(f)
+            if cache["key"] == key:
+                return cache["data"]
+        except Exception as e:
+            logger.debug(f"Can't read yaml cache {cache_path}: {e}")
+
+    config_data = yaml.load(content, Loader=YAML_LOADER)
+
+    if cache_path is not None:
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(temp_path, "wb") as f:
+                pickle.dump(
+                    {"key": key, "data": config_data}, f, pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logger.debug(f"Can't write yaml cache {cache_path}: {e}")
+            if temp_path.exists():
+                temp_path.unlink()
+    return config_data
+
+
 def load_yaml_file(file_path: str) -> Union[dict, None]:
     """Load YAML file from Disk
 
@@ -151,12 +259,11 @@ def load_yaml_file(file_path: str) -> Union[dict, None]:
     file_path = Path(file_path)
     if not file_path.exists():
         return None
-    with open(file_path) as f:
-        try:
-            config_data = yaml.load(f, Loader=yaml.FullLoader)
-        except yaml.YAMLError as yaml_error:
-            print(f"Can't load yaml file: {file_path} - {yaml_error}")
-            return None
+    try:
+        config_data = parse_yaml_file(file_path)
+    except yaml.YAMLError as yaml_error:
+        print(f"Can't load yaml file: {file_path} - {yaml_error}")
+        return None
     return config_data
 
 
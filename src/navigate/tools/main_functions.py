@@ -197,6 +197,25 @@ def create_parser():
         help="Enables debugging tool menu to be accessible.",
     )
 
+    input_args.add_argument(
+        "--profile-startup",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Profile Startup - "
+        "Prints how long each module import and device startup takes.",
+    )
+
+    input_args.add_argument(
+        "--trace",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Trace - "
+        "Records the time each frame spends in the acquisition pipeline. The trace "
+        "is saved to .navigate/traces on exit and opens in Perfetto.",
+    )
+
     # Non-Default Configuration and Experiment Input Arguments
     input_args.add_argument(
         "--config-file",
@@ -35,7 +35,6 @@ import csv
 
 # Third party imports
 import numpy as np
-import pandas as pd
 
 # Local application imports
 
@@ -237,6 +236,8 @@ def update_table(table, pos, append=False):
     None :
         Table is updated
     """
+    import pandas as pd
+
     frame = pd.DataFrame(pos, columns=list("XYZRF"))
     if append:
         table.model.df = table.model.df.append(frame, ignore_index=True)
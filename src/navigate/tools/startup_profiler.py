@@ -0,0 +1,230 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import os
+import sys
+import time
+import threading
+import importlib.abc
+from contextlib import contextmanager
+
+# Third Party Imports
+
+# Local Imports
+
+#: str: Set to "1" to profile the startup of navigate processes. Child processes
+#: inherit it, so the model subprocess is profiled from its first import.
+PROFILE_STARTUP_VARIABLE = "NAVIGATE_PROFILE_STARTUP"
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Loader wrapper that times the execution of a module."""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._profiler.time_import(module.__name__):
+            self._loader.exec_module(module)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Meta path finder that wraps the loader of every module imported."""
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+        self._finding = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._finding, "active", False):
+            return None
+        self._finding.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.active = False
+        if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, self._profiler)
+        return spec
+
+
+class StartupProfiler:
+    """Collect how long imports and device startup take.
+
+    Imports are timed by a meta path finder, which records the time spent
+    executing each module, excluding the modules it imports. Other steps, e.g.
+    connecting to or starting a device, are timed with the time() context manager.
+    Both are no-ops until the profiler is enabled.
+    """
+
+    def __init__(self) -> None:
+        #: bool: Is the profiler collecting timings?
+        self.enabled = False
+
+        #: float: Time the profiler was enabled.
+        self.start_time = None
+
+        #: dict: Self time in seconds spent importing each module.
+        self.imports = {}
+
+        #: list: (category, name, seconds) of each timed step.
+        self.steps = []
+
+        #: threading.local: Stack of modules being imported, per thread.
+        self._stack = threading.local()
+
+        #: _ImportTimer: The meta path finder.
+        self._import_timer = None
+
+    def enable(self) -> None:
+        """Start collecting timings in this and any child process."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.start_time = time.perf_counter()
+        os.environ[PROFILE_STARTUP_VARIABLE] = "1"
+        self._import_timer = _ImportTimer(self)
+        sys.meta_path.insert(0, self._import_timer)
+
+    def disable(self) -> None:
+        """Stop collecting timings."""
+        self.enabled = False
+        if self._import_timer in sys.meta_path:
+            sys.meta_path.remove(self._import_timer)
+        self._import_timer = None
+
+    @contextmanager
+    def time_import(self, module_name: str):
+        """Time the execution of a module, excluding its own imports.
+
+        Parameters
+        ----------
+        module_name : str
+            Name of the module being imported.
+        """
+        stack = getattr(self._stack, "modules", None)
+        if stack is None:
+            stack = self._stack.modules = []
+        # [name, start time, time spent in nested imports]
+        stack.append([module_name, time.perf_counter(), 0.0])
+        try:
+            yield
+        finally:
+            name, start, nested = stack.pop()
+            elapsed = time.perf_counter() - start
+            self.imports[name] = self.imports.get(name, 0.0) + elapsed - nested
+            if stack:
+                stack[-1][2] += elapsed
+
+    @contextmanager
+    def time(self, category: str, name: str):
+        """Time a startup step.
+
+        Parameters
+        ----------
+        category : str
+            Kind of step, e.g. "connect" or "start".
+        name : str
+            Name of the step, e.g. the device.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((category, name, time.perf_counter() - start))
+
+    def report(self, title: str = "navigate", top: int = 25) -> str:
+        """Summarize the timings.
+
+        Parameters
+        ----------
+        title : str
+            Name of the profiled process.
+        top : int
+            Number of modules and packages to list.
+
+        Returns
+        -------
+        str
+            The report.
+        """
+        lines = [f"Startup profile of {title}"]
+        if self.start_time is not None:
+            elapsed = time.perf_counter() - self.start_time
+            lines.append(f"  Elapsed since profiling started: {elapsed:8.3f} s")
+
+        total = sum(self.imports.values())
+        lines.append(f"  Imports: {len(self.imports)} modules, {total:.3f} s")
+        packages = {}
+        for name, seconds in self.imports.items():
+            package = name.split(".")[0]
+            if package == "navigate":
+                package = ".".join(name.split(".")[:3])
+            packages[package] = packages.get(package, 0.0) + seconds
+        lines.append("  Slowest packages:")
+        for name, seconds in sorted(packages.items(), key=lambda x: -x[1])[:top]:
+            lines.append(f"    {seconds:8.3f} s  {name}")
+        lines.append("  Slowest modules:")
+        for name, seconds in sorted(self.imports.items(), key=lambda x: -x[1])[:top]:
+            lines.append(f"    {seconds:8.3f} s  {name}")
+
+        if self.steps:
+            lines.append("  Steps:")
+            for category, name, seconds in self.steps:
+                lines.append(f"    {seconds:8.3f} s  {category:<10} {name}")
+        return "\n".join(lines)
+
+
+#: StartupProfiler: Profiler of this process.
+profiler = StartupProfiler()
+
+if os.environ.get(PROFILE_STARTUP_VARIABLE) == "1":
+    profiler.enable()
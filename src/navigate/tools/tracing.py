@@ -0,0 +1,288 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import os
+import json
+import time
+import threading
+from typing import Optional
+
+# Third Party Imports
+
+# Local Imports
+
+#: str: Set to "1" to trace navigate processes. Child processes inherit it, so the
+#: model subprocess is traced too.
+TRACE_VARIABLE = "NAVIGATE_TRACE"
+
+
+class _Ring:
+    """Fixed-size ring of spans, written only by the thread that owns it."""
+
+    __slots__ = ("thread_id", "thread_name", "spans", "index")
+
+    def __init__(self, size: int) -> None:
+        thread = threading.current_thread()
+        #: int: Identifier of the thread that owns the ring.
+        self.thread_id = threading.get_ident()
+        #: str: Name of the thread that owns the ring.
+        self.thread_name = thread.name
+        #: list: (name, start, end, args) of the spans, in nanoseconds.
+        self.spans = [None] * size
+        #: int: Number of spans written since the ring was created.
+        self.index = 0
+
+    def snapshot(self) -> list:
+        """Return the spans of the ring, oldest first."""
+        size, index = len(self.spans), self.index
+        if index <= size:
+            return self.spans[:index]
+        index %= size
+        return self.spans[index:] + self.spans[:index]
+
+
+class _Span:
+    """Context manager that records a span when it exits."""
+
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name: str, args: dict) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.record(self.name, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    """Context manager used while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class SpanTracer:
+    """Record timestamped spans, e.g. of each frame in the data thread.
+
+    Each thread writes its spans into its own fixed-size ring, without locking,
+    and the oldest spans are overwritten once the ring is full. The spans are
+    exported on demand in the Chrome trace format, which chrome://tracing and
+    Perfetto open. While the tracer is disabled, span() returns a shared no-op
+    context manager.
+    """
+
+    def __init__(self, ring_size: int = 65536) -> None:
+        """Initialize the SpanTracer.
+
+        Parameters
+        ----------
+        ring_size : int
+            Number of spans kept per thread.
+        """
+        #: bool: Is the tracer recording spans?
+        self.enabled = False
+
+        #: int: Number of spans kept per thread.
+        self.ring_size = ring_size
+
+        #: threading.local: Ring of the current thread.
+        self._local = threading.local()
+
+        #: list: Rings of all threads that recorded a span.
+        self._rings = []
+
+        #: threading.Lock: Lock for adding a ring. Recording spans does not lock.
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start recording spans in this and any child process."""
+        self.enabled = True
+        os.environ[TRACE_VARIABLE] = "1"
+
+    def disable(self) -> None:
+        """Stop recording spans."""
+        self.enabled = False
+        os.environ.pop(TRACE_VARIABLE, None)
+
+    def clear(self) -> None:
+        """Discard the recorded spans."""
+        with self._lock:
+            for ring in self._rings:
+                ring.index = 0
+
+    def span(self, name: str, **args):
+        """Time a block of code.
+
+        Parameters
+        ----------
+        name : str
+            Name of the span, e.g. "camera.get_new_frame".
+        **args
+            Values shown with the span, e.g. the frame ids.
+
+        Returns
+        -------
+        span : context manager
+            Records the span when the block exits.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def record(
+        self, name: str, start: int, end: int, args: Optional[dict] = None
+    ) -> None:
+        """Record a span of the current thread.
+
+        Parameters
+        ----------
+        name : str
+            Name of the span.
+        start : int
+            Start of the span, from time.perf_counter_ns().
+        end : int
+            End of the span, from time.perf_counter_ns().
+        args : Optional[dict]
+            Values shown with the span.
+        """
+        ring = getattr(self._local, "ring", None)
+        if ring is None or len(ring.spans) != self.ring_size:
+            ring = self._local.ring = _Ring(self.ring_size)
+            with self._lock:
+                self._rings.append(ring)
+        ring.spans[ring.index % self.ring_size] = (name, start, end, args)
+        ring.index += 1
+
+    def chrome_trace_events(self, process_name: Optional[str] = None) -> list:
+        """Convert the recorded spans to Chrome trace events.
+
+        Parameters
+        ----------
+        process_name : Optional[str]
+            Name of this process in the trace viewer.
+
+        Returns
+        -------
+        events : list
+            Complete ("X") events with timestamps in microseconds, and the
+            metadata events naming the process and threads.
+        """
+        pid = os.getpid()
+        events = []
+        if process_name:
+            events.append(
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "args": {"name": process_name},
+                }
+            )
+        with self._lock:
+            rings = list(self._rings)
+        for ring in rings:
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": ring.thread_id,
+                    "args": {"name": ring.thread_name},
+                }
+            )
+            for name, start, end, args in ring.snapshot():
+                event = {
+                    "name": name,
+                    "ph": "X",
+                    "ts": start / 1000,
+                    "dur": (end - start) / 1000,
+                    "pid": pid,
+                    "tid": ring.thread_id,
+                }
+                if args:
+                    event["args"] = args
+                events.append(event)
+        return events
+
+    def export_chrome_trace(
+        self,
+        file_name: str,
+        process_name: Optional[str] = None,
+        events: Optional[list] = None,
+    ) -> int:
+        """Write the recorded spans to a Chrome trace JSON file.
+
+        Parameters
+        ----------
+        file_name : str
+            Path of the trace file.
+        process_name : Optional[str]
+            Name of this process in the trace viewer.
+        events : Optional[list]
+            Events of other processes, e.g. the model subprocess, to include.
+
+        Returns
+        -------
+        number_of_events : int
+            Number of events written.
+        """
+        trace_events = self.chrome_trace_events(process_name) + list(events or [])
+        with open(file_name, "w") as f:
+            json.dump(
+                {"traceEvents": trace_events, "displayTimeUnit": "ms"},
+                f,
+                default=str,
+            )
+        return len(trace_events)
+
+
+#: SpanTracer: Tracer of this process.
+tracer = SpanTracer()
+
+if os.environ.get(TRACE_VARIABLE) == "1":
+    tracer.enable()
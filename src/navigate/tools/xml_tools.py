@@ -31,6 +31,7 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 import xml.etree.ElementTree as ET
+from types import GeneratorType
 
 
 def dict_to_xml(d, tag=None, level=0):
@@ -48,42 +49,89 @@ def dict_to_xml(d, tag=None, level=0):
     xml : str
         String of XML tags produced from dictionary.
     """
+    return "".join(iter_dict_to_xml(d, tag, level))
 
+
+def write_dict_to_xml(fp, d, tag=None, level=0):
+    """Write a Python dictionary to an XML file, one element at a time.
+
+    The whole document is never held in memory. Lists of child elements may be
+    generators, so they are also produced while writing.
+
+    Parameters
+    ----------
+    fp : file object
+        File opened for writing text.
+    d: dict
+        Dictionary to parse to XML.
+    tag : str
+        Root key of dictionary
+    level : int
+        Indentation level of the root element.
+    """
+    fp.writelines(iter_dict_to_xml(d, tag, level))
+
+
+def iter_dict_to_xml(d, tag=None, level=0):
+    """Generate the XML of a Python dictionary in pieces.
+
+    Parameters
+    ----------
+    d: dict
+        Dictionary to parse to XML.
+    tag : str
+        Root key of dictionary
+    level : int
+        Indentation level of the root element.
+
+    Yields
+    ------
+    xml : str
+        Consecutive pieces of the XML string produced from the dictionary.
+    """
     if tag is None:
         tag = list(d.keys())[0]
 
     xml = "  " * level + f"<{tag}"
-    if isinstance(d, dict):
-        next_xml = ""
-        text = ""
-        next_level = level + 1
-        for k, v in d.items():
-            if isinstance(v, dict):
-                # Not a leaf node
-                next_xml += dict_to_xml(v, k, next_level)
-            elif isinstance(v, list):
-                for el in v:
-                    next_xml += dict_to_xml(el, k, next_level)
-            else:
-                if k == "text":
-                    text = str(v)
-                else:
-                    xml += f' {k}="{v}"'
-        if text != "" or next_xml != "":
-            xml += ">"
-            if text != "":
-                xml += text
-            if next_xml != "":
-                xml += f"\n{next_xml}"
-            if text != "":
-                xml += f"</{tag}>\n"
-            else:
-                xml += "  " * level
-                xml += f"</{tag}>\n"
+    if not isinstance(d, dict):
+        yield xml
+        return
+
+    text = ""
+    children = []
+    for k, v in d.items():
+        if isinstance(v, dict):
+            # Not a leaf node
+            children.append((k, (v,)))
+        elif isinstance(v, (list, GeneratorType)):
+            children.append((k, v))
+        elif k == "text":
+            text = str(v)
         else:
-            xml += "/>\n"
-
-    return xml
+            xml += f' {k}="{v}"'
+
+    child_xml = (
+        piece
+        for k, elements in children
+        for el in elements
+        for piece in iter_dict_to_xml(el, k, level + 1)
+    )
+    # Only look ahead one piece to know whether there are child elements.
+    first_child = next(child_xml, None)
+
+    if text == "" and first_child is None:
+        yield xml + "/>\n"
+        return
+
+    yield xml + ">" + text
+    if first_child is not None:
+        yield "\n"
+        yield first_child
+        yield from child_xml
+    if text != "":
+        yield f"</{tag}>\n"
+    else:
+        yield "  " * level + f"</{tag}>\n"
 
 
 def parse_xml(root: ET.Element) -> dict:
@@ -44,6 +44,7 @@ from matplotlib.figure import Figure
 from navigate.view.custom_widgets.DockableNotebook import DockableNotebook
 from navigate.view.custom_widgets.LabelInputWidgetFactory import LabelInput
 from navigate.view.custom_widgets.common import CommonMethods
+from navigate.view.custom_widgets.validation import ValidatedSpinbox
 
 # Logger Setup
 p = __name__.split(".")[1]
@@ -83,12 +84,21 @@ class CameraNotebook(DockableNotebook):
         #: WaveformTab: The waveform settings tab.
         self.waveform_tab = WaveformTab(self)
 
+        #: OverviewTab: The overview of tiled acquisitions tab.
+        self.overview_tab = OverviewTab(self)
+
         # Set tab list
-        tab_list = [self.camera_tab, self.mip_tab, self.waveform_tab]
+        tab_list = [
+            self.camera_tab,
+            self.mip_tab,
+            self.waveform_tab,
+            self.overview_tab,
+        ]
         self.set_tablist(tab_list)
         self.add(self.camera_tab, text="Camera", sticky=tk.NSEW)
         self.add(self.mip_tab, text="MIP", sticky=tk.NSEW)
         self.add(self.waveform_tab, text="Waveforms", sticky=tk.NSEW)
+        self.add(self.overview_tab, text="Overview", sticky=tk.NSEW)
 
 
 class MIPTab(tk.Frame):
@@ -157,6 +167,60 @@ class MIPTab(tk.Frame):
         self.render.grid(row=1, column=1, sticky=tk.NSEW, padx=5, pady=5)
 
 
+class OverviewTab(tk.Frame):
+    """OverviewTab class."""
+
+    def __init__(
+        self, cam_wave: CameraNotebook, *args: Iterable, **kwargs: Dict[str, Any]
+    ) -> None:
+        """Initialize the OverviewTab class.
+
+        Parameters
+        ----------
+        cam_wave : CameraNotebook
+            The frame that will hold the overview tab.
+        *args : Iterable
+            Variable length argument list.
+        **kwargs : Dict[str, Any]
+            Arbitrary keyword arguments.
+        """
+        #  Init Frame
+        tk.Frame.__init__(self, cam_wave, *args, **kwargs)
+
+        #: int: The index of the tab.
+        self.index = 3
+
+        #: bool: The popup flag.
+        self.is_popup = False
+
+        #: bool: The docked flag.
+        self.is_docked = True
+
+        #: ttk.Frame: The frame that will hold the overview image.
+        self.cam_image = ttk.Frame(self)
+        self.cam_image.grid(row=0, column=0, rowspan=3, sticky=tk.NSEW)
+
+        #: int: The width of the canvas.
+        self.canvas_width = 512
+
+        #: int: The height of the canvas.
+        self.canvas_height = 512
+
+        #: tk.Canvas: The canvas that will hold the overview image.
+        self.canvas = tk.Canvas(
+            self.cam_image, width=self.canvas_width, height=self.canvas_height
+        )
+        self.canvas.grid(row=0, column=0, sticky=tk.NSEW, padx=5, pady=5)
+
+        #: IntensityFrame: The frame that will hold the scale settings/palette color.
+        self.lut = IntensityFrame(self)
+        self.lut.grid(row=0, column=1, sticky=tk.NSEW, padx=5, pady=5)
+
+        #: OverviewRenderFrame: The frame that will hold the display settings.
+        self.render = OverviewRenderFrame(self)
+        self.render.grid(row=1, column=1, sticky=tk.NSEW, padx=5, pady=5)
+
+
 class CameraTab(tk.Frame):
     """CameraTab class."""
 
@@ -376,6 +440,60 @@ class MipRenderFrame(ttk.Labelframe, CommonMethods):
         self.columnconfigure(0, weight=1)
 
 
+class OverviewRenderFrame(ttk.Labelframe, CommonMethods):
+    """This class is the frame that holds the overview display settings."""
+
+    def __init__(
+        self, overview_tab: OverviewTab, *args: Iterable, **kwargs: Dict[str, Any]
+    ) -> None:
+        """Initialize the OverviewRenderFrame class.
+
+        Parameters
+        ----------
+        overview_tab : OverviewTab
+            The frame that will hold the overview display settings.
+        *args : Iterable
+            Variable length argument list.
+        **kwargs : Dict[str, Any]
+            Arbitrary keyword arguments.
+        """
+        # Init Frame
+        text_label = "Image Display"
+        ttk.Labelframe.__init__(self, overview_tab, text=text_label, *args, **kwargs)
+
+        # Formatting
+        Grid.columnconfigure(self, "all", weight=1)
+        Grid.rowconfigure(self, "all", weight=1)
+
+        # Label Strings
+        channel = f"{'Channel':<11}"
+        resolution = f"{'µm/pixel':<11}"
+
+        #: dict: The dictionary that holds the widgets.
+        self.inputs = {
+            "channel": LabelInput(
+                parent=self,
+                label=channel,
+                input_class=ttk.Combobox,
+                input_var=tk.StringVar(),
+                input_args={"width": 5},
+            ),
+            "um_per_pixel": LabelInput(
+                parent=self,
+                label=resolution,
+                input_class=ValidatedSpinbox,
+                input_var=tk.DoubleVar(),
+                input_args={"from_": 0, "to": 1000, "increment": 1, "width": 5},
+            ),
+        }
+        self.inputs["channel"].widget.state(["!disabled", "readonly"])
+        self.inputs["channel"].grid(row=0, column=0, sticky=tk.EW, padx=3, pady=3)
+        self.inputs["um_per_pixel"].grid(
+            row=1, column=0, sticky=tk.EW, padx=3, pady=3
+        )
+        self.columnconfigure(0, weight=1)
+
+
 class WaveformTab(tk.Frame):
     """This class is the frame that holds the waveform tab."""
 
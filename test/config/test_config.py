@@ -64,12 +64,14 @@ def test_config_methods():
         "__package__",
         "__spec__",
         "build_nested_dict",
+        "build_proxy_object",
         "build_ref_name",
         "get_configuration_paths",
         "get_navigate_path",
         "isfile",
         "load_configs",
         "os",
+        "parse_yaml_file",
         "platform",
         "shutil",
         "sys",
@@ -358,6 +360,7 @@ class TestVerifyExperimentConfig(unittest.TestCase):
             "abs_z_start": 0.0,
             "abs_z_end": 100.0,
             "waveform_template": "Default",
+            "optimize_channel_order": False,
         }
 
         # multipositions_sample = [[10.0, 10.0, 10.0, 10.0, 10.0]]
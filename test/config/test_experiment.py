@@ -172,6 +172,7 @@ class TextExperimentFile(unittest.TestCase):
             "abs_z_start": float,
             "abs_z_end": float,
             "waveform_template": str,
+            "optimize_channel_order": bool,
         }
 
         self.parse_entries(section="MicroscopeState", expected_values=expected_values)
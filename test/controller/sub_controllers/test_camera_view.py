@@ -34,6 +34,7 @@
 from navigate.controller.sub_controllers.camera_view import CameraViewController
 import pytest
 import random
+import time
 from unittest.mock import MagicMock
 import numpy as np
 
@@ -787,6 +788,8 @@ class TestCameraViewController:
         self.camera_view.ilastik_seg_mask = None
         self.camera_view.ilastik_mask_ready_lock.acquire()
         mask = np.zeros((5, 5), dtype=np.uint8)
+        mask_buffer = np.stack([np.ones_like(mask), mask])
+        mask_pending = np.ones(2, dtype=np.uint8)
         self.camera_view.mask_color_table = np.zeros((256, 1, 3), dtype=np.uint8)
 
         # Define the monkeypatch
@@ -797,10 +800,11 @@ class TestCameraViewController:
         monkeypatch.setattr(cv2, "applyColorMap", mock_applyColorMap)
 
         # Call the function
-        self.camera_view.display_mask(mask)
+        self.camera_view.display_mask((mask_buffer, mask_pending, 1))
 
         # Assert the output
         assert (self.camera_view.ilastik_seg_mask == mask).all()
+        assert mask_pending.tolist() == [1, 0]
         assert not self.camera_view.ilastik_mask_ready_lock.locked()
 
     def test_update_canvas_size(self):
@@ -811,3 +815,91 @@ class TestCameraViewController:
 
         assert self.camera_view.canvas_width > 0
         assert self.camera_view.canvas_height > 0
+
+
+class TestOverviewViewController:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, dummy_controller):
+        from navigate.controller.sub_controllers.camera_view import (
+            OverviewViewController,
+        )
+        from navigate.model.analysis.overview import OverviewMosaic
+
+        c = dummy_controller
+        self.v = dummy_controller.view
+        self.overview_view = OverviewViewController(
+            self.v.camera_waveform.overview_tab, c
+        )
+        self.overview_view.overview = OverviewMosaic(
+            2, (0, 0), (2000, 1000), (500, 500), 2.0, shared=False
+        )
+        self.microscope_state = {
+            "channels": {
+                f"channel_{i}": {"is_selected": True} for i in range(1, 3)
+            },
+            "number_z_steps": 10,
+            "stack_cycling_mode": "per_stack",
+            "image_mode": "z-stack",
+        }
+        self.camera_parameters = {"img_x_pixels": 512, "img_y_pixels": 512}
+
+    def test_init(self):
+        assert self.overview_view.apply_cross_hair is False
+        assert "overview_display" in self.overview_view.parent_controller.configuration[
+            "gui"
+        ]
+
+    def test_initialize_non_live_display(self):
+        self.overview_view.initialize_non_live_display(
+            self.microscope_state, self.camera_parameters
+        )
+        assert self.overview_view.original_image_width == 1000
+        assert self.overview_view.original_image_height == 500
+        assert self.overview_view.get_channel_index() == 0
+        assert self.overview_view.image is None
+
+    def test_try_to_display_image(self, monkeypatch):
+        self.overview_view.initialize_non_live_display(
+            self.microscope_state, self.camera_parameters
+        )
+        self.overview_view.display_enabled.set(True)
+        display = MagicMock()
+        monkeypatch.setattr(self.overview_view, "display_image", display)
+
+        # Nothing new in the overview.
+        self.overview_view.revision = 0
+        self.overview_view.try_to_display_image(np.zeros((512, 512)))
+        display.assert_not_called()
+
+        self.overview_view.overview.add_tile(np.ones((512, 512)), 250, 250)
+        self.overview_view.try_to_display_image(np.zeros((512, 512)))
+        time.sleep(0.1)
+        display.assert_called_once()
+
+    def test_digital_zoom_uses_pyramid(self):
+        self.overview_view.initialize_non_live_display(
+            self.microscope_state, self.camera_parameters
+        )
+        self.overview_view.display_overview_image()
+        image = self.overview_view.digital_zoom()
+        # The display is smaller than the canvas, a coarser level is used.
+        assert image.shape[0] >= self.overview_view.canvas_height
+        assert image.shape[1] >= self.overview_view.canvas_width
+        assert image.shape[1] <= 1000
+
+    def test_pan(self):
+        self.overview_view.initialize_non_live_display(
+            self.microscope_state, self.camera_parameters
+        )
+        self.overview_view.display_overview_image()
+        self.overview_view.zoom_rect = np.array(
+            [
+                [-100, 2 * self.overview_view.canvas_width - 100],
+                [-100, 2 * self.overview_view.canvas_height - 100],
+            ]
+        )
+        self.overview_view.start_pan(MagicMock(x=10, y=10))
+        self.overview_view.pan(MagicMock(x=500, y=500))
+        # Panning stops at the edge of the overview.
+        assert self.overview_view.zoom_rect[0][0] == 0
+        assert self.overview_view.zoom_rect[1][0] == 0
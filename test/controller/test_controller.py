@@ -53,6 +53,7 @@ def controller(tk_root):
     controller.model = MagicMock()
     controller.threads_pool = MagicMock()
     controller.model.get_offset_variance_maps.return_value = (None, None)
+    controller.model.get_acquisition_plan.return_value = None
 
     yield controller
 
@@ -554,6 +555,46 @@ def test_capture_image(controller):
     assert True
 
 
+def test_capture_image_cancelled():
+    from navigate.controller.controller import Controller
+    from navigate.controller.thread_pool import PoolTask
+
+    count = 0
+
+    def get_image_id():
+        nonlocal count
+        count += 1
+        if count == 3:
+            task.cancel()
+        elif count > 10:
+            # the cancellation was missed, end the loop anyway
+            return "stop"
+        return count % 10
+
+    # capture_image only talks to the sub-controllers, so no Tk window is needed.
+    controller = MagicMock()
+    controller.configuration = {
+        "experiment": {
+            "MicroscopeState": {"microscope_name": "Mesoscale"},
+            "CameraParameters": {"Mesoscale": {}},
+        }
+    }
+    controller.plugin_acquisition_modes = {}
+    controller.data_buffer = numpy.random.rand(10, 16, 16)
+    controller.show_img_pipe.recv = get_image_id
+
+    # the model never sends "stop", the loop ends once the task is cancelled.
+    task = PoolTask(
+        "camera",
+        lambda: Controller.capture_image(controller, "acquire", "live"),
+    )
+    task.run()
+
+    assert count == 3
+    assert not task.is_alive()
+    controller.execute.assert_called_once_with("stop_acquire")
+
+
 def test_launch_additional_microscope():
     # This looks awful to test...
     pass
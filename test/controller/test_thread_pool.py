@@ -0,0 +1,172 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard Library Imports
+import threading
+import time
+
+# Third Party Imports
+import pytest
+
+# Local Imports
+from navigate.controller.thread_pool import (
+    SynchronizedThreadPool,
+    TaskCancelled,
+    get_cancellation_token,
+)
+
+
+@pytest.fixture
+def pool():
+    pool = SynchronizedThreadPool()
+    yield pool
+    pool.clear()
+
+
+def block(pool, resourceName, event):
+    """Block a resource until the event is set."""
+    started = threading.Event()
+
+    def target():
+        started.set()
+        event.wait(5)
+
+    task = pool.createThread(resourceName, target)
+    assert started.wait(5)
+    return task
+
+
+def test_tasks_run_in_order_on_one_worker(pool):
+    results = []
+    threads = set()
+
+    def target(i):
+        results.append(i)
+        threads.add(threading.current_thread())
+
+    tasks = [pool.createThread("model", target, args=(i,)) for i in range(20)]
+    for task in tasks:
+        assert task.join(5)
+
+    assert results == list(range(20))
+    # a single long-lived worker runs every task of a resource
+    assert len(threads) == 1
+    metrics = pool.getMetrics("model")
+    assert metrics["submitted"] == 20
+    assert metrics["completed"] == 20
+    assert metrics["run_time_total"] >= 0
+
+
+def test_resources_run_concurrently(pool):
+    event = threading.Event()
+    block(pool, "camera", event)
+    task = pool.createThread("model", lambda: None)
+    assert task.join(5)
+    event.set()
+
+
+def test_callback(pool):
+    results = []
+    task = pool.createThread(
+        "model",
+        results.append,
+        args=(1,),
+        callback=results.append,
+        cbArgs=(2,),
+    )
+    assert task.join(5)
+    assert results == [1, 2]
+
+
+def test_coalesce(pool):
+    results = []
+    event = threading.Event()
+    block(pool, "model", event)
+    tasks = [
+        pool.createThread("model", results.append, args=(i,), coalesceKey="x")
+        for i in range(5)
+    ]
+    last = pool.createThread("model", results.append, args=("y",))
+    event.set()
+    assert last.join(5)
+    assert results == [4, "y"]
+    assert all(task.token.cancelled for task in tasks[:-1])
+    assert pool.getMetrics("model")["cancelled"] == 4
+
+
+def test_remove_waiting_task(pool):
+    results = []
+    event = threading.Event()
+    running = block(pool, "model", event)
+    waiting = pool.createThread("model", results.append, args=(1,))
+    assert pool.getRunningThread("model") is running
+    assert pool.removeThread("model", waiting)
+    assert not pool.removeThread("model", waiting)
+    assert waiting.join(0)
+    event.set()
+    assert running.join(5)
+    assert results == []
+
+
+def test_cooperative_cancellation(pool):
+    started = threading.Event()
+    steps = []
+
+    def target():
+        token = get_cancellation_token()
+        started.set()
+        while True:
+            token.check()
+            steps.append(1)
+            time.sleep(0.001)
+
+    task = pool.createThread("model", target)
+    waiting = pool.createThread("model", steps.append, args=("never",))
+    assert started.wait(5)
+    pool.clear()
+    assert task.join(5)
+    assert waiting.join(0)
+    assert "never" not in steps
+    assert get_cancellation_token() is None
+
+    with pytest.raises(TaskCancelled):
+        task.token.check()
+
+
+def test_exception_does_not_stop_worker(pool):
+    def target():
+        raise RuntimeError("error")
+
+    pool.createThread("model", target)
+    task = pool.createThread("model", lambda: None)
+    assert task.join(5)
+    assert pool.getMetrics()["model"]["completed"] == 2
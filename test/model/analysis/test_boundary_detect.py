@@ -32,6 +32,7 @@
 import math
 
 import numpy as np
+import pytest
 
 
 def im_circ(r=1, N=128):
@@ -110,3 +111,189 @@ def test_map_boundary():
     assert map_boundary([[1, 2]]) == [(0, 1), (0, 2)]
     assert map_boundary([None, [1, 2]]) == [(1, 1), (1, 2)]
     assert map_boundary([None, [1, 2], None]) == [(1, 1), (1, 2)]
+
+
+def map_labels_reference(
+    labeled_image, position, z_start, z_step, x_direction, y_direction,
+    current_pixel_size, current_image_width, current_image_height,
+    target_pixel_size, target_image_width, target_image_height,
+    overlap=0.05, filter_pixel_number=10,
+):  # fmt: skip
+    """The loop based label mapping, to check the vectorized one against."""
+    from skimage import measure
+
+    x_index = 0 if x_direction[-1] == "x" else 1
+    x_align = -1 if x_direction[0] == "-" else 1
+    y_align = -1 if y_direction[0] == "-" else 1
+    x, y, z, theta, f = position
+    x_pixel = int(target_image_width * target_pixel_size / current_pixel_size)
+    y_pixel = int(target_image_height * target_pixel_size / current_pixel_size)
+    regionprops = measure.regionprops(labeled_image)
+
+    labels = []
+    for i, props in enumerate(regionprops):
+        min_z, min_y, min_x, max_z, max_y, max_x = props.bbox
+        if min(max_x - min_x, max_y - min_y) >= filter_pixel_number:
+            labels.append(i)
+    if not labels:
+        return 1, [], []
+
+    def centroid(i):
+        return regionprops[i].centroid[2], regionprops[i].centroid[1]
+
+    current = min(labels, key=lambda i: sum(centroid(i)))
+    path, unvisited = [current], [i for i in labels if i != current]
+    while unvisited:
+        cx, cy = centroid(current)
+        current = min(
+            unvisited,
+            key=lambda i: abs(centroid(i)[0] - cx) + abs(centroid(i)[1] - cy),
+        )
+        path.append(current)
+        unvisited.remove(current)
+
+    z_range, position_table = 1, []
+    for i in path:
+        min_z, min_y, min_x, max_z, max_y, max_x = regionprops[i].bbox
+        num_x = math.ceil((max_x - min_x) / (x_pixel * (1 - overlap)))
+        num_y = math.ceil((max_y - min_y) / (y_pixel * (1 - overlap)))
+        min_x -= (num_x * x_pixel - (max_x - min_x)) // 2
+        min_y -= (num_y * y_pixel - (max_y - min_y)) // 2
+        z_range = max(z_range, max_z - min_z)
+        x_start = position[x_index] + x_align * (
+            min_x + x_pixel / 2 - current_image_width // 2
+        ) * current_pixel_size
+        y_start = position[1 - x_index] + y_align * (
+            min_y + y_pixel / 2 - current_image_height // 2
+        ) * current_pixel_size
+        x_step = x_align * x_pixel * (1 - overlap) * current_pixel_size
+        y_step = y_align * y_pixel * (1 - overlap) * current_pixel_size
+        for j in range(num_x):
+            for k in range(num_y):
+                x_pos = x_start + x_step if j else x_start
+                y_pos = y_start + y_step if k else y_start
+                xy = [x_pos, y_pos] if x_index == 0 else [y_pos, x_pos]
+                position_table.append(xy + [z + z_start + min_z * z_step, theta, f])
+    return z_range, position_table, path
+
+
+@pytest.mark.parametrize("x_direction, y_direction", [("x", "y"), ("-y", "x")])
+def test_map_labels(x_direction, y_direction):
+    from skimage import measure
+    from navigate.model.analysis.boundary_detect import map_labels
+
+    rng = np.random.default_rng(3)
+    for _ in range(5):
+        image = np.zeros((8, 256, 256), dtype=bool)
+        for _ in range(rng.integers(1, 30)):
+            z0, y0, x0 = rng.integers(0, [6, 240, 240])
+            dz, dy, dx = rng.integers(1, [4, 60, 60])
+            image[z0 : z0 + dz, y0 : y0 + dy, x0 : x0 + dx] = True
+        labeled_image = measure.label(image)
+        kwargs = {
+            "labeled_image": labeled_image,
+            "position": [100.0, 200.0, 50.0, 0.0, 10.0],
+            "z_start": -5,
+            "z_step": 2.0,
+            "x_direction": x_direction,
+            "y_direction": y_direction,
+            "current_pixel_size": 6.5,
+            "current_image_width": 256,
+            "current_image_height": 256,
+            "target_pixel_size": 0.5,
+            "target_image_width": 128,
+            "target_image_height": 128,
+            "overlap": 0.1,
+        }
+
+        z_range, position_table, labels = map_labels(**kwargs)
+        expected = map_labels_reference(**kwargs)
+        assert z_range == expected[0]
+        assert labels == expected[2]
+        np.testing.assert_allclose(position_table, expected[1])
+
+
+def test_map_labels_no_labels():
+    from navigate.model.analysis.boundary_detect import map_labels
+
+    labeled_image = np.zeros((4, 64, 64), dtype=int)
+    labeled_image[1, 10:12, 10:12] = 1
+    args = [labeled_image, [0, 0, 0, 0, 0], 0, 1, "x", "y", 6.5, 64, 64, 0.5, 32, 32]
+    assert map_labels(*args, filter_pixel_number=5) == (1, [], [])
+
+    args[9] = 7.0
+    assert map_labels(*args) == (1, [[0, 0, 0, 0, 0]], [0])
+
+
+def test_nearest_neighbour_path():
+    from navigate.model.analysis.boundary_detect import nearest_neighbour_path
+
+    rng = np.random.default_rng(0)
+    points = rng.integers(0, 20, (300, 2)).astype(float)
+    path = nearest_neighbour_path(points, 5)
+    assert sorted(path) == list(range(len(points)))
+
+    current, unvisited = 5, set(range(len(points))) - {5}
+    for i in path[1:]:
+        distances = np.abs(points - points[current]).sum(axis=1)
+        closest = min(unvisited, key=lambda j: (distances[j], j))
+        assert i == closest
+        current = i
+        unvisited.remove(i)
+
+
+def synthetic_blobs(shape, number_of_blobs, seed=0):
+    """Noisy uint16 volume of bright spheres, every other one hollow."""
+    rng = np.random.default_rng(seed)
+    z, y, x = np.indices(shape)
+    image = rng.normal(100, 10, shape)
+    for i in range(number_of_blobs):
+        center = rng.uniform(0, shape)
+        radius = rng.uniform(4, 10)
+        distance = np.sqrt(((np.stack([z, y, x], -1) - center) ** 2).sum(-1))
+        blob = distance < radius
+        if i % 2:
+            blob &= distance > radius - 2
+        image[blob] += 1000
+    return image.clip(0, 2**16 - 1).astype(np.uint16)
+
+
+@pytest.mark.parametrize("slab_size", [1, 3, 16])
+def test_find_cell_boundary_3d_chunked(slab_size):
+    from navigate.model.analysis.boundary_detect import (
+        find_cell_boundary_3d,
+        find_cell_boundary_3d_chunked,
+    )
+
+    image = synthetic_blobs((24, 64, 64), 12)
+    expected = find_cell_boundary_3d(image)
+    labels = find_cell_boundary_3d_chunked(image, slab_size=slab_size, max_workers=4)
+    assert expected.max() > 1
+    np.testing.assert_array_equal(labels, expected)
+
+    image = image.astype(np.float32)
+    labels = find_cell_boundary_3d_chunked(image, slab_size=slab_size)
+    np.testing.assert_array_equal(labels, find_cell_boundary_3d(image))
+
+
+def test_find_cell_boundary_3d_chunked_constant():
+    from navigate.model.analysis.boundary_detect import (
+        find_cell_boundary_3d,
+        find_cell_boundary_3d_chunked,
+    )
+
+    image = np.full((5, 16, 16), 7, dtype=np.uint16)
+    labels = find_cell_boundary_3d_chunked(image, slab_size=2)
+    np.testing.assert_array_equal(labels, find_cell_boundary_3d(image))
+
+
+def test_find_cell_boundary_3d_chunked_downsample():
+    from navigate.model.analysis.boundary_detect import find_cell_boundary_3d_chunked
+
+    image = synthetic_blobs((16, 63, 65), 6, seed=1)
+    expected = find_cell_boundary_3d_chunked(image)
+    labels = find_cell_boundary_3d_chunked(image, downsample=2, histogram_step=3)
+    assert labels.shape == image.shape
+    assert labels.max() > 0
+    # most of the pixels are in the same foreground or background
+    assert np.mean((labels > 0) == (expected > 0)) > 0.95
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+
+def reference_correction(image, offset, flatfield):
+    corrected = np.clip(image.astype(float) - offset, 0, None) / flatfield
+    return np.clip(corrected, 0, 2**16 - 1)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_camera_correction_matches_float(workers):
+    from navigate.model.analysis.camera_correction import CameraCorrection
+
+    shape = (150, 70)
+    offset = np.random.randint(90, 110, shape, dtype=np.uint16)
+    flatfield = np.random.uniform(0.5, 1.0, shape)
+    image = np.random.randint(0, 2**16, shape, dtype=np.uint16)
+    image[:5] = 0  # darker than the offset
+    image[-5:] = 2**16 - 1
+    flatfield[-5:] = 0.5  # saturates after the gain
+    expected = reference_correction(image, offset, flatfield)
+
+    correction = CameraCorrection(
+        offset, flatfield, workers=workers, band_height=32
+    )
+    out = correction(image)
+    correction.close()
+
+    assert out is image and image.dtype == np.uint16
+    assert np.all(image[:5] == 0)
+    assert np.all(image[-5:] == 2**16 - 1)
+    # within the fixed-point resolution of the gain
+    np.testing.assert_allclose(image, expected, rtol=2**-11, atol=1)
+
+
+def test_camera_correction_partial_maps():
+    from navigate.model.analysis.camera_correction import (
+        CameraCorrection,
+        flatfield_gain_table,
+    )
+
+    image = np.full((8, 8), 1000, dtype=np.uint16)
+    assert not CameraCorrection().is_active
+    assert CameraCorrection()(image) is image
+
+    CameraCorrection(offset=np.full((8, 8), 100.0))(image)
+    assert np.all(image == 900)
+
+    flatfield = np.full((8, 8), 0.5)
+    flatfield[0, 0] = 0
+    assert flatfield_gain_table(flatfield)[0, 0] == 2**12
+    CameraCorrection(flatfield=flatfield)(image)
+    assert image[0, 0] == 900 and np.all(image.ravel()[1:] == 1800)
+
+    with pytest.raises(ValueError):
+        CameraCorrection(offset=np.zeros((8, 8)), flatfield=np.ones((4, 4)))
+    with pytest.raises(ValueError):
+        CameraCorrection(offset=np.zeros((4, 4)))(image)
+
+
+def test_camera_correction_crop():
+    from navigate.model.analysis.camera_correction import CameraCorrection
+
+    offset = np.arange(64, dtype=np.uint16).reshape(8, 8)
+    correction = CameraCorrection(offset=offset, flatfield=np.ones((8, 8)))
+    roi = correction.crop(2, 4, 4, 2)
+    assert roi.shape == (4, 2)
+    np.testing.assert_array_equal(roi.offset, offset[2:6, 4:6])
+
+    image = np.full((4, 2), 100, dtype=np.uint16)
+    roi(image)
+    np.testing.assert_array_equal(image, 100 - offset[2:6, 4:6])
+
+    with pytest.raises(ValueError):
+        correction.crop(6, 0, 4, 4)
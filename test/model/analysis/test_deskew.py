@@ -0,0 +1,114 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from navigate.model.analysis.deskew import StreamingDeskew
+
+
+def reference_deskew(volume, factor, displaced, source, shape):
+    """Shear every voxel on its own, with linear interpolation."""
+    out = np.zeros(shape)
+    shifts = factor * np.arange(volume.shape[source])
+    shifts -= min(shifts.min(), 0)
+    for index in itertools.product(*map(range, volume.shape)):
+        shift = shifts[index[source]]
+        integer = int(np.floor(shift))
+        fraction = shift - integer
+        target = list(index)
+        target[displaced] += integer
+        out[tuple(target)] += (1 - fraction) * volume[index]
+        if fraction > 0:
+            target[displaced] += 1
+            out[tuple(target)] += fraction * volume[index]
+    return out
+
+
+def deskew_stack(deskew, volume):
+    planes = []
+    deskew.sink = planes.append
+    for image in volume:
+        deskew.push(image)
+    return np.stack(planes)
+
+
+@pytest.mark.parametrize("displaced,source", list(itertools.permutations("zyx", 2)))
+@pytest.mark.parametrize("factor", [0.7, -1.3, 2.0, 0])
+def test_deskew_matches_reference(displaced, source, factor):
+    volume = np.random.randint(0, 1000, (5, 6, 7)).astype(np.uint16)
+    deskew = StreamingDeskew(
+        *volume.shape, factor, displaced=displaced, source=source, dtype="float32"
+    )
+    out = deskew_stack(deskew, volume)
+
+    assert out.shape == deskew.shape
+    expected = reference_deskew(
+        volume.astype(float),
+        factor,
+        "zyx".index(displaced),
+        "zyx".index(source),
+        deskew.shape,
+    )
+    np.testing.assert_allclose(out, expected, atol=1e-3)
+
+
+def test_deskew_window_is_bounded():
+    volume = np.random.randint(0, 1000, (50, 8, 4)).astype(np.uint16)
+    deskew = StreamingDeskew(*volume.shape, 0.5, displaced="z", source="y")
+    assert deskew.depth == 5
+    assert deskew.window.shape == (5, 8, 4)
+
+    planes = []
+    deskew.sink = planes.append
+    # Every plane completes one output plane, the last one flushes the rest.
+    assert [deskew.push(image) for image in volume[:3]] == [1, 1, 1]
+    for image in volume[3:]:
+        deskew.push(image)
+    assert len(planes) == deskew.shape[0] == 54
+    assert deskew.is_complete
+
+    # The next stack starts from an empty window.
+    assert np.array_equal(deskew_stack(deskew, volume), np.stack(planes))
+
+
+def test_deskew_flush_stopped_stack():
+    volume = np.random.randint(0, 1000, (10, 8, 4)).astype(np.uint16)
+    deskew = StreamingDeskew(*volume.shape, 1, displaced="z", source="y")
+    planes = []
+    deskew.sink = planes.append
+    for image in volume[:4]:
+        deskew.push(image)
+    assert len(planes) == 4
+    assert deskew.flush() == 7
+    assert deskew.flush() == 0
+    assert deskew.is_complete
+
+
+def test_deskew_rounds_and_clips():
+    volume = np.full((3, 4, 4), 65535, dtype=np.uint16)
+    deskew = StreamingDeskew(*volume.shape, 0.5, displaced="y", source="z")
+    out = deskew_stack(deskew, volume)
+    assert out.dtype == np.uint16
+    # Overlapping contributions saturate instead of wrapping around.
+    assert out.max() == 65535
+    assert out[1, 0, 0] == 32768
+
+
+def test_deskew_from_shear_transform():
+    from navigate.tools.linear_algebra import affine_shear
+
+    transform = affine_shear(2.0, 1.0, 1.0, dimension="YZ", angle=60)[:3]
+    deskew = StreamingDeskew.from_shear_transform(transform, 4, 6, 5)
+    assert (deskew.displaced, deskew.source) == (1, 0)
+    assert deskew.factor == pytest.approx(1.0)
+    assert deskew.shape == (4, 9, 5)
+    np.testing.assert_array_equal(deskew.shift_index, [0, 1, 2, 3])
+
+    identity = StreamingDeskew.from_shear_transform(np.eye(3, 4), 4, 6, 5)
+    assert identity.shape == (4, 6, 5)
+
+    transform[0, 1] = 0.5
+    with pytest.raises(ValueError):
+        StreamingDeskew.from_shear_transform(transform, 4, 6, 5)
+    with pytest.raises(ValueError):
+        StreamingDeskew(4, 6, 5, 1.0, displaced="y", source="y")
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("stack_cycling_mode", ["per_stack", "per_z", None])
+def test_mip_accumulator_matches_numpy(stack_cycling_mode):
+    from navigate.model.analysis.mip import MIPAccumulator
+
+    n_c, n_z, n_y, n_x = 2, 5, 150, 70
+    stack = np.random.randint(0, 2**16, (n_c, n_z, n_y, n_x), dtype=np.uint16)
+
+    mip = MIPAccumulator(n_c, n_z, n_y, n_x, stack_cycling_mode, shared=False)
+    mip.band_height = 32
+
+    for frame in range(n_c * n_z):
+        c, z = mip.locate(frame)
+        assert mip.add_frame(stack[c, z]) == (c, z)
+
+    if stack_cycling_mode is None:
+        # Every frame is placed in channel 0.
+        n_c = 1
+
+    for c in range(n_c):
+        np.testing.assert_array_equal(mip.xy[c], stack[c].max(axis=0))
+        np.testing.assert_array_equal(mip.zy[c], stack[c].max(axis=1))
+        np.testing.assert_array_equal(mip.zx[c], stack[c].max(axis=2))
+
+
+def test_mip_accumulator_channel_order():
+    from navigate.model.analysis.mip import MIPAccumulator
+
+    mip = MIPAccumulator(3, 2, 8, 8, "per_z", shared=False)
+    mip.channel_order = [0, 2, 1]
+    assert [mip.locate(frame) for frame in range(4)] == [
+        (0, 0),
+        (2, 0),
+        (1, 0),
+        (0, 1),
+    ]
+
+
+def test_mip_accumulator_restarts_each_stack():
+    from navigate.model.analysis.mip import MIPAccumulator
+
+    mip = MIPAccumulator(1, 2, 8, 8)
+    mip.add_frame(np.full((8, 8), 100, dtype=np.uint16))
+    mip.add_frame(np.full((8, 8), 50, dtype=np.uint16))
+    assert np.all(mip.xy[0] == 100)
+
+    # first slice of the next stack overwrites the XY projection
+    mip.add_frame(np.full((8, 8), 10, dtype=np.uint16))
+    assert np.all(mip.xy[0] == 10)
+    assert np.all(mip.zy[0, 0] == 10) and np.all(mip.zy[0, 1] == 50)
+
+
+def test_mip_accumulator_shared_memory():
+    import pickle
+    from navigate.model.analysis.mip import MIPAccumulator
+
+    mip = MIPAccumulator(2, 3, 16, 32)
+    assert mip.matches(2, 3, 16, 32)
+    assert not mip.matches(1, 3, 16, 32)
+
+    copy = pickle.loads(pickle.dumps(mip))
+    mip.update(np.ones((16, 32), dtype=np.uint16) * 7, 1, 2)
+    assert np.all(copy.xy[1] == 7)
+    assert np.all(copy.zx[1, 2] == 7)
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from navigate.model.analysis.overview import OverviewMosaic
+
+
+@pytest.fixture
+def overview():
+    return OverviewMosaic(
+        2,
+        origin=(0, 0),
+        extent=(300, 200),
+        tile_size=(100, 100),
+        um_per_pixel=1.0,
+        shared=False,
+    )
+
+
+def test_overview_pyramid(overview):
+    assert overview.shape == (2, 200, 300)
+    assert [level.shape for level in overview.levels] == [
+        (2, 200, 300),
+        (2, 100, 150),
+        (2, 50, 75),
+        (2, 25, 38),
+    ]
+
+
+def test_overview_resolution_is_capped():
+    overview = OverviewMosaic(
+        1, (0, 0), (10000, 5000), (100, 100), 1.0, max_size=1000, shared=False
+    )
+    assert overview.um_per_pixel == 10
+    assert overview.shape == (1, 500, 1000)
+
+
+def test_overview_add_tile(overview):
+    image = np.random.randint(100, 1000, (256, 256)).astype(np.uint16)
+    region = overview.add_tile(image, 50, 50, channel=1)
+    assert region == (0, 0, 100, 100)
+    assert overview.revision[0] == 1
+
+    canvas = overview.levels[0]
+    np.testing.assert_array_equal(
+        canvas[1, :100, :100], overview.downsample(image, 100, 100)
+    )
+    assert not canvas[0].any()
+    assert not canvas[1, 100:].any() and not canvas[1, :, 100:].any()
+
+    # Coarser levels are the 2x2 means of the finer ones.
+    expected = canvas[1, :100, :100].reshape(50, 2, 50, 2).mean(axis=(1, 3))
+    np.testing.assert_allclose(overview.levels[1][1, :50, :50], expected, atol=1)
+    assert overview.levels[3][1].max() > 0
+
+
+def test_overview_blends_and_clips(overview):
+    dim = np.full((100, 100), 10, dtype=np.uint16)
+    bright = np.full((100, 100), 50, dtype=np.uint16)
+    overview.add_tile(bright, 100, 100)
+    overview.add_tile(dim, 150, 100)
+    canvas = overview.levels[0][0]
+    assert canvas[100, 75] == 50
+    assert canvas[100, 175] == 10
+
+    # Partially outside of the canvas.
+    assert overview.add_tile(dim, 290, 190) == (140, 240, 200, 300)
+    assert overview.add_tile(dim, 1000, 1000) is None
+    assert overview.revision[0] == 3
+
+
+def test_overview_flip():
+    overview = OverviewMosaic(
+        1, (0, 0), (100, 100), (100, 100), 1.0, flip_x=True, shared=False
+    )
+    image = np.zeros((100, 100), dtype=np.uint16)
+    image[:, 0] = 100
+    overview.add_tile(image, 50, 50)
+    assert overview.levels[0][0, :, -1].min() == 100
+    assert not overview.levels[0][0, :, 0].any()
+
+
+def test_overview_region(overview):
+    # The coarsest level with at least as many pixels as the display.
+    assert overview.region(0, 0, 0, 200, 300, 50, 70).shape == (50, 75)
+    assert overview.region(0, 0, 0, 200, 300, 200, 300).shape == (200, 300)
+    assert overview.region(0, 10, 10, 30, 30, 50, 50).shape == (20, 20)
+
+
+def test_overview_parameters_from_configuration():
+    configuration = {
+        "experiment": {
+            "MicroscopeState": {
+                "zoom": "N/A",
+                "is_multiposition": True,
+            },
+            "CameraParameters": {"scope": {"x_pixels": 100, "y_pixels": 50}},
+            "StageParameters": {"x": 0, "y": 0},
+        },
+        "configuration": {
+            "microscopes": {
+                "scope": {
+                    "zoom": {"pixel_size": {"N/A": 2.0}},
+                    "camera": {"flip_x": True},
+                }
+            }
+        },
+        "multi_positions": [[0, 0, 0, 0, 0], [1000, -500, 0, 0, 0]],
+    }
+    parameters = OverviewMosaic.parameters_from_configuration(
+        configuration, "scope", 3
+    )
+    assert parameters["tile_size"] == (200, 100)
+    assert parameters["origin"] == (-100, -550)
+    assert parameters["extent"] == (1200, 600)
+    assert parameters["um_per_pixel"] == 200 / 128
+    assert parameters["flip_x"] and not parameters["flip_y"]
+
+    overview = OverviewMosaic(**parameters, shared=False)
+    assert overview.matches(**parameters)
+    assert not overview.matches(**{**parameters, "um_per_pixel": 5})
+
+    configuration["experiment"]["MicroscopeState"]["is_multiposition"] = False
+    parameters = OverviewMosaic.parameters_from_configuration(
+        configuration, "scope", 3, um_per_pixel=4
+    )
+    assert parameters["extent"] == (200, 100)
+    assert parameters["um_per_pixel"] == 4
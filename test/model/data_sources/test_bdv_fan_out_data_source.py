@@ -0,0 +1,127 @@
+import os
+
+import pytest
+import numpy as np
+import h5py
+
+
+def fan_out_ds(fn, route_by, per_stack=True, shared=True, **kw):
+    from navigate.model.concurrency.concurrency_tools import SharedNDArray
+    from navigate.model.data_sources.bdv_fan_out_data_source import (
+        BigDataViewerFanOutDataSource,
+    )
+
+    kw.setdefault("max_pending", 2)
+    ds = BigDataViewerFanOutDataSource(fn, route_by=route_by, **kw)
+    ds.set_metadata(
+        {"x": 24, "y": 16, "c": 2, "z": 3, "t": 2, "p": 3, "per_stack": per_stack}
+    )
+
+    n_images = ds.shape_c * ds.shape_z * ds.shape_t * ds.positions
+    data = np.random.randint(0, 2**16, (n_images, 16, 24)).astype("uint16")
+    # Larger than the number of planes queued for the writers.
+    buffer = SharedNDArray(shape=(8, 16, 24), dtype="uint16")
+    indices = []
+    for i in range(n_images):
+        indices.append(ds._cztp_indices(i, per_stack))
+        if shared:
+            # Flipped views of the frame buffer are passed by reference.
+            buffer[i % 8] = data[i, ::-1, :]
+            image = buffer[i % 8][::-1, :]
+        else:
+            image = data[i]
+        ds.write(image, x=i, y=0, z=0, theta=0, f=0)
+    # The writers may still be reading the frame buffer, so keep it alive.
+    return ds, data, indices, buffer
+
+
+@pytest.mark.parametrize("route_by", ["position", "channel"])
+@pytest.mark.parametrize("per_stack", [True, False])
+def test_fan_out_h5(tmp_path, route_by, per_stack):
+    fn = str(tmp_path / "test.h5")
+    ds, data, indices, buffer = fan_out_ds(fn, route_by, per_stack, processes=2)
+    setups = ds.writer_setups()
+    ds.close()
+
+    assert len(setups) == 2
+    for index, owned in enumerate(setups):
+        assert os.path.exists(str(tmp_path / f"test-{index:02}.h5"))
+        with h5py.File(str(tmp_path / f"test-{index:02}.h5"), "r") as f:
+            assert sorted(int(k[1:]) for k in f.keys() if k[0] == "s") == owned
+    assert os.path.exists(str(tmp_path / "test.xml"))
+
+    with h5py.File(fn, "r") as f:
+        assert f["s00/resolutions"].shape == (1, 3)
+        for i, (c, z, t, p) in enumerate(indices):
+            setup = c * ds.positions + p
+            np.testing.assert_array_equal(
+                f[f"t{t:05}/s{setup:02}/0/cells"][z], data[i]
+            )
+
+
+@pytest.mark.parametrize("route_by", ["position", "channel"])
+def test_fan_out_n5(tmp_path, route_by):
+    from navigate.model.data_sources.bdv_data_source import BigDataViewerDataSource
+
+    fn = str(tmp_path / "test.n5")
+    ds, data, indices, buffer = fan_out_ds(fn, route_by, shared=False, processes=4)
+    assert ds.number_of_writers == (3 if route_by == "position" else 2)
+    ds.close()
+    assert os.path.exists(str(tmp_path / "test.xml"))
+
+    # The writers share the container, which matches one written by a single
+    # process.
+    expected_fn = str(tmp_path / "expected.n5")
+    expected = BigDataViewerDataSource(expected_fn)
+    expected.set_metadata(
+        {"x": 24, "y": 16, "c": 2, "z": 3, "t": 2, "p": 3, "per_stack": True}
+    )
+    for image in data:
+        expected.write(image)
+    expected.close()
+
+    setups = [f"setup{i}" for i in range(ds.shape_c * ds.positions)]
+    assert sorted(os.listdir(fn)) == sorted(setups + ["attributes.json"])
+    for setup in setups:
+        for root, _, files in os.walk(os.path.join(expected_fn, setup)):
+            for name in files:
+                path = os.path.relpath(os.path.join(root, name), expected_fn)
+                with open(os.path.join(expected_fn, path), "rb") as f:
+                    expected_bytes = f.read()
+                with open(os.path.join(fn, path), "rb") as f:
+                    assert f.read() == expected_bytes, path
+
+
+def test_fan_out_read_back(tmp_path):
+    from navigate.model.data_sources.bdv_data_source import BigDataViewerDataSource
+
+    fn = str(tmp_path / "test.h5")
+    ds, data, indices, buffer = fan_out_ds(fn, "position", max_pending=1)
+    ds.close()
+
+    ds = BigDataViewerDataSource(fn, "r")
+    assert (ds.shape_c, ds.shape_z, ds.shape_t, ds.positions) == (2, 3, 2, 3)
+    for i, (c, z, t, p) in enumerate(indices):
+        np.testing.assert_array_equal(
+            ds.get_slice(slice(None), slice(None), c, z, t, p), data[i]
+        )
+    ds.close()
+
+
+def test_fan_out_writer_error(tmp_path):
+    fn = str(tmp_path / "test.h5")
+    ds, _, _, buffer = fan_out_ds(fn, "position", shared=False)
+    process, tasks = ds._writers[0]
+    tasks.put((np.zeros((16, 24), dtype="uint16"), 0, 0, 5, 0))
+    with pytest.raises(Exception, match="writer failed"):
+        ds.close()
+    assert ds._writers == []
+
+
+def test_fan_out_route_by():
+    from navigate.model.data_sources.bdv_fan_out_data_source import (
+        BigDataViewerFanOutDataSource,
+    )
+
+    with pytest.raises(ValueError):
+        BigDataViewerFanOutDataSource("test.h5", route_by="time")
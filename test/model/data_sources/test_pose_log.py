@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pytest
+
+
+def fill(pose_log, n):
+    poses = np.random.rand(n, 5) * 1e3
+    for i in range(n):
+        pose_log.append(
+            i,
+            channel=i % 3,
+            slice=i // 3,
+            x=poses[i, 0],
+            y=poses[i, 1],
+            z=poses[i, 2],
+            theta=poses[i, 3],
+            f=poses[i, 4],
+        )
+    return poses
+
+
+@pytest.mark.parametrize("n", [0, 1, 7, 8, 50])
+def test_pose_log_in_memory(n):
+    from navigate.model.data_sources.pose_log import PoseLog, POSE_AXES
+
+    pose_log = PoseLog(block_size=8, max_blocks=100)
+    poses = fill(pose_log, n)
+
+    assert len(pose_log) == n
+    assert pose_log.spill_path is None
+    records = pose_log.records()
+    assert len(records) == n
+    np.testing.assert_array_equal(records["frame"], np.arange(n))
+    np.testing.assert_array_equal(records["channel"], np.arange(n) % 3)
+    for j, axis in enumerate(POSE_AXES):
+        np.testing.assert_array_equal(pose_log[axis], poses[:, j])
+    for i in range(n):
+        assert pose_log[i]["x"] == poses[i, 0]
+    if n > 0:
+        assert pose_log[-1]["frame"] == n - 1
+    with pytest.raises(IndexError):
+        pose_log[n]
+
+
+def test_pose_log_spill():
+    from navigate.model.data_sources.pose_log import PoseLog
+
+    pose_log = PoseLog(block_size=8, max_blocks=2)
+    poses = fill(pose_log, 40)
+
+    spill_path = pose_log.spill_path
+    assert os.path.exists(spill_path)
+    # at most max_blocks blocks are held in memory
+    assert len(pose_log._blocks) <= 2
+
+    # indexing works across the spilled and in-memory records
+    for i in range(40):
+        assert pose_log[i]["frame"] == i
+        assert pose_log[i]["y"] == poses[i, 1]
+
+    records = pose_log.records()
+    assert isinstance(records, np.memmap)
+    np.testing.assert_array_equal(records["z"], poses[:, 2])
+
+    # the log keeps growing after being read
+    fill(pose_log, 5)
+    assert len(pose_log) == 45
+    np.testing.assert_array_equal(pose_log["frame"][40:], np.arange(5))
+    np.testing.assert_array_equal(PoseLog.load(spill_path)["frame"][:40], range(40))
+
+    pose_log.close()
+    assert not os.path.exists(spill_path)
+    assert len(pose_log) == 0
+
+
+def test_pose_log_keeps_sidecar(tmp_path):
+    from navigate.model.data_sources.pose_log import PoseLog
+
+    spill_path = str(tmp_path / "test.poses")
+    pose_log = PoseLog(block_size=4, max_blocks=1, spill_path=spill_path)
+    poses = fill(pose_log, 10)
+    pose_log.flush()
+    pose_log.close()
+
+    records = PoseLog.load(spill_path)
+    np.testing.assert_array_equal(records["theta"], poses[:, 3])
+
+
+def test_bdv_metadata_from_pose_log():
+    from navigate.model.data_sources.pose_log import PoseLog
+    from navigate.model.metadata_sources.bdv_metadata import BigDataViewerMetadata
+
+    md = BigDataViewerMetadata()
+    md.shape_t, md.positions, md.shape_c, md.shape_z = 1, 2, 2, 3
+
+    pose_log = PoseLog(block_size=4, max_blocks=1)
+    fill(pose_log, 10)
+    views = [
+        {axis: pose_log[i][axis] for axis in ("x", "y", "z", "theta", "f")}
+        for i in range(len(pose_log))
+    ]
+
+    np.testing.assert_allclose(
+        md.bdv_view_affine_matrices(pose_log), md.bdv_view_affine_matrices(views)
+    )
+    pose_log.close()
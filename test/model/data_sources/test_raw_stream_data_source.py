@@ -0,0 +1,164 @@
+import os
+import json
+
+import pytest
+import numpy as np
+
+
+def raw_ds(fn, per_stack=True, stop=None, **kw):
+    from navigate.model.data_sources.raw_stream_data_source import (
+        RawStreamDataSource,
+    )
+
+    ds = RawStreamDataSource(fn, **kw)
+    ds.set_metadata(
+        {"x": 30, "y": 20, "c": 2, "z": 3, "t": 2, "p": 2, "per_stack": per_stack}
+    )
+    n_images = ds.shape_c * ds.shape_z * ds.shape_t * ds.positions
+    if stop is not None:
+        n_images = stop
+    data = np.random.randint(0, 2**16, (n_images, 20, 30)).astype("uint16")
+    indices = []
+    for i in range(n_images):
+        indices.append(ds._cztp_indices(i, per_stack))
+        # Flipped views are written like the image writer passes them.
+        ds.write(data[i, ::-1, :][::-1, :], x=i, y=2 * i, z=0, theta=0, f=0)
+    return ds, data, indices
+
+
+@pytest.mark.parametrize("per_stack", [True, False])
+@pytest.mark.parametrize("stripes", [0, 2])
+def test_raw_write_read(tmp_path, per_stack, stripes):
+    from navigate.model.data_sources.raw_stream_data_source import (
+        RawStreamDataSource,
+        PAGE_SIZE,
+    )
+
+    fn = str(tmp_path / "test.raw")
+    directories = [str(tmp_path / f"stripe{i}") for i in range(stripes)]
+    ds, data, indices = raw_ds(fn, per_stack, stripe_directories=directories)
+
+    # Frames are page aligned and the files were preallocated.
+    assert ds.frame_stride % PAGE_SIZE == 0
+    assert ds.frame_stride >= 20 * 30 * 2
+    assert sum(os.path.getsize(x) for x in ds.stripes) == ds.nbytes
+    ds.close()
+
+    assert len(ds.stripes) == stripes + 1
+    for i, stripe in enumerate(ds.stripes):
+        frames = len(range(i, len(data), len(ds.stripes)))
+        assert os.path.getsize(stripe) == frames * ds.frame_stride
+
+    ds = RawStreamDataSource(fn, mode="r")
+    assert ds.frames == len(data)
+    assert ds.shape == (30, 20, 2, 3, 2)
+    for i, (c, z, t, p) in enumerate(indices):
+        np.testing.assert_array_equal(ds.get_frame(i), data[i])
+        assert ds.get_frame_index(c, z, t, p) == i
+        assert ds.poses[i]["x"] == i
+        assert ds.poses[i]["y"] == 2 * i
+    stack = ds.get_data(timepoint=1, position=1, channel=1)
+    assert stack.shape == (3, 20, 30)
+    np.testing.assert_array_equal(
+        stack[2], data[ds.get_frame_index(1, 2, 1, 1)]
+    )
+    ds.close()
+
+
+def test_raw_stop_early(tmp_path):
+    from navigate.model.data_sources.raw_stream_data_source import (
+        RawStreamDataSource,
+    )
+
+    fn = str(tmp_path / "test.raw")
+    ds, data, _ = raw_ds(fn, stop=5)
+    ds.close()
+
+    # The space preallocated for the frames that were not acquired is released.
+    assert os.path.getsize(fn) == 5 * ds.frame_stride
+    with open(str(tmp_path / "test.json")) as f:
+        header = json.load(f)
+    assert header["frames"] == 5
+    assert header["stripes"] == ["test.raw"]
+
+    ds = RawStreamDataSource(fn, mode="r")
+    assert ds.get_data(channel=1).shape == (2, 20, 30)
+    assert ds.get_data(position=1) is None
+    with pytest.raises(IndexError):
+        ds.get_frame(5)
+    ds.close()
+
+
+def test_raw_direct_io(tmp_path):
+    from navigate.model.data_sources.raw_stream_data_source import (
+        RawStreamDataSource,
+    )
+
+    # Falls back to cached writes where O_DIRECT is not supported.
+    fn = str(tmp_path / "test.raw")
+    ds, data, _ = raw_ds(fn, direct_io=True)
+    ds.close()
+
+    ds = RawStreamDataSource(fn, mode="r")
+    for i in range(len(data)):
+        np.testing.assert_array_equal(ds.get_frame(i), data[i])
+    ds.close()
+
+
+@pytest.mark.parametrize("per_stack", [True, False])
+def test_convert_raw_stream_h5(tmp_path, per_stack):
+    from navigate.model.data_sources.bdv_data_source import BigDataViewerDataSource
+    from navigate.model.data_sources.raw_stream_data_source import (
+        convert_raw_stream,
+    )
+
+    fn = str(tmp_path / "test.raw")
+    ds, data, indices = raw_ds(
+        fn, per_stack, stripe_directories=[str(tmp_path / "stripe")]
+    )
+    ds.close()
+
+    output = convert_raw_stream(fn, "H5", remove=True)
+    assert output == str(tmp_path / "test.h5")
+    assert not os.path.exists(fn)
+    assert not os.path.exists(str(tmp_path / "stripe" / "test-01.raw"))
+
+    ds = BigDataViewerDataSource(output, "r")
+    assert (ds.shape_c, ds.shape_z, ds.shape_t, ds.positions) == (2, 3, 2, 2)
+    for i, (c, z, t, p) in enumerate(indices):
+        np.testing.assert_array_equal(
+            ds.get_slice(slice(None), slice(None), c, z, t, p), data[i]
+        )
+    ds.close()
+
+
+def test_convert_raw_stream_tiff(tmp_path):
+    import tifffile
+    from navigate.model.data_sources.raw_stream_data_source import (
+        convert_raw_stream,
+    )
+
+    fn = str(tmp_path / "test.raw")
+    ds, data, indices = raw_ds(fn, stop=8)
+    ds.close()
+
+    convert_raw_stream(fn, "TIFF")
+    assert os.path.exists(fn)
+
+    # Stopped during the first stack of the second position.
+    def read(name):
+        return tifffile.imread(str(tmp_path / name)).reshape(-1, 20, 30)
+
+    np.testing.assert_array_equal(read("CH00_000000.tiff"), data[:3])
+    np.testing.assert_array_equal(read("CH01_000000.tiff"), data[3:6])
+    np.testing.assert_array_equal(read("CH00_000001.tiff"), data[6:8])
+
+
+def test_get_data_source():
+    from navigate.model.data_sources import get_data_source, FILE_TYPES
+    from navigate.model.data_sources.raw_stream_data_source import (
+        RawStreamDataSource,
+    )
+
+    assert "Raw" in FILE_TYPES
+    assert get_data_source("Raw") is RawStreamDataSource
@@ -106,3 +106,89 @@ def test_tiff_write_read(is_ome, multiposition, per_stack, z_stack, stop_early):
         raise e
     finally:
         delete_folder("test_save_dir")
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_tiff_reader(compression):
+    import numpy as np
+    import tifffile
+
+    from navigate.model.data_sources.tiff_data_source import TiffReader
+
+    if not os.path.exists("test_save_dir"):
+        os.mkdir("test_save_dir")
+    fn = "./test_save_dir/test_reader.tif"
+    data = (np.random.rand(5, 16, 24) * 2**16).astype(np.uint16)
+    tifffile.imwrite(fn, data, compression=compression, photometric="minisblack")
+
+    try:
+        plane_size = data[0].nbytes
+        reader = TiffReader(tifffile.TiffFile(fn), cache_size=2 * plane_size)
+        assert (reader.memmap is not None) == (compression is None)
+        assert reader.shape == data.shape
+
+        np.testing.assert_equal(np.asarray(reader), data)
+        np.testing.assert_equal(reader[3], data[3])
+        np.testing.assert_equal(reader[1:4], data[1:4])
+        np.testing.assert_equal(reader[:], data)
+        np.testing.assert_equal(reader[2, 4:9], data[2, 4:9])
+        np.testing.assert_equal(reader[2, 4:9, 3], data[2, 4:9, 3])
+        np.testing.assert_equal(reader[0:5:2, :, 5:10], data[0:5:2, :, 5:10])
+        assert reader["a"] is None
+
+        # decoded pages are evicted once the cache is full
+        assert reader._cached_bytes <= 2 * plane_size
+        assert len(reader._pages) <= 2
+
+        # returned data does not alias the cache
+        reader[1][:] = 0
+        np.testing.assert_equal(reader[1], data[1])
+        reader.close()
+    finally:
+        delete_folder("test_save_dir")
+
+
+def test_tiff_get_data_reuses_files():
+    import numpy as np
+    import tifffile
+
+    from navigate.model.data_sources.tiff_data_source import TiffDataSource
+
+    position_dir = os.path.join("test_save_dir", "Position0")
+    os.makedirs(position_dir, exist_ok=True)
+    data = (np.random.rand(4, 8, 8) * 2**16).astype(np.uint16)
+    for ch in range(3):
+        tifffile.imwrite(
+            os.path.join(position_dir, f"CH{ch:02d}_000000.tiff"),
+            data,
+            photometric="minisblack",
+        )
+
+    try:
+        ds = TiffDataSource("./test_save_dir/test.tiff")
+        ds.max_open_files = 2
+        stack = ds.get_data(channel=0)
+        reader = ds.get_reader(stack.filename)
+        assert stack.reader is reader
+        assert stack.shape == data.shape
+        np.testing.assert_equal(ds.get_data(channel=0, z=2), data[2])
+        assert ds.get_data(channel=0, z=4) is None
+        assert ds.get_data(channel=5) is None
+
+        # least recently used files are closed
+        ds.get_data(channel=1)[0]
+        ds.get_data(channel=2)[0]
+        assert len(ds._readers) == 2
+        assert reader.tiff.filehandle.closed
+
+        # the z-stack is reopened on demand
+        np.testing.assert_equal(stack[1], data[1])
+        np.testing.assert_equal(np.asarray(stack), data)
+
+        ds.close()
+        assert len(ds._readers) == 0
+        np.testing.assert_equal(stack[3], data[3])
+        ds.close()
+        assert len(ds._readers) == 0
+    finally:
+        delete_folder("test_save_dir")
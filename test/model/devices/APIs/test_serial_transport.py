@@ -0,0 +1,146 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+# Standard Library Imports
+import time
+
+# Third Party Imports
+import pytest
+
+# Local Imports
+from navigate.model.devices.APIs.serial_transport import (
+    LatencyHistogram,
+    SerialTransport,
+)
+from navigate.model.devices.APIs.serial_emulator import (
+    ASIEmulator,
+    SutterMP285Emulator,
+)
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    for seconds in [0.001] * 98 + [0.5, 2.0]:
+        histogram.add(seconds)
+    assert histogram.count == 100
+    assert histogram.max == 2.0
+    assert histogram.mean == pytest.approx((0.098 + 2.5) / 100)
+    assert 0.001 <= histogram.percentile(50) < 0.002
+    assert histogram.percentile(100) >= 2.0
+
+
+def test_transport_query_many():
+    emulator = ASIEmulator(axes=["X", "Y"])
+    emulator.open()
+    transport = SerialTransport(emulator)
+
+    # terminators are not doubled
+    assert transport.query("MOVE X=10 Y=20\r").strip() == ":A"
+    assert emulator.written == [b"MOVE X=10 Y=20\r"]
+
+    responses = transport.query_many(["WHERE X", "WHERE Y", "FOO"])
+    assert [r.strip() for r in responses] == [":A 10.0", ":A 20.0", ":N-1"]
+    assert len(emulator.written) == 2
+    assert transport.latency["WHERE"].count == 2
+    assert "WHERE" in transport.latency_report("ASI")
+
+
+def test_transport_timeout():
+    emulator = ASIEmulator(timeout=0.01)
+    transport = SerialTransport(emulator)
+    transport.write("MOVE X=1")
+    transport.read()
+    # the emulator does not answer an empty read
+    assert transport.read() == ""
+    assert transport.latency[""].timeouts == 1
+
+
+def test_tiger_controller_with_emulator():
+    from navigate.model.devices.APIs.asi.asi_tiger_controller import (
+        TigerController,
+        TigerException,
+    )
+
+    emulator = ASIEmulator(axes=["X", "Y", "Z", "M"], move_time=0.05)
+    controller = TigerController("COM1", 115200)
+    controller.serial_port = emulator
+    controller.connect_to_serial()
+    assert controller.default_axes_sequence == ["X", "Y", "Z", "M"]
+
+    controller.move({"X": 100, "M": -50})
+    assert controller.is_moving()
+    start = time.perf_counter()
+    controller.wait_for_device(timeout=1.0)
+    assert time.perf_counter() - start < 0.5
+    assert not controller.is_moving()
+    assert controller.get_position(["X", "M"]) == {"X": 100.0, "M": -50.0}
+
+    writes = len(emulator.written)
+    controller.set_feedback_alignment("X", 75)
+    assert len(emulator.written) == writes + 1
+
+    with pytest.raises(TigerException):
+        controller.move_axis("Q", 1)
+    assert controller.transport.latency["MOVE"].count == 2
+
+
+def test_ms2000_controller_with_emulator():
+    from navigate.model.devices.APIs.asi.asi_MS2000_controller import (
+        MS2000Controller,
+    )
+
+    emulator = ASIEmulator(axes=["X", "Y", "Z"])
+    controller = MS2000Controller("COM1", 115200)
+    controller.serial_port = emulator
+    controller.connect_to_serial()
+
+    start = time.perf_counter()
+    for i in range(20):
+        controller.move_axis("Z", i)
+    # no fixed pause after every command
+    assert time.perf_counter() - start < 0.5
+    assert controller.get_axis_position("Z") == 19.0
+
+
+def test_mp285_with_emulator():
+    from navigate.model.devices.APIs.sutter.MP285 import MP285
+
+    emulator = SutterMP285Emulator(timeout=0.25)
+    stage = MP285("COM1", 9600)
+    stage.serial = emulator
+    stage.connect_to_serial()
+
+    assert stage.set_resolution_and_velocity(1000, "high")
+    assert emulator.velocity == 32768 + 1000
+    assert stage.move_to_specified_position(10.0, -20.0, 4.0)
+    assert emulator.position == [250, -500, 100]
+    assert stage.get_current_position() == (10.0, -20.0, 4.0)
@@ -76,3 +76,61 @@ def test_daq_ni_functions():
             getattr(daq, f)(*a)
         else:
             getattr(daq, f)()
+
+
+def test_volts_to_int16():
+    import numpy as np
+    from navigate.model.devices.daq.ni import volts_to_int16
+
+    waveform = np.array([-20.0, -1.0, 0.0, 0.5, 1.0])
+    out = np.zeros(12, dtype=np.int16)
+    volts_to_int16(waveform, [1.0, 3276.8], out, np.empty(12))
+
+    expected = np.clip(np.rint(waveform * 3276.8 + 1), -32768, 32767)
+    np.testing.assert_array_equal(out, np.tile(expected, 3)[:12])
+
+
+def test_daq_ni_analog_output_buffers():
+    from unittest.mock import MagicMock, patch
+    import numpy as np
+    from navigate.model.devices.daq import ni
+    from test.model.dummy import DummyModel
+
+    model = DummyModel()
+    daq = ni.NIDAQ(model.configuration)
+    daq.sample_rate = 1000
+    daq.sweep_times = {"channel_1": 0.01}
+    daq.waveform_expand_num = 2
+    daq.waveform_repeat_num = 1
+    waveforms = {
+        "Dev1/ao0": np.linspace(-1, 1, 10),
+        "Dev1/ao1": np.linspace(0, 2, 10),
+    }
+    for k, v in waveforms.items():
+        daq.analog_outputs[k] = {"trigger_source": None, "waveform": {"channel_1": v}}
+
+    task = MagicMock()
+    channel = MagicMock(ao_dev_scaling_coeff=[0.0, 1000.0])
+    task.ao_channels.__iter__.return_value = [channel, channel]
+    writer = MagicMock()
+    with patch.object(ni.nidaqmx, "Task", return_value=task), patch.object(
+        ni, "AnalogUnscaledWriter", return_value=writer
+    ), patch.object(ni, "volts_to_int16", wraps=ni.volts_to_int16) as convert:
+        daq.create_analog_output_tasks("channel_1")
+        assert convert.call_count == 2
+        data = writer.write_int16.call_args[0][0]
+        assert data.dtype == np.int16 and data.shape == (2, 20)
+        for i, v in enumerate(waveforms.values()):
+            np.testing.assert_array_equal(data[i], np.tile(np.rint(v * 1000), 2))
+
+        # only the changed waveform is converted again, in the same buffer
+        daq.current_channel_key = "channel_1"
+        new_waveform = np.full(10, 0.25)
+        daq.analog_outputs["Dev1/ao1"]["waveform"] = {"channel_1": new_waveform}
+        daq.update_analog_task("Dev1")
+        assert convert.call_count == 3
+        assert writer.write_int16.call_args[0][0] is data
+        np.testing.assert_array_equal(data[1], np.full(20, 250))
+        np.testing.assert_array_equal(
+            data[0], np.tile(np.rint(waveforms["Dev1/ao0"] * 1000), 2)
+        )
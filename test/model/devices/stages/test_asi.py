@@ -33,6 +33,7 @@
 # Standard Library Imports
 import pytest
 import random
+from unittest.mock import patch
 
 # Third Party Imports
 
@@ -61,8 +62,13 @@ class MockASIStage:
     def reset_output_buffer(self):
         self.output_buffer = []
 
-    def write(self, command):
-        command = command.decode(encoding="ascii")[:-1]
+    def write(self, commands):
+        # several commands can be sent with one write
+        for command in commands.decode(encoding="ascii").split("\r"):
+            if command:
+                self.handle_command(command)
+
+    def handle_command(self, command):
         temps = command.split()
         command = temps[0]
         if command == "WHERE":
@@ -148,17 +154,15 @@ class TestStageASI:
         port = self.stage_configuration["stage"]["hardware"]["port"]
         baudrate = self.stage_configuration["stage"]["hardware"]["baudrate"]
 
-        # Patch TigerController.get_default_motor_axis_sequence
-        TigerController.get_default_motor_axis_sequence = lambda self: [
-            "X",
-            "Y",
-            "Z",
-            "M",
-            "N",
-        ]
         asi_stage = TigerController(port, baudrate)
         asi_stage.serial_port = self.asi_serial_device
-        asi_stage.connect_to_serial()
+        # Patch TigerController.get_default_motor_axis_sequence
+        with patch.object(
+            TigerController,
+            "get_default_motor_axis_sequence",
+            return_value=["X", "Y", "Z", "M", "N"],
+        ):
+            asi_stage.connect_to_serial()
         return asi_stage
 
     def test_stage_attributes(self):
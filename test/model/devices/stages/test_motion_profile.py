@@ -0,0 +1,159 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+# Standard Library Imports
+import time
+
+# Third Party Imports
+import pytest
+
+# Local Imports
+from navigate.model.devices.stages.motion_profile import MotionProfile
+
+
+def test_motion_profile_duration():
+    profile = MotionProfile(
+        velocity={"x": 1000, "y": 1000},
+        acceleration={"x": 10000},
+        settle={"x": 0.01, "y": 0.02},
+    )
+    # triangular: the axis never reaches its velocity
+    assert profile.axis_duration("x", 10) == pytest.approx(2 * (10 / 10000) ** 0.5)
+    # trapezoidal: ramp up, cruise and ramp down
+    assert profile.axis_duration("x", -1000) == pytest.approx(1.1)
+    # no acceleration, no velocity
+    assert profile.axis_duration("y", 500) == pytest.approx(0.5)
+    assert profile.axis_duration("z", 500) == 0
+
+    assert profile.predict({}) == 0
+    assert profile.predict({"x": 0, "y": 0}) == 0
+    assert profile.limiting_axis({"x": 1000, "y": 500}) == "x"
+    assert profile.predict({"x": 1000, "y": 500}) == pytest.approx(1.11)
+    assert profile.predict({"x": 10, "y": 500}) == pytest.approx(0.52)
+
+
+def test_motion_profile_from_config():
+    profile = MotionProfile.from_config({}, ["x", "y"])
+    assert profile.velocity == {} and profile.predict({"x": 10}) == 0
+
+    config = {
+        "motion_profile": {
+            "velocity": 2000,
+            "acceleration": {"x": 5000},
+            "settle_ms": {"y": 5},
+            "poll_fraction": 0.5,
+        }
+    }
+    profile = MotionProfile.from_config(config, ["x", "y"])
+    assert profile.velocity == {"x": 2000.0, "y": 2000.0}
+    assert profile.acceleration == {"x": 5000.0}
+    assert profile.settle == {"y": 0.005}
+    assert profile.poll_fraction == 0.5
+
+
+def test_motion_profile_wait():
+    profile = MotionProfile(velocity={"x": 1000})
+    move_time = 0.15
+    start = time.perf_counter()
+    polls = []
+
+    def is_busy():
+        polls.append(time.perf_counter() - start)
+        return time.perf_counter() - start < move_time
+
+    elapsed = profile.wait({"x": 100}, is_busy, poll_interval=0.001)
+    assert elapsed >= move_time
+    # sleeps most of the predicted 100 ms before the first poll
+    assert polls[0] >= 0.08
+    # the model learns that the axis is slower than predicted
+    assert profile.scale["x"] > 1
+    assert profile.predict({"x": 100}) > 0.1
+
+    # without a busy check the predicted duration is slept
+    profile = MotionProfile(settle={"x": 0.02})
+    assert profile.wait({"x": 1}) >= 0.02
+    assert profile.wait({"x": 0}) < 0.02
+
+
+def test_motion_profile_wait_timeout():
+    profile = MotionProfile(velocity={"x": 1000})
+    elapsed = profile.wait({"x": 10}, lambda: True, timeout=0.05)
+    assert 0.05 <= elapsed < 0.5
+    assert "x" not in profile.scale
+
+
+def test_asi_stage_motion_profile():
+    from navigate.model.devices.stages.asi import ASIStage
+    from navigate.model.devices.APIs.asi.asi_tiger_controller import TigerController
+    from navigate.model.devices.APIs.serial_emulator import ASIEmulator
+
+    emulator = ASIEmulator(axes=["X", "Y", "Z", "M"], move_time=0.1)
+    controller = TigerController("COM1", 115200)
+    controller.serial_port = emulator
+    controller.connect_to_serial()
+
+    configuration = {
+        "configuration": {
+            "microscopes": {
+                "Mesoscale": {
+                    "stage": {
+                        "hardware": {
+                            "axes": ["x", "y", "z"],
+                            "axes_mapping": ["X", "Y", "Z"],
+                        },
+                        "x_min": -1000,
+                        "x_max": 1000,
+                        "y_min": -1000,
+                        "y_max": 1000,
+                        "z_min": -1000,
+                        "z_max": 1000,
+                    },
+                    "zoom": {"pixel_size": {"1x": 1.0}},
+                }
+            }
+        }
+    }
+    stage = ASIStage("Mesoscale", controller, configuration)
+
+    # velocities come from the controller speeds, 90% of the maximum
+    assert stage.motion_profile.velocity["x"] == pytest.approx(900 * 1000)
+    assert stage.motion_profile.acceleration["x"] == pytest.approx(900 * 1000 / 0.07)
+
+    stage.motion_profile.velocity = {"x": 1000.0, "y": 1000.0}
+    stage.motion_profile.acceleration = {}
+    writes = len(emulator.written)
+    start = time.perf_counter()
+    assert stage.move_absolute({"x_abs": 100, "y_abs": 20}, wait_until_done=True)
+    assert time.perf_counter() - start >= 0.1
+    assert not controller.is_device_busy()
+    # the status is only polled near the end of the move
+    assert len(emulator.written) - writes < 40
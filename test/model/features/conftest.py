@@ -79,6 +79,12 @@ class RecordObj:
         self.record_list.append((self.name_list, args, kwargs))
 
 
+class MicroscopeRecordObj(RecordObj):
+    def __init__(self, available_channels, *args):
+        super().__init__("active_microscope", *args)
+        self.available_channels = available_channels
+
+
 class DummyModelToTestFeatures:
     def __init__(self, configuration):
         self.configuration = configuration
@@ -99,6 +105,26 @@ class DummyModelToTestFeatures:
         self.signal_records = []
         self.data_records = []
 
+        # channels in acquisition order, the selected channels if None
+        self.available_channels = None
+
+    @property
+    def active_microscope(self):
+        available_channels = self.available_channels
+        if available_channels is None:
+            channels = self.configuration["experiment"]["MicroscopeState"]["channels"]
+            available_channels = [
+                int(k[len("channel_") :])
+                for k, v in channels.items()
+                if v["is_selected"]
+            ]
+        return MicroscopeRecordObj(
+            available_channels,
+            self.signal_records,
+            self.frame_id,
+            self.frame_id_completed,
+        )
+
     def signal_func(self):
         self.signal_container.reset()
         while not self.signal_container.end_flag:
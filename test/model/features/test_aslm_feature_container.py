@@ -965,6 +965,138 @@ class TestFeatureContainer(unittest.TestCase):
         assert feature.running_times_main_func == 6
         assert data_container.end_flag == True
 
+    def test_asynchronous_data_node(self):
+        records = []
+        release = threading.Event()
+
+        def main_func(frame_ids, name="async", raise_error=False):
+            release.wait(5)
+            if raise_error:
+                raise Exception
+            records.append((name, frame_ids[0], threading.current_thread().name))
+            return True
+
+        steps = {"count": 0}
+
+        def end_func():
+            steps["count"] += 1
+            return steps["count"] >= 2
+
+        # one-step asynchronous node followed by a synchronous node
+        node1 = DataNode(
+            "async_node",
+            {"init": dummy_True, "pre-main": dummy_True, "main": main_func},
+            asynchronous=True,
+        )
+        node2 = DataNode(
+            "sync_node",
+            {
+                "init": dummy_True,
+                "pre-main": dummy_True,
+                "main": lambda frame_ids: main_func(frame_ids, "sync"),
+            },
+        )
+        node1.sibling = node2
+        data_container = DataContainer(node1)
+
+        data_container.run([0])
+        assert len(data_container.pending) == 1
+        assert data_container.curr_node == node1
+        release.set()
+        data_container.pending[0][0].result()
+        data_container.run([1])
+        # the result is collected first, the next node runs on the same frames
+        assert [r[:2] for r in records] == [("async", 0), ("sync", 0)]
+        assert records[0][2].startswith("DataNode async_node")
+        assert records[1][2] == threading.current_thread().name
+        assert data_container.end_flag is True
+        data_container.cleanup()
+        assert node1.executor is None
+
+        # multi-step asynchronous node, as without asynchronous nodes the next
+        # node runs on the last frame, then on the frames queued after the end
+        records.clear()
+        release.clear()
+        node1 = DataNode(
+            "async_node",
+            {
+                "init": dummy_True,
+                "pre-main": dummy_True,
+                "main": main_func,
+                "end": end_func,
+            },
+            node_type="multi-step",
+            asynchronous=True,
+        )
+        node2 = DataNode(
+            "sync_node",
+            {
+                "init": dummy_True,
+                "pre-main": dummy_True,
+                "main": lambda frame_ids: main_func(frame_ids, "sync"),
+                "end": lambda: False,
+            },
+            node_type="multi-step",
+        )
+        node1.sibling = node2
+        data_container = DataContainer(node1, lease_frames=4)
+        for i in range(4):
+            data_container.run([i])
+        assert len(data_container.pending) == 4
+        release.set()
+        # the result of frame 0 is waited for when its frames are 4 frames old
+        data_container.run([4])
+        assert [r[:2] for r in records] == [
+            ("async", 0),
+            ("async", 1),
+            ("sync", 1),
+            ("sync", 2),
+            ("sync", 3),
+            ("sync", 4),
+        ]
+        assert data_container.curr_node == node2
+        assert node1.is_initialized is False
+        data_container.cleanup()
+
+        # an exception marks a one-step asynchronous node
+        records.clear()
+        node1 = DataNode(
+            "async_node",
+            {
+                "init": dummy_True,
+                "pre-main": dummy_True,
+                "main": lambda frame_ids: main_func(frame_ids, raise_error=True),
+            },
+            asynchronous=True,
+        )
+        node2 = DataNode(
+            "sync_node",
+            {
+                "init": dummy_True,
+                "pre-main": dummy_True,
+                "main": lambda frame_ids: main_func(frame_ids, "sync"),
+            },
+        )
+        node1.sibling = node2
+        data_container = DataContainer(node1, lease_frames=1)
+        data_container.run([0])
+        data_container.run([1])
+        assert node1.is_marked is True
+        assert [r[:2] for r in records] == [("sync", 0)]
+        assert data_container.end_flag is True
+        data_container.cleanup()
+
+    def test_load_asynchronous_feature(self):
+        model = DummyModel()
+        feature_list = [
+            {"name": WaitToContinue, "node": {"asynchronous": True}},
+            {"name": LoopByCount},
+        ]
+        _, data_container = load_features(model, feature_list)
+        assert data_container.root.asynchronous is True
+        assert data_container.root.sibling.asynchronous is False
+        assert data_container.lease_frames == model.number_of_frames // 2
+
 
 if __name__ == "__main__":
     unittest.main()
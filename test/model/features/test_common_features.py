@@ -44,6 +44,7 @@ class TestZStack:
         self.config = self.model.configuration["experiment"]["MicroscopeState"]
         self.record_num = 0
         self.feature_list = [[{"name": ZStackAcquisition}]]
+        self.model.available_channels = None
 
         self.config["start_position"] = 0
         self.config["end_position"] = 200
@@ -85,6 +86,10 @@ class TestZStack:
             if self.config["channels"][channel_key]["is_selected"]:
                 selected_channels.append(dict(self.config["channels"][channel_key]))
                 selected_channels[-1]["id"] = int(channel_key[len("channel_") :])
+        if self.model.available_channels is not None:
+            selected_channels.sort(
+                key=lambda c: self.model.available_channels.index(c["id"])
+            )
 
         # restore z and f
         pos_dict = self.model.get_stage_position()
@@ -474,3 +479,25 @@ class TestZStack:
         self.z_stack_verification()
 
         self.config["is_multiposition"] = False
+
+    @pytest.mark.parametrize("stack_cycling_mode", ["per_stack", "per_z"])
+    def test_optimized_channel_order_defocus(self, stack_cycling_mode):
+        # each channel keeps its own focus offset when it is acquired out of
+        # configuration order
+        self.config["is_multiposition"] = False
+        self.model.configuration["configuration"]["microscopes"][
+            self.config["microscope_name"]
+        ]["stage"]["has_ni_galvo_stage"] = False
+        self.config["stack_cycling_mode"] = stack_cycling_mode
+        defocus = {}
+        for i, channel_key in enumerate(["channel_1", "channel_2", "channel_3"]):
+            self.config["channels"][channel_key]["is_selected"] = True
+            defocus[channel_key] = self.config["channels"][channel_key]["defocus"]
+            self.config["channels"][channel_key]["defocus"] = 10.0 * (i + 1) ** 2
+        self.model.available_channels = [3, 1, 2]
+        try:
+            self.model.start(self.feature_list)
+            self.z_stack_verification()
+        finally:
+            for channel_key, value in defocus.items():
+                self.config["channels"][channel_key]["defocus"] = value
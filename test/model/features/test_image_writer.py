@@ -46,3 +46,207 @@ def test_image_write(image_writer):
     assert ls
 
     delete_folder("test_save_dir")
+
+
+def test_image_write_exposure(image_writer):
+    import numpy as np
+
+    channels = image_writer.model.configuration["experiment"]["MicroscopeState"][
+        "channels"
+    ]
+    exposure_times = [
+        float(channel["camera_exposure_time"])
+        for channel in channels.values()
+        if channel["is_selected"]
+    ]
+    assert image_writer.exposure_times == exposure_times
+
+    data_source = image_writer.data_source
+    frames = min(image_writer.shape_z, image_writer.model.number_of_frames)
+    image_writer.save_image(list(range(frames)))
+
+    poses = data_source._views
+    assert len(poses) == frames
+    np.testing.assert_array_equal(
+        poses["exposure"], np.array(exposure_times)[poses["channel"]]
+    )
+
+    delete_folder("test_save_dir")
+
+
+def test_image_write_deskew(dummy_model):
+    from numpy.random import rand
+    from navigate.model.features.image_writer import ImageWriter
+
+    model = dummy_model
+    model.configuration["experiment"]["Saving"]["save_directory"] = "test_save_dir"
+    model.configuration["experiment"]["MicroscopeState"]["image_mode"] = "z-stack"
+    model.configuration["experiment"]["MicroscopeState"]["number_z_steps"] = 5
+    model.configuration["experiment"]["MicroscopeState"][
+        "stack_cycling_mode"
+    ] = "per_stack"
+    model.configuration["experiment"]["BDVParameters"] = {
+        "shear": {
+            "shear_data": True,
+            "shear_dimension": "YZ",
+            "shear_angle": 45,
+            "deskew": True,
+        },
+        "rotate": {"rotate_data": False},
+    }
+    writer = ImageWriter(model)
+    try:
+        assert writer.deskew is not None
+        assert writer.data_source.shape_z == writer.shape_z
+        assert writer.data_source.shape_y == writer.deskew.shape[1]
+        assert writer.data_source.shape_y > model.img_height
+
+        for i in range(model.data_buffer.shape[0]):
+            model.data_buffer[i, ...] = rand(model.img_width, model.img_height)
+        frames = min(writer.shape_z, model.number_of_frames)
+        writer.save_image(list(range(frames)))
+
+        # One deskewed plane is written per acquired plane.
+        assert writer.data_source._current_frame == frames
+    finally:
+        writer.close()
+        delete_folder("test_save_dir")
+
+
+def test_image_write_fan_out(dummy_model):
+    import h5py
+    import numpy as np
+    from navigate.model.features.image_writer import ImageWriter
+    from navigate.model.data_sources.bdv_fan_out_data_source import (
+        BigDataViewerFanOutDataSource,
+    )
+
+    model = dummy_model
+    experiment = model.configuration["experiment"]
+    file_type = experiment["Saving"]["file_type"]
+    experiment["Saving"]["save_directory"] = "test_save_dir"
+    experiment["Saving"]["file_type"] = "H5"
+    experiment["MicroscopeState"]["image_mode"] = "z-stack"
+    experiment["MicroscopeState"]["number_z_steps"] = 5
+    experiment["BDVParameters"] = {
+        "shear": {"shear_data": False},
+        "rotate": {"rotate_data": False},
+        "fan_out": {"processes": 2, "route_by": "channel"},
+    }
+    writer = None
+    try:
+        writer = ImageWriter(model)
+        assert isinstance(writer.data_source, BigDataViewerFanOutDataSource)
+        assert writer.data_source.max_pending == model.number_of_frames // 2
+
+        for i in range(model.data_buffer.shape[0]):
+            model.data_buffer[i, ...] = i
+        frames = min(writer.shape_z, model.number_of_frames)
+        data_source = writer.data_source
+        names = []
+        for i in range(frames):
+            c, z, t, p = data_source._cztp_indices(i, data_source.metadata.per_stack)
+            setup = c * data_source.positions + p
+            names.append((f"t{t:05}/s{setup:02}/0/cells", z))
+        writer.save_image(list(range(frames)))
+        writer.close()
+
+        with h5py.File(data_source.file_name, "r") as f:
+            for i, (name, z) in enumerate(names):
+                assert np.all(f[name][z] == i)
+    finally:
+        if writer is not None:
+            writer.close()
+        experiment["Saving"]["file_type"] = file_type
+        experiment["BDVParameters"] = {
+            "shear": {"shear_data": False},
+            "rotate": {"rotate_data": False},
+        }
+        delete_folder("test_save_dir")
+
+
+def test_image_write_raw_stream(dummy_model):
+    import numpy as np
+    from navigate.model.features.image_writer import ImageWriter
+    from navigate.model.data_sources.bdv_data_source import BigDataViewerDataSource
+    from navigate.model.data_sources.raw_stream_data_source import (
+        RawStreamDataSource,
+    )
+
+    model = dummy_model
+    saving = model.configuration["experiment"]["Saving"]
+    file_type = saving["file_type"]
+    saving["save_directory"] = "test_save_dir"
+    saving["file_type"] = "Raw"
+    saving["raw_stripe_directories"] = [os.path.join("test_save_dir", "stripe")]
+    saving["raw_convert_to"] = "H5"
+    model.configuration["experiment"]["MicroscopeState"]["image_mode"] = "z-stack"
+    model.configuration["experiment"]["MicroscopeState"]["number_z_steps"] = 5
+    writer = None
+    try:
+        writer = ImageWriter(model)
+        data_source = writer.data_source
+        assert isinstance(data_source, RawStreamDataSource)
+        assert len(data_source.stripe_directories) == 1
+
+        for i in range(model.data_buffer.shape[0]):
+            model.data_buffer[i, ...] = i
+        frames = min(writer.shape_z, model.number_of_frames)
+        indices = [
+            data_source._cztp_indices(i, data_source.metadata.per_stack)
+            for i in range(frames)
+        ]
+        writer.save_image(list(range(frames)))
+        writer.close()
+
+        # The conversion runs after the acquisition.
+        writer.conversion.join(60)
+        assert writer.conversion.exitcode == 0
+        converted = BigDataViewerDataSource(
+            os.path.splitext(data_source.file_name)[0] + ".h5", "r"
+        )
+        for i, (c, z, t, p) in enumerate(indices):
+            image = converted.get_slice(slice(None), slice(None), c, z, t, p)
+            assert np.all(image == i)
+        converted.close()
+    finally:
+        if writer is not None:
+            writer.close()
+        saving["file_type"] = file_type
+        for key in ["raw_stripe_directories", "raw_convert_to"]:
+            saving.pop(key)
+        delete_folder("test_save_dir")
+
+
+def test_image_write_raw_stream_conversion_failed(dummy_model, caplog):
+    import logging
+
+    from navigate.model.features.image_writer import ImageWriter
+
+    model = dummy_model
+    saving = model.configuration["experiment"]["Saving"]
+    file_type = saving["file_type"]
+    saving["save_directory"] = "test_save_dir"
+    saving["file_type"] = "Raw"
+    saving["raw_convert_to"] = "H5"
+    model.configuration["experiment"]["MicroscopeState"]["image_mode"] = "z-stack"
+    model.configuration["experiment"]["MicroscopeState"]["number_z_steps"] = 5
+    writer = None
+    try:
+        writer = ImageWriter(model)
+        writer.save_image(list(range(min(writer.shape_z, model.number_of_frames))))
+
+        # the raw stream header is gone by the time the stream is converted
+        writer.data_source.close()
+        os.remove(writer.data_source.header_file_name)
+        with caplog.at_level(logging.ERROR):
+            writer.convert_raw_stream()
+            assert writer.wait_for_conversion(60)
+        assert writer.conversion.exitcode != 0
+        assert "failed with exit code" in caplog.text
+    finally:
+        if writer is not None:
+            writer.close()
+        saving["file_type"] = file_type
+        saving.pop("raw_convert_to")
+        delete_folder("test_save_dir")
@@ -36,6 +36,8 @@ import base64
 import unittest
 import json
 import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, Mock, MagicMock
 from io import BytesIO
 
@@ -46,7 +48,10 @@ import numpy as np
 from navigate.model.features.restful_features import (
     prepare_service,
     IlastikSegmentation,
+    pack_frames,
+    unpack_frames,
 )
+from navigate.model.concurrency.concurrency_tools import SharedNDArray
 
 
 class TestPrepareService(unittest.TestCase):
@@ -59,7 +64,7 @@ class TestPrepareService(unittest.TestCase):
             "mymodule"
         )  # Replace with the actual logger name used
 
-    @patch("navigate.model.features.restful_features.requests.get")
+    @patch("requests.get")
     def test_prepare_service_success(self, mock_get):
         expected_response = {"status": "success", "data": "segmentation data"}
         mock_response = Mock()
@@ -72,7 +77,7 @@ class TestPrepareService(unittest.TestCase):
         self.assertEqual(response, expected_response)
         mock_get.assert_called_once_with(self.expected_url)
 
-    @patch("navigate.model.features.restful_features.requests.get")
+    @patch("requests.get")
     def test_prepare_service_failure(self, mock_get):
         mock_response = Mock()
         mock_response.status_code = 404
@@ -127,11 +132,12 @@ class TestIlastikSegmentation(unittest.TestCase):
         self.mock_model.display_ilastik_segmentation = True
         self.mock_model.mark_ilastik_position = False
         self.mock_model.event_queue = MagicMock()
+        self.mock_model.ilastik_mask_buffers = []
         self.mock_model.active_microscope_name = "Nanoscale"
 
         self.ilastik_segmentation = IlastikSegmentation(self.mock_model)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_data_func_success(self, mock_post):
         frame_ids = [0, 1]
         expected_json_data = {
@@ -175,7 +181,7 @@ class TestIlastikSegmentation(unittest.TestCase):
         called_args, _ = self.mock_model.event_queue.put.call_args
         assert "multiposition" in called_args[0]
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_data_func_failure(self, mock_post):
         frame_ids = [0, 1]
         mock_response = Mock()
@@ -218,5 +224,138 @@ class TestIlastikSegmentation(unittest.TestCase):
         self.mock_model.event_queue.put.assert_called()
 
 
+class SegmentationHandler(BaseHTTPRequestHandler):
+    """Stand-in Ilastik service which thresholds binary frame payloads."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = self.rfile.read(int(self.headers["Content-Length"]))
+        frames = unpack_frames(payload)
+        buffer = BytesIO()
+        np.savez(buffer, *[(frame > 100).astype(np.uint8) for frame in frames])
+        body = buffer.getvalue()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestIlastikBinaryTransport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), SegmentationHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.shape = (32, 48)
+        self.mock_model = Mock()
+        self.mock_model.configuration = {
+            "rest_api_config": {
+                "Ilastik": {
+                    "url": f"http://127.0.0.1:{self.server.server_port}/ilastik",
+                    "transport": "binary",
+                }
+            }
+        }
+        self.mock_model.data_buffer = [
+            np.random.randint(0, 200, size=self.shape, dtype=np.uint16)
+            for _ in range(6)
+        ]
+        self.mock_model.img_height, self.mock_model.img_width = self.shape
+        self.mock_model.display_ilastik_segmentation = True
+        self.mock_model.mark_ilastik_position = False
+        self.mock_model.event_queue = MagicMock()
+        self.mock_model.ilastik_mask_buffers = []
+
+        # the shared mask buffer is reused, keep a copy of each mask and hand the
+        # slot back like the controller does.
+        self.masks = []
+
+        def put(event):
+            assert event[0] == "ilastik_mask"
+            mask_buffer, mask_pending, idx = event[1]
+            assert isinstance(mask_buffer, SharedNDArray)
+            self.masks.append(np.array(mask_buffer[idx]))
+            mask_pending[idx] = 0
+
+        self.mock_model.event_queue.put.side_effect = put
+
+    def assert_masks(self, frame_ids):
+        assert len(self.masks) == len(frame_ids)
+        for mask, idx in zip(self.masks, frame_ids):
+            np.testing.assert_array_equal(mask, self.mock_model.data_buffer[idx] > 100)
+
+    def test_pack_frames(self):
+        frames = self.mock_model.data_buffer[:3]
+        unpacked = unpack_frames(pack_frames(frames))
+        assert unpacked.shape == (3,) + self.shape
+        np.testing.assert_array_equal(unpacked, np.stack(frames))
+        with self.assertRaises(ValueError):
+            unpack_frames(b"\x00" * 16)
+
+    def test_binary_transport(self):
+        ilastik_segmentation = IlastikSegmentation(self.mock_model)
+        ilastik_segmentation.data_func([0, 1])
+        self.assert_masks([0, 1])
+        ilastik_segmentation.cleanup_func()
+
+    def test_pipelined_transport(self):
+        self.mock_model.configuration["rest_api_config"]["Ilastik"][
+            "pipeline_depth"
+        ] = 3
+        ilastik_segmentation = IlastikSegmentation(self.mock_model)
+        for idx in range(6):
+            ilastik_segmentation.data_func([idx])
+        ilastik_segmentation.cleanup_func()
+
+        # masks are delivered in frame order.
+        assert ilastik_segmentation.executor is None
+        self.assert_masks(range(6))
+
+    def test_share_mask_waits_for_controller(self):
+        ilastik_segmentation = IlastikSegmentation(self.mock_model)
+        masks = [np.full(self.shape, i, dtype=np.uint8) for i in range(5)]
+        shared_masks = [ilastik_segmentation.share_mask(mask) for mask in masks]
+
+        # the slots the controller has not read are not overwritten.
+        size = ilastik_segmentation.mask_buffer_size
+        assert shared_masks[size:] == [None] * (5 - size)
+        for i, (mask_buffer, mask_pending, idx) in enumerate(shared_masks[:size]):
+            assert mask_pending[idx] == 1
+            np.testing.assert_array_equal(mask_buffer[idx], masks[i])
+
+        mask_buffer, mask_pending, idx = shared_masks[1]
+        mask_pending[idx] = 0
+        assert ilastik_segmentation.share_mask(masks[4])[2] == idx
+        np.testing.assert_array_equal(mask_buffer[idx], masks[4])
+
+    def test_share_mask_keeps_replaced_buffer(self):
+        import pickle
+
+        ilastik_segmentation = IlastikSegmentation(self.mock_model)
+        mask = np.ones(self.shape, dtype=np.uint8)
+        message = pickle.dumps(ilastik_segmentation.share_mask(mask))
+
+        # a new shape replaces the buffer, the queued mask is still readable.
+        ilastik_segmentation.share_mask(np.ones((16, 16), dtype=np.uint8))
+        assert len(self.mock_model.ilastik_mask_buffers) == 2
+        mask_buffer, mask_pending, idx = pickle.loads(message)
+        np.testing.assert_array_equal(mask_buffer[idx], mask)
+        mask_pending[idx] = 0
+
+        ilastik_segmentation.share_mask(np.ones((16, 16), dtype=np.uint8))
+        assert len(self.mock_model.ilastik_mask_buffers) == 1
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -28,7 +28,10 @@
 # IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
+import io
 import queue
+from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 import numpy as np
@@ -237,3 +240,86 @@ class TestVolumeSearch:
 
         self.model.start(self.feature_list)
         self.verify_volume_search()
+
+
+@pytest.fixture(scope="module")
+def runner():
+    from navigate.model.headless import HeadlessRunner
+
+    base_directory = Path(__file__).resolve().parent.parent.parent.parent
+    configuration_directory = Path.joinpath(base_directory, "src", "navigate", "config")
+    runner = HeadlessRunner(
+        SimpleNamespace(synthetic_hardware=True),
+        configuration_directory / "configuration.yaml",
+        configuration_directory / "experiment.yml",
+        configuration_directory / "waveform_constants.yml",
+        configuration_directory / "rest_api_config.yml",
+        configuration_directory / "waveform_templates.yml",
+        configuration_directory / "multi_positions.yml",
+        output=io.StringIO(),
+    )
+    yield runner
+    runner.close()
+
+
+@pytest.mark.parametrize("is_save", [False, True])
+def test_volume_search_3d(runner, is_save, tmp_path):
+    from tifffile import imread
+    from navigate.model.features.volume_search import VolumeSearch3D
+
+    microscope_state = runner.configuration["experiment"]["MicroscopeState"]
+    microscope_state.update(
+        {
+            "image_mode": "customized",
+            "start_position": 0,
+            "end_position": 10,
+            "step_size": 2,
+            "number_z_steps": 5,
+            "start_focus": 0,
+            "end_focus": 0,
+            "is_multiposition": False,
+        }
+    )
+    runner.configuration["multi_positions"] = []
+    img_width, img_height = runner.model.img_width, runner.model.img_height
+
+    z_stacks = []
+
+    def analysis_function(z_stack_data):
+        z_stacks.append(z_stack_data.copy())
+        labels = np.zeros(z_stack_data.shape, dtype=np.int32)
+        labels[1:4, 64:192, 64:192] = 1
+        return labels
+
+    # binned by 4, first channel only
+    runner.model.feature_list.append(
+        [
+            {
+                "name": VolumeSearch3D,
+                "args": (
+                    "Nanoscale", "N/A", 0, 0.1, "x", "y", 0.05, analysis_function,
+                    1.0, 10, 1, 4,
+                ),
+            }
+        ]
+    )  # fmt: skip
+    runner.feature_id = len(runner.model.feature_list)
+
+    summary = runner.acquire(is_save=is_save, save_directory=tmp_path, timeout=30)
+
+    assert summary["timed_out"] is False
+    assert len(z_stacks) == 1
+    assert z_stacks[0].shape == (5, img_height // 4, img_width // 4)
+    assert z_stacks[0].any()
+    assert len(runner.configuration["multi_positions"]) > 0
+    assert microscope_state["is_multiposition"] is True
+
+    if not is_save:
+        assert list(tmp_path.iterdir()) == []
+        return
+
+    for file_name in ["labels.tiff", "positions.csv", "target_labels.txt"]:
+        assert (tmp_path / file_name).exists()
+    z_stack = imread(tmp_path / "Position0" / "CH00_000000.tiff")
+    binned = z_stack.reshape(5, img_height // 4, 4, img_width // 4, 4).mean(axis=(2, 4))
+    np.testing.assert_array_equal(z_stacks[0], binned.astype(z_stack.dtype))
@@ -70,3 +70,56 @@ def test_bdv_metadata(ext):
     # Make sure we can still write the data.
     md.write_xml(f"test_bdv.{ext}", views)
     os.remove("test_bdv.xml")
+
+
+def test_bdv_view_affine_matrices():
+    from navigate.model.metadata_sources.bdv_metadata import BigDataViewerMetadata
+
+    md = BigDataViewerMetadata()
+    md.shape_t, md.positions, md.shape_c, md.shape_z = 2, 3, 2, 4
+    md.dx, md.dy, md.dz = 0.5, 0.25, 2.0
+    md._coupled_axes = {"z": "f"}
+
+    # stopped early: the last views were not acquired
+    views = [
+        dict(zip(["x", "y", "z", "theta", "f"], np.random.uniform(-1e3, 1e3, 5)))
+        for _ in range(40)
+    ]
+    matrices = md.bdv_view_affine_matrices(views)
+    assert matrices.shape == (2, 3, 2, 3, 4)
+
+    for t in range(md.shape_t):
+        for p in range(md.positions):
+            for c in range(md.shape_c):
+                expected = np.zeros((3, 4))
+                for z in range(md.shape_z):
+                    i = z + md.shape_z * (c + md.shape_c * (p + md.positions * t))
+                    if i < len(views):
+                        expected += (
+                            md.stage_positions_to_affine_matrix(**views[i])
+                            / md.shape_z
+                        )
+                np.testing.assert_allclose(matrices[t, p, c], expected)
+
+
+def test_bdv_write_xml_views(tmp_path):
+    import xml.etree.ElementTree as ET
+    from navigate.model.metadata_sources.bdv_metadata import BigDataViewerMetadata
+
+    md = BigDataViewerMetadata()
+    md.shape_t, md.positions, md.shape_c, md.shape_z = 1, 5, 3, 2
+    md.shear_data = True
+    views = [
+        {"x": float(i), "y": 0.0, "z": 0.0, "theta": 0.0, "f": 0.0}
+        for i in range(30)
+    ]
+    md.write_xml(str(tmp_path / "test_bdv.h5"), views)
+
+    registrations = [
+        el
+        for _, el in ET.iterparse(tmp_path / "test_bdv.xml")
+        if el.tag == "ViewRegistration"
+    ]
+    assert len(registrations) == 15
+    assert [int(el.attrib["setup"]) for el in registrations[:3]] == [0, 5, 10]
+    assert all(len(el.findall("ViewTransform")) == 2 for el in registrations)
@@ -41,3 +41,32 @@ def test_ome_metadata_valid(dummy_model):
     os.remove("test.xml")
 
     assert "No validation errors found." in output
+
+
+def test_ome_plane_positions_coupled_axes(dummy_model):
+    from navigate.model.data_sources.pose_log import PoseLog
+    from navigate.model.metadata_sources.ome_tiff_metadata import OMETIFFMetadata
+
+    md = OMETIFFMetadata()
+    md.configuration = dummy_model.configuration
+    md.shape_c, md.shape_z = 2, 3
+    md._coupled_axes = {"z": "f"}
+
+    # the focus axis moves along z, both in microns
+    views = PoseLog()
+    for i in range(md.shape_c * md.shape_z):
+        views.append(i, x=10.0 * i, y=-5.0 * i, z=100.0 + i, f=2.5 * i)
+
+    ome_dict = md.ome_tiff_xml_dict(views=views)
+    planes = ome_dict["Image"]["Pixels"]["Plane"]
+    assert len(planes) == md.shape_c
+    for c, plane in enumerate(planes):
+        view = views[c * md.shape_z]
+        assert plane["TheC"] == str(c)
+        assert plane["PositionX"] == view["x"]
+        assert plane["PositionY"] == view["y"]
+        assert plane["PositionZ"] == view["z"] + view["f"]
+
+    # the logged poses are left untouched
+    assert views[md.shape_z]["z"] == 100.0 + md.shape_z
+    views.close()
@@ -0,0 +1,149 @@
+import itertools
+import pickle
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("per_stack", [True, False])
+@pytest.mark.parametrize("shape", [(1, 1, 1, 1), (3, 1, 2, 4), (2, 5, 3, 2)])
+def test_plan_matches_frame_indices(shape, per_stack):
+    from navigate.model.acquisition_plan import AcquisitionPlan, frame_indices
+
+    plan = AcquisitionPlan(*shape, per_stack=per_stack, shared=False)
+    assert len(plan) == np.prod(shape)
+    for frame_id in range(len(plan)):
+        assert plan.indices(frame_id) == frame_indices(frame_id, *shape, per_stack)
+
+    # every (c, z, t, p) is planned exactly once
+    rows = set(plan.indices(frame_id) for frame_id in range(len(plan)))
+    assert rows == set(itertools.product(*[range(n) for n in shape]))
+
+
+def test_plan_from_configuration():
+    from test.model.dummy import DummyModel
+    from navigate.model.acquisition_plan import AcquisitionPlan
+
+    model = DummyModel()
+    configuration = model.configuration
+    state = configuration["experiment"]["MicroscopeState"]
+    state["image_mode"] = "z-stack"
+    state["stack_cycling_mode"] = "per_stack"
+    state["number_z_steps"] = 4
+    state["start_position"] = -10.0
+    state["step_size"] = 5.0
+    state["start_focus"] = 0.0
+    state["end_focus"] = 40.0
+    state["timepoints"] = 2
+    state["is_multiposition"] = True
+    configuration["multi_positions"] = [[1, 2, 3, 4, 5], [10, 20, 30, 40, 50]]
+    channels = [ch for ch in state["channels"].values() if ch["is_selected"]]
+
+    plan = AcquisitionPlan.from_configuration(configuration, shared=False)
+    assert plan.matches(len(channels), 4, 2, 2, True)
+    assert len(plan) == len(channels) * 4 * 2 * 2
+
+    for row in plan.table:
+        c, z, p = row["channel"], row["slice"], row["position"]
+        position = configuration["multi_positions"][p]
+        assert row["x"] == position[0]
+        assert row["theta"] == position[3]
+        assert row["z"] == position[2] - 10.0 + 5.0 * z
+        assert row["f"] == pytest.approx(
+            position[4] + 10.0 * z + float(channels[c]["defocus"])
+        )
+        assert row["exposure"] == pytest.approx(
+            channels[c]["camera_exposure_time"] / 1000
+        )
+
+    np.testing.assert_allclose(
+        np.diff(plan.table["start_time"]), plan.table["exposure"][:-1], rtol=1e-6
+    )
+
+    state["image_mode"] = "single"
+    plan = AcquisitionPlan.from_configuration(configuration, shared=False)
+    assert plan.shape_z == 1
+    assert len(plan) == len(channels) * 2 * 2
+
+    for image_mode in ["live", "customized"]:
+        state["image_mode"] = image_mode
+        assert AcquisitionPlan.from_configuration(configuration) is None
+
+
+def test_plan_channel_order():
+    from test.model.dummy import DummyModel
+    from navigate.model.acquisition_plan import AcquisitionPlan
+
+    model = DummyModel()
+    configuration = model.configuration
+    state = configuration["experiment"]["MicroscopeState"]
+    state["image_mode"] = "z-stack"
+    state["stack_cycling_mode"] = "per_z"
+    state["number_z_steps"] = 2
+    state["timepoints"] = 1
+    state["is_multiposition"] = False
+    for i, channel in enumerate(state["channels"].values()):
+        channel["is_selected"] = True
+        channel["camera_exposure_time"] = 10.0 * (i + 1)
+    channels = list(state["channels"].values())
+    order = list(range(len(channels)))[::-1]
+
+    plan = AcquisitionPlan.from_configuration(
+        configuration, shared=False, channel_order=order
+    )
+    assert plan.matches(len(channels), 2, 1, 1, False)
+    # frames follow the acquisition order and keep their configured channel
+    assert list(plan.table["channel"][: len(channels)]) == order
+    for row in plan.table:
+        assert row["exposure"] == pytest.approx(
+            channels[row["channel"]]["camera_exposure_time"] / 1000
+        )
+
+
+def test_plan_remaining_time():
+    from navigate.model.acquisition_plan import AcquisitionPlan
+
+    plan = AcquisitionPlan(2, 3, 1, 1, shared=False)
+    plan.table["exposure"] = [0.1, 0.1, 0.1, 0.5, 0.5, 0.5]
+    plan.table["start_time"][1:] = np.cumsum(plan.table["exposure"][:-1])
+
+    assert plan.remaining_time(0) == pytest.approx(1.8)
+    assert plan.remaining_time(3) == pytest.approx(1.5)
+    assert plan.remaining_time(6) == 0
+    # the frames so far took twice as long as planned
+    assert plan.remaining_time(3, elapsed_time=0.6) == pytest.approx(3.0)
+
+
+def test_plan_is_shared():
+    from navigate.model.acquisition_plan import AcquisitionPlan
+
+    plan = AcquisitionPlan(2, 3, 2, 1)
+    plan.table["x"] = np.arange(len(plan))
+
+    # Pickling, as done between the model and the controller, shares the table.
+    copy = pickle.loads(pickle.dumps(plan))
+    np.testing.assert_array_equal(copy.table, plan.table)
+    plan.table["y"][5] = 42
+    assert copy.table["y"][5] == 42
+
+
+def test_data_source_uses_plan():
+    from navigate.model.acquisition_plan import AcquisitionPlan
+    from navigate.model.data_sources.data_source import DataSource
+
+    ds = DataSource()
+    ds.metadata = type("Metadata", (), {"per_stack": False})()
+    ds.shape_c, ds.shape_z, ds.shape_t, ds.positions = 2, 3, 2, 2
+    expected = [ds._cztp_indices(i, False) for i in range(24)]
+
+    ds.set_acquisition_plan(AcquisitionPlan(2, 3, 2, 3, per_stack=False))
+    assert ds._plan is None
+
+    plan = AcquisitionPlan(2, 3, 2, 2, per_stack=False)
+    ds.set_acquisition_plan(plan)
+    assert ds._plan is plan
+    assert [ds._cztp_indices(i, False) for i in range(24)] == expected
+
+    # stopped after the second z-slice of the first stack
+    ds._check_shape(3, False)
+    assert (ds.shape_c, ds.shape_z, ds.shape_t, ds.positions) == (2, 2, 1, 1)
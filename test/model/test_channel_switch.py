@@ -0,0 +1,159 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+# Standard Library Imports
+import threading
+import time
+
+# Third Party Imports
+import pytest
+
+# Local Imports
+from navigate.model.channel_switch import (
+    ChannelSwitchPlanner,
+    device_resource,
+    order_channels,
+)
+
+
+class Device:
+    def __init__(self, device_connection=None):
+        self.device_connection = device_connection
+
+
+def test_device_resource():
+    device = Device()
+    assert device_resource(device) is device
+    connection = object()
+    assert device_resource(Device(connection)) is connection
+    assert device_resource(None) is None
+
+
+def test_plan_lanes():
+    daq, camera, wheel = object(), object(), object()
+    operations = [
+        ("filter_wheel", [wheel], None),
+        ("camera", [camera], None),
+        ("lasers", [object(), object()], None),
+        ("daq", [daq], None),
+        ("stage", [daq], None),
+        ("camera_and_wheel", [camera, wheel], None),
+    ]
+    lanes = ChannelSwitchPlanner.plan(operations)
+    names = sorted([name for name, _, _ in lane] for lane in lanes)
+    assert names == [
+        ["daq", "stage"],
+        ["filter_wheel", "camera", "camera_and_wheel"],
+        ["lasers"],
+    ]
+
+
+def test_run_concurrently():
+    planner = ChannelSwitchPlanner()
+    events = []
+
+    def operation(name, duration):
+        def run():
+            time.sleep(duration)
+            events.append((name, threading.current_thread().name))
+
+        return run
+
+    daq = object()
+    operations = [
+        ("filter_wheel", [object()], operation("filter_wheel", 0.1)),
+        ("camera", [object()], operation("camera", 0.1)),
+        ("daq", [daq], operation("daq", 0.05)),
+        ("stage", [daq], operation("stage", 0.05)),
+    ]
+    start = time.perf_counter()
+    planner.run(operations)
+    elapsed = time.perf_counter() - start
+    try:
+        # the barrier waits for every operation
+        assert sorted(name for name, _ in events) == [
+            "camera",
+            "daq",
+            "filter_wheel",
+            "stage",
+        ]
+        assert 0.1 <= elapsed < 0.25
+        # operations sharing a resource run in order
+        names = [name for name, _ in events]
+        assert names.index("daq") < names.index("stage")
+        assert set(planner.timings) == {"filter_wheel", "camera", "daq", "stage"}
+        assert planner.timings["filter_wheel"] >= 0.1
+        assert planner.switch_time == pytest.approx(elapsed, abs=0.05)
+    finally:
+        planner.shutdown()
+
+
+def test_run_raises_after_barrier():
+    planner = ChannelSwitchPlanner()
+    finished = []
+
+    def fail():
+        raise ValueError("Unknown filter name")
+
+    operations = [
+        ("filter_wheel", [object()], fail),
+        ("camera", [object()], lambda: (time.sleep(0.05), finished.append(1))),
+        ("lasers", [object()], lambda: (time.sleep(0.05), finished.append(1))),
+    ]
+    with pytest.raises(ValueError):
+        planner.run(operations)
+    assert finished == [1, 1]
+
+    # sequential operation
+    planner.max_workers = 0
+    with pytest.raises(ValueError):
+        planner.run(operations)
+    planner.shutdown()
+
+
+def test_order_channels():
+    positions = {1: 0, 2: 3, 3: 1, 4: 2}
+
+    def travel(a, b):
+        return abs(positions[a] - positions[b])
+
+    def cost(order):
+        return sum(travel(a, b) for a, b in zip(order, order[1:] + order[:1]))
+
+    # the wheel travels 0 -> 3 -> 1 -> 2 -> 0 in configured order
+    assert cost([1, 2, 3, 4]) == 8
+    assert cost(order_channels([1, 2, 3, 4], travel)) == 6
+    assert cost(order_channels([1, 2, 3, 4], travel, max_exhaustive=2)) == 6
+    assert order_channels([1, 2, 3, 4], travel, cyclic=False) == [1, 3, 4, 2]
+    # ties keep the configured order
+    assert order_channels([1, 3, 4], travel) == [1, 3, 4]
+    assert order_channels([2, 1], travel) == [2, 1]
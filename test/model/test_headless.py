@@ -0,0 +1,212 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only (subject to the
+# limitations in the disclaimer below) provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+# Standard Library Imports
+import io
+import json
+import queue
+from pathlib import Path
+from types import SimpleNamespace
+
+# Third Party Imports
+import pytest
+
+# Local Imports
+
+
+@pytest.fixture(scope="module")
+def runner():
+    from navigate.model.headless import HeadlessRunner
+
+    configuration_directory = Path.joinpath(
+        Path(__file__).resolve().parent.parent.parent, "src", "navigate", "config"
+    )
+    runner = HeadlessRunner(
+        SimpleNamespace(synthetic_hardware=True),
+        configuration_directory / "configuration.yaml",
+        configuration_directory / "experiment.yml",
+        configuration_directory / "waveform_constants.yml",
+        configuration_directory / "rest_api_config.yml",
+        configuration_directory / "waveform_templates.yml",
+        configuration_directory / "multi_positions.yml",
+        output=io.StringIO(),
+    )
+    yield runner
+    runner.close()
+
+
+def read_records(runner):
+    records = [json.loads(line) for line in runner.output.getvalue().splitlines()]
+    runner.output.seek(0)
+    runner.output.truncate()
+    return records
+
+
+def test_headless_no_tk():
+    import sys
+    import subprocess
+
+    # the test session has imported tkinter already, check in a new interpreter
+    modules = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, navigate.model.headless; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    assert "navigate.model.headless" in modules
+    assert not [m for m in modules if m.startswith("tkinter")]
+    assert not [m for m in modules if m.startswith("navigate.view")]
+
+
+def test_headless_single_acquisition(runner):
+    read_records(runner)
+    channels = runner.configuration["experiment"]["MicroscopeState"]["channels"]
+    n_frames = len([c for c in channels.values() if c["is_selected"]])
+
+    summary = runner.acquire(image_mode="single", is_save=False)
+
+    assert summary["frames"] == n_frames
+    assert summary["timed_out"] is False
+    records = read_records(runner)
+    assert records[0]["event"] == "start"
+    assert records[-1] == {"event": "done", "time": records[-1]["time"], **summary}
+    frames = [r for r in records if r["event"] == "frame"]
+    assert [r["frames"] for r in frames] == list(range(1, n_frames + 1))
+    assert all(r["fps"] > 0 for r in frames)
+
+
+def test_headless_feature_list(runner):
+    runner.load_feature_list('[{"name": PrepareNextChannel}]')
+    assert runner.configuration["experiment"]["MicroscopeState"]["image_mode"] == (
+        "customized"
+    )
+
+    # the feature list is run again by the second acquisition
+    for _ in range(2):
+        summary = runner.acquire(is_save=False)
+        assert summary["image_mode"] == "customized"
+        assert summary["frames"] == 1
+
+
+def test_headless_parser(tmp_path):
+    from navigate.model.headless import create_headless_parser
+
+    args = create_headless_parser().parse_args(
+        ["-sh", "--mode", "z-stack", "--no-save", "--metrics-file", "m.jsonl"]
+    )
+    assert args.synthetic_hardware is True
+    assert args.mode == "z-stack"
+    assert args.save is False
+    assert args.metrics_file == Path("m.jsonl")
+    assert args.repeat == 1
+
+
+def test_headless_trace(runner):
+    from navigate.tools.tracing import tracer
+
+    tracer.clear()
+    tracer.enable()
+    try:
+        summary = runner.acquire(image_mode="single", is_save=False)
+    finally:
+        tracer.disable()
+
+    spans = [e for e in tracer.chrome_trace_events("model") if e["ph"] == "X"]
+    tracer.clear()
+    names = [e["name"] for e in spans]
+    assert names.count("show_img_pipe.send") == summary["frames"]
+    assert names.count("DataContainer.run") == summary["frames"]
+    assert names.count("camera.get_new_frame") >= summary["frames"]
+
+
+def test_headless_stalled_acquisition():
+    from unittest.mock import MagicMock
+    from navigate.model.headless import HeadlessRunner
+
+    runner = HeadlessRunner.__new__(HeadlessRunner)
+    runner.output = io.StringIO()
+    runner.report_every = 1
+    runner.configuration = {
+        "experiment": {
+            "MicroscopeState": {"image_mode": "single", "is_save": False},
+            "Saving": {},
+        }
+    }
+    runner.event_queue = MagicMock()
+    runner.event_queue.get_nowait.side_effect = queue.Empty
+    runner.model = MagicMock()
+    runner.model.data_thread = None
+    runner.show_img_pipe = MagicMock()
+    runner.show_img_pipe.poll.return_value = False
+    runner.terminated = False
+
+    # neither frames nor the stop arrive, both waits are bounded
+    summary = runner.acquire(timeout=0.01)
+
+    assert summary["timed_out"] is True
+    assert summary["stalled"] is True
+    assert runner.show_img_pipe.poll.call_count == 2
+    runner.show_img_pipe.poll.assert_called_with(0.01)
+    runner.model.run_command.assert_any_call("stop")
+    runner.model.terminate.assert_called_once()
+    events = [r["event"] for r in read_records(runner)]
+    assert events == ["start", "timeout", "stall", "done"]
+
+    # the model is terminated only once, and not reused
+    runner.terminate()
+    runner.model.terminate.assert_called_once()
+    with pytest.raises(RuntimeError):
+        runner.acquire(timeout=0.01)
+
+
+def test_headless_main_exit_code(monkeypatch):
+    from unittest.mock import MagicMock
+    import navigate.model.headless as headless
+
+    runner = MagicMock()
+    runner.acquire.return_value = {"stalled": True}
+    monkeypatch.setattr(headless, "HeadlessRunner", MagicMock(return_value=runner))
+    monkeypatch.setattr(headless, "log_setup", MagicMock())
+
+    assert headless.main(["-sh", "--repeat", "3", "--timeout", "1"]) == 1
+    # the terminated model is not used for the remaining repeats
+    runner.acquire.assert_called_once()
+    runner.close.assert_called_once()
+
+    runner.acquire.return_value = {"stalled": False}
+    runner.acquire.reset_mock()
+    assert headless.main(["-sh", "--repeat", "3"]) == 0
+    assert runner.acquire.call_count == 3
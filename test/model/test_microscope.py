@@ -120,6 +120,77 @@ def test_prepare_next_channel(dummy_microscope):
     )
 
 
+def test_prepare_next_channel_timings(dummy_microscope):
+    dummy_microscope.prepare_acquisition()
+    dummy_microscope.prepare_next_channel()
+
+    timings = dummy_microscope.channel_switch.timings
+    for k in dummy_microscope.filter_wheel:
+        assert f"filter_wheel {k}" in timings
+    for name in ["camera", "lasers", "daq", "defocus"]:
+        assert timings[name] >= 0
+    assert dummy_microscope.channel_switch.switch_time >= max(timings.values())
+
+    # the DAQ can be left untouched
+    dummy_microscope.prepare_next_channel(update_daq_task_flag=False)
+    assert "daq" not in dummy_microscope.channel_switch.timings
+
+
+def test_optimize_channel_order(dummy_microscope):
+    dummy_microscope.prepare_acquisition()
+    channels = list(dummy_microscope.available_channels)
+
+    channel_order = dummy_microscope.optimize_channel_order()
+    assert sorted(dummy_microscope.available_channels) == sorted(channels)
+    assert [channels[i] for i in channel_order] == (
+        dummy_microscope.available_channels
+    )
+
+
+def test_camera_correction(dummy_microscope):
+    import numpy as np
+
+    camera_config = dummy_microscope.configuration["configuration"]["microscopes"][
+        dummy_microscope.microscope_name
+    ]["camera"]
+    camera_parameters = dummy_microscope.configuration["experiment"][
+        "CameraParameters"
+    ][dummy_microscope.microscope_name]
+    height, width = int(camera_parameters["y_pixels"]), int(
+        camera_parameters["x_pixels"]
+    )
+    camera = dummy_microscope.camera
+    camera._offset = np.full((2 * height, 2 * width), 100, dtype=np.uint16)
+    camera._flatfield = np.full((2 * height, 2 * width), 0.5)
+    center_x, center_y = camera_parameters["center_x"], camera_parameters["center_y"]
+    camera_parameters["center_x"], camera_parameters["center_y"] = width, height
+    camera_config["correction"] = {"workers": 2}
+    try:
+        dummy_microscope.prepare_acquisition()
+        assert dummy_microscope.camera_correction.shape == (height, width)
+
+        frames = [np.full((height, width), 1100, dtype=np.uint16) for _ in range(2)]
+        data_buffer = dummy_microscope.data_buffer
+        dummy_microscope.data_buffer = frames
+        dummy_microscope.correct_frames([1])
+        dummy_microscope.data_buffer = data_buffer
+        assert np.all(frames[0] == 1100)
+        assert np.all(frames[1] == 2000)
+
+        camera_config["correction"] = {"offset": False, "flatfield": False}
+        dummy_microscope.prepare_acquisition()
+        assert dummy_microscope.camera_correction is None
+    finally:
+        del camera_config["correction"]
+        camera._offset, camera._flatfield = None, None
+        camera_parameters["center_x"], camera_parameters["center_y"] = (
+            center_x,
+            center_y,
+        )
+        dummy_microscope.prepare_camera_correction()
+    assert dummy_microscope.camera_correction is None
+
+
 def test_calculate_all_waveform(dummy_microscope):
     # set waveform template to default
     dummy_microscope.configuration["experiment"]["MicroscopeState"][
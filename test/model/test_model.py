@@ -272,6 +272,99 @@ def test_multiposition_acquisition(model):
     model.release_pipe("show_img_pipe")
 
 
+def test_overview_acquisition(model):
+    from navigate.config.config import update_config_dict
+
+    state = model.configuration["experiment"]["MicroscopeState"]
+    state["image_mode"] = "z-stack"
+    state["is_save"] = False
+    state["is_multiposition"] = True
+    state["number_z_steps"] = 3
+    state["timepoints"] = 1
+    update_config_dict(
+        model.__test_manager,  # noqa
+        model.configuration,
+        "multi_positions",
+        [[0.0, 0.0, 10.0, 0.0, 10.0], [1000.0, 500.0, 10.0, 0.0, 10.0]],
+    )
+    n_channels = len([c for c in state["channels"].values() if c["is_selected"]])
+
+    _ = model.create_pipe("show_img_pipe")
+    model.run_command("acquire")
+    assert model.get_overview_buffer() is model.overview
+    model.data_thread.join()
+    model.release_pipe("show_img_pipe")
+
+    # One tile per channel and position.
+    assert model.overview.revision[0] == 2 * n_channels
+    assert model.overview.shape[0] == n_channels
+    assert model.get_overview_buffer() is None
+
+    update_config_dict(
+        model.__test_manager, model.configuration, "multi_positions", []  # noqa
+    )
+
+
+def test_mip_batches_spanning_stacks(model, tmp_path):
+    import numpy as np
+    from tifffile import imread
+    from navigate.config.config import update_config_dict
+
+    experiment = model.configuration["experiment"]
+    state = experiment["MicroscopeState"]
+    state["image_mode"] = "z-stack"
+    state["is_save"] = True
+    state["is_multiposition"] = False
+    state["stack_cycling_mode"] = "per_stack"
+    state["number_z_steps"] = 3
+    state["timepoints"] = 2
+    save_directory = experiment["Saving"]["save_directory"]
+    file_type = experiment["Saving"]["file_type"]
+    experiment["Saving"]["save_directory"] = str(tmp_path)
+    experiment["Saving"]["file_type"] = "TIFF"
+    update_config_dict(
+        model.__test_manager, model.configuration, "multi_positions", []  # noqa
+    )
+    n_channels = len([c for c in state["channels"].values() if c["is_selected"]])
+
+    # Hand the data thread several frames at once, so that the batches cross the
+    # end of each stack.
+    camera = model.active_microscope.camera
+    get_new_frame = camera.get_new_frame
+
+    def get_batch():
+        frame_ids = get_new_frame()
+        while frame_ids and len(frame_ids) < 4:
+            new_frame_ids = get_new_frame()
+            if not new_frame_ids:
+                break
+            frame_ids += new_frame_ids
+        return frame_ids
+
+    camera.get_new_frame = get_batch
+    show_img_pipe = model.create_pipe("show_img_pipe")
+    try:
+        model.run_command("acquire")
+        while show_img_pipe.recv() != "stop":
+            pass
+        model.data_thread.join()
+        assert model.image_writer.is_mip_shared
+    finally:
+        del camera.get_new_frame
+        model.release_pipe("show_img_pipe")
+        state["is_save"] = False
+        state["timepoints"] = 1
+        experiment["Saving"]["save_directory"] = save_directory
+        experiment["Saving"]["file_type"] = file_type
+
+    for c in range(n_channels):
+        for t in range(2):
+            stack = imread(tmp_path / f"CH0{c}_{t:06}.tiff")
+            mip = imread(tmp_path / "MIP" / f"P0000_CH0{c}_{t:06}.tif")
+            assert stack.shape[0] == 3
+            np.testing.assert_array_equal(mip, stack.max(axis=0))
+
+
 def test_change_resolution(model):
     """
     Note: The stage position check is an absolute mess due to us instantiating two
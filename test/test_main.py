@@ -55,6 +55,8 @@ def get_args():
     args.gui_config_file = False
     args.logging_config = False
     args.synthetic_hardware = True
+    args.profile_startup = False
+    args.trace = False
     return args
 
 
@@ -66,7 +68,7 @@ class TestArgParser(unittest.TestCase):
         parser = create_parser()
 
         # Boolean arguments
-        input_arguments = ["-sh", "--synthetic-hardware"]
+        input_arguments = ["-sh", "--synthetic-hardware", "--profile-startup"]
         for arg in input_arguments:
             parser.parse_args([arg])
 
@@ -88,7 +90,7 @@ class TestMainController(unittest.TestCase):
     """Unit Test for main.py"""
 
     @patch("navigate.main.tk.Tk.mainloop")
-    @patch("navigate.main.Controller")
+    @patch("navigate.controller.controller.Controller")
     @patch("argparse.ArgumentParser.parse_args")
     def test_main_call_controller(
         self, mock_parse_args, mock_controller, mock_mainloop
@@ -31,6 +31,7 @@
 
 # Standard library imports
 import unittest
+import unittest.mock
 import os
 from datetime import datetime
 import json
@@ -43,7 +44,10 @@ from navigate.tools.file_functions import (
     save_yaml_file,
     delete_folder,
     load_yaml_file,
+    parse_yaml_file,
+    get_yaml_cache_path,
 )
+import navigate.tools.file_functions as file_functions
 
 
 class CreateSavePathTestCase(unittest.TestCase):
@@ -254,5 +258,42 @@ class TestLoadYamlFile(unittest.TestCase):
         self.assertIsNone(result)
 
 
+class TestParseYamlFileCache(unittest.TestCase):
+    def setUp(self) -> None:
+        os.mkdir("test_dir")
+        self.save_root = "test_dir"
+        self.cache_directory = file_functions.YAML_CACHE_DIRECTORY
+        file_functions.YAML_CACHE_DIRECTORY = os.path.join(self.save_root, "cache")
+        self.file_path = os.path.join(self.save_root, "test.yml")
+        with open(self.file_path, "w") as f:
+            f.write("a: 1\nb: [1, 2, {c: 3}]\n")
+
+    def tearDown(self) -> None:
+        file_functions.YAML_CACHE_DIRECTORY = self.cache_directory
+        delete_folder("test_dir")
+
+    def test_cache_is_written_and_reused(self):
+        expected = {"a": 1, "b": [1, 2, {"c": 3}]}
+        assert parse_yaml_file(self.file_path) == expected
+        cache_path = get_yaml_cache_path(self.file_path)
+        assert cache_path.exists()
+
+        # A cache hit must not parse the yaml file again.
+        with unittest.mock.patch("yaml.load") as mock_yaml_load:
+            assert parse_yaml_file(self.file_path) == expected
+            mock_yaml_load.assert_not_called()
+
+    def test_cache_is_invalidated_by_changes(self):
+        parse_yaml_file(self.file_path)
+        with open(self.file_path, "w") as f:
+            f.write("a: 2\n")
+        assert parse_yaml_file(self.file_path) == {"a": 2}
+        assert load_yaml_file(self.file_path) == {"a": 2}
+
+    def test_without_cache(self):
+        assert parse_yaml_file(self.file_path, use_cache=False)["a"] == 1
+        assert not os.path.exists(file_functions.YAML_CACHE_DIRECTORY)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,83 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard library imports
+import os
+import sys
+import time
+
+# Third party imports
+
+# Local application imports
+from navigate.tools.startup_profiler import StartupProfiler, PROFILE_STARTUP_VARIABLE
+
+
+def test_startup_profiler_times_imports(tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_STARTUP_VARIABLE, raising=False)
+    (tmp_path / "slow_profiled_module.py").write_text(
+        "import time\nimport fast_profiled_module\ntime.sleep(0.05)\n"
+    )
+    (tmp_path / "fast_profiled_module.py").write_text("x = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = StartupProfiler()
+    profiler.enable()
+    try:
+        import slow_profiled_module  # noqa: F401
+    finally:
+        profiler.disable()
+        sys.modules.pop("slow_profiled_module", None)
+        sys.modules.pop("fast_profiled_module", None)
+
+    assert profiler.imports["slow_profiled_module"] >= 0.05
+    # nested imports are not counted twice
+    assert profiler.imports["fast_profiled_module"] < 0.05
+    assert profiler._import_timer is None
+    assert "slow_profiled_module" in profiler.report()
+
+    # child processes inherit the setting
+    assert os.environ[PROFILE_STARTUP_VARIABLE] == "1"
+
+
+def test_startup_profiler_times_steps():
+    profiler = StartupProfiler()
+    with profiler.time("connect", "camera"):
+        pass
+    assert profiler.steps == []
+
+    profiler.enabled = True
+    with profiler.time("connect", "camera"):
+        time.sleep(0.01)
+    category, name, seconds = profiler.steps[0]
+    assert (category, name) == ("connect", "camera")
+    assert seconds >= 0.01
+    assert "connect" in profiler.report()
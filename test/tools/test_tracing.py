@@ -0,0 +1,117 @@
+# Copyright (c) 2021-2024  The University of Texas Southwestern Medical Center.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted for academic and research use only
+# (subject to the limitations in the disclaimer below)
+# provided that the following conditions are met:
+
+#      * Redistributions of source code must retain the above copyright notice,
+#      this list of conditions and the following disclaimer.
+
+#      * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+
+#      * Neither the name of the copyright holders nor the names of its
+#      contributors may be used to endorse or promote products derived from this
+#      software without specific prior written permission.
+
+# NO EXPRESS OR IMPLIED LICENSES TO ANY PARTY'S PATENT RIGHTS ARE GRANTED BY
+# THIS LICENSE. THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+# Standard library imports
+import json
+import threading
+
+# Third party imports
+
+# Local application imports
+from navigate.tools.tracing import SpanTracer, TRACE_VARIABLE
+
+
+def test_tracer_disabled_records_nothing():
+    tracer = SpanTracer()
+    with tracer.span("camera.get_new_frame"):
+        pass
+    assert tracer.span("a") is tracer.span("b")
+    assert tracer.chrome_trace_events() == []
+
+
+def test_tracer_export_chrome_trace(tmp_path, monkeypatch):
+    monkeypatch.delenv(TRACE_VARIABLE, raising=False)
+    tracer = SpanTracer()
+    tracer.enable()
+    try:
+        import os
+
+        assert os.environ[TRACE_VARIABLE] == "1"
+
+        def work():
+            for i in range(3):
+                with tracer.span("show_img_pipe.send", frame=i):
+                    pass
+
+        thread = threading.Thread(target=work, name="Data")
+        thread.start()
+        thread.join()
+        with tracer.span("DataContainer.run", frames=[0, 1]):
+            pass
+    finally:
+        tracer.disable()
+
+    # spans are not recorded after disabling
+    with tracer.span("ignored"):
+        pass
+
+    file_name = tmp_path / "trace.json"
+    assert tracer.export_chrome_trace(str(file_name), "model") == 7
+    with open(file_name) as f:
+        events = json.load(f)["traceEvents"]
+
+    assert events[0] == {
+        "name": "process_name",
+        "ph": "M",
+        "pid": events[0]["pid"],
+        "args": {"name": "model"},
+    }
+    threads = {
+        e["tid"]: e["args"]["name"] for e in events if e["name"] == "thread_name"
+    }
+    assert "Data" in threads.values()
+
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [e["name"] for e in spans] == ["show_img_pipe.send"] * 3 + [
+        "DataContainer.run"
+    ]
+    assert [e["args"] for e in spans] == [
+        {"frame": 0},
+        {"frame": 1},
+        {"frame": 2},
+        {"frames": [0, 1]},
+    ]
+    assert threads[spans[0]["tid"]] == "Data"
+    assert spans[0]["tid"] != spans[-1]["tid"]
+    assert all(e["dur"] >= 0 for e in spans)
+    assert spans[0]["ts"] <= spans[1]["ts"] <= spans[2]["ts"]
+
+
+def test_tracer_ring_keeps_latest_spans():
+    tracer = SpanTracer(ring_size=4)
+    for i in range(10):
+        tracer.record(f"span {i}", i, i + 1)
+    events = [e for e in tracer.chrome_trace_events() if e["ph"] == "X"]
+    assert [e["name"] for e in events] == [f"span {i}" for i in range(6, 10)]
+
+    tracer.clear()
+    assert [e for e in tracer.chrome_trace_events() if e["ph"] == "X"] == []
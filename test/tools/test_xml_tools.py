@@ -32,6 +32,7 @@
 
 # Standard library imports
 import glob
+import io
 import xml.etree.ElementTree as ET
 import unittest
 
@@ -187,5 +188,41 @@ class TestParseXml(unittest.TestCase):
         }
         self.assertEqual(parse_xml(root), expected_dict)
 
+
+class TestWriteDictToXml(unittest.TestCase):
+    def setUp(self):
+        self.d = {
+            "version": 0.2,
+            "Empty": {},
+            "Note": {"Key": "Note", "text": "text"},
+            "Group": {
+                "text": "mixed",
+                "Item": [{"id": {"text": i}} for i in range(3)],
+            },
+            "Items": {"Item": []},
+        }
+
+    def test_matches_dict_to_xml(self):
+        fp = io.StringIO()
+        xml_tools.write_dict_to_xml(fp, self.d, "root")
+        self.assertEqual(fp.getvalue(), xml_tools.dict_to_xml(self.d, "root"))
+
+    def test_generator_children(self):
+        expected = xml_tools.dict_to_xml(self.d, "root")
+        self.d["Group"]["Item"] = ({"id": {"text": i}} for i in range(3))
+        fp = io.StringIO()
+        xml_tools.write_dict_to_xml(fp, self.d, "root")
+        self.assertEqual(fp.getvalue(), expected)
+
+        # the streamed document can be parsed incrementally
+        fp.seek(0)
+        ids = [
+            el.text
+            for _, el in ET.iterparse(io.BytesIO(fp.getvalue().encode()))
+            if el.tag == "id"
+        ]
+        self.assertEqual(ids, ["0", "1", "2"])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file